@@ -0,0 +1,151 @@
+"""
+Reference implementations and synthetic inputs shared by the benchmarks and the tests.
+
+Each benchmark times the current code against the implementation it replaced; the tests
+check both give the same result. Kept out of the bench_* scripts so a test imports no
+benchmark.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from constants import LORA_CFG
+from core.transmitter.SX126x import SX126x
+from core.transmitter.mock_bus import MockGpio, MockSpiDev
+from utils.dedup import dedup_keep, group_keys
+from utils.distance_utils import haversine_m
+
+DEDUP_DISTANCE_M = 10.0
+
+
+def dedup_by_id_and_distance_dataframe(batch_df: pd.DataFrame, distance_m: float = DEDUP_DISTANCE_M) -> pd.DataFrame:
+    """The DataFrame implementation previously used by DetectionWithGPS.dedup_by_id_and_distance."""
+    if batch_df.empty:
+        return batch_df
+
+    keep_rows = []
+    grouped = batch_df.groupby(["label", "id"], dropna=False)
+    for (_, _id), group in grouped:
+        selected = []
+        for idx, row in group.sort_values("ts").iterrows():
+            if not selected:
+                selected.append((idx, row))
+                continue
+            too_close = any(
+                haversine_m(row["lat"], row["lon"], kept["lat"], kept["lon"]) < distance_m
+                for _, kept in selected
+            )
+            if not too_close:
+                selected.append((idx, row))
+        keep_rows.extend([i for i, _ in selected])
+
+    return batch_df.loc[keep_rows].sort_values("ts")
+
+
+def make_batch(n, rng, n_ids=None, spread_deg=2e-3):
+    """Synthetic batch: distinct timestamps, points in a few-hundred-meter box, small id pool."""
+    if n_ids is None:
+        n_ids = max(1, n // 50)
+    return pd.DataFrame({
+        "ts": np.arange(n, dtype=np.float64) * 0.01 + rng.random(n) * 1e-3,
+        "label": rng.choice(["person", "car"], size=n, p=[0.9, 0.1]),
+        "id": rng.integers(-1, n_ids, size=n),
+        "lat": 45.42 + rng.random(n) * spread_deg,
+        "lon": -75.69 + rng.random(n) * spread_deg,
+    }).sample(frac=1.0, random_state=0).reset_index(drop=True)
+
+
+def dedup_engine(batch_df: pd.DataFrame, distance_m: float = DEDUP_DISTANCE_M) -> np.ndarray:
+    labels = pd.factorize(batch_df["label"])[0]
+    groups = group_keys(labels, batch_df["id"].to_numpy())
+    keep = dedup_keep(batch_df["ts"].to_numpy(), batch_df["lat"].to_numpy(), batch_df["lon"].to_numpy(), groups, distance_m)
+    return batch_df.index.to_numpy()[keep]
+
+
+class LegacySX126x(SX126x):
+    """The packet path as it was before the command queue."""
+
+    def busyCheck(self, timeout: int = SX126x._busyTimeout):
+        t = time.time()
+        while self._gpio.gpio_read(self._gpio_handle, self._busy) == 1:
+            if (time.time() - t) > (timeout / 1000): return True
+        return False
+
+    def beginPacket(self):
+        self._payloadTxRx = 0
+        self.setBufferBaseAddress(self._bufferIndex, (self._bufferIndex + 0xFF) % 0xFF)
+        if self._txen != -1:
+            self._txState = self._gpio.gpio_read(self._gpio_handle, self._txen)
+            self._gpio.gpio_write(self._gpio_handle, self._txen, 0)
+        self._fixLoRaBw500(self._bw)
+
+    def endPacket(self, timeout: int = SX126x.TX_SINGLE) -> bool:
+        if self.getMode == self.STATUS_MODE_TX: return False
+        self._irqSetup(self.IRQ_TX_DONE | self.IRQ_TIMEOUT)
+        self.setPacketParamsLoRa(self._preambleLength, self._headerType, self._payloadTxRx, self._crcType, self._invertIq)
+        self._statusWait = self.STATUS_TX_WAIT
+        self._statusIrq = 0x0000
+        txTimeout = timeout << 6
+        if txTimeout > 0x00FFFFFF: txTimeout = self.TX_SINGLE
+        self.setTx(txTimeout)
+        self._transmitTime = time.time()
+        if self._irq != -1:
+            self._gpio.callback(self._gpio_handle, self._irq, self._gpio.RISING_EDGE, self._interruptTx)
+        return True
+
+    def put(self, data):
+        dataList = tuple(data)
+        length = len(dataList)
+        self.writeBuffer(self._bufferIndex, dataList, length)
+        self._bufferIndex = (self._bufferIndex + length) % 256
+        self._payloadTxRx += length
+
+    def writeBuffer(self, offset: int, data: tuple, nData: int):
+        buf = (offset,) + tuple(data)
+        self._writeBytes(0x0E, buf, nData + 1)
+
+    def _fixLoRaBw500(self, bw: int):
+        packetType = self.getPakcetType()
+        buf = self.readRegister(self.REG_TX_MODULATION, 1)
+        value = buf[0] | 0x04
+        if packetType == self.LORA_MODEM and bw == self.BW_500000:
+            value = buf[0] & 0xFB
+        self.writeRegister(self.REG_TX_MODULATION, (value,), 1)
+
+    def _writeBytes(self, opCode: int, data: tuple, nBytes: int):
+        if self.busyCheck(): return
+        self._gpio.gpio_write(self._gpio_handle, self._cs_define, 0)
+        buf = [opCode]
+        for i in range(nBytes): buf.append(data[i])
+        self._spi.xfer2(buf)
+        self._gpio.gpio_write(self._gpio_handle, self._cs_define, 1)
+
+    def _readBytes(self, opCode: int, nBytes: int, address: tuple = (), nAddress: int = 0) -> tuple:
+        if self.busyCheck(): return ()
+        self._gpio.gpio_write(self._gpio_handle, self._cs_define, 0)
+        buf = [opCode]
+        for i in range(nAddress): buf.append(address[i])
+        for i in range(nBytes): buf.append(0x00)
+        feedback = self._spi.xfer2(buf)
+        self._gpio.gpio_write(self._gpio_handle, self._cs_define, 1)
+        return tuple(feedback[nAddress + 1:])
+
+
+def make_radio(cls, spi=None, gpio=None):
+    spi = spi or MockSpiDev()
+    gpio = gpio or MockGpio()
+    radio = cls(spi, gpio)
+    if not radio.begin(LORA_CFG["busId"], LORA_CFG["csId"], LORA_CFG["resetPin"], LORA_CFG["busyPin"],
+                       LORA_CFG["irqPin"], LORA_CFG["txenPin"], LORA_CFG["rxenPin"]):
+        raise RuntimeError("mock radio did not report STDBY_RC")
+    radio.setLoRaModulation(LORA_CFG["sf"], LORA_CFG["bw"], LORA_CFG["cr"])
+    radio.setLoRaPacket(LORA_CFG["headerType"], LORA_CFG["preambleLength"], LORA_CFG["payloadLength"], LORA_CFG["crcType"])
+    return radio, spi, gpio
+
+
+def send(radio, payload: bytes):
+    # TX done waiting is covered by bench_lora_wait
+    radio.beginPacket()
+    radio.put(payload)
+    radio.endPacket()
@@ -0,0 +1,37 @@
+"""
+Benchmark: batch dedup used by try_transmit_batch.
+
+Compares the previous pandas groupby + iterrows implementation against the
+grid-indexed dedup_keep engine, and checks both produce the same keep-set.
+
+Run from src/:
+    python -m benchmarks.bench_dedup --sizes 10 1000 50000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks._reference import dedup_by_id_and_distance_dataframe, dedup_engine, make_batch
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch dedup benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 50000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>8} {'kept':>8} {'dataframe ms':>14} {'engine ms':>10} {'speedup':>8}")
+    for n in args.sizes:
+        batch_df = make_batch(n, rng)
+        t0 = time.perf_counter()
+        expected = dedup_by_id_and_distance_dataframe(batch_df).index.to_numpy()
+        t1 = time.perf_counter()
+        got = dedup_engine(batch_df)
+        t2 = time.perf_counter()
+        assert np.array_equal(expected, got), f"keep-set mismatch at n={n}"
+        old_ms, new_ms = (t1 - t0) * 1000, (t2 - t1) * 1000
+        print(f"{n:>8} {len(got):>8} {old_ms:>14.1f} {new_ms:>10.1f} {old_ms / new_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark: per-frame callback cost of storing detections.
+
+Compares the previous pandas DataFrame store (append with .loc, then age filter
+and iloc slice on every detection) against DetectionRingBuffer.
+
+Run from src/:
+    python -m benchmarks.bench_detection_store --frames 50
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.detection_buffer import DetectionRingBuffer
+
+MAX_AGE_SEC = 5 * 60
+MAX_ROWS = 5000
+
+
+class DataFrameStore:
+    """The DataFrame-backed store previously used by DetectionWithGPS.add_detection."""
+
+    def __init__(self, capacity, max_age_sec):
+        self.capacity = capacity
+        self.max_age_sec = max_age_sec
+        self.df = pd.DataFrame(columns=["ts", "label", "id", "lat", "lon", "sent"])
+
+    def append(self, ts, label, track_id, lat, lon):
+        self.df.loc[len(self.df)] = [ts, label, track_id, lat, lon, False]
+        cutoff = ts - self.max_age_sec
+        self.df = self.df[self.df["ts"] >= cutoff]
+        if len(self.df) > self.capacity:
+            self.df = self.df.iloc[-self.capacity:].reset_index(drop=True)
+
+
+def run(store, detections_per_frame, frames, rng):
+    per_frame_ms = []
+    ts = time.time()
+    for _ in range(frames):
+        lats = 45.42 + rng.random(detections_per_frame) * 1e-3
+        lons = -75.69 + rng.random(detections_per_frame) * 1e-3
+        t0 = time.perf_counter()
+        for i in range(detections_per_frame):
+            store.append(ts, "person", i, lats[i], lons[i])
+        per_frame_ms.append((time.perf_counter() - t0) * 1000)
+        ts += 1 / 30
+    return per_frame_ms
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return statistics.mean(samples), p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detection store callback latency benchmark")
+    parser.add_argument("--frames", type=int, default=30, help="Frames per configuration")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Detections per frame")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'det/frame':>10} {'store':>12} {'mean ms':>10} {'p99 ms':>10}")
+    for n in args.sizes:
+        for name, factory in (
+            ("dataframe", lambda: DataFrameStore(MAX_ROWS, MAX_AGE_SEC)),
+            ("ringbuffer", lambda: DetectionRingBuffer(MAX_ROWS, MAX_AGE_SEC)),
+        ):
+            # keep the DataFrame run bounded at large sizes; it is O(rows) per append
+            frames = args.frames if name == "ringbuffer" or n < 1000 else max(3, args.frames // 10)
+            mean, p99 = summarize(run(factory(), n, frames, rng))
+            print(f"{n:>10} {name:>12} {mean:>10.3f} {p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: per-frame cost of getting a BGR frame out of a GstBuffer.
+
+"copy" is the previous callback path (get_numpy_from_buffer copies the mapped
+buffer, then cv2.cvtColor allocates the BGR frame); "zero-copy" maps the
+buffer with map_numpy_from_buffer and converts into a reused array with
+FrameConverter. Allocations are measured with tracemalloc, which NumPy
+reports into.
+
+Needs GStreamer and the hailo module (run on the Pi), from src/:
+    python -m benchmarks.bench_frame_access --width 1280 --height 720
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+import cv2
+import gi
+import numpy as np
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+from core.vision.hailo_apps_infra.hailo_rpi_common import (
+    FrameConverter,
+    get_numpy_from_buffer,
+    map_numpy_from_buffer,
+)
+
+
+def copy_path(buffer, width, height):
+    frame = get_numpy_from_buffer(buffer, "RGB", width, height)
+    return cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+
+
+def make_zero_copy_path():
+    converter = FrameConverter(cv2.COLOR_RGB2BGR)
+
+    def zero_copy_path(buffer, width, height):
+        with map_numpy_from_buffer(buffer, "RGB", width, height) as frame:
+            return converter.convert(frame)
+
+    return zero_copy_path
+
+
+def measure(fn, buffer, width, height, frames):
+    fn(buffer, width, height)  # warm-up: first call may allocate the reusable output
+    latencies = []
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(frames):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        fn(buffer, width, height)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+    tracemalloc.stop()
+    return statistics.mean(latencies), allocated / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GstBuffer to BGR frame benchmark")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    Gst.init(None)
+    data = np.random.default_rng(0).integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    buffer = Gst.Buffer.new_wrapped(data.tobytes())
+
+    print(f"{args.width}x{args.height} RGB, {args.frames} frames")
+    print(f"{'path':>10} {'mean ms':>9} {'alloc KiB/frame':>16}")
+    for name, fn in (("copy", copy_path), ("zero-copy", make_zero_copy_path())):
+        mean_ms, alloc = measure(fn, buffer, args.width, args.height, args.frames)
+        print(f"{name:>10} {mean_ms:>9.3f} {alloc / 1024:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: detections per second of airtime, CSV string vs binary frames.
+
+Airtime per packet comes from core.transmitter.airtime (SX126x datasheet
+time-on-air formula) with the modulation and packet settings from LORA_CFG.
+Throughput assumes back-to-back packets (100% duty cycle), so the ratio
+between formats is what matters.
+
+Run from src/:
+    python -m benchmarks.bench_frame_format
+"""
+import argparse
+
+import numpy as np
+
+from constants import LORA_CFG, LORA_LABELS, NODE_ID
+from core.transmitter.airtime import ldro_required, time_on_air_ms
+from core.transmitter.frame_codec import Detection, FrameEncoder
+
+
+def csv_payload(det: Detection) -> bytes:
+    """The per-detection string payload previously sent by lora_send_string (truncated to payloadLength)."""
+    track_id = -1 if det.track_id is None else det.track_id
+    return f"{det.label},{track_id},{det.lat:.6f},{det.lon:.6f}".encode("utf-8")[:LORA_CFG["payloadLength"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LoRa payload format throughput")
+    parser.add_argument("--detections", type=int, default=1000)
+    parser.add_argument("--sf", type=int, nargs="+", default=[LORA_CFG["sf"]])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    detections = [
+        Detection(1_700_000_000 + i * 0.2, "person", int(rng.integers(0, 500)),
+                  45.42 + rng.random() * 2e-3, -75.69 + rng.random() * 2e-3)
+        for i in range(args.detections)
+    ]
+    csv_packets = [len(csv_payload(d)) for d in detections]
+    frames = FrameEncoder(NODE_ID, LORA_CFG["payloadLength"], LORA_LABELS).encode(detections)
+
+    common = dict(
+        bw=LORA_CFG["bw"], cr=LORA_CFG["cr"], preamble_len=LORA_CFG["preambleLength"],
+        header_type=LORA_CFG["headerType"], crc=LORA_CFG["crcType"],
+    )
+    print(f"{len(detections)} detections, payloadLength={LORA_CFG['payloadLength']}, BW={LORA_CFG['bw']/1000:.0f} kHz, CR=4/{LORA_CFG['cr']}")
+    print(f"{'SF':>3} {'format':>7} {'packets':>8} {'B/pkt':>6} {'det/pkt':>8} {'airtime s':>10} {'det/s':>8}")
+    for sf in args.sf:
+        ldro = ldro_required(sf, LORA_CFG["bw"])
+        for name, sizes, counts in (
+            ("csv", csv_packets, [1] * len(csv_packets)),
+            ("binary", [len(f) for f, _ in frames], [c for _, c in frames]),
+        ):
+            airtime = sum(time_on_air_ms(n, sf, ldro=ldro, **common) for n in sizes) / 1000
+            print(f"{sf:>3} {name:>7} {len(sizes):>8} {np.mean(sizes):>6.1f} {np.mean(counts):>8.2f} {airtime:>10.2f} {sum(counts) / airtime:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+NPU frames saved by the adaptive inference rate over a typical search flight.
+
+A 30 fps camera and a GPS fix every 400 ms (with speed noise) drive
+InferenceRateController through the phases below, the way
+core.vision.inference_gate does on the drone. For each phase: the mean inference
+rate, the fraction of frames kept off the NPU, and the largest ground shift between
+consecutive inferred frames as a fraction of the footprint (the controller aims to
+keep it under 1 - INFERENCE_FRAME_OVERLAP).
+
+Run from src/:
+    python -m benchmarks.bench_inference_rate
+"""
+import argparse
+from types import SimpleNamespace
+
+import numpy as np
+
+from constants import CAMERA_FOV_DEG, INFERENCE_FRAME_OVERLAP, INFERENCE_MAX_FPS, INFERENCE_MIN_FPS
+from utils.inference_rate import InferenceRateController
+
+CAMERA_FPS = 30
+GPS_PERIOD_SEC = 0.4
+
+# (phase, seconds, speed m/s at start -> end, elevation m at start -> end)
+PROFILE = [
+    ("takeoff hover", 30, (0, 0), (2, 2)),
+    ("climb", 40, (0.5, 0.5), (2, 60)),
+    ("transit", 120, (12, 12), (60, 60)),
+    ("low search", 180, (5, 5), (25, 25)),
+    ("hover on target", 60, (0, 0), (25, 25)),
+    ("return", 120, (12, 12), (60, 60)),
+    ("descent", 40, (0.5, 0.5), (60, 2)),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--overlap", type=float, default=INFERENCE_FRAME_OVERLAP)
+    parser.add_argument("--min-fps", type=float, default=INFERENCE_MIN_FPS)
+    parser.add_argument("--speed-noise", type=float, default=0.3, help="GPS speed noise (m/s, 1 sigma)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    clock = SimpleNamespace(t=0.0)
+    controller = InferenceRateController(CAMERA_FOV_DEG, args.overlap, args.min_fps, INFERENCE_MAX_FPS,
+                                         clock=lambda: clock.t)
+    print(f"{'phase':>16} {'sec':>5} {'speed':>6} {'elev':>6} {'mean fps':>9} {'saved':>7} {'max shift':>10}")
+    total = skipped = 0
+    frame = 0
+    for phase, seconds, speeds, elevations in PROFILE:
+        admitted_before, skipped_before = controller.admitted, controller.skipped
+        last_pos = None
+        max_shift = 0.0
+        pos = 0.0
+        next_fix = clock.t
+        for i in range(seconds * CAMERA_FPS):
+            s = i / (seconds * CAMERA_FPS)
+            speed = speeds[0] + s * (speeds[1] - speeds[0])
+            elevation = elevations[0] + s * (elevations[1] - elevations[0])
+            if clock.t >= next_fix:
+                noisy = max(speed + rng.normal(0, args.speed_noise), 0.0)
+                controller.update(SimpleNamespace(speed=noisy, elevation=elevation, positioned=True), 0.0)
+                next_fix += GPS_PERIOD_SEC
+            if controller.admit(int(frame * 1e9 / CAMERA_FPS)):
+                if last_pos is not None:
+                    footprint = controller.footprint_m(elevation)
+                    max_shift = max(max_shift, (pos - last_pos) / footprint)
+                last_pos = pos
+            pos += speed / CAMERA_FPS
+            frame += 1
+            clock.t += 1 / CAMERA_FPS
+        admitted = controller.admitted - admitted_before
+        skip = controller.skipped - skipped_before
+        total += admitted + skip
+        skipped += skip
+        print(f"{phase:>16} {seconds:>5} {np.mean(speeds):>6.1f} {np.mean(elevations):>6.0f}"
+              f" {admitted / seconds:>9.1f} {skip / (admitted + skip):>6.0%} {max_shift:>9.1%}")
+    print(f"whole flight: {skipped} of {total} frames kept off the NPU ({skipped / total:.0%}), {controller.changes} rate changes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Benchmark: end-to-end detection -> LoRa packet throughput and latency, no radio needed.
+
+Synthetic detections go through the same path as DetectionWithGPS in main.py:
+DetectionRingBuffer -> dedup by id and distance -> priority order -> FrameEncoder ->
+AirtimeBudget -> TxScheduler -> SX126x, with the radio replaced by
+core.transmitter.emulator so every packet takes its real time on air.
+
+The emulator side plays the ground station: it decodes each frame, with --loss it
+drops that fraction of packets, and in ACK mode it answers each received frame with
+an ACK (which can be lost too) that the node hears in its RX window after the batch.
+
+The scene: each detection is a new track with probability --new-share, otherwise a
+re-sighting of one of the recent tracks, which wander a few metres per sighting.
+
+Reported: detections delivered per second and per second of airtime, frames sent,
+the latency from a detection to the end of the packet carrying it (0.1 s resolution,
+from the frame timestamps) and the time until the ground station first hears of a
+new track.
+
+Run from src/:
+    python -m benchmarks.bench_lora_pipeline --rate 20 --duration 10
+    python -m benchmarks.bench_lora_pipeline --rate 5 --duration 20 --loss 0.3 --compare-acks
+    python -m benchmarks.bench_lora_pipeline --rate 40 --duration 30 --new-share 0.1 --compare-priority
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from constants import (ACK_MAX_TRIES, ACK_RX_PERIOD_MS, ACK_RX_WINDOW_SEC, ACK_SLEEP_PERIOD_MS,
+                       AIRTIME_BURST_MS, AIRTIME_DUTY_CYCLE, BATCH_INTERVAL_SEC, DATA_MAX_AGE_SEC, DATA_MAX_ROWS,
+                       ARQ_WINDOW, DEDUP_DISTANCE_M, LORA_CFG, LORA_LABELS, NODE_ID, PRIORITY_MOVED_SCALE_M,
+                       PRIORITY_WEIGHTS, TX_QUEUE_MAX)
+from core.transmitter.SX126x import SX126x
+from core.transmitter.airtime import AirtimeBudget, time_on_air_from_config
+from core.transmitter.emulator import SX126xEmulator
+from core.transmitter.frame_codec import Detection, FrameEncoder, decode_ack, decode_frame, encode_ack
+from core.transmitter.link import LinkManager
+from core.transmitter.reliable import ReliableSender, SelectiveRepeatReceiver
+from core.transmitter.scheduler import TxScheduler
+from utils.dedup import dedup_keep, group_keys
+from utils.detection_buffer import DetectionRingBuffer
+from utils.priority import PriorityWeights, ReportLog, chunks_by_priority, order_by_priority, priority_scores
+
+IRQ_PIN = 16
+METERS_PER_DEGREE = 111_320.0
+ACK_WINDOW_SEC = ACK_RX_WINDOW_SEC or 0.5    # the emulated ground station does ACK, even while the node ships fire-and-forget
+
+
+def make_radio(irq_pin: int = -1, on_transmit=None):
+    """SX126x on an emulated chip, configured like init_lora. Returns (radio, chip)."""
+    chip = SX126xEmulator(LORA_CFG["busyPin"], LORA_CFG["resetPin"], irq_pin, on_transmit=on_transmit)
+    radio = SX126x(chip.spi, chip.gpio)
+    if not radio.begin(LORA_CFG["busId"], LORA_CFG["csId"], LORA_CFG["resetPin"], LORA_CFG["busyPin"],
+                       irq_pin, LORA_CFG["txenPin"], LORA_CFG["rxenPin"]):
+        raise RuntimeError("emulated radio did not report STDBY_RC")
+    radio.setDio2RfSwitch()
+    radio.setFrequency(LORA_CFG["frequency"])
+    radio.setTxPower(LORA_CFG["txPower"], LORA_CFG["txPowerVersion"])
+    radio.setLoRaModulation(LORA_CFG["sf"], LORA_CFG["bw"], LORA_CFG["cr"])
+    radio.setLoRaPacket(LORA_CFG["headerType"], LORA_CFG["preambleLength"], LORA_CFG["payloadLength"], LORA_CFG["crcType"])
+    radio.setSyncWord(LORA_CFG["syncWord"])
+    return radio, chip
+
+
+class Pipeline:
+    """The store/batch/transmit half of DetectionWithGPS, driven by a synthetic detector."""
+
+    def __init__(self, irq_pin: int, loss: float = 0.0, acks: bool = False, priority: bool = True, seed: int = 0):
+        self.first_seen = {}        # track id -> wall time of its first detection
+        self.first_heard = {}       # track id -> seconds until the ground station first heard of it
+        self.latencies = []
+        self.delivered = 0
+        self.airtime_ms = 0.0
+        self.loss = loss
+        self.rng = np.random.default_rng(seed)
+        self.radio, self.chip = make_radio(irq_pin, self.on_air)
+        self.store = DetectionRingBuffer(DATA_MAX_ROWS, DATA_MAX_AGE_SEC)
+        self.store_lock = threading.Lock()
+        self.reports = ReportLog()
+        self.priority_weights = PriorityWeights(**PRIORITY_WEIGHTS)
+        self.use_priority = priority
+        self.frame_encoder = FrameEncoder(NODE_ID, LORA_CFG["payloadLength"], LORA_LABELS)
+        self.airtime_budget = AirtimeBudget(AIRTIME_DUTY_CYCLE, AIRTIME_BURST_MS)
+        self.use_acks = acks
+        self.reliable = ReliableSender(
+            ARQ_WINDOW, ACK_MAX_TRIES, lambda n: time_on_air_from_config(LORA_CFG, n), ACK_WINDOW_SEC
+        ) if acks else None
+        self.receiver = SelectiveRepeatReceiver()
+        self.link = LinkManager(self.radio, ACK_WINDOW_SEC, ACK_RX_PERIOD_MS, ACK_SLEEP_PERIOD_MS)
+        self.tx = TxScheduler(self.send_frame, max_queue=TX_QUEUE_MAX,
+                              on_idle=self.link.listen_window if acks else None)
+        self.tx.start()
+
+    def on_air(self, payload: bytes):
+        # the ground station, called on the emulator at the end of each packet
+        self.airtime_ms += time_on_air_from_config(LORA_CFG, len(payload))
+        if self.rng.random() < self.loss:
+            return
+        done = time.time()
+        frame = decode_frame(payload, LORA_LABELS)
+        # the ACK crosses the same lossy channel
+        if self.use_acks and self.rng.random() >= self.loss:
+            self.chip.inject(encode_ack(NODE_ID, [frame.seq]))
+        if not self.receiver.accept(frame.node_id, frame.seq):
+            return
+        for det in frame.detections:
+            self.latencies.append(done - det.ts)
+            self.delivered += 1
+            if det.track_id not in self.first_heard and det.track_id in self.first_seen:
+                self.first_heard[det.track_id] = done - self.first_seen[det.track_id]
+
+    def send_frame(self, data: bytes):
+        # main.DetectionWithGPS.lora_send_frame
+        self.radio.beginPacket()
+        self.radio.put(data)
+        self.radio.endPacket()
+        self.radio.wait()
+        if self.reliable is not None:
+            self.reliable.on_sent(data)
+
+    def add(self, track_id: int, lat: float, lon: float, conf: float):
+        # main.DetectionWithGPS.add_detection
+        ts = time.time()
+        self.first_seen.setdefault(track_id, ts)
+        self.reports.seen(track_id, ts)
+        with self.store_lock:
+            self.store.append(ts, "person", track_id, lat, lon, conf)
+
+    def process_acks(self):
+        # main.DetectionWithGPS.process_acks
+        for rx in self.link.drain():
+            acked = self.reliable.on_ack(decode_ack(rx.payload).seqs)
+            with self.store_lock:
+                for slots, row_seq in acked:
+                    self.store.mark_acked(slots, row_seq)
+
+    def retransmit_due(self):
+        # main.DetectionWithGPS.retransmit_due
+        if self.reliable is None:
+            return
+        for frame in self.reliable.due():
+            airtime = time_on_air_from_config(LORA_CFG, len(frame))
+            if not self.airtime_budget.try_consume(airtime):
+                self.reliable.defer(frame)
+            elif not self.tx.submit(frame):
+                self.airtime_budget.refund(airtime)
+                self.reliable.defer(frame)
+
+    def transmit_batch(self):
+        # main.DetectionWithGPS.try_transmit_batch without the interval check
+        t = time.time()
+        self.process_acks()
+        self.retransmit_due()
+        with self.store_lock:
+            pending = self.store.pending()
+            labels = self.store.label_names(pending.label)
+        if not len(pending):
+            return
+        keep = dedup_keep(pending.ts, pending.lat, pending.lon, group_keys(pending.label, pending.id), DEDUP_DISTANCE_M)
+        if self.use_priority:
+            order = self.prioritize(pending, keep, t)
+        else:
+            order = keep[::-1]      # previous behaviour: newest first
+        queued = self.queue_frames(pending, labels, order)
+        self.reports.reported(pending.id[queued], pending.lat[queued], pending.lon[queued], t)
+        with self.store_lock:
+            self.store.mark_sent(pending.slots[queued], pending.seq[queued])
+
+    def prioritize(self, batch, keep, now):
+        # main.DetectionWithGPS.prioritize
+        ids = batch.id[keep]
+        lat = batch.lat[keep]
+        lon = batch.lon[keep]
+        scores = priority_scores(
+            self.reports.is_new(ids), batch.conf[keep], self.reports.moved_m(ids, lat, lon),
+            now - batch.ts[keep], self.priority_weights, PRIORITY_MOVED_SCALE_M, DATA_MAX_AGE_SEC,
+        )
+        return keep[order_by_priority(scores, batch.ts[keep])]
+
+    def queue_frames(self, batch, labels, order):
+        # main.DetectionWithGPS.queue_frames
+        queued = []
+        for chunk in chunks_by_priority(order, batch.ts, self.frame_encoder.per_frame):
+            detections = [
+                Detection(batch.ts[i], labels[i], int(batch.id[i]), batch.lat[i], batch.lon[i])
+                for i in chunk
+            ]
+            frames = self.frame_encoder.encode(detections)
+            ends = np.cumsum([count for _, count in frames])
+            for (frame, count), end in zip(frames, ends):
+                airtime = time_on_air_from_config(LORA_CFG, len(frame))
+                if not self.airtime_budget.try_consume(airtime):
+                    return queued
+                rows = chunk[end - count:end]
+                if self.reliable is not None and not self.reliable.add(frame, (batch.slots[rows], batch.seq[rows])):
+                    self.airtime_budget.refund(airtime)
+                    return queued
+                if self.tx.submit(frame):
+                    queued.extend(rows)
+                else:
+                    self.airtime_budget.refund(airtime)
+                    if self.reliable is not None:
+                        self.reliable.cancel(frame)
+        return queued
+
+
+class Scene:
+    """New tracks appear at random; re-sightings pick one of the last `active` tracks and move it."""
+
+    def __init__(self, new_share: float, active: int = 20, step_m: float = 8.0, seed: int = 0):
+        self.new_share = new_share
+        self.active = active
+        self.step_deg = step_m / METERS_PER_DEGREE
+        self.rng = np.random.default_rng(seed)
+        self.tracks = {}            # track id -> [lat, lon]
+        self.next_id = 0
+
+    def detect(self):
+        """Next (track id, lat, lon, confidence)."""
+        if not self.tracks or self.rng.random() < self.new_share:
+            track_id = self.next_id % 0xFFFF
+            self.next_id += 1
+            self.tracks[track_id] = [45.0 + self.rng.uniform(-0.01, 0.01), -75.0 + self.rng.uniform(-0.01, 0.01)]
+            if len(self.tracks) > self.active:
+                del self.tracks[next(iter(self.tracks))]
+        else:
+            track_id = list(self.tracks)[self.rng.integers(len(self.tracks))]
+            pos = self.tracks[track_id]
+            pos[0] += self.rng.normal(0, self.step_deg)
+            pos[1] += self.rng.normal(0, self.step_deg)
+        lat, lon = self.tracks[track_id]
+        return track_id, lat, lon, self.rng.uniform(0.7, 1.0)
+
+
+def run(rate: float, duration: float, batch_interval: float, irq_pin: int, loss: float = 0.0, acks: bool = False,
+        new_share: float = 1.0, priority: bool = True):
+    pipe = Pipeline(irq_pin, loss, acks, priority)
+    scene = Scene(new_share)
+    period = 1.0 / rate
+    detections = 0
+    start = time.monotonic()
+    start_cpu = time.process_time()
+    next_det = next_batch = start
+    while True:
+        now = time.monotonic()
+        if now - start >= duration:
+            break
+        if now >= next_det:
+            pipe.add(*scene.detect())
+            detections += 1
+            next_det += period
+        if now >= next_batch:
+            pipe.transmit_batch()
+            next_batch += batch_interval
+        time.sleep(max(0.0, min(next_det, next_batch) - time.monotonic()))
+    pipe.tx.stop(drain=True, timeout=10.0)
+    wall = time.monotonic() - start
+    cpu = time.process_time() - start_cpu
+    lat = np.array(pipe.latencies) * 1000 if pipe.latencies else np.zeros(1)
+    ttfr = np.array(list(pipe.first_heard.values())) if pipe.first_heard else np.zeros(1)
+    return {
+        "detections": detections,
+        "tracks": scene.next_id,
+        "tracks_heard": len(pipe.first_heard),
+        "delivered": pipe.delivered,
+        "frames": len(pipe.chip.transmitted),
+        "delivered_per_s": pipe.delivered / wall,
+        "delivered_per_airtime_s": pipe.delivered / (pipe.airtime_ms / 1000) if pipe.airtime_ms else 0.0,
+        "link": pipe.link.stats(),
+        "arq": pipe.reliable.stats() if pipe.reliable is not None else None,
+        "cpu_pct": cpu / wall * 100,
+        "latency_ms": np.percentile(lat, (50, 90, 99)),
+        "ttfr_s": np.percentile(ttfr, (50, 90, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detection -> LoRa packet throughput on the emulated SX126x")
+    parser.add_argument("--rate", type=float, default=20.0, help="detections per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of detections")
+    parser.add_argument("--batch-interval", type=float, default=BATCH_INTERVAL_SEC)
+    parser.add_argument("--irq", action="store_true", help=f"wire DIO1 to pin {IRQ_PIN} instead of polling")
+    parser.add_argument("--loss", type=float, default=0.0, help="packet loss probability, each direction")
+    parser.add_argument("--new-share", type=float, default=1.0, help="fraction of detections that are new tracks")
+    parser.add_argument("--compare-acks", action="store_true", help="run fire-and-forget and with ACKs")
+    parser.add_argument("--compare-priority", action="store_true", help="run newest-first and priority order")
+    args = parser.parse_args()
+
+    print(f"{args.rate:g} detections/s for {args.duration:g} s ({args.new_share:g} new tracks), "
+          f"batch every {args.batch_interval:g} s, SF{LORA_CFG['sf']} {LORA_CFG['bw'] / 1000:g} kHz, "
+          f"{LORA_CFG['payloadLength']} B frames, loss {args.loss:g}")
+    default_acks = ACK_RX_WINDOW_SEC > 0 and args.loss > 0
+    if args.compare_acks:
+        modes = [("fire-and-forget", False, True), ("acks", True, True)]
+    elif args.compare_priority:
+        modes = [("newest-first", default_acks, False), ("priority", default_acks, True)]
+    else:
+        modes = [("acks" if default_acks else "fire-and-forget", default_acks, True)]
+    for name, acks, priority in modes:
+        r = run(args.rate, args.duration, args.batch_interval, IRQ_PIN if args.irq else -1, args.loss, acks,
+                args.new_share, priority)
+        print(f"[{name}]")
+        print(f"  detections {r['detections']}  delivered {r['delivered']}  frames {r['frames']}  "
+              f"tracks heard {r['tracks_heard']}/{r['tracks']}")
+        print(f"  throughput {r['delivered_per_s']:.1f} detections/s  {r['delivered_per_airtime_s']:.1f} per airtime s  "
+              f"CPU {r['cpu_pct']:.1f}%")
+        p50, p90, p99 = r["latency_ms"]
+        print(f"  detection -> end of packet latency ms: p50 {p50:.0f}  p90 {p90:.0f}  p99 {p99:.0f}")
+        p50, p90, p99 = r["ttfr_s"]
+        print(f"  new track -> first heard s: p50 {p50:.2f}  p90 {p90:.2f}  p99 {p99:.2f}")
+        if acks:
+            print(f"  link {r['link']}")
+            arq = r["arq"]
+            print(f"  arq delivery ratio {arq['delivery_ratio']:.2f}  goodput {arq['goodput_bps']:.1f} B/s  "
+                  f"retransmissions {arq['retransmissions']}  failed {arq['failed']}  in flight {arq['in_flight']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: CPU used while waiting for LoRa TX done.
+
+The radio is core.transmitter.mock_bus with transmissions that take the real time
+on air for LORA_CFG, so wait() blocks as long as it would on the Pi. Compared:
+
+    spin      previous wait(): tight loop on GetIrqStatus (no IRQ pin)
+    spin-irq  previous wait() with an IRQ pin: tight loop on the handler flag
+    poll      no IRQ pin: sleep through the time on air, then poll about once per symbol
+    irq       DIO1 callback sets a threading.Event that wait() blocks on
+
+Run from src/:
+    python -m benchmarks.bench_lora_wait --packets 20
+"""
+import argparse
+import time
+
+from constants import LORA_CFG
+from core.transmitter.SX126x import SX126x
+from core.transmitter.airtime import time_on_air_from_config
+from core.transmitter.mock_bus import MockGpio, MockSpiDev
+
+IRQ_PIN = 16
+
+
+class SpinWaitSX126x(SX126x):
+    """wait() as it was before the event and adaptive polling modes."""
+
+    def wait(self, timeout: int = 0) -> bool:
+        if self._statusIrq:
+            return True
+        irqStat = 0x0000
+        t = time.time()
+        while irqStat == 0x0000 and self._statusIrq == 0x0000:
+            if self._irq == -1: irqStat = self.getIrqStatus()
+            if (time.time() - t) > timeout and timeout > 0: return False
+        if self._statusIrq:
+            return True
+        elif self._statusWait == self.STATUS_TX_WAIT:
+            self._transmitTime = time.time() - self._transmitTime
+        self._statusIrq = irqStat
+        return True
+
+
+def make_radio(cls, irq_pin: int, tx_time: float):
+    gpio = MockGpio()
+    spi = MockSpiDev(tx_time=tx_time, gpio=gpio, irq_pin=irq_pin)
+    radio = cls(spi, gpio)
+    radio.begin(LORA_CFG["busId"], LORA_CFG["csId"], LORA_CFG["resetPin"], LORA_CFG["busyPin"],
+                irq_pin, LORA_CFG["txenPin"], LORA_CFG["rxenPin"])
+    radio.setLoRaModulation(LORA_CFG["sf"], LORA_CFG["bw"], LORA_CFG["cr"])
+    radio.setLoRaPacket(LORA_CFG["headerType"], LORA_CFG["preambleLength"], LORA_CFG["payloadLength"], LORA_CFG["crcType"])
+    return radio, spi
+
+
+def run(cls, irq_pin: int, packets: int, payload: bytes, tx_time: float):
+    radio, spi = make_radio(cls, irq_pin, tx_time)
+    late = []
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    for _ in range(packets):
+        radio.beginPacket()
+        radio.put(payload)
+        radio.endPacket()
+        radio.wait()
+        late.append(time.monotonic() - spi._tx_done_at)
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - start_cpu
+    return {
+        "cpu_pct": cpu / wall * 100,
+        "cpu_ms_per_packet": cpu / packets * 1000,
+        "late_ms_mean": sum(late) / len(late) * 1000,
+        "late_ms_max": max(late) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU while waiting for LoRa TX done")
+    parser.add_argument("--packets", type=int, default=20)
+    parser.add_argument("--payload", type=int, default=LORA_CFG["payloadLength"])
+    args = parser.parse_args()
+
+    payload = bytes(args.payload)
+    tx_time = time_on_air_from_config(LORA_CFG, args.payload) / 1000
+    print(f"{args.packets} packets of {args.payload} B, SF{LORA_CFG['sf']}, time on air {tx_time * 1000:.1f} ms")
+    print(f"{'mode':>9} {'CPU %':>7} {'CPU ms/pkt':>11} {'done->return ms mean/max':>25}")
+    for name, cls, irq_pin in (
+        ("spin", SpinWaitSX126x, -1),
+        ("spin-irq", SpinWaitSX126x, IRQ_PIN),
+        ("poll", SX126x, -1),
+        ("irq", SX126x, IRQ_PIN),
+    ):
+        r = run(cls, irq_pin, args.packets, payload, tx_time)
+        print(f"{name:>9} {r['cpu_pct']:>7.1f} {r['cpu_ms_per_packet']:>11.2f} {r['late_ms_mean']:>15.2f} / {r['late_ms_max']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
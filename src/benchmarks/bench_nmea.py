@@ -0,0 +1,154 @@
+"""
+Benchmark: CPU time per GPS fix, byte-at-a-time UART loop vs the streaming NMEA framer.
+
+A recorded NMEA log (--log, raw bytes as read from /dev/ttyAMA0) or a synthetic
+400 ms L76X output burst is replayed through a fake serial port. The port hands out
+bytes at the rate they would arrive at the given baud, in chunks of what the tty
+driver would have buffered since the reader last woke up (--wake-ms), so read(1)
+always costs one call per byte while read(in_waiting) grows with the baud rate.
+
+Both paths parse with MicropyGPS and stop at every $GNGLL, like L76X.get_gps_data.
+
+Run from src/:
+    python -m benchmarks.bench_nmea --baud 9600 115200
+"""
+import argparse
+import time
+from collections import deque
+
+from micropyGPS import MicropyGPS
+
+from core.gps.nmea import NMEAFramer, dispatch_sentence, nmea_checksum
+
+
+class ReplaySerial:
+    """Minimal pyserial stand-in that replays a byte log."""
+
+    def __init__(self, data: bytes, baud: int, wake_ms: float):
+        self._data = data
+        self._pos = 0
+        # 10 bits per byte on the wire (8N1)
+        self._chunk = max(1, int(baud / 10 * wake_ms / 1000))
+
+    @property
+    def in_waiting(self) -> int:
+        return min(self._chunk, len(self._data) - self._pos)
+
+    def read(self, size: int = 1) -> bytes:
+        if self._pos >= len(self._data):
+            raise EOFError
+        chunk = self._data[self._pos:self._pos + size]
+        self._pos += size
+        return chunk
+
+
+def _sentence(body: str) -> str:
+    return f"${body}*{nmea_checksum(body.encode()):02X}\r\n"
+
+
+def synthetic_log(fixes: int) -> bytes:
+    """One SET_NMEA_OUTPUT burst (RMC, VTG, GGA, GSA, GSV, GLL) per fix."""
+    out = []
+    for i in range(fixes):
+        t = 120000 + i
+        lat = 4525.1234 + i * 1e-4
+        lon = 7541.5678 + i * 1e-4
+        out += [
+            _sentence(f"GNRMC,{t}.000,A,{lat:.4f},N,{lon:.4f},W,0.52,54.70,170926,,,A"),
+            _sentence("GNVTG,54.70,T,,M,0.52,N,0.96,K,A"),
+            _sentence(f"GNGGA,{t}.000,{lat:.4f},N,{lon:.4f},W,1,09,0.95,102.3,M,-34.1,M,,"),
+            _sentence("GNGSA,A,3,10,16,18,20,26,27,,,,,,,1.26,0.95,0.83"),
+            _sentence("GNGSA,A,3,65,66,72,,,,,,,,,,1.26,0.95,0.83"),
+            _sentence("GPGSV,3,1,11,10,63,137,17,16,28,310,33,18,67,302,29,20,24,055,31"),
+            _sentence("GPGSV,3,2,11,26,33,209,38,27,44,099,40,21,07,177,,23,12,250,"),
+            _sentence("GPGSV,3,3,11,29,08,040,,31,05,112,,32,02,330,"),
+            _sentence("GLGSV,2,1,06,65,32,036,33,66,74,328,36,72,21,088,29,74,11,305,"),
+            _sentence("GLGSV,2,2,06,75,40,258,,81,09,143,"),
+            _sentence(f"GNGLL,{lat:.4f},N,{lon:.4f},W,{t}.000,A,A"),
+        ]
+    return "".join(out).encode()
+
+
+def legacy_fix(serial, g):
+    """The previous L76X.get_gps_data read loop (without the elevation lookup)."""
+    data = ""
+    while True:
+        x = serial.read(1)
+        if x == b"$":
+            while x != b"\r":
+                data += x.decode()
+                g.update(x.decode())
+                x = serial.read(1)
+            data += "\r\n"
+            if "$GNGLL" in data:
+                break
+
+
+def framed_fix(serial, g, framer, pending):
+    while True:
+        if not pending:
+            pending.extend(framer.feed(serial.read(serial.in_waiting or 1)))
+            continue
+        sentence = pending.popleft()
+        dispatch_sentence(g, sentence)
+        if sentence.startswith("$GNGLL"):
+            break
+
+
+def run(data: bytes, baud: int, wake_ms: float, framed: bool):
+    serial = ReplaySerial(data, baud, wake_ms)
+    g = MicropyGPS(+8)
+    framer = NMEAFramer()
+    pending = deque()
+    fixes = 0
+    reads = 0
+    read = serial.read
+
+    def counting_read(size=1):
+        nonlocal reads
+        reads += 1
+        return read(size)
+
+    serial.read = counting_read
+    start = time.process_time()
+    try:
+        while True:
+            if framed:
+                framed_fix(serial, g, framer, pending)
+            else:
+                legacy_fix(serial, g)
+            fixes += 1
+    except EOFError:
+        pass
+    cpu = time.process_time() - start
+    return fixes, reads, cpu, (g.latitude, g.longitude)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NMEA read path CPU per fix")
+    parser.add_argument("--log", help="raw NMEA capture; synthetic if omitted")
+    parser.add_argument("--fixes", type=int, default=2000, help="synthetic fixes to generate")
+    parser.add_argument("--baud", type=int, nargs="+", default=[9600, 115200])
+    parser.add_argument("--wake-ms", type=float, default=10.0, help="reader wake-up interval used to size read(in_waiting)")
+    args = parser.parse_args()
+
+    if args.log:
+        with open(args.log, "rb") as f:
+            data = f.read()
+    else:
+        data = synthetic_log(args.fixes)
+
+    print(f"{len(data)} bytes replayed, reader wakes every {args.wake_ms:.0f} ms")
+    print(f"{'baud':>7} {'path':>8} {'fixes':>6} {'reads/fix':>10} {'CPU us/fix':>11} {'speedup':>8}")
+    for baud in args.baud:
+        legacy = run(data, baud, args.wake_ms, framed=False)
+        framed = run(data, baud, args.wake_ms, framed=True)
+        assert legacy[3] == framed[3], "paths disagree on the last position"
+        for name, (fixes, reads, cpu, _) in (("byte", legacy), ("framed", framed)):
+            per_fix = cpu / max(fixes, 1) * 1e6
+            speedup = legacy[2] / cpu if cpu else float("inf")
+            print(f"{baud:>7} {name:>8} {fixes:>6} {reads / max(fixes, 1):>10.1f} {per_fix:>11.1f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
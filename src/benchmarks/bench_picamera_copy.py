@@ -0,0 +1,109 @@
+"""
+Benchmark: host CPU and latency per frame between the camera's buffer and appsrc.
+
+"before" is the previous picamera_thread path: capture_array() (a copy out of the
+camera buffer), cv2.cvtColor(BGR2RGB) into a new array, frame.tobytes() and a fresh
+Gst.Buffer.new_wrapped() per frame. "after" is core.vision.picamera_source: the ISP
+delivers RGB and copy_frame() writes the camera buffer into a pooled buffer in one pass.
+
+The camera buffer is simulated by a frame with padded rows (as libcamera allocates
+them). With GStreamer installed, both paths include their Gst.Buffer work (new_wrapped
+vs pool acquire + map); without it, the pooled buffer is a reused bytearray.
+
+Run from src/:
+    python -m benchmarks.bench_picamera_copy
+    python -m benchmarks.bench_picamera_copy --sizes 1280x720 1920x1080 --frames 500
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from core.vision.picamera_source import copy_frame, frame_view, rgb_stride
+
+
+def _gst():
+    try:
+        import gi
+
+        gi.require_version("Gst", "1.0")
+        from gi.repository import Gst
+    except (ImportError, ValueError):
+        return None
+    Gst.init(None)
+    return Gst
+
+
+def before(camera, width, Gst):
+    frame_data = np.array(frame_view(camera, width))        # capture_array('lores')
+    frame = cv2.cvtColor(frame_data, cv2.COLOR_BGR2RGB)
+    data = np.asarray(frame).tobytes()
+    return Gst.Buffer.new_wrapped(data) if Gst else data
+
+
+class After:
+    def __init__(self, width, height, Gst):
+        self.width = width
+        self.stride = rgb_stride(width)
+        self.Gst = Gst
+        if Gst:
+            caps = Gst.Caps.from_string(f"video/x-raw, format=RGB, width={width}, height={height}")
+            self.pool = Gst.BufferPool.new()
+            config = self.pool.get_config()
+            Gst.BufferPool.config_set_params(config, caps, self.stride * height, 4, 0)
+            self.pool.set_config(config)
+            self.pool.set_active(True)
+        else:
+            self.scratch = bytearray(self.stride * height)
+
+    def __call__(self, camera):
+        if not self.Gst:
+            copy_frame(self.scratch, self.stride, frame_view(camera, self.width))
+            return self.scratch
+        _, buffer = self.pool.acquire_buffer(None)
+        _, map_info = buffer.map(self.Gst.MapFlags.WRITE)
+        try:
+            copy_frame(map_info.data, self.stride, frame_view(camera, self.width))
+        finally:
+            buffer.unmap(map_info)
+        return buffer
+
+
+def measure(fn, camera, frames):
+    """(wall µs per frame: mean, p50, p99; CPU µs per frame)."""
+    for _ in range(10):
+        fn(camera)
+    times = np.empty(frames)
+    cpu0 = time.process_time()
+    for i in range(frames):
+        t0 = time.perf_counter_ns()
+        fn(camera)
+        times[i] = (time.perf_counter_ns() - t0) / 1000
+    cpu = (time.process_time() - cpu0) / frames * 1e6
+    return times.mean(), np.percentile(times, 50), np.percentile(times, 99), cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Picamera2 -> appsrc per-frame cost, before and after")
+    parser.add_argument("--sizes", nargs="+", default=["1280x720", "1920x1080"])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--row-align", type=int, default=64, help="Camera row alignment in bytes")
+    args = parser.parse_args()
+
+    Gst = _gst()
+    print(f"Gst.Buffer work included: {'yes' if Gst else 'no (GStreamer not installed)'}")
+    print(f"{'size':>10} {'path':>7} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'cpu us':>9}")
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        width, height = (int(n) for n in size.split("x"))
+        camera_stride = -(-width * 3 // args.row_align) * args.row_align
+        camera = rng.integers(0, 256, (height, camera_stride), dtype=np.uint8)
+        after = After(width, height, Gst)
+        for name, fn in (("before", lambda c: before(c, width, Gst)), ("after", after)):
+            mean, p50, p99, cpu = measure(fn, camera, args.frames)
+            print(f"{size:>10} {name:>7} {mean:>9.0f} {p50:>9.0f} {p99:>9.0f} {cpu:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Per-frame cost of the Python detection callback with and without the postprocess pre-filter.
+
+Without it, the callback receives every box the NMS decode keeps at the 0.3 score
+threshold (all classes) and discards the irrelevant ones itself; with it,
+libyolo_hailortpp_postprocess drops classes outside RELEVANT_CLASSES and boxes below
+POSTPROCESS_MIN_CONFIDENCE in C++. The same synthetic flight is replayed through
+main.detection_callback both ways; prefilter() below applies the C++ rule offline.
+Runs alternate and the fastest of --repeat is reported, to keep scheduler noise out.
+
+The fake hailo objects of replay.stubs are plain Python, cheaper than the pybind
+wrappers get_objects_typed() builds on the drone, so the saving measured here is a
+lower bound; the tracker's saving (fewer boxes to match) is not included at all.
+
+Run from src/:
+    python -m benchmarks.bench_prefilter --seconds 120 --clutter 20
+"""
+import argparse
+import logging
+
+from constants import POSTPROCESS_MIN_CONFIDENCE, RELEVANT_CLASSES
+from replay.harness import run_replay
+from replay.recording import RecordedFrame, synthesize
+
+
+def prefilter(frames, allowed_labels, min_confidence):
+    """What yolo_hailortpp.cpp's prefilter() leaves on the ROI."""
+    return [
+        RecordedFrame(fr.t, [d for d in fr.detections
+                             if d.confidence >= min_confidence and (not allowed_labels or d.label in allowed_labels)])
+        for fr in frames
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=120.0, help="Length of the synthetic flight")
+    parser.add_argument("--tracks", type=int, default=8, help="People in view")
+    parser.add_argument("--clutter", type=int, default=20, help="Extra boxes per frame from the unfiltered postprocess")
+    parser.add_argument("--repeat", type=int, default=5, help="Replays per variant; the fastest is reported")
+    args = parser.parse_args()
+    logging.getLogger("utils.metrics").setLevel(logging.WARNING)
+
+    raw, fixes = synthesize(args.seconds, tracks=args.tracks, clutter=args.clutter)
+    variants = {"unfiltered": raw, "prefilter": prefilter(raw, RELEVANT_CLASSES, POSTPROCESS_MIN_CONFIDENCE)}
+    best = {}
+    for _ in range(args.repeat):
+        for name, frames in variants.items():
+            report = run_replay(frames, fixes)
+            if name not in best or report["stages"]["callback"]["mean_ms"] < best[name]["stages"]["callback"]["mean_ms"]:
+                best[name] = report
+
+    print(f"{'postprocess':>12} {'boxes/frame':>11} {'stored':>7} {'callback p50':>13} {'p99':>8} {'mean':>8}"
+          f" {'detections p50':>15} {'p99':>8}")
+    for name, report in best.items():
+        cb, det = report["stages"]["callback"], report["stages"]["detections"]
+        print(f"{name:>12} {report['detections_in'] / max(report['frames'], 1):>11.1f} {report['detections_stored']:>7}"
+              f" {cb['p50_ms'] * 1000:>10.1f} us {cb['p99_ms'] * 1000:>5.1f} us {cb['mean_ms'] * 1000:>5.1f} us"
+              f" {det['p50_ms'] * 1000:>12.1f} us {det['p99_ms'] * 1000:>5.1f} us")
+
+
+if __name__ == "__main__":
+    main()
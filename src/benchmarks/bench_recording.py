@@ -0,0 +1,118 @@
+"""
+Benchmark: pipeline FPS and CPU with recording off, in a GStreamer branch, or via OpenCV.
+
+Builds source -> identity -> fakesink from gstreamer_helper_pipelines (no Hailo
+inference, so the numbers isolate the cost of recording) and runs a file
+source as fast as possible (sync=false):
+    off      - no recording
+    pipeline - tee into RECORDING_PIPELINE (leaky queue, encoder, splitmuxsink)
+    opencv   - pad probe mapping every frame and writing it with cv2.VideoWriter,
+               as DetectionWithGPS.set_frame does
+
+CPU is process user+system time over wall time (1.0 = one core).
+
+Needs GStreamer (run on the Pi), from src/:
+    python -m benchmarks.bench_recording --input ../resources/example.mp4 --seconds 20
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+import cv2
+import gi
+import numpy as np
+
+gi.require_version("Gst", "1.0")
+from gi.repository import GLib, Gst
+
+from core.vision.hailo_apps_infra.gstreamer_helper_pipelines import (
+    RECORDING_PIPELINE,
+    SOURCE_PIPELINE,
+    USER_CALLBACK_PIPELINE,
+)
+
+
+def select_encoder():
+    for encoder in ("v4l2h264enc", "x264enc"):
+        if Gst.ElementFactory.find(encoder) is not None:
+            return encoder
+    raise RuntimeError("no H.264 encoder element available")
+
+
+def build(mode, video_source, width, height, out_dir, fps):
+    sink = "fakesink name=bench_sink sync=false"
+    head = f"{SOURCE_PIPELINE(video_source, width, height)} ! {USER_CALLBACK_PIPELINE()} ! "
+    if mode == "pipeline":
+        recording = RECORDING_PIPELINE(out_dir, segment_sec=30, fps=fps, encoder=select_encoder())
+        return f"{head} tee name=t t. ! queue ! {sink} t. ! {recording}"
+    return f"{head} {sink}"
+
+
+def run(mode, args, out_dir):
+    pipeline = Gst.parse_launch(build(mode, args.input, args.width, args.height, out_dir, args.fps))
+    frames = 0
+    writer = None
+
+    def count(pad, info):
+        nonlocal frames, writer
+        frames += 1
+        if mode == "opencv":
+            buffer = info.get_buffer()
+            ok, map_info = buffer.map(Gst.MapFlags.READ)
+            if ok:
+                try:
+                    frame = np.ndarray((args.height, args.width, 3), dtype=np.uint8, buffer=map_info.data)
+                    if writer is None:
+                        path = os.path.join(out_dir, "opencv.mp4")
+                        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), args.fps, (args.width, args.height))
+                    writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+                finally:
+                    buffer.unmap(map_info)
+        return Gst.PadProbeReturn.OK
+
+    identity = pipeline.get_by_name("identity_callback")
+    identity.get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, count)
+
+    loop = GLib.MainLoop()
+    bus = pipeline.get_bus()
+    bus.add_signal_watch()
+    bus.connect("message::eos", lambda *_: loop.quit())
+    bus.connect("message::error", lambda _, msg: (print(msg.parse_error()), loop.quit()))
+    GLib.timeout_add(int(args.seconds * 1000), loop.quit)
+
+    usage0 = resource.getrusage(resource.RUSAGE_SELF)
+    t0 = time.monotonic()
+    pipeline.set_state(Gst.State.PLAYING)
+    loop.run()
+    wall = time.monotonic() - t0
+    usage1 = resource.getrusage(resource.RUSAGE_SELF)
+    pipeline.set_state(Gst.State.NULL)
+    if writer is not None:
+        writer.release()
+
+    cpu = (usage1.ru_utime - usage0.ru_utime) + (usage1.ru_stime - usage0.ru_stime)
+    return frames / wall, cpu / wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recording cost benchmark")
+    parser.add_argument("--input", "-i", required=True, help="Video file source")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=20.0, help="Recorded frame rate (VIDEO_FPS)")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--modes", nargs="+", default=["off", "pipeline", "opencv"])
+    args = parser.parse_args()
+
+    Gst.init(None)
+    print(f"{'mode':>9} {'fps':>8} {'cpu cores':>10}")
+    with tempfile.TemporaryDirectory() as out_dir:
+        for mode in args.modes:
+            fps, cpu = run(mode, args, out_dir)
+            print(f"{mode:>9} {fps:>8.1f} {cpu:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
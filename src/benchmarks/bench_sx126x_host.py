@@ -0,0 +1,55 @@
+"""
+Benchmark: host-side cost of sending one LoRa packet through SX126x, previous
+per-command SPI path vs the command queue with reused frames.
+
+The radio is replaced by core.transmitter.mock_bus, so what is measured is the
+Python work to start a packet (beginPacket -> put -> endPacket) plus the number of SPI
+transactions and GPIO calls it issues, not time on air.
+
+Run from src/:
+    python -m benchmarks.bench_sx126x_host --packets 20000
+"""
+import argparse
+import time
+
+from benchmarks._reference import LegacySX126x, make_radio, send
+from constants import LORA_CFG
+from core.transmitter.SX126x import SX126x
+
+
+def run(cls, packets: int, payload: bytes):
+    radio, spi, gpio = make_radio(cls)
+    send(radio, payload)                # first packet pays the one-off register read-modify-write
+    spi.transfers = spi.bytes = gpio.reads = gpio.writes = 0
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    for _ in range(packets):
+        send(radio, payload)
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - start_cpu
+    return {
+        "us_per_packet": wall / packets * 1e6,
+        "cpu_us_per_packet": cpu / packets * 1e6,
+        "spi_per_packet": spi.transfers / packets,
+        "gpio_per_packet": (gpio.reads + gpio.writes) / packets,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SX126x per-packet host overhead on a mock bus")
+    parser.add_argument("--packets", type=int, default=20000)
+    parser.add_argument("--payload", type=int, default=LORA_CFG["payloadLength"])
+    args = parser.parse_args()
+
+    payload = bytes(range(args.payload))
+    print(f"{args.packets} packets of {args.payload} bytes on mock SPI/GPIO")
+    print(f"{'path':>8} {'us/pkt':>8} {'CPU us/pkt':>11} {'SPI/pkt':>8} {'GPIO/pkt':>9}")
+    results = {}
+    for name, cls in (("legacy", LegacySX126x), ("queued", SX126x)):
+        r = results[name] = run(cls, args.packets, payload)
+        print(f"{name:>8} {r['us_per_packet']:>8.1f} {r['cpu_us_per_packet']:>11.1f} {r['spi_per_packet']:>8.1f} {r['gpio_per_packet']:>9.1f}")
+    print(f"speedup: {results['legacy']['us_per_packet'] / results['queued']['us_per_packet']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: throughput of tiled inference at each tiling level.
+
+For every grid in --grids (1x1 is the single-pass INFERENCE_PIPELINE_WRAPPER used
+without tiling), builds source -> inference -> identity -> fakesink with the same
+helpers and batch size as GStreamerDetectionApp and runs a file source as fast as
+possible (sync=false). Reports frames/s at the sink and tiles/s out of hailonet,
+plus the person size at the network input that grid gives at --elevation.
+
+Needs GStreamer and a Hailo device (run on the Pi), from src/:
+    python -m benchmarks.bench_tiling --input ../resources/example.mp4 --seconds 20
+
+--plan-only prints the grid plan_tiles() picks per elevation and resolution, and
+runs anywhere.
+"""
+import argparse
+import os
+import time
+
+from constants import CAMERA_HFOV_DEG, PERSON_SIZE_M, TILE_MIN_PERSON_PX
+from core.vision.tiling import grid_plan, plan_tiles
+
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core", "vision", "resources")
+RESOLUTIONS = ((1280, 720), (1920, 1080), (3840, 2160), (4608, 2592))
+ELEVATIONS = (10, 20, 40, 60, 80, 120)
+
+
+def print_plans():
+    print("grid (person size at the network input) picked per source resolution and elevation:")
+    print(f"{'source':>10} " + " ".join(f"{f'{e} m':>15}" for e in ELEVATIONS))
+    for width, height in RESOLUTIONS:
+        cells = []
+        for elevation in ELEVATIONS:
+            plan = plan_tiles(elevation, width, height, CAMERA_HFOV_DEG,
+                              person_m=PERSON_SIZE_M, min_person_px=TILE_MIN_PERSON_PX)
+            cells.append(f"{plan.tiles_x}x{plan.tiles_y} {plan.person_px:4.1f} px")
+        print(f"{f'{width}x{height}':>10} " + " ".join(f"{c:>15}" for c in cells))
+
+
+def _gst():
+    """GStreamer is only needed for the device run; --plan-only works without it."""
+    import gi
+
+    gi.require_version("Gst", "1.0")
+    from gi.repository import GLib, Gst
+    return GLib, Gst
+
+
+def run(grid, args):
+    GLib, Gst = _gst()
+    from core.vision.hailo_apps_infra.gstreamer_helper_pipelines import (
+        INFERENCE_PIPELINE,
+        INFERENCE_PIPELINE_WRAPPER,
+        SOURCE_PIPELINE,
+        TILED_INFERENCE_PIPELINE,
+        USER_CALLBACK_PIPELINE,
+    )
+
+    tiles_x, tiles_y = grid
+    plan = grid_plan(tiles_x, tiles_y, args.elevation, args.width, args.height, CAMERA_HFOV_DEG,
+                     person_m=PERSON_SIZE_M)
+    inference = INFERENCE_PIPELINE(
+        hef_path=args.hef,
+        post_process_so=args.so,
+        post_function_name="filter" if plan.tiles > 1 else "filter_letterbox",
+        batch_size=args.batch_size,
+        additional_params="nms-score-threshold=0.3 nms-iou-threshold=0.45 output-format-type=HAILO_FORMAT_TYPE_FLOAT32",
+    )
+    if plan.tiles > 1:
+        inference = TILED_INFERENCE_PIPELINE(inference, tiles_x, tiles_y, plan.overlap_x, plan.overlap_y,
+                                             batch_size=args.batch_size)
+    else:
+        inference = INFERENCE_PIPELINE_WRAPPER(inference)
+    pipeline = Gst.parse_launch(
+        f"{SOURCE_PIPELINE(args.input, args.width, args.height)} ! {inference} ! "
+        f"{USER_CALLBACK_PIPELINE()} ! fakesink name=bench_sink sync=false"
+    )
+
+    counts = {"frames": 0, "tiles": 0}
+
+    def count(key):
+        def probe(pad, info):
+            counts[key] += 1
+            return Gst.PadProbeReturn.OK
+        return probe
+
+    pipeline.get_by_name("identity_callback").get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, count("frames"))
+    pipeline.get_by_name("inference_hailonet").get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, count("tiles"))
+
+    loop = GLib.MainLoop()
+    bus = pipeline.get_bus()
+    bus.add_signal_watch()
+    bus.connect("message::eos", lambda *_: loop.quit())
+    bus.connect("message::error", lambda _, msg: (print(msg.parse_error()), loop.quit()))
+    GLib.timeout_add(int(args.seconds * 1000), loop.quit)
+
+    pipeline.set_state(Gst.State.PLAYING)
+    t0 = time.monotonic()
+    loop.run()
+    wall = time.monotonic() - t0
+    pipeline.set_state(Gst.State.NULL)
+    return plan, counts["frames"] / wall, counts["tiles"] / wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiled inference throughput per tiling level")
+    parser.add_argument("--input", "-i", help="Video file source")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--elevation", type=float, default=60.0, help="Elevation (m) for the person size column")
+    parser.add_argument("--grids", nargs="+", default=["1x1", "2x1", "3x2", "4x3"])
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--hef", default=os.path.join(RESOURCES, "yolov8s_h8l.hef"))
+    parser.add_argument("--so", default=os.path.join(RESOURCES, "libyolo_hailortpp_postprocess.so"))
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--plan-only", action="store_true", help="Only print the grids plan_tiles() picks")
+    args = parser.parse_args()
+
+    print_plans()
+    if args.plan_only:
+        return
+    if not args.input:
+        parser.error("--input is required unless --plan-only")
+
+    _gst()[1].init(None)
+    print(f"\n{args.width}x{args.height}, batch {args.batch_size}, {args.elevation:.0f} m")
+    print(f"{'grid':>6} {'tiles':>6} {'tile px':>10} {'person px':>10} {'frames/s':>9} {'tiles/s':>8}")
+    for grid in args.grids:
+        tiles_x, tiles_y = (int(n) for n in grid.split("x"))
+        plan, fps, tps = run((tiles_x, tiles_y), args)
+        print(f"{grid:>6} {plan.tiles:>6} {f'{plan.tile_width_px}x{plan.tile_height_px}':>10}"
+              f" {plan.person_px:>10.1f} {fps:>9.1f} {tps:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: memory and per-detection cost of the per-id last-location table.
+
+Simulates a long flight where the tracker keeps minting ids: a handful of tracks
+are live at any time, each lives for a few seconds and is never seen again.
+Compares the unbounded dict DetectionWithGPS used (last_loc_by_id) against
+TrackTable, which evicts ids the tracker can no longer emit.
+
+Run from src/:
+    python -m benchmarks.bench_track_table --minutes 60
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from constants import TRACK_TABLE_CAPACITY, TRACKER_KEEP_LOST_FRAMES, TRACKER_KEEP_TRACKED_FRAMES
+from utils.track_table import TrackTable
+
+FPS = 30
+
+
+class DictTable:
+    """The dict previously used as DetectionWithGPS.last_loc_by_id."""
+
+    def __init__(self):
+        self.d = {}
+
+    def get(self, track_id, frame):
+        return self.d.get(track_id)
+
+    def put(self, track_id, lat, lon, frame):
+        self.d[track_id] = (lat, lon)
+
+    def nbytes(self):
+        return sys.getsizeof(self.d) + sum(sys.getsizeof(v) for v in self.d.values())
+
+    def __len__(self):
+        return len(self.d)
+
+
+def run(table, frames, live, lifetime_frames, rng):
+    """Each frame looks up and updates `live` tracks; a track is replaced after lifetime_frames."""
+    ids = np.arange(live)
+    born = -rng.integers(0, lifetime_frames, live)
+    next_id = live
+    t0 = time.perf_counter()
+    for frame in range(frames):
+        dead = frame - born >= lifetime_frames
+        for k in np.flatnonzero(dead):
+            ids[k] = next_id
+            born[k] = frame
+            next_id += 1
+        for track_id in ids.tolist():
+            table.get(track_id, frame)
+            table.put(track_id, 45.42, -75.69, frame)
+        if isinstance(table, TrackTable) and frame % (2 * FPS) == 0:
+            table.expire(frame)      # DetectionWithGPS.try_transmit_batch, every BATCH_INTERVAL_SEC
+    elapsed = time.perf_counter() - t0
+    return elapsed / (frames * live) * 1e6, next_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track location table memory benchmark")
+    parser.add_argument("--minutes", type=float, default=30.0, help="Simulated flight length")
+    parser.add_argument("--live", type=int, default=10, help="Tracks visible per frame")
+    parser.add_argument("--lifetime", type=float, default=4.0, help="Seconds each track stays visible")
+    args = parser.parse_args()
+
+    frames = int(args.minutes * 60 * FPS)
+    ttl = TRACKER_KEEP_TRACKED_FRAMES + TRACKER_KEEP_LOST_FRAMES
+    print(f"{'table':>10} {'ids minted':>11} {'entries':>8} {'KiB':>9} {'us/det':>8}")
+    for name, factory in (
+        ("dict", DictTable),
+        ("tracktable", lambda: TrackTable(TRACK_TABLE_CAPACITY, ttl)),
+    ):
+        table = factory()
+        us, minted = run(table, frames, args.live, int(args.lifetime * FPS), np.random.default_rng(0))
+        print(f"{name:>10} {minted:>11} {len(table):>8} {table.nbytes() / 1024:>9.1f} {us:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import os
+
 from core.transmitter import SX126x
 
 LORA_CFG = {
@@ -19,6 +21,8 @@ LORA_CFG = {
     "payloadLength": 64,        # allow small batches/strings
     "crcType": True,
     "syncWord": 0x34,
+    "backend": "hardware",      # "emulator" runs the LoRa path on core.transmitter.emulator
+    "emulatorTimeScale": 1.0,   # emulator only: scales time on air (0 = instant)
 }
 
 # ----------------------------
@@ -29,5 +33,48 @@ BATCH_INTERVAL_SEC = 2.0
 DEDUP_DISTANCE_M = 10.0                 # do not send multiple detections of same person within 10m
 DATA_MAX_AGE_SEC = 5 * 60              # retain last 5 minutes
 DATA_MAX_ROWS = 5000                    # hard cap to avoid runaway memory
+TX_QUEUE_MAX = 64                       # payloads waiting for the LoRa TX worker before new ones are dropped
+TX_DRAIN_TIMEOUT_SEC = 10.0             # time allowed to flush queued payloads on shutdown
+AIRTIME_DUTY_CYCLE = 0.25               # long-run fraction of time the radio may spend transmitting
+AIRTIME_BURST_MS = 2000.0               # airtime that may be spent at once after an idle period
+ELEVATION_GRID_M = 30.0                 # ground elevation cache cell size (SRTM1 resolution)
+ELEVATION_CACHE_SIZE = 4096             # cached elevation cells before LRU eviction
+ACK_RX_WINDOW_SEC = 0                   # listen for ground station ACKs after each TX batch; 0 = fire-and-forget
+                                        # (no ground station ACKs yet: a window resends every frame ACK_MAX_TRIES times)
+ACK_RX_PERIOD_MS = 10                   # listen duty cycle: receive period ...
+ACK_SLEEP_PERIOD_MS = 20                # ... and sleep period; ACK senders need a preamble longer than this
+ACK_MAX_TRIES = 3                       # transmissions per frame before giving up on its ACK
+ARQ_WINDOW = 16                         # frames awaiting ACK before new detections wait in the store
+PRIORITY_WEIGHTS = {"new_track": 4.0, "confidence": 1.0, "moved": 2.0, "age": 1.0}   # batch order, see utils.priority.PriorityWeights
+PRIORITY_MOVED_SCALE_M = 50.0           # distance from the last report that earns the full "moved" weight
+TRACKER_KEEP_TRACKED_FRAMES = 15        # hailotracker: unmatched frames before a track is 'lost' ...
+TRACKER_KEEP_LOST_FRAMES = 2            # ... and before a lost track is removed; its id is never reused
+TRACK_TABLE_CAPACITY = 1024             # live track ids remembered for per-id dedup before LRU eviction
+POSTPROCESS_PREFILTER = True            # drop non-relevant classes and weak boxes in the C++ postprocess, before the tracker
+POSTPROCESS_MIN_CONFIDENCE = CONF_THRESHOLD  # its confidence floor; lower it to feed the tracker weaker boxes
+INFERENCE_RATE_ADAPTIVE = False         # lower the inference rate when hovering or flying high, see utils.inference_rate;
+                                        # skipped frames are also missing from the display and the recording
+INFERENCE_MIN_FPS = 2.0                 # inference rate while hovering
+INFERENCE_MAX_FPS = 30.0                # camera frame rate; also used without a GPS fix
+INFERENCE_FRAME_OVERLAP = 0.95          # fraction of the ground footprint consecutive inferred frames must share
+CAMERA_FOV_DEG = 41.0                   # narrowest field of view of the nadir camera (Camera Module 3 at 16:9: 66 x 41 deg)
+CAMERA_HFOV_DEG = 66.0                  # its horizontal field of view
+TILED_MODE = "off"                      # tiled inference: "off", "auto" (grid from SURVEY_ELEVATION_M and resolution) or "NxM"
+TILED_VIDEO_SIZE = (1920, 1080)         # minimum source resolution in tiled mode; tiles narrower than 640 px add no detail
+SURVEY_ELEVATION_M = 60.0               # planned elevation above ground the "auto" grid is sized for
+TILE_MIN_PERSON_PX = 16.0               # person size wanted at the 640 px network input
+PERSON_SIZE_M = 0.5                     # apparent size of a person seen from above
+PIPELINE_PROFILE_PATH = os.getenv(     # batch size, queue depth and converter threads from python -m core.vision.autotune
+    "PIPELINE_PROFILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipeline_profile.json"))
+METRICS_ENABLED = False                 # per-stage latency metrics at startup; toggle at runtime with SIGUSR2
+METRICS_PORT = 9108                     # local Prometheus-text endpoint (GET /metrics); 0 = no server
+METRICS_LOG_SEC = 30.0                  # period of the metrics summary log line while enabled
+
+RELEVANT_CLASSES = {"person"}
 
-RELEVANT_CLASSES = {"person"}
\ No newline at end of file
+# ----------------------------
+# LoRa frame format
+# ----------------------------
+NODE_ID = 1
+# label code table shared with the ground station decoder; append only, never reorder
+LORA_LABELS = ("person", "bicycle", "car", "motorcycle", "bus", "truck")
\ No newline at end of file
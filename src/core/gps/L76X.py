@@ -2,8 +2,9 @@ import lgpio
 from core.gps import config
 import math
 import time
+from collections import deque
 from micropyGPS import MicropyGPS
-import srtm
+from core.gps.nmea import NMEAFramer, dispatch_sentence
 
 g = MicropyGPS(+8)
 Temp = "0123456789ABCDEF*"
@@ -29,6 +30,8 @@ class L76X(object):
     Lon_Google = 0.0
     Lat_Google = 0.0
     elevation_above_ground = 0.0
+    altitude = 0.0
+    fix_quality = 0
     speed = 0.0
     course = 0.0
 
@@ -88,6 +91,8 @@ class L76X(object):
     def __init__(self):
         self.config = config.config(9600)
         self._gpio_handle = None  # Will hold the input-mode handle if needed
+        self.framer = NMEAFramer()
+        self._sentences = deque()  # validated sentences read past the last $GNGLL
 
     def L76X_Send_Command(self, data):
         Check = ord(data[1])
@@ -102,21 +107,15 @@ class L76X(object):
         # print(data)
 
     def get_gps_data(self, elevation_data):
-        data = ""
         while True:
-            if g.valid:
-                self.Status = 1
-            else:
-                self.Status = 0
-            x = self.config.Uart_ReceiveByte()
-            if x == b"$":
-                while x != b"\r":
-                    data += x.decode()
-                    g.update(x.decode())
-                    x = self.config.Uart_ReceiveByte()
-                data += "\r\n"
-                if "$GNGLL" in data:
-                    break
+            if not self._sentences:
+                self._sentences.extend(self.framer.feed(self.config.Uart_ReceiveAvailable()))
+                continue
+            sentence = self._sentences.popleft()
+            dispatch_sentence(g, sentence)
+            if sentence.startswith("$GNGLL"):
+                break
+        self.Status = 1 if g.valid else 0
         self.Lat = g.latitude[0] + g.latitude[1] / 60
         self.Lon = g.longitude[0] + g.longitude[1] / 60
         if g.latitude[2] != "N":
@@ -132,14 +131,12 @@ class L76X(object):
         # print("Altitude ", g.altitude)
         # print("Ground elevation ", ground_elevation)
 
-        if ground_elevation:
-            self.elevation_above_ground = g.altitude - elevation_data.get_elevation(
-                self.Lat, self.Lon
-            )
+        if ground_elevation is not None:
+            self.elevation_above_ground = g.altitude - ground_elevation
+        self.altitude = g.altitude
+        self.fix_quality = g.fix_stat
         self.speed = g.speed[2]
         self.course = g.course
-        # print(data)
-        data = "\r\n"
 
     def transformLat(self, x, y):
         ret = (
@@ -28,6 +28,10 @@ class config(object):
     def Uart_ReceiveByte(ser):
         return ser.serial.read(1)
 
+    def Uart_ReceiveAvailable(ser):
+        # Blocks for the first byte, then returns everything already buffered by the driver
+        return ser.serial.read(ser.serial.in_waiting or 1)
+
     def Uart_ReceiveString(ser, value):
         data = ser.serial.read(value)
         return data
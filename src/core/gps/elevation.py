@@ -0,0 +1,107 @@
+"""
+Ground elevation lookups backed by SRTM, with a quantised-coordinate LRU cache.
+
+Fixes are snapped to a grid of resolution_m (converted to degrees, like the SRTM
+arc-second grid) so consecutive fixes over the same cell cost one dict lookup.
+The SRTM index is only loaded on the first lookup, and the tiles around the
+first fix are loaded on a background thread.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import srtm
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_DEGREE = 111_320.0   # one degree of latitude; SRTM cells are equal in degrees, not meters
+
+
+class ElevationCache:
+    """
+    LRU cache of ground elevation keyed by grid cell.
+
+    Drop-in for srtm's GeoElevationData.get_elevation. get_elevation() is meant to be
+    called from a single thread (the GPS reader). srtm is not thread-safe, so its
+    initialisation, lookups and the background tile preload all take one lock; the
+    preload takes it per tile, so a lookup waits for at most one tile load.
+    """
+
+    def __init__(self, resolution_m: float = 30.0, max_entries: int = 4096, preload_radius: int = 1,
+                 data_factory=srtm.get_data):
+        """
+        Args:
+            resolution_m (float): Grid cell size; 30 m matches SRTM1, 90 m matches SRTM3.
+            max_entries (int): Cells kept before the least recently used one is evicted.
+            preload_radius (int): 1-degree tiles to load around the first fix (0 disables preloading).
+            data_factory (callable): Returns an object with get_elevation(lat, lon) and get_file(lat, lon).
+        """
+        if resolution_m <= 0:
+            raise ValueError("resolution_m must be positive")
+        self.grid_deg = resolution_m / METERS_PER_DEGREE
+        self.max_entries = max_entries
+        self.preload_radius = preload_radius
+        self._data_factory = data_factory
+        self._data = None
+        self._srtm_lock = threading.Lock()
+        self._cells = OrderedDict()
+        self._preloader = None
+        self.hits = 0
+        self.misses = 0
+
+    def _srtm(self):
+        """The SRTM data object, created on first use; the caller holds _srtm_lock."""
+        if self._data is None:
+            self._data = self._data_factory()
+        return self._data
+
+    def cell(self, lat: float, lon: float):
+        return (round(lat / self.grid_deg), round(lon / self.grid_deg))
+
+    def get_elevation(self, lat: float, lon: float) -> Optional[float]:
+        """Ground elevation (m) at the centre of the cell containing lat/lon, None where SRTM has no data."""
+        key = self.cell(lat, lon)
+        cells = self._cells
+        if key in cells:
+            cells.move_to_end(key)
+            self.hits += 1
+            return cells[key]
+
+        self.misses += 1
+        if self._preloader is None and self.preload_radius > 0:
+            self.preload(lat, lon)
+        try:
+            with self._srtm_lock:
+                elevation = self._srtm().get_elevation(key[0] * self.grid_deg, key[1] * self.grid_deg)
+        except Exception:
+            logger.exception("SRTM lookup failed")
+            return None
+        cells[key] = elevation
+        if len(cells) > self.max_entries:
+            cells.popitem(last=False)
+        return elevation
+
+    def preload(self, lat: float, lon: float):
+        """Load the SRTM tiles around lat/lon in the background."""
+        self._preloader = threading.Thread(target=self._preload, args=(lat, lon), name="srtm-preload", daemon=True)
+        self._preloader.start()
+
+    def _preload(self, lat: float, lon: float):
+        r = self.preload_radius
+        for dlat in range(-r, r + 1):
+            for dlon in range(-r, r + 1):
+                try:
+                    with self._srtm_lock:
+                        self._srtm().get_file(lat + dlat, lon + dlon)
+                except Exception:
+                    logger.warning(f"SRTM tile near ({lat + dlat:.0f}, {lon + dlon:.0f}) could not be loaded")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._cells),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
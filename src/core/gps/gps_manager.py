@@ -1,56 +1,111 @@
+import logging
+import threading
 import time
 import core.gps.L76X as L76X
-import srtm
-from typing import Tuple
+from core.gps.elevation import ElevationCache
+from typing import NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class GPSFix(NamedTuple):
+    """Immutable GPS snapshot published by the reader thread."""
+    latitude: float
+    longitude: float
+    altitude: float             # MSL altitude from the receiver (m)
+    elevation: float            # elevation above ground (m)
+    speed: float                # ground speed (m/s)
+    course: float
+    fix_quality: int            # GGA fix quality (0 = no fix)
+    positioned: bool
+    received_at: Optional[float]  # time.monotonic() when published, None before the first sentence
+
+
+NO_FIX = GPSFix(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, False, None)
+
 
 class GPSManager:
-    def __init__(self, update_threshold: float = 1.0):
+    def __init__(self, elevation_grid_m: float = 30.0, elevation_cache_size: int = 4096):
         self.gps = L76X.L76X()
         self.gps.L76X_Set_Baudrate(9600)
         self.gps.L76X_Send_Command(self.gps.SET_POS_FIX_400MS)
         self.gps.L76X_Send_Command(self.gps.SET_NMEA_OUTPUT)
         self.gps.L76X_Send_Command(self.gps.SET_HOT_START)
-        self.elevation_data = srtm.get_data()
+        # SRTM is loaded on the first fix, not here
+        self.elevation_data = ElevationCache(elevation_grid_m, elevation_cache_size)
         self.gps.L76X_Exit_BackupMode()
-        
-        # Threshold in seconds between GPS updates
-        self.update_threshold = update_threshold
-        self.last_update_time = 1
-        self.last_location: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+
+        # Latest fix; replaced wholesale by the reader thread, so readers never need a lock
+        self._fix: GPSFix = NO_FIX
+        self._stop = threading.Event()
+        self._reader = threading.Thread(target=self._read_loop, name="gps-reader", daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        while not self._stop.is_set():
+            try:
+                # blocks on the UART until the next $GNGLL sentence
+                self.gps.get_gps_data(self.elevation_data)
+            except Exception:
+                logger.exception("GPS read failed")
+                time.sleep(0.5)
+                continue
+            self._fix = GPSFix(
+                latitude=self.gps.Lat,
+                longitude=self.gps.Lon,
+                altitude=self.gps.altitude,
+                elevation=self.gps.elevation_above_ground,
+                speed=self.gps.speed / 3.6,     # micropyGPS reports km/h
+                course=self.gps.course,
+                fix_quality=self.gps.fix_quality,
+                positioned=self.gps.Status == 1,
+                received_at=time.monotonic(),
+            )
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the reader thread (it exits after the sentence it is waiting on)."""
+        self._stop.set()
+        self._reader.join(timeout)
+        logger.info(f"Elevation cache: {self.elevation_data.stats()}")
+
+    def get_fix(self) -> Tuple[GPSFix, float]:
+        """
+        Get the latest fix without blocking.
+
+        Returns:
+            Tuple[GPSFix, float]: (fix, age in seconds); age is inf before the first fix.
+        """
+        fix = self._fix
+        if fix.received_at is None:
+            return fix, float("inf")
+        return fix, time.monotonic() - fix.received_at
 
     def get_current_location(self) -> Tuple[float, float, float]:
         """
-        Get the current GPS location and elevation.
-        If the time since the last update is less than the threshold,
-        return cached data; otherwise, poll the GPS module for new data.
-        
+        Get the latest GPS location and elevation published by the reader thread.
+
         Returns:
             Tuple[float, float, float]: (latitude, longitude, elevation)
         """
-        current_time = time.time()
-        if (current_time - self.last_update_time) < self.update_threshold and self.last_update_time != 0.0:
-            return self.last_location
-        else:
-            self.gps.get_gps_data(self.elevation_data)
-            self.last_location = (self.gps.Lat, self.gps.Lon, self.gps.elevation_above_ground)
-            self.last_update_time = current_time
-            return self.last_location
+        fix = self._fix
+        return (fix.latitude, fix.longitude, fix.elevation)
 
     def get_speed_and_course(self) -> Tuple[float, float]:
         """
         Get the current speed and course.
-        
+
         Returns:
             Tuple[float, float]: (speed, course)
         """
-        return (self.gps.speed, self.gps.course)
+        fix = self._fix
+        return (fix.speed, fix.course)
 
     @property
     def is_positioned(self) -> bool:
         """
         Check if the GPS has a position fix.
-        
+
         Returns:
             bool: True if positioned, False otherwise.
         """
-        return self.gps.Status == 1
+        return self._fix.positioned
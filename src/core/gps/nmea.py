@@ -0,0 +1,118 @@
+"""
+Streaming NMEA 0183 framer.
+
+Bytes are read from the UART in whatever chunk size is available, appended to a
+bytearray and split into complete "$...*hh" sentences. Sentences with a bad or
+missing checksum are counted and dropped, so the parser only ever sees clean input.
+"""
+from typing import List
+
+MAX_SENTENCE = 100          # NMEA 0183 allows 82 characters; leave room for proprietary sentences
+
+
+def nmea_checksum(body) -> int:
+    """XOR of every byte between '$' and '*'."""
+    check = 0
+    for b in body:
+        check ^= b
+    return check
+
+
+class NMEAFramer:
+    """Splits a byte stream into checksum-validated sentences."""
+
+    def __init__(self, max_sentence: int = MAX_SENTENCE):
+        self.max_sentence = max_sentence
+        self._buf = bytearray()
+        self.sentences = 0
+        self.bad_checksum = 0
+        self.dropped = 0
+
+    def feed(self, data: bytes) -> List[str]:
+        """
+        Append received bytes and return the sentences they completed.
+
+        Returns:
+            list: Sentences as str, "$...*hh" without the line ending.
+        """
+        buf = self._buf
+        buf += data
+        out = []
+        start = buf.find(b"$")
+        while start >= 0:
+            end = buf.find(b"\n", start)
+            if end < 0:
+                break
+            nxt = buf.find(b"$", start + 1, end)
+            if nxt >= 0:
+                # truncated sentence (dropped bytes); resync on the next '$'
+                self.dropped += 1
+                start = nxt
+                continue
+            sentence = self._check(buf, start, end)
+            if sentence is not None:
+                out.append(sentence)
+            start = buf.find(b"$", end + 1)
+
+        if start < 0:
+            buf.clear()
+        else:
+            del buf[:start]
+            if len(buf) > self.max_sentence:
+                # no line ending within a sentence length: garbage, drop it
+                self.dropped += 1
+                buf.clear()
+        return out
+
+    def _check(self, buf: bytearray, start: int, end: int):
+        star = buf.rfind(b"*", start, end)
+        if star < 0 or end - star < 3:
+            self.bad_checksum += 1
+            return None
+        try:
+            expected = int(buf[star + 1:star + 3], 16)
+        except ValueError:
+            self.bad_checksum += 1
+            return None
+        body = buf[start + 1:star]
+        if nmea_checksum(body) != expected:
+            self.bad_checksum += 1
+            return None
+        self.sentences += 1
+        return buf[start:star + 3].decode("ascii", "replace")
+
+    def reset(self):
+        self._buf.clear()
+
+
+def dispatch_sentence(parser, sentence: str):
+    """
+    Hand one validated sentence (as returned by NMEAFramer.feed) to a MicropyGPS parser.
+
+    MicropyGPS keeps a table of sentence handlers that read parser.gps_segments, so a
+    complete sentence can be parsed in one call instead of character by character.
+    Parsers without that table are fed the sentence one character at a time.
+
+    Returns:
+        str or None: The sentence type (e.g. "GNGLL") if it was parsed, else None.
+    """
+    handlers = getattr(parser, "supported_sentences", None)
+    if handlers is None:
+        result = None
+        for ch in sentence + "\r\n":
+            result = parser.update(ch) or result
+        return result
+
+    body, _, checksum = sentence[1:].partition("*")
+    segments = body.split(",")
+    handler = handlers.get(segments[0])
+    if handler is None:
+        return None
+    # same layout MicropyGPS.update builds: the fields, then the checksum as the last segment
+    segments.append(checksum)
+    parser.gps_segments = segments
+    parser.clean_sentences += 1
+    if handler(parser):
+        parser.parsed_sentences += 1
+        return segments[0]
+    return None
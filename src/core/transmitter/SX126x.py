@@ -1,9 +1,15 @@
 from core.transmitter.base import BaseLoRa
-import spidev
-import lgpio
+from core.transmitter.airtime import symbol_time_ms, time_on_air_ms
+import threading
 import time
 
-spi = spidev.SpiDev()
+try:
+    import spidev
+    import lgpio
+    spi = spidev.SpiDev()
+except ImportError:
+    spi = None # Available only on the Pi; lets the package (frame codec, constants) load elsewhere
+    lgpio = None
 
 class SX126x(BaseLoRa) :
     """Class for SX1261/62/68 and LLCC68 LoRa chipsets from Semtech"""
@@ -287,6 +293,31 @@ class SX126x(BaseLoRa) :
 
     _gpio_handle = None  # Will hold the GPIO handle
 
+    # SPI frame and command queue
+    _FRAME_SIZE = 264   # opcode + 2 address bytes + 256 byte buffer, rounded up
+    _queueing = False
+    _bw500Fix = None    # bandwidth the TX modulation workaround was last applied for
+
+    # TX/RX completion
+    _irqCallback = None
+    _irqHandler = None
+    _POLL_MIN = 0.0005  # IRQ status poll interval bounds (s) when no IRQ pin is wired
+    _POLL_MAX = 0.01
+
+    def __init__(self, spiDev = None, gpio = None) :
+
+        # SPI device and lgpio compatible GPIO module, the Pi hardware unless given (e.g. mock_bus)
+        self._spi = spiDev if spiDev is not None else spi
+        self._gpio = gpio if gpio is not None else lgpio
+        # reused SPI write frame and queued command frames
+        self._frame = bytearray(self._FRAME_SIZE)
+        self._frameView = memoryview(self._frame)
+        self._cmdQueue = bytearray()
+        self._cmdEnds = []
+        # set by the DIO interrupt handlers, which run on the lgpio callback thread and share the SPI bus
+        self._irqEvent = threading.Event()
+        self._spiLock = threading.RLock()
+
 ### COMMON OPERATIONAL METHODS ###
 
     def begin(self, bus: int = _bus, cs: int = _cs, reset: int = _reset, busy: int = _busy, irq: int = _irq, txen: int = _txen, rxen: int = _rxen, wake: int = _wake) :
@@ -308,21 +339,23 @@ class SX126x(BaseLoRa) :
     def end(self) :
 
         self.sleep(self.SLEEP_COLD_START)
-        spi.close()
+        self._spi.close()
         if self._gpio_handle is not None:
-            lgpio.gpiochip_close(self._gpio_handle)
+            self._gpio.gpiochip_close(self._gpio_handle)
 
     def reset(self) -> bool :
 
         # put reset pin to low then wait busy pin to low
-        lgpio.gpio_write(self._gpio_handle, self._reset, 0)
+        self._bw500Fix = None
+        self._gpio.gpio_write(self._gpio_handle, self._reset, 0)
         time.sleep(0.001)
-        lgpio.gpio_write(self._gpio_handle, self._reset, 1)
+        self._gpio.gpio_write(self._gpio_handle, self._reset, 1)
         return not self.busyCheck()
 
     def sleep(self, option = SLEEP_WARM_START) :
 
         # put device in sleep mode, wait for 500 us to enter sleep mode
+        self._bw500Fix = None
         self.standby()
         self.setSleep(option)
         time.sleep(0.0005)
@@ -331,7 +364,7 @@ class SX126x(BaseLoRa) :
 
         # wake device by set wake pin (cs pin) to low before spi transaction and put device in standby mode
         if (self._wake != -1) :
-            lgpio.gpio_claim_output(self._gpio_handle, self._wake, 0)
+            self._gpio.gpio_claim_output(self._gpio_handle, self._wake, 0)
             time.sleep(0.0005)
         self.setStandby(self.STANDBY_RC)
         self._fixResistanceAntenna()
@@ -343,8 +376,10 @@ class SX126x(BaseLoRa) :
     def busyCheck(self, timeout: int = _busyTimeout) :
 
         # wait for busy pin to LOW or timeout reached
+        gpio_read = self._gpio.gpio_read
+        if gpio_read(self._gpio_handle, self._busy) == 0 : return False
         t = time.time()
-        while lgpio.gpio_read(self._gpio_handle, self._busy) == 1 :
+        while gpio_read(self._gpio_handle, self._busy) == 1 :
             if (time.time() - t) > (timeout / 1000) : return True
         return False
 
@@ -364,10 +399,11 @@ class SX126x(BaseLoRa) :
         self._cs = cs
         self._spiSpeed = speed
         # open spi line and set bus id, chip select, and spi speed
-        spi.open(bus, cs)
-        spi.max_speed_hz = speed
-        spi.lsbfirst = False
-        spi.mode = 0
+        if self._spi is None : raise RuntimeError("spidev is not available, pass spiDev to SX126x()")
+        self._spi.open(bus, cs)
+        self._spi.max_speed_hz = speed
+        self._spi.lsbfirst = False
+        self._spi.mode = 0
 
     def setPins(self, reset: int, busy: int, irq: int = -1, txen: int = -1, rxen: int = -1, wake: int = -1) :
 
@@ -380,14 +416,14 @@ class SX126x(BaseLoRa) :
         
         # Initialize GPIO handle if not already done
         if self._gpio_handle is None:
-            self._gpio_handle = lgpio.gpiochip_open(0)
+            self._gpio_handle = self._gpio.gpiochip_open(0)
             
         # set pins as input or output
-        lgpio.gpio_claim_output(self._gpio_handle, reset, 0)
-        lgpio.gpio_claim_input(self._gpio_handle, busy)
-        lgpio.gpio_claim_output(self._gpio_handle, self._cs_define, 0)
-        if irq != -1: lgpio.gpio_claim_input(self._gpio_handle, irq)
-        if txen != -1: lgpio.gpio_claim_output(self._gpio_handle, txen, 0)
+        self._gpio.gpio_claim_output(self._gpio_handle, reset, 0)
+        self._gpio.gpio_claim_input(self._gpio_handle, busy)
+        self._gpio.gpio_claim_output(self._gpio_handle, self._cs_define, 0)
+        if irq != -1: self._gpio.gpio_claim_alert(self._gpio_handle, irq, self._gpio.RISING_EDGE)
+        if txen != -1: self._gpio.gpio_claim_output(self._gpio_handle, txen, 0)
 
     def setRfIrqPin(self, dioPinSelect: int) :
 
@@ -426,6 +462,7 @@ class SX126x(BaseLoRa) :
     def setModem(self, modem) :
 
         self._modem = modem
+        self._bw500Fix = None
         self.setStandby(self.STANDBY_RC)
         self.setPacketType(modem)
 
@@ -609,7 +646,7 @@ class SX126x(BaseLoRa) :
         if syncWord <= 0xFF :
             buf = (
                 (syncWord & 0xF0) | 0x04,
-                (syncWord << 4) | 0x04
+                ((syncWord << 4) & 0xFF) | 0x04
             )
         self.writeRegister(self.REG_LORA_SYNC_WORD_MSB, buf, 2)
 
@@ -642,20 +679,24 @@ class SX126x(BaseLoRa) :
 
     def beginPacket(self) :
 
+        # queue packet setup commands until endPacket sends them together
+        self.beginCommands()
         # reset payload length and buffer index
         self._payloadTxRx = 0
         self.setBufferBaseAddress(self._bufferIndex, (self._bufferIndex + 0xFF) % 0xFF)
 
         # save current txen pin state and set txen pin to LOW
         if self._txen != -1 :
-            self._txState = lgpio.gpio_read(self._gpio_handle, self._txen)
-            lgpio.gpio_write(self._gpio_handle, self._txen, 0)
+            self._txState = self._gpio.gpio_read(self._gpio_handle, self._txen)
+            self._gpio.gpio_write(self._gpio_handle, self._txen, 0)
         self._fixLoRaBw500(self._bw)
 
     def endPacket(self, timeout: int = TX_SINGLE) -> bool :
 
         # skip to enter TX mode when previous TX operation incomplete
-        if self.getMode == self.STATUS_MODE_TX : return False
+        if self.getMode == self.STATUS_MODE_TX :
+            self.flushCommands()
+            return False
 
         # clear previous interrupt and set TX done, and TX timeout as interrupt source
         self._irqSetup(self.IRQ_TX_DONE | self.IRQ_TIMEOUT)
@@ -669,13 +710,15 @@ class SX126x(BaseLoRa) :
         txTimeout = timeout << 6
         if txTimeout > 0x00FFFFFF : txTimeout = self.TX_SINGLE
 
+        # attach TX interrupt handler before the device can raise it
+        if self._irq != -1 :
+            self._attachIrq(self._interruptTx)
+
         # set device to transmit mode with configured timeout or single operation
         self.setTx(txTimeout)
+        self.flushCommands()
+        # SetTx has gone out with the flush, transmission starts now
         self._transmitTime = time.time()
-
-        # set operation status to wait and attach TX interrupt handler
-        if self._irq != -1 :
-            lgpio.callback(self._gpio_handle, self._irq, lgpio.RISING_EDGE, self._interruptTx)
         return True
 
     def write(self, data, length: int = 0) :
@@ -697,11 +740,10 @@ class SX126x(BaseLoRa) :
 
         # prepare bytes or bytearray to be transmitted
         if type(data) is bytes or type(data) is bytearray :
-            dataList = tuple(data)
-            length = len(dataList)
+            length = len(data)
         else : raise TypeError("input data must be bytes or bytearray")
         # write data to buffer and update buffer index and payload
-        self.writeBuffer(self._bufferIndex, dataList, length)
+        self.writeBuffer(self._bufferIndex, data, length)
         self._bufferIndex = (self._bufferIndex + length) % 256
         self._payloadTxRx += length
 
@@ -727,15 +769,15 @@ class SX126x(BaseLoRa) :
 
         # save current txen pin state and set txen pin to high
         if self._txen != -1 :
-            self._txState = lgpio.gpio_read(self._gpio_handle, self._txen)
-            lgpio.gpio_write(self._gpio_handle, self._txen, 1)
+            self._txState = self._gpio.gpio_read(self._gpio_handle, self._txen)
+            self._gpio.gpio_write(self._gpio_handle, self._txen, 1)
+
+        # attach RX interrupt handler before the device can raise it
+        if self._irq != -1 :
+            self._attachIrq(self._interruptRx)
 
         # set device to receive mode with configured timeout, single, or continuous operation
         self.setRx(rxTimeout)
-
-        # set operation status to wait and attach RX interrupt handler
-        if self._irq != -1 :
-            lgpio.callback(self._gpio_handle, self._irq, lgpio.RISING_EDGE, self._interruptRx)
         return True
 
     def listen(self, rxPeriod: int, sleepPeriod: int) -> bool :
@@ -757,15 +799,15 @@ class SX126x(BaseLoRa) :
 
         # save current txen pin state and set txen pin to high
         if self._txen != -1 :
-            self._txState = lgpio.gpio_read(self._gpio_handle, self._txen)
-            lgpio.gpio_write(self._gpio_handle, self._txen, 1)
+            self._txState = self._gpio.gpio_read(self._gpio_handle, self._txen)
+            self._gpio.gpio_write(self._gpio_handle, self._txen, 1)
+
+        # attach RX interrupt handler before the device can raise it
+        if self._irq != -1 :
+            self._attachIrq(self._interruptRx)
 
         # set device to receive mode with configured receive and sleep period
         self.setRxDutyCycle(rxPeriod, sleepPeriod)
-
-        # set operation status to wait and attach RX interrupt handler
-        if self._irq != -1 :
-            lgpio.callback(self._gpio_handle, self._irq, lgpio.RISING_EDGE, self._interruptRx)
         return True
 
     def available(self) -> int :
@@ -820,14 +862,17 @@ class SX126x(BaseLoRa) :
         if self._statusIrq :
             return True
 
-        # wait transmit or receive process finish by checking IRQ status
+        # wait transmit or receive process finish, signalled by the IRQ pin handler or by polling IRQ status
         irqStat = 0x0000
         t = time.time()
-        while irqStat == 0x0000 and self._statusIrq == 0x0000 :
-            # only check IRQ status register for non interrupt operation
-            if self._irq == -1 : irqStat = self.getIrqStatus()
-            # return when timeout reached
-            if (time.time() - t) > timeout and timeout > 0 : return False
+        if self._irq != -1 :
+            while self._statusIrq == 0x0000 :
+                remaining = t + timeout - time.time() if timeout > 0 else None
+                if remaining is not None and remaining <= 0 : return False
+                if self._irqEvent.wait(remaining) : self._irqEvent.clear()
+        else :
+            irqStat = self._pollIrqStatus(t, timeout)
+            if irqStat == 0x0000 : return False
 
         if self._statusIrq :
             # immediately return when interrupt signal hit
@@ -836,12 +881,12 @@ class SX126x(BaseLoRa) :
             # for transmit, calculate transmit time and set back txen pin to previous state
             self._transmitTime = time.time() - self._transmitTime
             if self._txen != -1 :
-                lgpio.gpio_write(self._gpio_handle, self._txen, self._txState)
+                self._gpio.gpio_write(self._gpio_handle, self._txen, self._txState)
         elif self._statusWait == self.STATUS_RX_WAIT :
             # for receive, get received payload length and buffer index and set back txen pin to previous state
             (self._payloadTxRx, self._bufferIndex) = self.getRxBufferStatus()
             if self._txen != -1 :
-                lgpio.gpio_write(self._gpio_handle, self._txen, self._txState)
+                self._gpio.gpio_write(self._gpio_handle, self._txen, self._txState)
             self._fixRxTimeout()
         elif self._statusWait == self.STATUS_RX_CONTINUOUS :
             # for receive continuous, get received payload length and buffer index and clear IRQ status
@@ -852,6 +897,23 @@ class SX126x(BaseLoRa) :
         self._statusIrq = irqStat
         return True
 
+    def _pollIrqStatus(self, start: float, timeout: float) -> int :
+
+        # poll interval of about one symbol, so completion is noticed within a symbol without spinning
+        interval = min(max(symbol_time_ms(self._sf, self._bw) / 1000, self._POLL_MIN), self._POLL_MAX)
+        deadline = start + timeout if timeout > 0 else float("inf")
+        # transmit cannot finish before its time on air, so sleep through it first
+        if self._statusWait == self.STATUS_TX_WAIT :
+            txDone = self._transmitTime + self.timeOnAir() / 1000
+            early = min(txDone, deadline) - interval - time.time()
+            if early > 0 : time.sleep(early)
+        while True :
+            irqStat = self.getIrqStatus()
+            if irqStat : return irqStat
+            now = time.time()
+            if now > deadline : return 0x0000
+            time.sleep(min(interval, max(deadline - now, 0)))
+
     def status(self) -> int :
 
         # set back status IRQ for RX continuous operation
@@ -876,6 +938,12 @@ class SX126x(BaseLoRa) :
         # get transmit time in millisecond (ms)
         return self._transmitTime * 1000
 
+    def timeOnAir(self, length: int = -1) -> float :
+
+        # calculate time on air in millisecond (ms) of a packet with current LoRa modulation and packet setting
+        if length < 0 : length = self._payloadTxRx
+        return time_on_air_ms(length, self._sf, self._bw, self._cr, self._preambleLength, self._headerType, self._crcType, self._ldro)
+
     def dataRate(self) -> float :
 
         # get data rate last transmitted package in kbps
@@ -913,6 +981,7 @@ class SX126x(BaseLoRa) :
     def _irqSetup(self, irqMask) :
 
         # clear IRQ status of previous transmit or receive operation
+        self._irqEvent.clear()
         self.clearIrqStatus(0x03FF)
         # set selected interrupt source
         dio1Mask = 0x0000
@@ -923,28 +992,38 @@ class SX126x(BaseLoRa) :
         else : dio1Mask = irqMask
         self.setDioIrqParams(irqMask, dio1Mask, dio2Mask, dio3Mask)
 
-    def _interruptTx(self, gpio, level, tick) :
+    def _attachIrq(self, handler) :
+
+        # keep a single handler on the IRQ pin, lgpio keeps every registered callback until cancelled
+        if self._irqHandler == handler : return
+        if self._irqCallback is not None : self._irqCallback.cancel()
+        self._irqCallback = self._gpio.callback(self._gpio_handle, self._irq, self._gpio.RISING_EDGE, handler)
+        self._irqHandler = handler
+
+    def _interruptTx(self, chip, gpio, level, tick) :
 
         # calculate transmit time
         self._transmitTime = time.time() - self._transmitTime
         # set back txen pin to previous state
         if self._txen != -1 :
-            lgpio.gpio_write(self._gpio_handle, self._txen, self._txState)
+            self._gpio.gpio_write(self._gpio_handle, self._txen, self._txState)
         # store IRQ status
         self._statusIrq = self.getIrqStatus()
+        self._irqEvent.set()
 
         # call onTransmit function
         if callable(self._onTransmit) :
             self._onTransmit()
 
-    def _interruptRx(self, gpio, level, tick) :
+    def _interruptRx(self, chip, gpio, level, tick) :
 
         # set back txen pin to previous state
         if self._txen != -1 :
-            lgpio.gpio_write(self._gpio_handle, self._txen, self._txState)
+            self._gpio.gpio_write(self._gpio_handle, self._txen, self._txState)
         self._fixRxTimeout()
         # store IRQ status
         self._statusIrq = self.getIrqStatus()
+        self._irqEvent.set()
         # get received payload length and buffer index
         (self._payloadTxRx, self._bufferIndex) = self.getRxBufferStatus()
 
@@ -952,10 +1031,11 @@ class SX126x(BaseLoRa) :
         if callable(self._onReceive) :
             self._onReceive()
 
-    def _interruptRxContinuous(self, gpio, level, tick) :
+    def _interruptRxContinuous(self, chip, gpio, level, tick) :
 
         # store IRQ status
         self._statusIrq = self.getIrqStatus()
+        self._irqEvent.set()
         # clear IRQ status
         self.clearIrqStatus(0x03FF)
         # get received payload length and buffer index
@@ -970,14 +1050,50 @@ class SX126x(BaseLoRa) :
         # register onTransmit function to call every transmit done
         self._onTransmit = callback
         if self._irq != -1:
-            lgpio.callback(self._gpio_handle, self._irq, lgpio.RISING_EDGE, self._interruptTx)
+            self._attachIrq(self._interruptTx)
 
     def onReceive(self, callback) :
 
         # register onReceive function to call every receive done
         self._onReceive = callback
         if self._irq != -1:
-            lgpio.callback(self._gpio_handle, self._irq, lgpio.RISING_EDGE, self._interruptRx)
+            self._attachIrq(self._interruptRx)
+
+### SPI COMMAND QUEUE ###
+
+    def beginCommands(self) :
+
+        # queue write commands in one buffer instead of sending each immediately, reads still flush first
+        self._queueing = True
+
+    def flushCommands(self) :
+
+        # stop queueing and send what was queued
+        self._queueing = False
+        self._sendQueued()
+
+    def _sendQueued(self) :
+
+        # send queued commands in order, each framed by chip select and started once busy pin is LOW
+        with self._spiLock :
+            ends = self._cmdEnds
+            if not ends : return
+            gpio_write = self._gpio.gpio_write
+            writebytes2 = self._spi.writebytes2
+            handle = self._gpio_handle
+            cs = self._cs_define
+            start = 0
+            try :
+                with memoryview(self._cmdQueue) as view :
+                    for end in ends :
+                        if not self.busyCheck() :
+                            gpio_write(handle, cs, 0)
+                            writebytes2(view[start:end])
+                            gpio_write(handle, cs, 1)
+                        start = end
+            finally :
+                self._cmdQueue.clear()
+                ends.clear()
 
 ### SX126X API: OPERATIONAL MODES COMMANDS ###
 
@@ -1064,8 +1180,7 @@ class SX126x(BaseLoRa) :
         return buf[1:]
 
     def writeBuffer(self, offset: int, data: tuple, nData: int) :
-        buf = (offset,) + tuple(data)
-        self._writeBytes(0x0E, buf, nData+1)
+        self._writeBytes(0x0E, (offset,), 1, data, nData)
 
     def readBuffer(self, offset: int, nData: int) -> tuple :
         buf = self._readBytes(0x1E, nData+1, (offset,), 1)
@@ -1236,6 +1351,9 @@ class SX126x(BaseLoRa) :
 ### SX126X API: WORKAROUND FUNCTIONS ###
 
     def _fixLoRaBw500(self, bw: int) :
+        # register value only depends on packet type and bandwidth, skip the read-modify-write when unchanged
+        if self._bw500Fix == bw : return
+        self._bw500Fix = bw
         packetType = self.getPakcetType()
         buf = self.readRegister(self.REG_TX_MODULATION, 1)
         value = buf[0] | 0x04
@@ -1263,31 +1381,35 @@ class SX126x(BaseLoRa) :
 
 ### SX126X API: UTILITIES ###
 
-    def _writeBytes(self, opCode: int, data: tuple, nBytes: int) :
-        if self.busyCheck() : return
-        lgpio.gpio_write(self._gpio_handle, self._cs_define, 0)
-        buf = [opCode]
-        for i in range(nBytes) : buf.append(data[i])
-        # print(f"\nSPI Write Debug:")
-        # print(f"OpCode: 0x{opCode:02X}")
-        # if nBytes > 0:
-            # print(f"Data: {' '.join([f'0x{x:02X}' for x in data])}")
-        # print(f"Sent: {' '.join([f'0x{x:02X}' for x in buf])}")
-        spi.xfer2(buf)
-        lgpio.gpio_write(self._gpio_handle, self._cs_define, 1)
+    def _writeBytes(self, opCode: int, data: tuple, nBytes: int, payload = (), nPayload: int = 0) :
+        with self._spiLock :
+            end = nBytes + nPayload + 1
+            if self._queueing :
+                # defer to flushCommands
+                queue = self._cmdQueue
+                queue.append(opCode)
+                queue.extend(data[:nBytes])
+                if nPayload : queue.extend(payload[:nPayload])
+                self._cmdEnds.append(len(queue))
+                return
+            if self.busyCheck() : return
+            frame = self._frame
+            frame[0] = opCode
+            frame[1:nBytes+1] = data[:nBytes]
+            if nPayload : frame[nBytes+1:end] = payload[:nPayload]
+            self._gpio.gpio_write(self._gpio_handle, self._cs_define, 0)
+            self._spi.writebytes2(self._frameView[:end])
+            self._gpio.gpio_write(self._gpio_handle, self._cs_define, 1)
 
     def _readBytes(self, opCode: int, nBytes: int, address: tuple = (), nAddress: int = 0) -> tuple :
-        if self.busyCheck() : return ()
-        lgpio.gpio_write(self._gpio_handle, self._cs_define, 0)
-        buf = [opCode]
-        for i in range(nAddress) : buf.append(address[i])
-        for i in range(nBytes) : buf.append(0x00)
-        # print(f"\nSPI Read Debug:")
-        # print(f"OpCode: 0x{opCode:02X}")
-        # if nAddress > 0:
-            # print(f"Address: {' '.join([f'0x{x:02X}' for x in address])}")
-        # print(f"Sent: {' '.join([f'0x{x:02X}' for x in buf])}")
-        feedback = spi.xfer2(buf)
-        # print(f"Received: {' '.join([f'0x{x:02X}' for x in feedback])}")
-        lgpio.gpio_write(self._gpio_handle, self._cs_define, 1)
-        return tuple(feedback[nAddress+1:])
+        # queued writes must reach the chip before anything is read back
+        with self._spiLock :
+            if self._cmdEnds : self._sendQueued()
+            if self.busyCheck() : return ()
+            buf = [opCode]
+            if nAddress : buf += address[:nAddress]
+            buf += [0x00] * nBytes
+            self._gpio.gpio_write(self._gpio_handle, self._cs_define, 0)
+            feedback = self._spi.xfer2(buf)
+            self._gpio.gpio_write(self._gpio_handle, self._cs_define, 1)
+            return tuple(feedback[nAddress+1:])
@@ -0,0 +1,142 @@
+"""
+LoRa time-on-air model for the SX126x and an airtime budget.
+
+time_on_air_ms follows the SX1261/2 datasheet (section 6.1.4):
+
+    SF5/SF6:  Nsym = Npreamble + 6.25 + 8 + ceil(max(8*PL + CRC - 4*SF + HDR,     0) / (4*SF)) * (CR + 4)
+    SF7-12:   Nsym = Npreamble + 4.25 + 8 + ceil(max(8*PL + CRC - 4*SF + 8 + HDR, 0) / (4*SF')) * (CR + 4)
+
+with CRC = 16 when enabled, HDR = 20 for the explicit header, SF' = SF - 2 when low
+data rate optimization is on, and Tsym = 2^SF / BW.
+"""
+import math
+import threading
+import time
+
+HEADER_EXPLICIT = 0x00          # same encoding as SX126x.HEADER_EXPLICIT
+LDRO_SYMBOL_TIME_MS = 16.0      # Semtech recommends LDRO above 16 ms symbols
+
+# (upper bound of requested bandwidth, actual bandwidth in Hz), mirroring SX126x.setLoRaModulation
+_BANDWIDTHS = (
+    (9100, 7812.5),
+    (13000, 31250 / 3),
+    (18200, 15625.0),
+    (26000, 62500 / 3),
+    (36500, 31250.0),
+    (52100, 125000 / 3),
+    (93800, 62500.0),
+    (187500, 125000.0),
+    (375000, 250000.0),
+)
+
+
+def lora_bandwidth_hz(bw: int) -> float:
+    """Actual bandwidth the radio uses for a requested bandwidth in Hz."""
+    for upper, actual in _BANDWIDTHS:
+        if bw < upper:
+            return actual
+    return 500000.0
+
+
+def symbol_time_ms(sf: int, bw: int) -> float:
+    return (2 ** sf) / lora_bandwidth_hz(bw) * 1000
+
+
+def ldro_required(sf: int, bw: int) -> bool:
+    return symbol_time_ms(sf, bw) > LDRO_SYMBOL_TIME_MS
+
+
+def payload_symbols(payload_len: int, sf: int, cr: int, header_type=HEADER_EXPLICIT, crc: bool = True, ldro: bool = False) -> int:
+    """Number of symbols after the preamble, sync word and the fixed 8 symbols."""
+    bits = 8 * payload_len - 4 * sf
+    if crc:
+        bits += 16
+    if header_type == HEADER_EXPLICIT:
+        bits += 20
+    if sf >= 7:
+        bits += 8
+    bits_per_symbol = 4 * (sf - 2) if (ldro and sf >= 7) else 4 * sf
+    return math.ceil(max(bits, 0) / bits_per_symbol) * cr
+
+
+def time_on_air_ms(payload_len: int, sf: int, bw: int, cr: int, preamble_len: int = 12,
+                   header_type=HEADER_EXPLICIT, crc: bool = True, ldro: bool = False) -> float:
+    """
+    LoRa time on air of one packet.
+
+    Args:
+        payload_len (int): Payload length in bytes.
+        sf (int): Spreading factor, 5 to 12.
+        bw (int): Bandwidth in Hz, as passed to SX126x.setLoRaModulation.
+        cr (int): Coding rate denominator, 5 to 8 (4/5 to 4/8).
+        preamble_len (int): Preamble length in symbols.
+        header_type: SX126x.HEADER_EXPLICIT or SX126x.HEADER_IMPLICIT.
+        crc (bool): Payload CRC enabled.
+        ldro (bool): Low data rate optimization enabled.
+
+    Returns:
+        float: Time on air in milliseconds.
+    """
+    fixed = 4.25 if sf >= 7 else 6.25
+    n_symbols = preamble_len + fixed + 8 + payload_symbols(payload_len, sf, cr, header_type, crc, ldro)
+    return n_symbols * symbol_time_ms(sf, bw)
+
+
+def time_on_air_from_config(cfg: dict, payload_len: int) -> float:
+    """Time on air using the modulation and packet settings of a LORA_CFG-style dict."""
+    return time_on_air_ms(
+        payload_len, cfg["sf"], cfg["bw"], cfg["cr"], cfg["preambleLength"],
+        cfg["headerType"], cfg["crcType"], cfg.get("ldro", False),
+    )
+
+
+class AirtimeBudget:
+    """
+    Token bucket of transmit airtime.
+
+    Tokens are milliseconds of airtime: the bucket refills at duty_cycle ms per
+    elapsed ms and holds at most burst_ms, so the long-run transmit duty cycle
+    never exceeds duty_cycle.
+    """
+
+    def __init__(self, duty_cycle: float, burst_ms: float, clock=time.monotonic):
+        if not 0 < duty_cycle <= 1:
+            raise ValueError("duty_cycle must be in (0, 1]")
+        self.duty_cycle = duty_cycle
+        self.burst_ms = burst_ms
+        self._clock = clock
+        self._tokens = burst_ms
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst_ms, self._tokens + (now - self._last) * 1000 * self.duty_cycle)
+        self._last = now
+
+    def available_ms(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_consume(self, airtime_ms: float) -> bool:
+        """Take airtime_ms from the bucket if available."""
+        with self._lock:
+            self._refill()
+            if airtime_ms > self._tokens:
+                return False
+            self._tokens -= airtime_ms
+            return True
+
+    def refund(self, airtime_ms: float):
+        """Return airtime that was reserved but not used."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.burst_ms, self._tokens + airtime_ms)
+
+    def wait_time(self, airtime_ms: float) -> float:
+        """Seconds until airtime_ms becomes available (0 if it already is)."""
+        with self._lock:
+            self._refill()
+            missing = airtime_ms - self._tokens
+        return max(0.0, missing / (1000 * self.duty_cycle))
@@ -0,0 +1,30 @@
+"""
+Selects the SPI/GPIO bus SX126x talks to.
+
+LORA_CFG["backend"] picks it:
+
+    "hardware"  spidev and lgpio (the default, SX126x opens them itself)
+    "emulator"  core.transmitter.emulator.SX126xEmulator, no radio needed
+"""
+from typing import Optional, Tuple
+
+BACKENDS = ("hardware", "emulator")
+
+
+def open_bus(cfg: dict) -> Tuple[Optional[object], Optional[object]]:
+    """
+    Bus objects for SX126x(spiDev, gpio) according to cfg["backend"].
+
+    Returns:
+        (spi, gpio): (None, None) for the hardware bus, so SX126x uses spidev and lgpio.
+        For the emulator both belong to one SX126xEmulator, reachable as spi.chip.
+    """
+    backend = cfg.get("backend", "hardware")
+    if backend == "hardware":
+        return None, None
+    if backend == "emulator":
+        from core.transmitter.emulator import SX126xEmulator
+        chip = SX126xEmulator(cfg["busyPin"], cfg["resetPin"], cfg["irqPin"],
+                              cfg.get("emulatorTimeScale", 1.0))
+        return chip.spi, chip.gpio
+    raise ValueError(f"Unknown LoRa backend {backend!r}, expected one of {BACKENDS}")
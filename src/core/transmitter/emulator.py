@@ -0,0 +1,437 @@
+"""
+Software SX126x for running the LoRa path without the radio.
+
+SX126xEmulator decodes the SPI command set SX126x uses and keeps the chip state
+(register file, 256 byte data buffer, modulation and packet parameters, IRQ flags,
+operating mode). Every command holds BUSY high for a short time and SetTx/SetRx
+complete after the time on air of the configured modulation, so waits and
+throughput behave like the real chip. It exposes the same bus objects as the
+hardware: pass emulator.spi and emulator.gpio to SX126x().
+
+The "air" is in-process: transmitted payloads go to on_transmit (and the
+transmitted list), and inject() queues a packet to be received by the next RX.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional
+
+from core.transmitter.airtime import time_on_air_ms
+
+# chip modes, as reported in bits 6:4 of the status byte
+MODE_SLEEP = 0x00
+MODE_STDBY_RC = 0x20
+MODE_STDBY_XOSC = 0x30
+MODE_FS = 0x40
+MODE_RX = 0x50
+MODE_TX = 0x60
+
+IRQ_TX_DONE = 0x0001
+IRQ_RX_DONE = 0x0002
+IRQ_CRC_ERR = 0x0040
+IRQ_TIMEOUT = 0x0200
+
+RX_CONTINUOUS = 0xFFFFFF
+TIMEOUT_STEP_S = 15.625e-6      # SetTx/SetRx timeout unit
+
+# LoRa bandwidth codes of SetModulationParams
+BANDWIDTHS_HZ = {
+    0x00: 7800, 0x08: 10400, 0x01: 15600, 0x09: 20800, 0x02: 31250,
+    0x0A: 41700, 0x03: 62500, 0x04: 125000, 0x05: 250000, 0x06: 500000,
+}
+
+# BUSY high time after a command (s); anything not listed uses BUSY_DEFAULT_S
+BUSY_DEFAULT_S = 20e-6
+BUSY_S = {
+    0x80: 50e-6,        # SetStandby
+    0x83: 80e-6,        # SetTx
+    0x82: 80e-6,        # SetRx
+    0x89: 3.5e-3,       # Calibrate
+    0x98: 5e-3,         # CalibrateImage
+}
+RESET_BUSY_S = 3.5e-3
+
+
+class ReceivedPacket(NamedTuple):
+    payload: bytes
+    rssi: float
+    snr: float
+    crc_ok: bool
+
+
+class SX126xEmulator:
+    """Behavioural model of an SX1262 on the SPI/GPIO bus SX126x drives."""
+
+    def __init__(self, busy_pin: int = 20, reset_pin: int = 18, irq_pin: int = -1,
+                 time_scale: float = 1.0, on_transmit: Optional[Callable[[bytes], None]] = None):
+        """
+        Args:
+            busy_pin (int): Pin that reads as BUSY.
+            reset_pin (int): Pin whose rising edge resets the chip.
+            irq_pin (int): Pin raised when an IRQ routed to DIO1 fires, -1 if not wired.
+            time_scale (float): Multiplier for time on air and BUSY times (0 completes instantly).
+            on_transmit (callable): Called with each transmitted payload when TX completes.
+        """
+        self.busy_pin = busy_pin
+        self.reset_pin = reset_pin
+        self.irq_pin = irq_pin
+        self.time_scale = time_scale
+        self.on_transmit = on_transmit
+        self.transmitted: List[bytes] = []
+        self.rx_queue = deque()
+        self.spi = EmulatedSpi(self)
+        self.gpio = EmulatedGpio(self)
+        self._lock = threading.RLock()
+        self._power_on()
+
+    def _power_on(self):
+        self.mode = MODE_STDBY_RC
+        self.registers = bytearray(0x1000)
+        self.buffer = bytearray(256)
+        self.packet_type = 0
+        self.sf, self.bw_hz, self.cr, self.ldro = 7, 125000, 5, False
+        self.preamble, self.header, self.payload_len, self.crc, self.invert_iq = 12, 0, 255, True, False
+        self.tx_base = self.rx_base = 0
+        self.irq = 0
+        self.irq_mask = self.dio1_mask = 0
+        self.rx_len = self.rx_start = 0
+        self.rssi = self.snr = 0.0
+        self.busy_until = 0.0
+        self._rx_continuous = False
+        self._rx_timeout = 0.0
+        self._pending = None        # (completion time, kind)
+        self._timer = None
+
+    # ---- timing ----
+
+    def _now(self) -> float:
+        return time.monotonic()
+
+    def _hold_busy(self, seconds: float):
+        self.busy_until = max(self.busy_until, self._now() + seconds * self.time_scale)
+
+    def time_on_air(self, payload_len: int) -> float:
+        """Seconds on air for payload_len bytes with the current modulation and packet settings."""
+        return time_on_air_ms(payload_len, self.sf, self.bw_hz, self.cr, self.preamble,
+                              self.header, self.crc, self.ldro) / 1000
+
+    def _schedule(self, delay: float, kind: str):
+        delay *= self.time_scale
+        self._pending = (self._now() + delay, kind)
+        if self._timer is not None:
+            self._timer.cancel()
+        # fire DIO1 when the operation completes, even if nobody touches the bus
+        if self.irq_pin != -1:
+            self._timer = threading.Timer(delay, self._complete_due)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel(self):
+        self._pending = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _complete_due(self):
+        with self._lock:
+            fired = self._advance()
+        if fired:
+            self.gpio.trigger(self.irq_pin)
+
+    def _advance(self) -> bool:
+        """Complete the pending TX/RX if its time has come. Returns True if a DIO1 IRQ fired."""
+        if self._pending is None or self._now() < self._pending[0]:
+            return False
+        _, kind = self._pending
+        self._pending = None
+        flags = 0
+        if kind == "tx":
+            payload = self._buffer_slice(self.tx_base, self.payload_len)
+            self.transmitted.append(payload)
+            self.mode = MODE_STDBY_RC
+            flags = IRQ_TX_DONE
+            if self.on_transmit is not None:
+                self.on_transmit(payload)
+        elif kind == "rx":
+            packet = self.rx_queue.popleft()
+            n = len(packet.payload)
+            for i, b in enumerate(packet.payload):
+                self.buffer[(self.rx_base + i) & 0xFF] = b
+            self.rx_len, self.rx_start = n, self.rx_base
+            self.rssi, self.snr = packet.rssi, packet.snr
+            flags = IRQ_RX_DONE if packet.crc_ok else IRQ_RX_DONE | IRQ_CRC_ERR
+            if not self._rx_continuous:
+                self.mode = MODE_STDBY_RC
+            else:
+                self._start_rx()
+        elif kind == "timeout":
+            self.mode = MODE_STDBY_RC
+            flags = IRQ_TIMEOUT
+        flags &= self.irq_mask
+        self.irq |= flags
+        return bool(flags & self.dio1_mask)
+
+    def _buffer_slice(self, offset: int, n: int) -> bytes:
+        # the data buffer is circular
+        end = offset + n
+        if end <= 256:
+            return bytes(self.buffer[offset:end])
+        return bytes(self.buffer[offset:]) + bytes(self.buffer[:end - 256])
+
+    def _start_rx(self):
+        if self.rx_queue:
+            self._schedule(self.time_on_air(len(self.rx_queue[0].payload)), "rx")
+        elif self._rx_timeout:
+            self._schedule(self._rx_timeout, "timeout")
+
+    # ---- the air ----
+
+    def inject(self, payload: bytes, rssi: float = -60.0, snr: float = 10.0, crc_ok: bool = True):
+        """Queue a packet for the radio to receive."""
+        with self._lock:
+            self.rx_queue.append(ReceivedPacket(bytes(payload), rssi, snr, crc_ok))
+            # a packet arriving before the RX timeout is received instead
+            if self.mode == MODE_RX and (self._pending is None or self._pending[1] == "timeout"):
+                self._start_rx()
+
+    # ---- SPI ----
+
+    def status_byte(self) -> int:
+        return self.mode
+
+    def transfer(self, frame) -> list:
+        """One chip-select framed SPI transaction; returns the bytes clocked out."""
+        with self._lock:
+            self._advance()
+            op = frame[0]
+            args = frame[1:]
+            # status is clocked out with the opcode and again before any data
+            out = [0] * len(frame)
+            out[0] = self.status_byte()
+            if len(frame) > 1:
+                out[1] = out[0]
+            handler = _COMMANDS.get(op)
+            if handler is not None:
+                handler(self, args, out)
+            self._hold_busy(BUSY_S.get(op, BUSY_DEFAULT_S))
+            return out
+
+    def _reset(self):
+        with self._lock:
+            self._cancel()
+            self._power_on()
+            self._hold_busy(RESET_BUSY_S)
+
+    # ---- command handlers: args are the bytes after the opcode, out is the MISO frame ----
+
+    def _set_standby(self, args, out):
+        self._cancel()
+        self.mode = MODE_STDBY_XOSC if args and args[0] else MODE_STDBY_RC
+
+    def _set_sleep(self, args, out):
+        self._cancel()
+        self.mode = MODE_SLEEP
+
+    def _set_fs(self, args, out):
+        self.mode = MODE_FS
+
+    def _set_tx(self, args, out):
+        timeout = (args[0] << 16) | (args[1] << 8) | args[2]
+        toa = self.time_on_air(self.payload_len)
+        self.mode = MODE_TX
+        if timeout and timeout * TIMEOUT_STEP_S < toa:
+            self._schedule(timeout * TIMEOUT_STEP_S, "timeout")
+        else:
+            self._schedule(toa, "tx")
+
+    def _set_rx(self, args, out):
+        timeout = (args[0] << 16) | (args[1] << 8) | args[2]
+        self.mode = MODE_RX
+        self._rx_continuous = timeout == RX_CONTINUOUS
+        self._rx_timeout = 0.0 if timeout in (0, RX_CONTINUOUS) else timeout * TIMEOUT_STEP_S
+        self._cancel()
+        self._start_rx()
+
+    def _set_rx_duty_cycle(self, args, out):
+        # listen mode: RX until a packet arrives, then STDBY_RC like the chip; the sleep
+        # periods only save power (a sender's preamble must span them)
+        self.mode = MODE_RX
+        self._rx_continuous = False
+        self._rx_timeout = 0.0
+        self._cancel()
+        self._start_rx()
+
+    def _set_packet_type(self, args, out):
+        self.packet_type = args[0]
+
+    def _get_packet_type(self, args, out):
+        out[2] = self.packet_type
+
+    def _set_modulation(self, args, out):
+        self.sf = args[0]
+        self.bw_hz = BANDWIDTHS_HZ.get(args[1], 125000)
+        self.cr = args[2] + 4
+        self.ldro = bool(args[3])
+
+    def _set_packet_params(self, args, out):
+        self.preamble = (args[0] << 8) | args[1]
+        self.header = args[2]
+        self.payload_len = args[3]
+        self.crc = bool(args[4])
+        self.invert_iq = bool(args[5])
+
+    def _set_buffer_base(self, args, out):
+        self.tx_base, self.rx_base = args[0], args[1]
+
+    def _write_buffer(self, args, out):
+        offset = args[0]
+        data = bytes(args[1:])
+        for i, b in enumerate(data):
+            self.buffer[(offset + i) & 0xFF] = b
+
+    def _read_buffer(self, args, out):
+        # opcode, offset, NOP (status), data...
+        offset = args[0]
+        for i in range(len(out) - 3):
+            out[3 + i] = self.buffer[(offset + i) & 0xFF]
+
+    def _write_register(self, args, out):
+        address = ((args[0] << 8) | args[1]) & 0x0FFF
+        for i, b in enumerate(args[2:]):
+            self.registers[(address + i) & 0x0FFF] = b
+
+    def _read_register(self, args, out):
+        # opcode, address (2), NOP (status), data...
+        address = ((args[0] << 8) | args[1]) & 0x0FFF
+        for i in range(len(out) - 4):
+            out[4 + i] = self.registers[(address + i) & 0x0FFF]
+
+    def _set_dio_irq(self, args, out):
+        self.irq_mask = (args[0] << 8) | args[1]
+        self.dio1_mask = (args[2] << 8) | args[3]
+
+    def _get_irq_status(self, args, out):
+        out[2] = (self.irq >> 8) & 0xFF
+        out[3] = self.irq & 0xFF
+
+    def _clear_irq_status(self, args, out):
+        self.irq &= ~((args[0] << 8) | args[1])
+
+    def _get_rx_buffer_status(self, args, out):
+        out[2] = self.rx_len
+        out[3] = self.rx_start
+
+    def _get_packet_status(self, args, out):
+        out[2] = min(255, int(-self.rssi * 2))
+        out[3] = int(self.snr * 4) & 0xFF
+        out[4] = min(255, int(-self.rssi * 2))
+
+    def _get_rssi_inst(self, args, out):
+        out[2] = min(255, int(-self.rssi * 2))
+
+
+_COMMANDS = {
+    0x80: SX126xEmulator._set_standby,
+    0x84: SX126xEmulator._set_sleep,
+    0xC1: SX126xEmulator._set_fs,
+    0x83: SX126xEmulator._set_tx,
+    0x82: SX126xEmulator._set_rx,
+    0x94: SX126xEmulator._set_rx_duty_cycle,
+    0x8A: SX126xEmulator._set_packet_type,
+    0x11: SX126xEmulator._get_packet_type,
+    0x8B: SX126xEmulator._set_modulation,
+    0x8C: SX126xEmulator._set_packet_params,
+    0x8F: SX126xEmulator._set_buffer_base,
+    0x0E: SX126xEmulator._write_buffer,
+    0x1E: SX126xEmulator._read_buffer,
+    0x0D: SX126xEmulator._write_register,
+    0x1D: SX126xEmulator._read_register,
+    0x08: SX126xEmulator._set_dio_irq,
+    0x12: SX126xEmulator._get_irq_status,
+    0x02: SX126xEmulator._clear_irq_status,
+    0x13: SX126xEmulator._get_rx_buffer_status,
+    0x14: SX126xEmulator._get_packet_status,
+    0x15: SX126xEmulator._get_rssi_inst,
+}
+
+
+class EmulatedSpi:
+    """spidev.SpiDev interface onto an SX126xEmulator."""
+
+    def __init__(self, chip: SX126xEmulator):
+        self.chip = chip
+        self.max_speed_hz = 0
+        self.lsbfirst = False
+        self.mode = 0
+
+    def open(self, bus: int, cs: int):
+        pass
+
+    def close(self):
+        pass
+
+    def xfer2(self, values):
+        return self.chip.transfer(values)
+
+    def writebytes2(self, values):
+        self.chip.transfer(values)
+
+
+class EmulatedGpio:
+    """lgpio interface onto an SX126xEmulator: BUSY and reset pins, DIO1 callbacks."""
+
+    RISING_EDGE = 0
+    FALLING_EDGE = 1
+    BOTH_EDGES = 2
+
+    def __init__(self, chip: SX126xEmulator):
+        self._chip = chip
+        self._levels = {}
+        self._callbacks = {}
+
+    def gpiochip_open(self, chip: int) -> int:
+        return 0
+
+    def gpiochip_close(self, handle: int):
+        pass
+
+    def gpio_claim_output(self, handle: int, pin: int, level: int = 0):
+        self._levels[pin] = level
+
+    def gpio_claim_input(self, handle: int, pin: int):
+        pass
+
+    def gpio_claim_alert(self, handle: int, pin: int, edge: int, flags: int = 0, notify_handle=None):
+        pass
+
+    def gpio_write(self, handle: int, pin: int, level: int):
+        if pin == self._chip.reset_pin and level and not self._levels.get(pin, 0):
+            self._chip._reset()
+        self._levels[pin] = level
+
+    def gpio_read(self, handle: int, pin: int) -> int:
+        if pin == self._chip.busy_pin:
+            return 1 if time.monotonic() < self._chip.busy_until else 0
+        return self._levels.get(pin, 0)
+
+    def callback(self, handle: int, pin: int, edge: int = RISING_EDGE, func=None):
+        cb = _Callback(self, pin, func)
+        self._callbacks[pin] = cb
+        return cb
+
+    def trigger(self, pin: int):
+        cb = self._callbacks.get(pin)
+        if cb is not None:
+            cb.func(0, pin, 1, time.monotonic_ns())
+
+
+class _Callback:
+
+    def __init__(self, gpio: EmulatedGpio, pin: int, func):
+        self._gpio = gpio
+        self.pin = pin
+        self.func = func
+
+    def cancel(self):
+        if self._gpio._callbacks.get(self.pin) is self:
+            del self._gpio._callbacks[self.pin]
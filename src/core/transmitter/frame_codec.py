@@ -0,0 +1,174 @@
+"""
+Binary multi-detection LoRa frame, version 1.
+
+All fields are little-endian.
+
+Header (16 bytes):
+    u8   version         FRAME_VERSION
+    u8   node id
+    u16  sequence number (wraps)
+    u32  base timestamp, unix seconds
+    i32  base latitude,  1e-6 degree
+    i32  base longitude, 1e-6 degree
+
+Followed by N detection entries (9 bytes each), N = (len - 16) / 9:
+    u8   label code      index into the shared labels table, 0xFF if unknown
+    u16  track id        0xFFFF if the detection has no track id
+    u16  dt              0.1 s after the base timestamp
+    i16  dlat            1e-6 degree from the base latitude
+    i16  dlon            1e-6 degree from the base longitude
+
+The base position is the first detection of the frame, so deltas cover roughly
++/-3.2 km; a detection that does not fit starts a new frame.
+
+ACK frame (ground station -> node):
+    u8   type            ACK_TYPE, never a valid data frame version
+    u8   node id         node the ACK is addressed to
+    u16  sequence number of each acknowledged frame, N = (len - 2) / 2
+"""
+import struct
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+FRAME_VERSION = 1
+
+HEADER = struct.Struct("<BBHIii")
+ENTRY = struct.Struct("<BHHhh")
+
+ACK_TYPE = 0x80
+ACK_HEADER = struct.Struct("<BB")
+ACK_SEQ = struct.Struct("<H")
+
+COORD_SCALE = 1_000_000     # 1e-6 degree units
+TS_SCALE = 10               # 0.1 s units
+NO_TRACK_ID = 0xFFFF
+UNKNOWN_LABEL = 0xFF
+
+_I16_MIN, _I16_MAX = -32768, 32767
+_U16_MAX = 0xFFFF
+
+
+class Detection(NamedTuple):
+    ts: float
+    label: str
+    track_id: Optional[int]
+    lat: float
+    lon: float
+
+
+class DecodedFrame(NamedTuple):
+    version: int
+    node_id: int
+    seq: int
+    detections: List[Detection]
+
+
+class Ack(NamedTuple):
+    node_id: int
+    seqs: List[int]
+
+
+def max_detections(max_payload: int) -> int:
+    """Number of detections that fit in one frame of max_payload bytes."""
+    return max(0, (max_payload - HEADER.size) // ENTRY.size)
+
+
+class FrameEncoder:
+    """Packs detections into as few frames of at most max_payload bytes as possible."""
+
+    def __init__(self, node_id: int, max_payload: int, labels: Sequence[str]):
+        if max_detections(max_payload) < 1:
+            raise ValueError(f"payload length {max_payload} cannot hold a single detection")
+        self.node_id = node_id & 0xFF
+        self.max_payload = max_payload
+        self.per_frame = max_detections(max_payload)
+        self._label_codes = {label: code for code, label in enumerate(labels)}
+        self._seq = 0
+
+    def _next_seq(self) -> int:
+        seq = self._seq
+        self._seq = (self._seq + 1) & 0xFFFF
+        return seq
+
+    def encode(self, detections: Sequence[Detection]) -> List[Tuple[bytes, int]]:
+        """
+        Encode detections (ideally in timestamp order) into frames.
+
+        Returns:
+            list: (frame bytes, number of detections it carries) in input order.
+        """
+        frames = []
+        entries = []
+        base = None
+        for det in detections:
+            lat_q = round(det.lat * COORD_SCALE)
+            lon_q = round(det.lon * COORD_SCALE)
+            if base is not None:
+                dt = round((det.ts - base[0]) * TS_SCALE)
+                dlat = lat_q - base[1]
+                dlon = lon_q - base[2]
+                fits = (
+                    len(entries) < self.per_frame
+                    and 0 <= dt <= _U16_MAX
+                    and _I16_MIN <= dlat <= _I16_MAX
+                    and _I16_MIN <= dlon <= _I16_MAX
+                )
+                if not fits:
+                    frames.append(self._finish(base, entries))
+                    entries = []
+                    base = None
+            if base is None:
+                base = (int(det.ts), lat_q, lon_q)
+                dt = round((det.ts - base[0]) * TS_SCALE)
+                dlat = dlon = 0
+
+            track_id = NO_TRACK_ID if det.track_id is None or det.track_id < 0 else det.track_id % NO_TRACK_ID
+            label = self._label_codes.get(det.label, UNKNOWN_LABEL)
+            entries.append(ENTRY.pack(label, track_id, dt, dlat, dlon))
+
+        if entries:
+            frames.append(self._finish(base, entries))
+        return frames
+
+    def _finish(self, base, entries) -> Tuple[bytes, int]:
+        header = HEADER.pack(FRAME_VERSION, self.node_id, self._next_seq(), base[0], base[1], base[2])
+        return header + b"".join(entries), len(entries)
+
+
+def decode_frame(data: bytes, labels: Sequence[str]) -> DecodedFrame:
+    """Ground-side decoder for frames produced by FrameEncoder."""
+    if len(data) < HEADER.size or (len(data) - HEADER.size) % ENTRY.size:
+        raise ValueError(f"invalid frame length {len(data)}")
+    version, node_id, seq, base_ts, base_lat, base_lon = HEADER.unpack_from(data, 0)
+    if version != FRAME_VERSION:
+        raise ValueError(f"unsupported frame version {version}")
+
+    detections = []
+    for label, track_id, dt, dlat, dlon in ENTRY.iter_unpack(data[HEADER.size:]):
+        detections.append(Detection(
+            ts=base_ts + dt / TS_SCALE,
+            label=labels[label] if label < len(labels) else "unknown",
+            track_id=None if track_id == NO_TRACK_ID else track_id,
+            lat=(base_lat + dlat) / COORD_SCALE,
+            lon=(base_lon + dlon) / COORD_SCALE,
+        ))
+    return DecodedFrame(version, node_id, seq, detections)
+
+
+def frame_seq(data: bytes) -> int:
+    """Sequence number of a frame produced by FrameEncoder."""
+    return HEADER.unpack_from(data, 0)[2]
+
+
+def encode_ack(node_id: int, seqs: Sequence[int]) -> bytes:
+    """ACK frame for the given data frame sequence numbers."""
+    return ACK_HEADER.pack(ACK_TYPE, node_id & 0xFF) + b"".join(ACK_SEQ.pack(s & 0xFFFF) for s in seqs)
+
+
+def decode_ack(data: bytes) -> Ack:
+    """Node-side decoder for frames produced by encode_ack."""
+    if len(data) < ACK_HEADER.size or (len(data) - ACK_HEADER.size) % ACK_SEQ.size:
+        raise ValueError(f"invalid ACK length {len(data)}")
+    kind, node_id = ACK_HEADER.unpack_from(data, 0)
+    if kind != ACK_TYPE:
+        raise ValueError(f"not an ACK frame (type {kind:#04x})")
+    return Ack(node_id, [s for (s,) in ACK_SEQ.iter_unpack(data[ACK_HEADER.size:])])
@@ -0,0 +1,118 @@
+"""
+Half-duplex LoRa link: after each TX batch the radio listens briefly for replies
+(ACKs or commands) from the ground station.
+
+LinkManager.listen_window is meant to be TxScheduler's on_idle hook, so the radio is
+still only driven from the TX worker thread. Received frames are put on a bounded
+queue that other threads drain without blocking.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ReceivedFrame(NamedTuple):
+    payload: bytes
+    rssi: float
+    snr: float
+    ts: float           # time.monotonic() when it was read out of the radio
+
+
+class LinkManager:
+    """RX windows between transmissions on one SX126x, using its duty-cycled listen mode."""
+
+    def __init__(self, radio, rx_window_sec: float, rx_period_ms: int, sleep_period_ms: int, max_queue: int = 64):
+        """
+        Args:
+            radio (SX126x): Radio shared with the TX worker.
+            rx_window_sec (float): How long to listen after a batch.
+            rx_period_ms (int): Receive period of each listen duty cycle.
+            sleep_period_ms (int): Sleep period of each listen duty cycle, 0 for continuous RX.
+                Senders need a preamble longer than the sleep period.
+            max_queue (int): Received frames kept before new ones are dropped.
+        """
+        self.radio = radio
+        self.rx_window_sec = rx_window_sec
+        self.rx_period_ms = rx_period_ms
+        self.sleep_period_ms = sleep_period_ms
+        self._queue = queue.Queue(maxsize=max_queue)
+
+        self._stats_lock = threading.Lock()
+        self._windows = 0
+        self._received = 0
+        self._errors = 0
+        self._dropped = 0
+        self._listen_sec = 0.0
+
+    def listen_window(self):
+        """Listen for rx_window_sec, queueing every frame received. Blocks for the window."""
+        if self.rx_window_sec <= 0:
+            return
+        radio = self.radio
+        start = time.monotonic()
+        deadline = start + self.rx_window_sec
+        received = errors = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self.sleep_period_ms > 0:
+                started = radio.listen(self.rx_period_ms, self.sleep_period_ms)
+            else:
+                started = radio.request(radio.RX_SINGLE)
+            if not started or not radio.wait(remaining):
+                break
+            status = radio.status()
+            if status == radio.STATUS_RX_DONE:
+                payload = radio.get(radio.available())
+                received += 1
+                self._put(ReceivedFrame(payload, radio.packetRssi(), radio.snr(), time.monotonic()))
+            elif status in (radio.STATUS_CRC_ERR, radio.STATUS_HEADER_ERR):
+                errors += 1
+            else:
+                break
+        # leave RX (and listen mode) so the next packet can be sent
+        radio.standby()
+        with self._stats_lock:
+            self._windows += 1
+            self._received += received
+            self._errors += errors
+            self._listen_sec += time.monotonic() - start
+
+    def _put(self, frame: ReceivedFrame):
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+
+    def get(self, timeout: Optional[float] = None):
+        """Next received frame, or None if none arrives within timeout (None waits forever)."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self) -> List[ReceivedFrame]:
+        """All frames received so far, without blocking."""
+        frames = []
+        while True:
+            try:
+                frames.append(self._queue.get_nowait())
+            except queue.Empty:
+                return frames
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "windows": self._windows,
+                "received": self._received,
+                "rx_errors": self._errors,
+                "dropped": self._dropped,
+                "listen_sec": self._listen_sec,
+                "queue_depth": self._queue.qsize(),
+            }
@@ -0,0 +1,135 @@
+"""
+Stand-ins for spidev.SpiDev and the lgpio module, so SX126x can be driven (and its
+host-side overhead measured) on a machine without the radio.
+
+They only count traffic: reads return the status byte followed by zeros, except
+GetIrqStatus which returns irq_status once tx_time has passed since the last SetTx.
+When given a MockGpio and IRQ pin, MockSpiDev also raises the pin at that point.
+"""
+import threading
+import time
+
+STATUS_STDBY_RC = 0x20          # SX126x.STATUS_MODE_STDBY_RC
+IRQ_TX_DONE = 0x0001
+_GET_IRQ_STATUS = 0x12
+_SET_TX = 0x83
+
+
+class MockSpiDev:
+    """Records SPI transactions instead of clocking them out."""
+
+    def __init__(self, status: int = STATUS_STDBY_RC, irq_status: int = IRQ_TX_DONE,
+                 tx_time: float = 0.0, gpio=None, irq_pin: int = -1):
+        """
+        Args:
+            status (int): Status byte returned by every read.
+            irq_status (int): IRQ flags reported once a transmission is done.
+            tx_time (float): Seconds from SetTx until the transmission is done.
+            gpio (MockGpio): Pin bank to raise irq_pin on when the transmission is done.
+            irq_pin (int): DIO1 pin, -1 when not wired.
+        """
+        self.status = status
+        self.irq_status = irq_status
+        self.tx_time = tx_time
+        self.gpio = gpio
+        self.irq_pin = irq_pin
+        self._tx_done_at = 0.0
+        self.max_speed_hz = 0
+        self.lsbfirst = False
+        self.mode = 0
+        self.transfers = 0
+        self.bytes = 0
+        self.log = None             # set to a list to keep every frame
+
+    def open(self, bus: int, cs: int):
+        pass
+
+    def close(self):
+        pass
+
+    def _record(self, values):
+        self.transfers += 1
+        self.bytes += len(values)
+        if self.log is not None:
+            self.log.append(bytes(values))
+        if values[0] == _SET_TX:
+            self._tx_done_at = time.monotonic() + self.tx_time
+            if self.gpio is not None and self.irq_pin != -1:
+                timer = threading.Timer(self.tx_time, self.gpio.trigger, (self.irq_pin,))
+                timer.daemon = True
+                timer.start()
+
+    def xfer2(self, values):
+        self._record(values)
+        # the chip clocks its status out while the opcode goes in, then status again before any data
+        out = [0] * len(values)
+        out[0] = self.status
+        if len(values) > 1:
+            out[1] = self.status
+        if values[0] == _GET_IRQ_STATUS and len(values) >= 4 and time.monotonic() >= self._tx_done_at:
+            out[2] = (self.irq_status >> 8) & 0xFF
+            out[3] = self.irq_status & 0xFF
+        return out
+
+    def writebytes2(self, values):
+        self._record(values)
+
+
+class MockGpio:
+    """The subset of the lgpio module SX126x uses; every pin reads LOW unless set in levels."""
+
+    RISING_EDGE = 0
+    FALLING_EDGE = 1
+    BOTH_EDGES = 2
+
+    def __init__(self):
+        self.levels = {}
+        self.reads = 0
+        self.writes = 0
+        self.callbacks = {}
+
+    def gpiochip_open(self, chip: int) -> int:
+        return 0
+
+    def gpiochip_close(self, handle: int):
+        pass
+
+    def gpio_claim_output(self, handle: int, pin: int, level: int = 0):
+        self.levels[pin] = level
+
+    def gpio_claim_input(self, handle: int, pin: int):
+        self.levels.setdefault(pin, 0)
+
+    def gpio_write(self, handle: int, pin: int, level: int):
+        self.writes += 1
+        self.levels[pin] = level
+
+    def gpio_claim_alert(self, handle: int, pin: int, edge: int, flags: int = 0, notify_handle=None):
+        self.levels.setdefault(pin, 0)
+
+    def gpio_read(self, handle: int, pin: int) -> int:
+        self.reads += 1
+        return self.levels.get(pin, 0)
+
+    def callback(self, handle: int, pin: int, edge: int = RISING_EDGE, func=None):
+        cb = _MockCallback(self, pin, func)
+        self.callbacks[pin] = cb
+        return cb
+
+    def trigger(self, pin: int):
+        """Raise an edge on pin, calling its callback like lgpio does (chip, gpio, level, tick)."""
+        cb = self.callbacks.get(pin)
+        if cb is not None:
+            cb.func(0, pin, 1, time.monotonic_ns())
+
+
+class _MockCallback:
+
+    def __init__(self, gpio: MockGpio, pin: int, func):
+        self._gpio = gpio
+        self.pin = pin
+        self.func = func
+
+    def cancel(self):
+        if self._gpio.callbacks.get(self.pin) is self:
+            del self._gpio.callbacks[self.pin]
@@ -0,0 +1,192 @@
+"""
+Selective-repeat delivery of FrameEncoder frames over the half-duplex link.
+
+The frame header's u16 sequence number identifies each frame. ReliableSender
+keeps at most `window` unacknowledged frames: every one has a retransmit timer
+that starts when its transmission ends and lasts the frame's time on air plus
+the time to hear an ACK, doubling per try. Only frames whose timer expired are
+resent (with the same sequence number), and a frame is dropped after max_tries
+transmissions. The ground station ACKs every frame it receives, duplicates
+included, and drops duplicates with SelectiveRepeatReceiver.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List
+
+from core.transmitter.frame_codec import frame_seq
+
+# ACK frames are tiny; reserve the airtime of one listing a few sequence numbers
+ACK_PAYLOAD_LEN = 2 + 2 * 8
+MAX_BACKOFF = 8
+
+
+class _Outstanding:
+    __slots__ = ("payload", "rows", "tries", "deadline", "queued")
+
+    def __init__(self, payload: bytes, rows):
+        self.payload = payload
+        self.rows = rows
+        self.tries = 1
+        self.deadline = float("inf")    # armed when the transmission ends
+        self.queued = True
+
+
+class ReliableSender:
+    """Window of frames awaiting ACK, with per-frame retransmit timers."""
+
+    def __init__(self, window: int, max_tries: int, airtime_ms: Callable[[int], float],
+                 ack_wait_sec: float, clock=time.monotonic):
+        """
+        Args:
+            window (int): Maximum number of unacknowledged frames; must stay below half the sequence space.
+            max_tries (int): Transmissions per frame before it is given up.
+            airtime_ms (callable): Time on air (ms) of a payload of the given length.
+            ack_wait_sec (float): Time after a transmission before an ACK can be heard (the RX window).
+        """
+        if not 0 < window < 0x8000:
+            raise ValueError("window must be in [1, 32767]")
+        self.window = window
+        self.max_tries = max_tries
+        self._airtime_ms = airtime_ms
+        self._ack_wait = ack_wait_sec
+        self._clock = clock
+        self._frames = OrderedDict()    # seq -> _Outstanding, oldest first
+        self._lock = threading.Lock()
+
+        self._start = None
+        self._offered = 0
+        self._acked = 0
+        self._failed = 0
+        self._transmissions = 0
+        self._retransmissions = 0
+        self._acked_bytes = 0
+        self._sent_bytes = 0
+
+    def room(self) -> int:
+        """Frames that can be added before the window is full."""
+        with self._lock:
+            return self.window - len(self._frames)
+
+    def rto(self, payload_len: int, tries: int = 1) -> float:
+        """Retransmit timeout in seconds for a payload sent tries times."""
+        base = (self._airtime_ms(payload_len) + self._airtime_ms(ACK_PAYLOAD_LEN)) / 1000 + self._ack_wait
+        return base * min(2 ** (tries - 1), MAX_BACKOFF)
+
+    def add(self, payload: bytes, rows=None) -> bool:
+        """
+        Track a new frame about to be queued for transmission.
+
+        Returns:
+            bool: False if the window is full; the frame must not be sent.
+        """
+        seq = frame_seq(payload)
+        with self._lock:
+            if len(self._frames) >= self.window or seq in self._frames:
+                return False
+            self._frames[seq] = _Outstanding(payload, rows)
+            self._offered += 1
+            if self._start is None:
+                self._start = self._clock()
+            return True
+
+    def on_sent(self, payload: bytes):
+        """Called when a transmission of payload ends; starts its retransmit timer."""
+        seq = frame_seq(payload)
+        with self._lock:
+            self._transmissions += 1
+            self._sent_bytes += len(payload)
+            frame = self._frames.get(seq)
+            if frame is None or frame.payload != payload:
+                return
+            frame.queued = False
+            frame.deadline = self._clock() + self.rto(len(payload), frame.tries)
+
+    def due(self) -> List[bytes]:
+        """
+        Frames whose retransmit timer expired, oldest first; the caller must queue each one or defer() it.
+
+        Frames already sent max_tries times are given up instead.
+        """
+        now = self._clock()
+        resend = []
+        with self._lock:
+            for seq, frame in list(self._frames.items()):
+                if frame.queued or frame.deadline > now:
+                    continue
+                if frame.tries >= self.max_tries:
+                    del self._frames[seq]
+                    self._failed += 1
+                    continue
+                frame.tries += 1
+                frame.queued = True
+                frame.deadline = float("inf")
+                self._retransmissions += 1
+                resend.append(frame.payload)
+        return resend
+
+    def defer(self, payload: bytes):
+        """Undo due() for a frame that could not be queued; it is offered again by the next due()."""
+        with self._lock:
+            frame = self._frames.get(frame_seq(payload))
+            if frame is None:
+                return
+            frame.tries -= 1
+            frame.queued = False
+            frame.deadline = self._clock()
+            self._retransmissions -= 1
+
+    def cancel(self, payload: bytes):
+        """Forget a frame from add() that could not be queued."""
+        with self._lock:
+            if self._frames.pop(frame_seq(payload), None) is not None:
+                self._offered -= 1
+
+    def on_ack(self, seqs: Iterable[int]) -> list:
+        """Release acknowledged frames. Returns the rows of each frame newly acknowledged."""
+        rows = []
+        with self._lock:
+            for seq in seqs:
+                frame = self._frames.pop(seq, None)
+                if frame is None:
+                    continue        # duplicate ACK, or the frame was given up
+                self._acked += 1
+                self._acked_bytes += len(frame.payload)
+                rows.append(frame.rows)
+        return rows
+
+    def stats(self) -> dict:
+        """Delivery ratio (acked / resolved frames) and goodput (acknowledged bytes per second)."""
+        with self._lock:
+            elapsed = self._clock() - self._start if self._start is not None else 0.0
+            resolved = self._acked + self._failed
+            return {
+                "in_flight": len(self._frames),
+                "offered": self._offered,
+                "acked": self._acked,
+                "failed": self._failed,
+                "transmissions": self._transmissions,
+                "retransmissions": self._retransmissions,
+                "delivery_ratio": self._acked / resolved if resolved else 0.0,
+                "goodput_bps": self._acked_bytes / elapsed if elapsed > 0 else 0.0,
+                "efficiency": self._acked_bytes / self._sent_bytes if self._sent_bytes else 0.0,
+            }
+
+
+class SelectiveRepeatReceiver:
+    """Ground-side duplicate filter: remembers the last `history` sequence numbers per node."""
+
+    def __init__(self, history: int = 1024):
+        self.history = history
+        self._seen = OrderedDict()      # (node id, seq) -> None
+
+    def accept(self, node_id: int, seq: int) -> bool:
+        """True the first time a frame arrives; it should be ACKed either way."""
+        key = (node_id, seq)
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return False
+        self._seen[key] = None
+        if len(self._seen) > self.history:
+            self._seen.popitem(last=False)
+        return True
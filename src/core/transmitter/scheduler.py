@@ -0,0 +1,148 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+
+from utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class TxScheduler:
+    """
+    Dedicated LoRa transmit worker fed by a bounded priority queue.
+
+    Producers (e.g. the GStreamer pad probe) call submit(), which never blocks: when
+    the queue is full the payload is dropped and counted. A single worker thread
+    pops the lowest priority value first (FIFO within a priority) and hands it to
+    the blocking send function, so on-air time is spent off the producer thread.
+    """
+
+    def __init__(self, send, max_queue: int = 64, name: str = "lora-tx", on_idle=None):
+        """
+        Args:
+            send (callable): Blocking function that puts one payload on air.
+            max_queue (int): Maximum number of queued payloads before new ones are dropped.
+            name (str): Worker thread name.
+            on_idle (callable): Called on the worker thread when a send leaves the queue empty,
+                i.e. after each batch; it may block (e.g. to listen for replies).
+        """
+        self._send = send
+        self._on_idle = on_idle
+        self._queue = queue.PriorityQueue(maxsize=max_queue)
+        self._order = itertools.count()
+        self._stop = threading.Event()
+        self._name = name
+        self._thread = None
+
+        self._stats_lock = threading.Lock()
+        self._enqueued = 0
+        self._sent = 0
+        self._dropped = 0
+        self._failed = 0
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+        self._latency_last = 0.0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def submit(self, payload, priority: int = 0) -> bool:
+        """Queue a payload for transmission. Returns False if it was dropped."""
+        item = (priority, next(self._order), time.monotonic(), payload)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+            return False
+        with self._stats_lock:
+            self._enqueued += 1
+        return True
+
+    def stop(self, drain: bool = True, timeout: float = 5.0) -> bool:
+        """
+        Stop the worker. With drain=True, queued payloads are sent first.
+
+        Returns:
+            bool: True if the worker exited within timeout.
+        """
+        if not drain:
+            self._discard_pending()
+        self._stop.set()
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"TX worker did not drain within {timeout:.1f}s; {self._queue.qsize()} payloads left")
+            return False
+        return True
+
+    def _discard_pending(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+            with self._stats_lock:
+                self._dropped += 1
+
+    def _run(self):
+        while True:
+            try:
+                _, _, enqueued_at, payload = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+
+            try:
+                self._send(payload)
+            except Exception:
+                logger.exception("LoRa transmit failed")
+                with self._stats_lock:
+                    self._failed += 1
+                self._idle()
+                continue
+
+            latency = time.monotonic() - enqueued_at
+            METRICS.observe("tx_queue_to_air", latency)
+            with self._stats_lock:
+                self._sent += 1
+                self._latency_sum += latency
+                self._latency_last = latency
+                if latency > self._latency_max:
+                    self._latency_max = latency
+            self._idle()
+
+    def _idle(self):
+        if self._on_idle is None or not self._queue.empty():
+            return
+        try:
+            self._on_idle()
+        except Exception:
+            logger.exception("TX idle hook failed")
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        """Snapshot of queue depth, counters and enqueue-to-air latency (ms)."""
+        with self._stats_lock:
+            mean = self._latency_sum / self._sent if self._sent else 0.0
+            return {
+                "queue_depth": self._queue.qsize(),
+                "enqueued": self._enqueued,
+                "sent": self._sent,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "latency_ms_last": self._latency_last * 1000,
+                "latency_ms_mean": mean * 1000,
+                "latency_ms_max": self._latency_max * 1000,
+            }
@@ -0,0 +1,183 @@
+"""
+Pipeline auto-tuner: sweeps hailonet batch size, queue depth and videoscale /
+videoconvert threads, and writes the best configuration as the pipeline profile
+GStreamerDetectionApp loads at startup (PIPELINE_PROFILE_PATH).
+
+Every configuration builds the app's pipeline from gstreamer_helper_pipelines
+(source, inference wrapper, tracker, user callback) into a fakesink with sync=false,
+runs a file source for --seconds after a --warmup, and records:
+
+- fps: frames reaching the callback per second;
+- latency: from the decoded frame (the source's scale queue) to the callback, p50/p99,
+  through core.vision.pipeline_metrics;
+- cpu: process user+system time over wall time (1.0 = one core).
+
+The best configuration is the one with the lowest p50 latency, then CPU, among those
+within --fps-tolerance of the highest FPS. Running as fast as possible keeps queues
+full, so latencies are upper bounds; use them to compare configurations.
+
+Needs GStreamer and a Hailo device (run on the Pi), from src/:
+    python -m core.vision.autotune --input ../resources/example.mp4
+    python -m core.vision.autotune --input flight.mp4 --batch-sizes 1 4 8 --seconds 15 --dry-run
+"""
+import argparse
+import itertools
+import json
+import os
+import resource
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import GLib, Gst
+
+from constants import PIPELINE_PROFILE_PATH, TRACKER_KEEP_LOST_FRAMES, TRACKER_KEEP_TRACKED_FRAMES
+from core.vision.hailo_apps_infra.gstreamer_helper_pipelines import (
+    INFERENCE_PIPELINE,
+    INFERENCE_PIPELINE_WRAPPER,
+    SOURCE_PIPELINE,
+    TRACKER_PIPELINE,
+    USER_CALLBACK_PIPELINE,
+)
+from core.vision.pipeline_metrics import attach_pipeline_metrics
+from core.vision.pipeline_profile import PipelineProfile, apply_pipeline_profile, save_profile
+from utils.metrics import Metrics
+
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources")
+THRESHOLDS = "nms-score-threshold=0.3 nms-iou-threshold=0.45 output-format-type=HAILO_FORMAT_TYPE_FLOAT32"
+
+
+def build(args, profile: PipelineProfile) -> str:
+    """The app's pipeline (as GStreamerDetectionApp.get_pipeline_string) into a fakesink."""
+    inference = INFERENCE_PIPELINE(
+        hef_path=args.hef,
+        post_process_so=args.so,
+        post_function_name="filter_letterbox",
+        batch_size=profile.batch_size,
+        additional_params=THRESHOLDS,
+    )
+    return (
+        f"{SOURCE_PIPELINE(args.input, args.width, args.height)} ! "
+        f"{INFERENCE_PIPELINE_WRAPPER(inference)} ! "
+        f"{TRACKER_PIPELINE(class_id=1, keep_tracked_frames=TRACKER_KEEP_TRACKED_FRAMES, keep_lost_frames=TRACKER_KEEP_LOST_FRAMES)} ! "
+        f"{USER_CALLBACK_PIPELINE()} ! fakesink name=tune_sink sync=false"
+    )
+
+
+def measure(args, profile: PipelineProfile) -> dict:
+    pipeline = Gst.parse_launch(build(args, profile))
+    apply_pipeline_profile(pipeline, profile)
+    metrics = Metrics(enabled=True)
+    attach_pipeline_metrics(pipeline, metrics, source="source_scale_q")
+
+    frames = 0
+
+    def count(pad, info):
+        nonlocal frames
+        frames += 1
+        return Gst.PadProbeReturn.OK
+
+    pipeline.get_by_name("identity_callback").get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, count)
+
+    loop = GLib.MainLoop()
+    bus = pipeline.get_bus()
+    bus.add_signal_watch()
+    error = []
+    bus.connect("message::eos", lambda *_: loop.quit())
+    bus.connect("message::error", lambda _, msg: (error.append(str(msg.parse_error()[0])), loop.quit()))
+
+    start = {}
+
+    def end_warmup():
+        nonlocal frames
+        frames = 0
+        metrics.reset()
+        start["wall"] = time.monotonic()
+        start["usage"] = resource.getrusage(resource.RUSAGE_SELF)
+        GLib.timeout_add(int(args.seconds * 1000), loop.quit)
+        return False
+
+    GLib.timeout_add(int(args.warmup * 1000), end_warmup)
+    pipeline.set_state(Gst.State.PLAYING)
+    loop.run()
+    end_wall = time.monotonic()
+    end_usage = resource.getrusage(resource.RUSAGE_SELF)
+    pipeline.set_state(Gst.State.NULL)
+    bus.remove_signal_watch()
+
+    if error or "wall" not in start:
+        return {"error": error[0] if error else "stream ended during warmup"}
+    wall = end_wall - start["wall"]
+    cpu = (end_usage.ru_utime - start["usage"].ru_utime) + (end_usage.ru_stime - start["usage"].ru_stime)
+    latency = metrics.snapshot()["stages"].get("pipeline", {})
+    return {
+        "fps": round(frames / wall, 2) if wall > 0 else 0.0,
+        "latency_p50_ms": round(latency.get("p50_ms", 0.0), 2),
+        "latency_p99_ms": round(latency.get("p99_ms", 0.0), 2),
+        "cpu": round(cpu / wall, 2) if wall > 0 else 0.0,
+    }
+
+
+def choose_best(results, fps_tolerance: float):
+    """(profile, measured) with the lowest latency, then CPU, among those within fps_tolerance of the best FPS."""
+    ok = [(p, m) for p, m in results if "error" not in m and m["fps"] > 0]
+    if not ok:
+        return None
+    best_fps = max(m["fps"] for _, m in ok)
+    eligible = [(p, m) for p, m in ok if m["fps"] >= (1 - fps_tolerance) * best_fps]
+    return min(eligible, key=lambda pm: (pm[1]["latency_p50_ms"], pm[1]["cpu"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep batch size, queue depth and converter threads; write the best profile")
+    parser.add_argument("--input", "-i", required=True, help="Video file source")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--hef", default=os.path.join(RESOURCES, "yolov8s_h8l.hef"))
+    parser.add_argument("--so", default=os.path.join(RESOURCES, "libyolo_hailortpp_postprocess.so"))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--queue-buffers", type=int, nargs="+", default=[3, 6])
+    parser.add_argument("--scale-threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--convert-threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measured time per configuration")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured time before each measurement")
+    parser.add_argument("--fps-tolerance", type=float, default=0.03, help="FPS loss accepted for lower latency")
+    parser.add_argument("--output", default=PIPELINE_PROFILE_PATH, help="Profile to write")
+    parser.add_argument("--results", help="Also write every configuration's measurements as JSON here")
+    parser.add_argument("--dry-run", action="store_true", help="Measure and report, but do not write the profile")
+    args = parser.parse_args()
+
+    Gst.init(None)
+    grid = [PipelineProfile(*values) for values in itertools.product(
+        args.batch_sizes, args.queue_buffers, args.scale_threads, args.convert_threads)]
+    print(f"{len(grid)} configurations, ~{len(grid) * (args.seconds + args.warmup) / 60:.0f} min")
+    print(f"{'configuration':>56} {'fps':>7} {'p50 ms':>8} {'p99 ms':>8} {'cpu':>5}")
+    results = []
+    for profile in grid:
+        measured = measure(args, profile)
+        results.append((profile, measured))
+        if "error" in measured:
+            print(f"{profile.label():>56} error: {measured['error']}")
+        else:
+            print(f"{profile.label():>56} {measured['fps']:>7.1f} {measured['latency_p50_ms']:>8.1f}"
+                  f" {measured['latency_p99_ms']:>8.1f} {measured['cpu']:>5.2f}")
+
+    if args.results:
+        with open(args.results, "w") as f:
+            json.dump([{**p._asdict(), **m} for p, m in results], f, indent=2)
+
+    best = choose_best(results, args.fps_tolerance)
+    if best is None:
+        print("No configuration ran; profile not written")
+        return
+    profile, measured = best
+    print(f"best: {profile.label()} -> {measured}")
+    if not args.dry_run:
+        save_profile(args.output, profile, {**measured, "input": args.input, "size": f"{args.width}x{args.height}",
+                                            "tuned_at": time.strftime("%Y-%m-%d %H:%M:%S")})
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+GStreamer side of the app's headless --benchmark N mode.
+
+Counts frames at the user callback and calls on_done once N have passed (a file source
+keeps looping until then), times the Python callback, records source-to-callback and
+hailonet latency through core.vision.pipeline_metrics, and turns the GStreamer tracer
+log (core.vision.tracer_stats) into per-element latency stats for the JSON report.
+
+FPS is measured from the first frame at the callback to the N-th, so pipeline start-up
+and preroll are not counted; tracer records cover the whole run.
+"""
+import functools
+import logging
+import os
+import subprocess
+import tempfile
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import GLib, Gst
+
+from core.vision.pipeline_metrics import attach_pipeline_metrics
+from core.vision.tracer_stats import TracerStats, benchmark_report, tracer_environment
+from utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+def git_revision():
+    """Short hash of the checked-out commit (with a -dirty suffix), or None outside a git checkout."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=here, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class PipelineBenchmark:
+    def __init__(self, frames: int, on_done):
+        """
+        Args:
+            frames (int): Frames to run through the callback.
+            on_done: Called once from the main loop after the last frame (e.g. GStreamerApp.shutdown).
+        """
+        if frames < 1:
+            raise ValueError("frames must be >= 1")
+        self.frames_wanted = frames
+        self.frames = 0
+        self.metrics = Metrics(enabled=True)
+        self._on_done = on_done
+        self._first = None
+        self._last = None
+        fd, self.tracer_log = tempfile.mkstemp(prefix="gst_tracer_", suffix=".log")
+        os.close(fd)
+
+    def configure_tracers(self):
+        """Enable the tracers, logging to self.tracer_log; must run before Gst.init()."""
+        os.environ.update(tracer_environment(self.tracer_log))
+
+    @property
+    def done(self) -> bool:
+        return self.frames >= self.frames_wanted
+
+    def time_callback(self, callback):
+        """Wrap a user callback pad probe so each call is recorded as the `callback` stage."""
+        @functools.wraps(callback)
+        def timed(pad, info, user_data):
+            with self.metrics.span("callback"):
+                return callback(pad, info, user_data)
+        return timed
+
+    def attach(self, pipeline, callback: str = "identity_callback") -> bool:
+        """
+        Count frames on the callback element's src pad and instrument the pipeline.
+
+        Returns:
+            bool: False if the callback element is missing (the run would never end).
+        """
+        attach_pipeline_metrics(pipeline, self.metrics)
+        element = pipeline.get_by_name(callback)
+        if element is None:
+            logger.error(f"Benchmark needs an element named {callback}")
+            return False
+        element.get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, self._count)
+        return True
+
+    def _count(self, pad, info):
+        if self.done:
+            return Gst.PadProbeReturn.OK
+        now = time.perf_counter()
+        if self._first is None:
+            self._first = now
+        self._last = now
+        self.frames += 1
+        if self.done:
+            GLib.idle_add(self._on_done)
+        return Gst.PadProbeReturn.OK
+
+    def report(self, **extra) -> dict:
+        """The JSON report; reads and removes the tracer log."""
+        tracer = TracerStats()
+        if not tracer.add_file(self.tracer_log):
+            logger.warning("No GStreamer tracer records (was Gst initialized before the tracers were configured?)")
+        try:
+            os.remove(self.tracer_log)
+        except OSError:
+            pass
+        seconds = self._last - self._first if self._first is not None else 0.0
+        return benchmark_report(
+            self.frames, seconds, tracer.summary(), self.metrics.snapshot()["stages"],
+            revision=git_revision(), frames_requested=self.frames_wanted, **extra,
+        )
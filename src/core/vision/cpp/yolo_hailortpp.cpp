@@ -1,3 +1,4 @@
+#include <algorithm>
 #include <regex>
 #include <fstream>
 #include <sstream>
@@ -55,11 +56,19 @@ YoloParamsNMS *init(const std::string config_path, const std::string function_na
             "items": {
                 "type": "string"
                 }
+            },
+            "allowed_labels": {
+            "type": "array",
+            "items": {
+                "type": "string"
+                }
+            },
+            "min_confidence": {
+            "type": "number",
+            "minimum": 0,
+            "maximum": 1
             }
-        },
-        "required": [
-            "labels"
-        ]
+        }
         })"""";
 
         std::FILE *fp = fopen(config_path.c_str(), "r");
@@ -74,13 +83,20 @@ YoloParamsNMS *init(const std::string config_path, const std::string function_na
             rapidjson::Document doc_config_json;
             doc_config_json.ParseStream(stream);
 
-            // parse labels
-            auto labels = doc_config_json["labels"].GetArray();
-            uint i = 0;
-            for (auto &v : labels)
+            // parse labels, the model's classes default to COCO
+            if (doc_config_json.HasMember("labels"))
+            {
+                auto labels = doc_config_json["labels"].GetArray();
+                uint i = 0;
+                for (auto &v : labels)
+                {
+                    params->labels.insert(std::pair<std::uint8_t, std::string>(i, v.GetString()));
+                    i++;
+                }
+            }
+            else
             {
-                params->labels.insert(std::pair<std::uint8_t, std::string>(i, v.GetString()));
-                i++;
+                params->labels = common::coco_eighty;
             }
 
             // set the params
@@ -91,6 +107,15 @@ YoloParamsNMS *init(const std::string config_path, const std::string function_na
                 params->max_boxes = doc_config_json["max_boxes"].GetInt();
                 params->filter_by_score = true;
             }
+            if (doc_config_json.HasMember("allowed_labels")) {
+                for (auto &v : doc_config_json["allowed_labels"].GetArray())
+                {
+                    params->allowed_labels.insert(v.GetString());
+                }
+            }
+            if (doc_config_json.HasMember("min_confidence")) {
+                params->min_confidence = doc_config_json["min_confidence"].GetFloat();
+            }
         }
         fclose(fp);
     }
@@ -207,6 +232,25 @@ void yolov5_no_persons(HailoROIPtr roi)
     }
     hailo_common::add_detections(roi, detections);
 }
+/**
+ * Drop decoded detections outside the allow-list or below the confidence floor,
+ * before they are attached to the ROI.
+ */
+static void prefilter(std::vector<HailoDetection> &detections, const YoloParamsNMS *params)
+{
+    if (params->allowed_labels.empty() && params->min_confidence <= 0.0f)
+    {
+        return;
+    }
+    detections.erase(std::remove_if(detections.begin(), detections.end(),
+                                    [params](HailoDetection &detection) {
+                                        return detection.get_confidence() < params->min_confidence ||
+                                               (!params->allowed_labels.empty() &&
+                                                params->allowed_labels.count(detection.get_label()) == 0);
+                                    }),
+                     detections.end());
+}
+
 void filter(HailoROIPtr roi, void *params_void_ptr)
 {
     if (!roi->has_tensors())
@@ -222,6 +266,7 @@ void filter(HailoROIPtr roi, void *params_void_ptr)
         {
             auto post = HailoNMSDecode(tensor, params->labels, params->detection_threshold, params->max_boxes, params->filter_by_score);
             auto detections = post.decode<float32_t, common::hailo_bbox_float32_t>();
+            prefilter(detections, params);
             hailo_common::add_detections(roi, detections);
         }
     }
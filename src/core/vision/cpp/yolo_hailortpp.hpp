@@ -3,6 +3,7 @@
 * Distributed under the LGPL license (https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt)
 **/
 #pragma once
+#include <set>
 #include "hailo_objects.hpp"
 #include "hailo_common.hpp"
 
@@ -15,6 +16,10 @@ public:
     float detection_threshold;
     uint max_boxes;
     bool filter_by_score=false;
+    // Pre-filter applied before detections are attached to the ROI (tracker and user callback
+    // never see the rest). An empty allow-list keeps every class.
+    std::set<std::string> allowed_labels;
+    float min_confidence = 0.0f;
     YoloParamsNMS(std::map<uint8_t, std::string> dataset = std::map<uint8_t, std::string>(),
                   float detection_threshold = 0.3f,
                   uint max_boxes = 200)
@@ -3,13 +3,32 @@ import gi
 gi.require_version("Gst", "1.0")
 from gi.repository import Gst, GLib
 import os
+import atexit
 import argparse
+import json
+import tempfile
 import multiprocessing
 import numpy as np
 import setproctitle
 import cv2
 import time
 import hailo
+from constants import (
+    CAMERA_HFOV_DEG,
+    PERSON_SIZE_M,
+    PIPELINE_PROFILE_PATH,
+    POSTPROCESS_MIN_CONFIDENCE,
+    POSTPROCESS_PREFILTER,
+    RELEVANT_CLASSES,
+    SURVEY_ELEVATION_M,
+    TILE_MIN_PERSON_PX,
+    TILED_MODE,
+    TILED_VIDEO_SIZE,
+    TRACKER_KEEP_LOST_FRAMES,
+    TRACKER_KEEP_TRACKED_FRAMES,
+)
+from core.vision.pipeline_profile import PipelineProfile, apply_pipeline_profile, load_profile
+from core.vision.tiling import grid_plan, plan_tiles
 from core.vision.hailo_apps_infra.hailo_rpi_common import (
     get_default_parser,
     detect_hailo_arch,
@@ -19,10 +38,11 @@ from core.vision.hailo_apps_infra.gstreamer_helper_pipelines import (
     SOURCE_PIPELINE,
     INFERENCE_PIPELINE,
     INFERENCE_PIPELINE_WRAPPER,
-    TILE_CROPPER_PIPELINE,
+    TILED_INFERENCE_PIPELINE,
     TRACKER_PIPELINE,
     USER_CALLBACK_PIPELINE,
     DISPLAY_PIPELINE,
+    RECORDING_PIPELINE,
 )
 from core.vision.hailo_apps_infra.gstreamer_app import (
     GStreamerApp,
@@ -31,6 +51,36 @@ from core.vision.hailo_apps_infra.gstreamer_app import (
 )
 
 
+def write_postprocess_config(allowed_labels, min_confidence, detection_threshold, path=None):
+    """Write a libyolo_hailortpp_postprocess config that keeps only allowed_labels at or above min_confidence.
+
+    The postprocess drops the other detections before attaching them to the ROI, so neither
+    the tracker nor the user callback sees them. Without a "labels" entry the model's
+    classes default to COCO.
+
+    Args:
+        allowed_labels (iterable): Class names to keep; empty keeps every class.
+        min_confidence (float): Confidence floor.
+        detection_threshold (float): NMS decode threshold (below min_confidence it only affects max_boxes ranking).
+        path (str): Output file; default a temporary file removed at exit.
+
+    Returns:
+        str: The path of the config file.
+    """
+    config = {
+        "detection_threshold": detection_threshold,
+        "allowed_labels": sorted(allowed_labels),
+        "min_confidence": min_confidence,
+    }
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="postprocess_", suffix=".json")
+        os.close(fd)
+        atexit.register(lambda: os.path.exists(path) and os.remove(path))
+    with open(path, "w") as f:
+        json.dump(config, f)
+    return path
+
+
 # -----------------------------------------------------------------------------------------------
 # User Gstreamer Application
 # -----------------------------------------------------------------------------------------------
@@ -45,12 +95,40 @@ class GStreamerDetectionApp(GStreamerApp):
             default=None,
             help="Path to costume labels JSON file",
         )
+        parser.add_argument(
+            "--no-prefilter",
+            action="store_true",
+            help="Pass every class and confidence from the postprocess to the tracker and callback "
+            "(e.g. to record a DETECTION_LOG for replay with other thresholds).",
+        )
+        parser.add_argument(
+            "--tiles",
+            default=TILED_MODE,
+            help="Tiled inference: 'off', 'auto' (grid sized for --survey-elevation and the source "
+            "resolution) or a fixed grid such as '3x2'. Defaults to TILED_MODE.",
+        )
+        parser.add_argument(
+            "--survey-elevation",
+            type=float,
+            default=SURVEY_ELEVATION_M,
+            help="Elevation above ground (m) the tile grid is sized for. Defaults to SURVEY_ELEVATION_M.",
+        )
+        parser.add_argument(
+            "--record",
+            default=os.getenv("VIDEO_RECORD_MODE", "pipeline"),
+            choices=["pipeline", "opencv", "off"],
+            help="Recording mode: 'pipeline' encodes in a tee branch off the streaming thread, "
+            "'opencv' writes frames from the user callback (fallback), 'off' disables recording. "
+            "Defaults to $VIDEO_RECORD_MODE or 'pipeline'.",
+        )
         args = parser.parse_args()
         # Call the parent class constructor
         super().__init__(args, user_data)
         # Additional initialization code can be added here
-        # Set Hailo parameters these parameters should be set based on the model used
-        self.batch_size = 8
+        # Set Hailo parameters these parameters should be set based on the model used;
+        # batch size, queue depth and converter threads may come from the auto-tuner's profile
+        self.profile = load_profile(PIPELINE_PROFILE_PATH)
+        self.batch_size = self.profile.batch_size or 8
         nms_score_threshold = 0.3
         nms_iou_threshold = 0.45
 
@@ -81,42 +159,142 @@ class GStreamerDetectionApp(GStreamerApp):
             self.current_path, "../resources/libyolo_hailortpp_postprocess.so"
         )
         self.post_function_name = "filter_letterbox"
-        # User-defined label JSON file
+        # User-defined label JSON file; otherwise the postprocess pre-filters to the relevant classes
         self.labels_json = args.labels_json
+        if self.labels_json is None and POSTPROCESS_PREFILTER and not args.no_prefilter:
+            self.labels_json = write_postprocess_config(
+                RELEVANT_CLASSES, POSTPROCESS_MIN_CONFIDENCE, nms_score_threshold
+            )
 
         self.app_callback = app_callback
 
+        # Recording settings (shared with the OpenCV fallback in the user callback)
+        self.record_mode = args.record
+        self.recordings_dir = os.getenv("VIDEO_DIR", os.path.join(os.getcwd(), "recordings"))
+        self.record_fps = float(os.getenv("VIDEO_FPS", "20.0"))
+        self.record_rotate_sec = int(os.getenv("VIDEO_ROTATE_SEC", "30"))
+        self.record_encoder = None
+
         self.thresholds_str = (
             f"nms-score-threshold={nms_score_threshold} "
             f"nms-iou-threshold={nms_iou_threshold} "
             f"output-format-type=HAILO_FORMAT_TYPE_FLOAT32"
         )
 
+        self.tile_plan = self.select_tile_plan(args.tiles, args.survey_elevation)
+        # where frames enter inference (the adaptive inference rate gate drops frames there)
+        self.inference_input_element = "tile_input_q" if self.tile_plan else "inference_wrapper_input_q"
+
         # Set the process title
         setproctitle.setproctitle("Hailo Detection App")
 
         self.create_pipeline()
+        if self.profile != PipelineProfile():
+            changed = apply_pipeline_profile(self.pipeline, self.profile)
+            print(f"Pipeline profile {PIPELINE_PROFILE_PATH}: {self.profile.label()} ({changed} element properties set)")
+        self.setup_recording()
+
+    def select_tile_plan(self, tiles, survey_elevation):
+        """Tile grid for --tiles, or None for single-pass inference; raises the source resolution if needed."""
+        if tiles == "off":
+            return None
+        if tiles != "auto":
+            try:
+                tiles_x, tiles_y = (int(n) for n in tiles.lower().split("x"))
+            except ValueError:
+                raise ValueError(f"--tiles must be 'off', 'auto' or NxM, not {tiles!r}") from None
+            if tiles_x < 1 or tiles_y < 1:
+                raise ValueError(f"--tiles must be 'off', 'auto' or NxM, not {tiles!r}")
+        # more source pixels are the point of tiling
+        self.video_width = max(self.video_width, TILED_VIDEO_SIZE[0])
+        self.video_height = max(self.video_height, TILED_VIDEO_SIZE[1])
+        if tiles == "auto":
+            plan = plan_tiles(
+                survey_elevation, self.video_width, self.video_height, CAMERA_HFOV_DEG,
+                person_m=PERSON_SIZE_M, min_person_px=TILE_MIN_PERSON_PX,
+            )
+        else:
+            plan = grid_plan(
+                tiles_x, tiles_y, survey_elevation, self.video_width, self.video_height, CAMERA_HFOV_DEG,
+                person_m=PERSON_SIZE_M,
+            )
+        if plan.tiles == 1:
+            print(f"Tiling not needed at {survey_elevation:.0f} m: single-pass inference ({plan})")
+            return None
+        print(f"Tiled inference at {survey_elevation:.0f} m, {self.video_width}x{self.video_height}: {plan}")
+        return plan
+
+    def select_record_encoder(self):
+        """Pick the hardware H.264 encoder if present, else x264enc; None if neither is installed."""
+        for encoder in ("v4l2h264enc", "x264enc"):
+            if Gst.ElementFactory.find(encoder) is not None:
+                return encoder
+        return None
+
+    def setup_recording(self):
+        # Let the user callback know whether it has to record frames itself (OpenCV fallback)
+        self.user_data.record_in_callback = self.record_mode == "opencv"
+        if self.record_mode != "pipeline":
+            return
+        splitmux = self.pipeline.get_by_name("recording_sink")
+        if splitmux is not None:
+            splitmux.connect("format-location", self.on_recording_segment)
+
+    def on_recording_segment(self, splitmux, fragment_id):
+        ts = time.strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.recordings_dir, f"recording_{ts}_{fragment_id:05d}.mkv")
+        print(f"Started new recording segment: {path}")
+        return path
 
     def get_pipeline_string(self):
 
         source_pipeline = SOURCE_PIPELINE(
             self.video_source, self.video_width, self.video_height
         )
-        detection_pipeline = INFERENCE_PIPELINE(
-            hef_path=self.hef_path,
-            post_process_so=self.post_process_so,
-            post_function_name=self.post_function_name,
-            batch_size=self.batch_size,
-            config_json=self.labels_json,
-            additional_params=self.thresholds_str,
+        if self.tile_plan:
+            detection_pipeline_wrapper = self.get_tiled_pipeline_string()
+        else:
+            detection_pipeline = INFERENCE_PIPELINE(
+                hef_path=self.hef_path,
+                post_process_so=self.post_process_so,
+                post_function_name=self.post_function_name,
+                batch_size=self.batch_size,
+                config_json=self.labels_json,
+                additional_params=self.thresholds_str,
+            )
+            detection_pipeline_wrapper = INFERENCE_PIPELINE_WRAPPER(detection_pipeline)
+        # main's track table evicts ids on the same schedule, so keep them in constants
+        tracker_pipeline = TRACKER_PIPELINE(
+            class_id=1,
+            keep_tracked_frames=TRACKER_KEEP_TRACKED_FRAMES,
+            keep_lost_frames=TRACKER_KEEP_LOST_FRAMES,
         )
-        detection_pipeline_wrapper = INFERENCE_PIPELINE_WRAPPER(detection_pipeline)
-        tracker_pipeline = TRACKER_PIPELINE(class_id=1)
         user_callback_pipeline = USER_CALLBACK_PIPELINE()
         display_pipeline = DISPLAY_PIPELINE(
             video_sink=self.video_sink, sync=self.sync, show_fps=self.show_fps
         )
 
+        if self.record_mode == "pipeline":
+            self.record_encoder = self.select_record_encoder()
+            if self.record_encoder is None:
+                print("No H.264 encoder element found, falling back to OpenCV recording")
+                self.record_mode = "opencv"
+
+        if self.record_mode == "pipeline":
+            os.makedirs(self.recordings_dir, exist_ok=True)
+            recording_pipeline = RECORDING_PIPELINE(
+                output_dir=self.recordings_dir,
+                segment_sec=self.record_rotate_sec,
+                fps=self.record_fps,
+                encoder=self.record_encoder,
+            )
+            # tee after the callback so the recording matches what the callback saw (no overlay)
+            display_pipeline = (
+                f"tee name=recording_tee "
+                f"recording_tee. ! {display_pipeline} "
+                f"recording_tee. ! {recording_pipeline}"
+            )
+
         pipeline_string = (
             f"{source_pipeline} ! "
             f"{detection_pipeline_wrapper} ! "
@@ -129,29 +307,32 @@ class GStreamerDetectionApp(GStreamerApp):
         return pipeline_string
 
     def get_tiled_pipeline_string(self):
-        """Get the tiled pipeline string using RPI camera source.
+        """Tiled inference for self.tile_plan, in place of the single-pass inference wrapper.
+
+        Tiles are scaled to the network input inside INFERENCE_PIPELINE and batched into
+        hailonet at self.batch_size; the aggregator maps detections back to the frame.
 
         Returns:
-            str: The complete GStreamer pipeline string for tiled inference with RPI camera.
+            str: The GStreamer pipeline string from the tile input queue to the aggregator output.
         """
-        return """filesrc location=/home/tails/TAILS-Embedded/OnBoardNode/resources/DJI_0501_10fps.MP4 name=src_0 !
-decodebin ! 
-videoconvert qos=false ! 
-video/x-raw,pixel-aspect-ratio=1/1,format=RGB ! 
-queue leaky=no max-size-buffers=3 max-size-bytes=0 max-size-time=0 ! 
-hailotilecropper internal-offset=true name=cropper tiles-along-x-axis=4 tiles-along-y-axis=3 overlap-x-axis=0.08 overlap-y-axis=0.08 hailotileaggregator flatten-detections=true iou-threshold=0.3 name=agg cropper. ! 
-queue leaky=no max-size-buffers=3 max-size-bytes=0 max-size-time=0 ! agg. cropper. ! 
-queue leaky=no max-size-buffers=3 max-size-bytes=0 max-size-time=0 ! 
-hailonet hef-path=/home/tails/TAILS-Embedded/OnBoardNode/resources/yolov8s_h8l.hef batch-size=16 output-format-type=HAILO_FORMAT_TYPE_FLOAT32 ! 
-queue leaky=no max-size-buffers=3 max-size-bytes=0 max-size-time=0 ! 
-hailofilter name=inference_hailofilter so-path=/home/tails/TAILS-Embedded/OnBoardNode/pipelines/resources/libyolo_hailortpp_postprocess.so qos=false !
-queue leaky=no max-size-buffers=3 max-size-bytes=0 max-size-time=0 ! agg. agg. !
-queue leaky=no max-size-buffers=3 max-size-bytes=0 max-size-time=0 !
-hailooverlay qos=false !
-queue leaky=no max-size-buffers=3 max-size-bytes=0 max-size-time=0 ! 
-videoconvert qos=false !
-fpsdisplaysink video-sink=xvimagesink name=hailo_display sync=false text-overlay=true"""
-
+        plan = self.tile_plan
+        detection_pipeline = INFERENCE_PIPELINE(
+            hef_path=self.hef_path,
+            post_process_so=self.post_process_so,
+            # tiles are not letterboxed by a cropper; hailotileaggregator maps them back
+            post_function_name="filter",
+            batch_size=self.batch_size,
+            config_json=self.labels_json,
+            additional_params=self.thresholds_str,
+        )
+        return TILED_INFERENCE_PIPELINE(
+            detection_pipeline,
+            tiles_along_x_axis=plan.tiles_x,
+            tiles_along_y_axis=plan.tiles_y,
+            overlap_x_axis=plan.overlap_x,
+            overlap_y_axis=plan.overlap_y,
+            batch_size=self.batch_size,
+        )
 
 if __name__ == "__main__":
     # Create an instance of the user app callback class
@@ -6,14 +6,16 @@ import gi
 import threading
 import sys
 import cv2
-import numpy as np
 import time
+import json
 gi.require_version('Gst', '1.0')
 from gi.repository import Gst, GLib, GObject
 from core.vision.hailo_apps_infra.gstreamer_helper_pipelines import get_source_type
+from core.vision.benchmark import PipelineBenchmark
+from core.vision.picamera_source import SensorTimestamps, copy_frame, frame_view, lores_conversion, rgb_stride
 
 try:
-    from picamera2 import Picamera2
+    from picamera2 import MappedArray, Picamera2
 except ImportError:
     pass # Available only on Pi OS
 
@@ -87,8 +89,14 @@ class GStreamerApp:
         self.source_type = get_source_type(self.video_source)
         self.user_data = user_data
 
+        # Headless benchmark (--benchmark N); the tracers must be configured before Gst.init()
+        self.benchmark = None
+        if self.options_menu.benchmark:
+            self.benchmark = PipelineBenchmark(self.options_menu.benchmark, self.shutdown)
+            self.benchmark.configure_tracers()
+
         # Select video sink based on environment and user preference (autovideosink will fail over SSH)
-        if args.headless:
+        if args.headless or self.benchmark:
             self.video_sink = "fakesink"
         else:
             # if there is a display, use a real sink; otherwise fall back to headless
@@ -111,7 +119,7 @@ class GStreamerApp:
         # Set user data parameters
         user_data.use_frame = self.options_menu.use_frame
 
-        self.sync = "false" if (self.options_menu.disable_sync or self.source_type != "file") else "true"
+        self.sync = "false" if (self.options_menu.disable_sync or self.benchmark or self.source_type != "file") else "true"
         self.show_fps = self.options_menu.show_fps
 
         if self.options_menu.dump_dot:
@@ -183,6 +191,22 @@ class GStreamerApp:
         GLib.idle_add(self.loop.quit)
 
 
+    def write_benchmark_report(self):
+        report = self.benchmark.report(
+            input=self.video_source,
+            video_size=f"{self.video_width}x{self.video_height}",
+            batch_size=self.batch_size,
+            hef=os.path.basename(self.hef_path) if self.hef_path else None,
+        )
+        if not self.benchmark.done:
+            print(f"Benchmark stopped after {self.benchmark.frames} of {self.benchmark.frames_wanted} frames", file=sys.stderr)
+            report["incomplete"] = True
+        text = json.dumps(report, indent=2)
+        print(text)
+        if self.options_menu.benchmark_report:
+            with open(self.options_menu.benchmark_report, "w") as f:
+                f.write(text + "\n")
+
     def get_pipeline_string(self):
         # This is a placeholder function that should be overridden by the child class
         return ""
@@ -205,8 +229,15 @@ class GStreamerApp:
             if identity is None:
                 print("Warning: identity_callback element not found, add <identity name=identity_callback> in your pipeline where you want the callback to be called.")
             else:
+                callback = self.benchmark.time_callback(self.app_callback) if self.benchmark else self.app_callback
                 identity_pad = identity.get_static_pad("src")
-                identity_pad.add_probe(Gst.PadProbeType.BUFFER, self.app_callback, self.user_data)
+                identity_pad.add_probe(Gst.PadProbeType.BUFFER, callback, self.user_data)
+
+        if self.benchmark:
+            if not self.benchmark.attach(self.pipeline):
+                print("Error: --benchmark counts frames at identity_callback, which is not in the pipeline.", file=sys.stderr)
+                sys.exit(1)
+            print(f"Benchmark: {self.benchmark.frames_wanted} frames")
 
         hailo_display = self.pipeline.get_by_name("hailo_display")
         if hailo_display is None:
@@ -242,6 +273,9 @@ class GStreamerApp:
         # Run the GLib event loop
         self.loop.run()
 
+        if self.benchmark:
+            self.write_benchmark_report()
+
         # Clean up
         try:
             self.user_data.running = False
@@ -270,51 +304,71 @@ def picamera_thread(pipeline, video_width, video_height, video_format, picamera_
     with Picamera2() as picam2:
         if picamera_config is None:
             # Default configuration
-            main = {'size': (1280, 720), 'format': 'RGB888'}
-            lores = {'size': (video_width, video_height), 'format': 'RGB888'}
+            # lores cannot be larger than main (tiled mode asks for more than 720p)
+            main = {'size': (max(1280, video_width), max(720, video_height)), 'format': 'RGB888'}
+            # 'BGR888' is R, G, B in memory: the ISP delivers GStreamer RGB, no conversion needed
+            lores = {'size': (video_width, video_height), 'format': 'BGR888'}
             controls = {'FrameRate': 30}
             config = picam2.create_preview_configuration(main=main, lores=lores, controls=controls)
         else:
             config = picamera_config
         # Configure the camera with the created configuration
         picam2.configure(config)
-        # Update GStreamer caps based on 'lores' stream
+        # Update GStreamer caps based on 'lores' stream; frames are always pushed as RGB
         lores_stream = config['lores']
-        format_str = 'RGB' if lores_stream['format'] == 'RGB888' else video_format
+        conversion = lores_conversion(lores_stream['format'])
         width, height = lores_stream['size']
-        print(f"Picamera2 configuration: width={width}, height={height}, format={format_str}")
-        appsrc.set_property(
-            "caps",
-            Gst.Caps.from_string(
-                f"video/x-raw, format={format_str}, width={width}, height={height}, "
-                f"framerate=30/1, pixel-aspect-ratio=1/1"
-            )
+        print(f"Picamera2 configuration: width={width}, height={height}, format={lores_stream['format']} -> RGB")
+        caps = Gst.Caps.from_string(
+            f"video/x-raw, format=RGB, width={width}, height={height}, "
+            f"framerate=30/1, pixel-aspect-ratio=1/1"
         )
+        appsrc.set_property("caps", caps)
+        # Buffers are recycled once downstream releases them instead of allocated per frame
+        stride = rgb_stride(width)
+        pool = Gst.BufferPool.new()
+        pool_config = pool.get_config()
+        Gst.BufferPool.config_set_params(pool_config, caps, stride * height, 4, 0)
+        pool.set_config(pool_config)
+        pool.set_active(True)
+        timestamps = SensorTimestamps()
         picam2.start()
-        frame_count = 0
-        start_time = time.time()
         print("picamera_process started")
-        while True:
-            frame_data = picam2.capture_array('lores')
-            # frame_data = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
-            if frame_data is None:
-                print("Failed to capture frame.")
-                break
-            # Convert framontigue data if necessary
-            frame = cv2.cvtColor(frame_data, cv2.COLOR_BGR2RGB)
-            frame = np.asarray(frame)
-            # Create Gst.Buffer by wrapping the frame data
-            buffer = Gst.Buffer.new_wrapped(frame.tobytes())
-            # Set buffer PTS and duration
-            buffer_duration = Gst.util_uint64_scale_int(1, Gst.SECOND, 30)
-            buffer.pts = frame_count * buffer_duration
-            buffer.duration = buffer_duration
-            # Push the buffer to appsrc
-            ret = appsrc.emit('push-buffer', buffer)
-            if ret != Gst.FlowReturn.OK:
-                print("Failed to push buffer:", ret)
-                break
-            frame_count += 1
+        try:
+            while True:
+                ret, buffer = pool.acquire_buffer(None)
+                if ret != Gst.FlowReturn.OK:
+                    print("Failed to acquire buffer:", ret)
+                    break
+                request = picam2.capture_request()
+                try:
+                    ok, map_info = buffer.map(Gst.MapFlags.WRITE)
+                    if not ok:
+                        print("Failed to map buffer.")
+                        # hand it back, or the pool is one buffer short
+                        pool.release_buffer(buffer)
+                        break
+                    try:
+                        # one pass from the camera's buffer into the pooled buffer
+                        with MappedArray(request, 'lores') as frame:
+                            copy_frame(map_info.data, stride, frame_view(frame.array, width), conversion)
+                    finally:
+                        buffer.unmap(map_info)
+                    metadata = request.get_metadata()
+                finally:
+                    # back to the camera right away
+                    request.release()
+                clock = pipeline.get_clock()
+                running_time = clock.get_time() - pipeline.get_base_time() if clock is not None else 0
+                buffer.pts = timestamps.pts(metadata.get('SensorTimestamp'), time.monotonic_ns(), running_time)
+                buffer.duration = metadata.get('FrameDuration', 33333) * Gst.USECOND
+                # Push the buffer to appsrc
+                ret = appsrc.emit('push-buffer', buffer)
+                if ret != Gst.FlowReturn.OK:
+                    print("Failed to push buffer:", ret)
+                    break
+        finally:
+            pool.set_active(False)
 
 def disable_qos(pipeline):
     """
@@ -342,6 +342,63 @@ def FILE_SINK_PIPELINE(output_file="output.mkv", name="file_sink", bitrate=5000)
     return file_sink_pipeline
 
 
+def RECORDING_PIPELINE(
+    output_dir,
+    segment_sec=30,
+    fps=20,
+    encoder="x264enc",
+    bitrate=4000,
+    max_size_buffers=5,
+    name="recording",
+):
+    """
+    Creates a GStreamer pipeline string for a segmented recording branch, to be fed from a tee.
+    The branch starts with a leaky queue, so a slow encoder drops frames here instead of back-pressuring
+    the rest of the pipeline. Segments are split by splitmuxsink every segment_sec seconds (at the next keyframe)
+    and muxed as .mkv, which stays playable if the process is killed mid-segment.
+
+    Args:
+        output_dir (str): Directory for the recording segments.
+        segment_sec (int, optional): Segment length in seconds. Defaults to 30.
+        fps (int, optional): Maximum recorded frame rate; extra frames are dropped. Defaults to 20.
+        encoder (str, optional): 'v4l2h264enc' for the hardware encoder, otherwise 'x264enc'. Defaults to 'x264enc'.
+        bitrate (int, optional): Encoder bitrate in kbit/s. Defaults to 4000.
+        max_size_buffers (int, optional): Depth of the leaky input queue. Defaults to 5.
+        name (str, optional): The prefix name for the pipeline elements. Defaults to 'recording'.
+
+    Returns:
+        str: A string representing the GStreamer pipeline for the recording branch.
+    """
+    fps = max(1, int(round(fps)))
+    key_int = fps * 2
+    if encoder == "v4l2h264enc":
+        encoder_str = (
+            f"v4l2h264enc name={name}_encoder "
+            f'extra-controls="controls,repeat_sequence_header=1,video_bitrate={bitrate * 1000},h264_i_frame_period={key_int}" ! '
+            f"video/x-h264, level=(string)4 "
+        )
+    else:
+        encoder_str = (
+            f"x264enc name={name}_encoder speed-preset=ultrafast tune=zerolatency "
+            f"bitrate={bitrate} key-int-max={key_int} "
+        )
+
+    recording_pipeline = (
+        f'{QUEUE(name=f"{name}_q", max_size_buffers=max_size_buffers, leaky="downstream")} ! '
+        f"videorate name={name}_videorate drop-only=true max-rate={fps} ! "
+        f"videoconvert name={name}_videoconvert n-threads=2 qos=false ! "
+        f"video/x-raw, format=I420 ! "
+        f'{QUEUE(name=f"{name}_encoder_q", max_size_buffers=max_size_buffers, leaky="downstream")} ! '
+        f"{encoder_str} ! "
+        f"h264parse name={name}_h264parse ! "
+        f"splitmuxsink name={name}_sink muxer-factory=matroskamux "
+        f"max-size-time={int(segment_sec) * 1_000_000_000} "
+        f'location="{os.path.join(output_dir, "recording_%05d.mkv")}" '
+    )
+
+    return recording_pipeline
+
+
 def USER_CALLBACK_PIPELINE(name="identity_callback"):
     """
     Creates a GStreamer pipeline string for the user callback element.
@@ -456,6 +513,7 @@ def TILE_CROPPER_PIPELINE(
     overlap_x_axis=0.08,
     overlap_y_axis=0.08,
     iou_threshold=0.3,
+    bypass_max_size_buffers=3,
 ):
     """
     Generates the tile cropper portion of the GStreamer pipeline string.
@@ -465,12 +523,14 @@ def TILE_CROPPER_PIPELINE(
 
     Args:
         internal_offset (bool, optional): Whether to use internal offsets. Defaults to True.
-        tiles_along_x_axis (int, optional): Number of tiles (columns) along the x axis. Defaults to 4.
+        tiles_along_x_axis (int, optional): Number of tiles (columns) along the x axis. Defaults to 3.
         tiles_along_y_axis (int, optional): Number of tiles (rows) along the y axis. Defaults to 3.
         overlap_x_axis (float, optional): Overlap percentage between tiles along the x axis. Defaults to 0.08.
         overlap_y_axis (float, optional): Overlap percentage between tiles along the y axis. Defaults to 0.08.
         iou_threshold (float, optional): IoU threshold used by the aggregator for non-max suppression.
                                            Defaults to 0.3.
+        bypass_max_size_buffers (int, optional): Whole frames held while their tiles are inferred;
+                                           must cover the frames one hailonet batch spans. Defaults to 3.
 
     Returns:
         str: The GStreamer pipeline string from the tile cropper element up to the start of the detection pipeline.
@@ -480,7 +540,53 @@ def TILE_CROPPER_PIPELINE(
         f"tiles-along-x-axis={tiles_along_x_axis} tiles-along-y-axis={tiles_along_y_axis} "
         f"overlap-x-axis={overlap_x_axis} overlap-y-axis={overlap_y_axis} "
         f"hailotileaggregator flatten-detections=true iou-threshold={iou_threshold} name=agg "
-        f"cropper. ! queue leaky=no max-size-buffers=3 max-size-bytes=0 max-size-time=0 ! agg. "
+        f'cropper. ! {QUEUE(name="tile_bypass_q", max_size_buffers=bypass_max_size_buffers)} ! agg. '
         f"cropper."
     )
     return tile_cropper_pipeline
+
+
+def TILED_INFERENCE_PIPELINE(
+    inner_pipeline,
+    tiles_along_x_axis,
+    tiles_along_y_axis,
+    overlap_x_axis=0.08,
+    overlap_y_axis=0.08,
+    iou_threshold=0.3,
+    batch_size=1,
+    name="tile",
+):
+    """
+    Runs inner_pipeline (typically INFERENCE_PIPELINE) on every tile of the frame and
+    aggregates the detections back onto the whole frame, in full-frame coordinates.
+
+    Args:
+        inner_pipeline (str): The inference pipeline run on each tile.
+        tiles_along_x_axis (int): Number of tiles (columns).
+        tiles_along_y_axis (int): Number of tiles (rows).
+        overlap_x_axis (float, optional): Overlap between tiles along x, a fraction of the tile. Defaults to 0.08.
+        overlap_y_axis (float, optional): Overlap between tiles along y. Defaults to 0.08.
+        iou_threshold (float, optional): IoU threshold of the aggregator's NMS across tiles. Defaults to 0.3.
+        batch_size (int, optional): hailonet batch size inside inner_pipeline; sizes the bypass queue
+                                    so a batch that spans several frames does not stall. Defaults to 1.
+        name (str, optional): Prefix of the input and output queues. Defaults to 'tile'.
+
+    Returns:
+        str: A string representing the tiled inference pipeline.
+    """
+    tiles = tiles_along_x_axis * tiles_along_y_axis
+    tile_cropper_pipeline = TILE_CROPPER_PIPELINE(
+        tiles_along_x_axis=tiles_along_x_axis,
+        tiles_along_y_axis=tiles_along_y_axis,
+        overlap_x_axis=overlap_x_axis,
+        overlap_y_axis=overlap_y_axis,
+        iou_threshold=iou_threshold,
+        bypass_max_size_buffers=max(3, -(-batch_size // tiles) + 2),
+    )
+    tiled_pipeline = (
+        f'{QUEUE(name=f"{name}_input_q")} ! '
+        f"{tile_cropper_pipeline} ! "
+        f"{inner_pipeline} ! agg. "
+        f'agg. ! {QUEUE(name=f"{name}_output_q")} '
+    )
+    return tiled_pipeline
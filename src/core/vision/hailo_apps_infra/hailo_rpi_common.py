@@ -12,6 +12,7 @@ import time
 import signal
 import threading
 import subprocess
+from contextlib import contextmanager
 from core.vision.hailo_apps_infra.gstreamer_app import (
     app_callback_class
 )
@@ -97,6 +98,13 @@ def get_default_parser():
     )
     parser.add_argument("--dump-dot", action="store_true", help="Dump the pipeline graph to a dot file pipeline.dot")
     parser.add_argument("--headless", "-H", action="store_true", help="Force headless (use fakesink) even if DISPLAY is set")
+    parser.add_argument(
+        "--benchmark", type=int, default=0, metavar="N",
+        help="Headless benchmark: run N frames through the callback (looping a file source), with the GStreamer "
+        "latency tracers enabled, then print a JSON report (FPS, per-element latency, callback time) and exit. "
+        "Implies --headless and --disable-sync."
+    )
+    parser.add_argument("--benchmark-report", default=None, help="Also write the --benchmark JSON report to this file")
     return parser
 
 
@@ -104,19 +112,27 @@ def get_default_parser():
 # Functions used to get numpy arrays from GStreamer buffers
 # ---------------------------------------------------------
 
-def handle_rgb(map_info, width, height):
+def handle_rgb(map_info, width, height, copy=True):
     # The copy() method is used to create a copy of the numpy array. This is necessary because the original numpy array is created from buffer data, and it does not own the data it represents. Instead, it's just a view of the buffer's data.
-    return np.ndarray(shape=(height, width, 3), dtype=np.uint8, buffer=map_info.data).copy()
+    frame = np.ndarray(shape=(height, width, 3), dtype=np.uint8, buffer=map_info.data)
+    return frame.copy() if copy else _read_only(frame)
 
-def handle_nv12(map_info, width, height):
+def handle_nv12(map_info, width, height, copy=True):
     y_plane_size = width * height
     uv_plane_size = width * height // 2
-    y_plane = np.ndarray(shape=(height, width), dtype=np.uint8, buffer=map_info.data[:y_plane_size]).copy()
-    uv_plane = np.ndarray(shape=(height//2, width//2, 2), dtype=np.uint8, buffer=map_info.data[y_plane_size:]).copy()
-    return y_plane, uv_plane
+    y_plane = np.ndarray(shape=(height, width), dtype=np.uint8, buffer=map_info.data[:y_plane_size])
+    uv_plane = np.ndarray(shape=(height//2, width//2, 2), dtype=np.uint8, buffer=map_info.data[y_plane_size:])
+    if copy:
+        return y_plane.copy(), uv_plane.copy()
+    return _read_only(y_plane), _read_only(uv_plane)
+
+def handle_yuyv(map_info, width, height, copy=True):
+    frame = np.ndarray(shape=(height, width, 2), dtype=np.uint8, buffer=map_info.data)
+    return frame.copy() if copy else _read_only(frame)
 
-def handle_yuyv(map_info, width, height):
-    return np.ndarray(shape=(height, width, 2), dtype=np.uint8, buffer=map_info.data).copy()
+def _read_only(array):
+    array.flags.writeable = False
+    return array
 
 FORMAT_HANDLERS = {
     'RGB': handle_rgb,
@@ -150,3 +166,44 @@ def get_numpy_from_buffer(buffer, format, width, height):
         return handler(map_info, width, height)
     finally:
         buffer.unmap(map_info)
+
+@contextmanager
+def map_numpy_from_buffer(buffer, format, width, height):
+    """
+    Zero-copy variant of get_numpy_from_buffer for read-only consumers.
+
+    Keeps the GstBuffer mapped for the duration of the with block and yields read-only
+    numpy views of its memory. The views must not be used after the block exits;
+    copy (or convert with FrameConverter) anything that has to outlive it.
+
+    Example:
+        with map_numpy_from_buffer(buffer, format, width, height) as frame:
+            bgr = converter.convert(frame)
+    """
+    handler = FORMAT_HANDLERS.get(format)
+    if handler is None:
+        raise ValueError(f"Unsupported format: {format}")
+
+    success, map_info = buffer.map(Gst.MapFlags.READ)
+    if not success:
+        raise ValueError("Buffer mapping failed")
+    try:
+        yield handler(map_info, width, height, copy=False)
+    finally:
+        buffer.unmap(map_info)
+
+class FrameConverter:
+    """
+    cv2.cvtColor into a reusable output array.
+
+    The first call allocates the output; later calls with the same frame shape write
+    into it (cvtColor dst=), so steady state does no frame-sized allocation. The
+    returned array is overwritten by the next call.
+    """
+    def __init__(self, code):
+        self.code = code
+        self._out = None
+
+    def convert(self, frame):
+        self._out = cv2.cvtColor(frame, self.code, dst=self._out)
+        return self._out
@@ -0,0 +1,70 @@
+"""
+GStreamer side of the adaptive inference rate: a drop probe ahead of the inference
+wrapper, driven by a utils.inference_rate controller and the latest GPS fix.
+
+Dropped buffers skip everything downstream of the gate (NPU, tracker, callback,
+display and the pipeline recording branch), so the tracker's keep_*_frames and the
+callback's frame counter both count inferred frames only. The hailocropper /
+hailoaggregator pair of the wrappers expects every frame on both branches, so the gate
+cannot sit on the inference branch alone. The gate is therefore off by default
+(INFERENCE_RATE_ADAPTIVE): turned on, it also brings display and recording down to
+INFERENCE_MIN_FPS while hovering.
+"""
+import logging
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+from utils.inference_rate import InferenceRateController
+from utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# re-read the GPS fix at most this often (the receiver updates every 400 ms)
+UPDATE_SEC = 0.2
+
+
+def attach_inference_gate(pipeline, controller: InferenceRateController, get_fix, metrics: Metrics,
+                          element: str = "inference_wrapper_input_q"):
+    """
+    Drop frames on the sink pad of `element` (the inference wrapper's input queue) down
+    to the controller's rate; the rate follows get_fix() (GPSManager.get_fix).
+
+    Exports the rate as the inference_fps gauge and the frames kept off the NPU as
+    inference_frames_skipped / inference_frames_admitted gauges.
+
+    Returns:
+        bool: False if the element is not in the pipeline (nothing attached).
+    """
+    target = pipeline.get_by_name(element)
+    if target is None:
+        logger.warning(f"Adaptive inference rate disabled: no element named {element}")
+        return False
+    last_update = [float("-inf")]
+
+    def probe(pad, info):
+        now = time.monotonic()
+        if now - last_update[0] >= UPDATE_SEC:
+            last_update[0] = now
+            previous = controller.fps
+            fps = controller.update(*get_fix())
+            if fps != previous:
+                logger.debug(f"[Inference] rate {previous:.1f} -> {fps:.1f} fps")
+        buffer = info.get_buffer()
+        if buffer is None:
+            return Gst.PadProbeReturn.OK
+        pts = buffer.pts if buffer.pts != Gst.CLOCK_TIME_NONE else time.monotonic_ns()
+        return Gst.PadProbeReturn.OK if controller.admit(pts) else Gst.PadProbeReturn.DROP
+
+    target.get_static_pad("sink").add_probe(Gst.PadProbeType.BUFFER, probe)
+
+    def collect(m: Metrics):
+        m.gauge("inference_fps", controller.fps)
+        m.gauge("inference_frames_admitted", controller.admitted)
+        m.gauge("inference_frames_skipped", controller.skipped)
+
+    metrics.add_collector(collect)
+    return True
@@ -0,0 +1,88 @@
+"""
+Frame handling for the Picamera2 -> appsrc source (gstreamer_app.picamera_thread).
+
+Each frame goes from the camera's buffer into a pooled GStreamer buffer in a single
+pass: the ISP is asked for RGB byte order directly, so no colour conversion is needed,
+and copy_frame() writes straight into the mapped pooled buffer, honouring both strides,
+without an intermediate array or bytes object. The camera buffer goes back to libcamera
+as soon as the copy is done, so the camera never waits for the pipeline.
+
+Picamera2 names formats by their little-endian word order: "BGR888" is R, G, B in
+memory (GStreamer RGB) and "RGB888" is B, G, R (GStreamer BGR).
+
+PTS comes from libcamera's SensorTimestamp (CLOCK_MONOTONIC, start of exposure), moved
+into pipeline running time, so frames the camera dropped show up as gaps instead of
+being hidden by a frame counter.
+"""
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Picamera2 lores format -> colour conversion into GStreamer RGB (None: already RGB)
+LORES_FORMATS = {
+    "BGR888": None,
+    "RGB888": cv2.COLOR_BGR2RGB,
+}
+
+
+def lores_conversion(picamera_format: str) -> Optional[int]:
+    """The cv2 conversion from a Picamera2 lores format to RGB; ValueError if unsupported."""
+    try:
+        return LORES_FORMATS[picamera_format]
+    except KeyError:
+        raise ValueError(f"lores format {picamera_format!r} not supported, use one of {sorted(LORES_FORMATS)}") from None
+
+
+def rgb_stride(width: int) -> int:
+    """Row stride of GStreamer video/x-raw,format=RGB (rows padded to 4 bytes)."""
+    return (width * 3 + 3) & ~3
+
+
+def frame_view(array: np.ndarray, width: int) -> np.ndarray:
+    """(height, width, 3) view of a camera frame whose rows may be padded past width (no copy)."""
+    rows = array.reshape(array.shape[0], -1)
+    return rows[:, :width * 3].reshape(array.shape[0], width, 3)
+
+
+def copy_frame(dst, stride: int, src: np.ndarray, conversion: Optional[int] = None):
+    """
+    Write an RGB frame into dst (a writable buffer: mapped GstBuffer memory) in one pass.
+
+    Args:
+        dst: Writable buffer of at least stride * height bytes.
+        stride (int): Row stride of dst in bytes.
+        src (np.ndarray): (height, width, 3) frame, e.g. from frame_view().
+        conversion (int): cv2 colour conversion applied on the way, or None for a plain copy.
+    """
+    height, width, _ = src.shape
+    rows = np.ndarray((height, stride), dtype=np.uint8, buffer=dst)
+    out = rows[:, :width * 3].reshape(height, width, 3)
+    if conversion is None:
+        np.copyto(out, src)
+    else:
+        cv2.cvtColor(src, conversion, dst=out)
+
+
+class SensorTimestamps:
+    """Buffer PTS in pipeline running time from libcamera SensorTimestamps."""
+
+    def __init__(self):
+        self._last: Optional[int] = None
+
+    def pts(self, sensor_ns: Optional[int], now_ns: int, running_time_ns: int) -> int:
+        """
+        Args:
+            sensor_ns (int): SensorTimestamp of the frame (CLOCK_MONOTONIC ns), None if missing.
+            now_ns (int): CLOCK_MONOTONIC now (time.monotonic_ns()).
+            running_time_ns (int): Pipeline running time now.
+
+        Returns:
+            int: The running time at which the frame was exposed; strictly increasing.
+        """
+        age = max(0, now_ns - sensor_ns) if sensor_ns is not None else 0
+        pts = max(0, running_time_ns - age)
+        if self._last is not None and pts <= self._last:
+            pts = self._last + 1
+        self._last = pts
+        return pts
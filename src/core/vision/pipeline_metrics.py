@@ -0,0 +1,129 @@
+"""
+GStreamer side of the metrics layer: queue levels, hailonet throughput and latency,
+and source-to-callback latency, recorded into a utils.metrics registry.
+
+Pad probes return immediately while metrics are disabled; queue levels are sampled
+only when metrics are exported.
+"""
+import threading
+import time
+from collections import deque
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+from utils.metrics import Metrics
+
+# PTS in flight between two probes; older timestamps are dropped (e.g. after a flush)
+MAX_IN_FLIGHT = 256
+
+
+class _PtsClock:
+    """
+    Remembers when each buffer (by PTS) passed one pad, and observes the time until it passes another.
+
+    Buffers sharing a PTS (the tiles of one frame) are matched first in, first out, which
+    holds for elements that keep buffer order such as hailonet. The two pads are on
+    different streaming threads, hence the lock.
+    """
+
+    def __init__(self, metrics: Metrics, stage: str):
+        self._metrics = metrics
+        self._stage = stage
+        self._started = {}      # pts -> deque of start times, oldest first
+        self._lock = threading.Lock()
+
+    def start(self, pad, info):
+        if self._metrics.enabled:
+            buffer = info.get_buffer()
+            if buffer is not None and buffer.pts != Gst.CLOCK_TIME_NONE:
+                now = time.perf_counter_ns()
+                with self._lock:
+                    starts = self._started.get(buffer.pts)
+                    if starts is None:
+                        starts = self._started[buffer.pts] = deque()
+                        if len(self._started) > MAX_IN_FLIGHT:
+                            self._started.pop(next(iter(self._started)), None)
+                    starts.append(now)
+        return Gst.PadProbeReturn.OK
+
+    def stop(self, pad, info):
+        if self._metrics.enabled:
+            buffer = info.get_buffer()
+            start = None
+            if buffer is not None:
+                with self._lock:
+                    starts = self._started.get(buffer.pts)
+                    if starts:
+                        start = starts.popleft()
+                        if not starts:
+                            self._started.pop(buffer.pts, None)
+            if start is not None:
+                self._metrics.observe_us(self._stage, (time.perf_counter_ns() - start) // 1000)
+        return Gst.PadProbeReturn.OK
+
+
+def factory_name(element) -> str:
+    factory = element.get_factory()
+    return factory.get_name() if factory is not None else ""
+
+
+def iter_elements(pipeline):
+    it = pipeline.iterate_recurse()
+    while True:
+        res, element = it.next()
+        if res == Gst.IteratorResult.OK:
+            yield element
+        elif res == Gst.IteratorResult.RESYNC:
+            it.resync()
+        else:
+            return
+
+
+def attach_pipeline_metrics(pipeline, metrics: Metrics, source: str = "source",
+                            callback: str = "identity_callback"):
+    """
+    Instrument a parsed pipeline:
+
+    - queue_level_buffers / queue_max_buffers gauges and an overruns counter per queue
+      (the QUEUE() helper's `*_q` elements);
+    - hailonet_frames counter and a `hailonet` latency stage per hailonet element;
+    - a `pipeline` latency stage from the source element's output to the user callback.
+    """
+    queues = []
+    for element in iter_elements(pipeline):
+        kind = factory_name(element)
+        name = element.get_name()
+        if kind == "queue":
+            queues.append(element)
+            element.connect("overrun", lambda q, n=name: metrics.count("queue_overruns", queue=n))
+        elif kind == "hailonet":
+            clock = _PtsClock(metrics, "hailonet")
+            element.get_static_pad("sink").add_probe(Gst.PadProbeType.BUFFER, clock.start)
+            src = element.get_static_pad("src")
+            src.add_probe(Gst.PadProbeType.BUFFER, clock.stop)
+            src.add_probe(Gst.PadProbeType.BUFFER, _count_frames, (metrics, name))
+
+    source_el = pipeline.get_by_name(source) or pipeline.get_by_name("app_source")
+    callback_el = pipeline.get_by_name(callback)
+    if source_el is not None and callback_el is not None:
+        clock = _PtsClock(metrics, "pipeline")
+        source_el.get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, clock.start)
+        callback_el.get_static_pad("sink").add_probe(Gst.PadProbeType.BUFFER, clock.stop)
+
+    def collect(m: Metrics):
+        for q in queues:
+            name = q.get_name()
+            m.gauge("queue_level_buffers", q.get_property("current-level-buffers"), queue=name)
+            m.gauge("queue_max_buffers", q.get_property("max-size-buffers"), queue=name)
+
+    metrics.add_collector(collect)
+
+
+def _count_frames(pad, info, data):
+    metrics, name = data
+    if metrics.enabled:
+        metrics.count("hailonet_frames", element=name)
+    return Gst.PadProbeReturn.OK
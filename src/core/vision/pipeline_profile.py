@@ -0,0 +1,98 @@
+"""
+Tuned pipeline parameters: hailonet batch size, queue depth and converter threads.
+
+A profile is written by the auto-tuner (python -m core.vision.autotune) and loaded by
+GStreamerDetectionApp at startup. The batch size goes into the pipeline string; queue
+depth and thread counts are set on the parsed pipeline by apply_pipeline_profile(),
+so the gstreamer_helper_pipelines builders keep their defaults. Bypass, tile bypass and
+recording queues (matched by name) and leaky queues are left alone.
+
+Fields left as None keep the helpers' defaults, so a missing or partial file is the
+untuned pipeline.
+"""
+import json
+import logging
+from typing import NamedTuple, Optional
+
+from core.vision.pipeline_metrics import factory_name, iter_elements
+
+logger = logging.getLogger(__name__)
+
+# name suffixes / prefixes of queues sized by their builder: a bypass queue must hold the
+# frames its aggregator waits on, the recording queues are leaky by design
+FIXED_QUEUE_SUFFIXES = ("_bypass_q",)
+FIXED_QUEUE_PREFIXES = ("recording_",)
+
+
+class PipelineProfile(NamedTuple):
+    batch_size: Optional[int] = None
+    queue_buffers: Optional[int] = None     # max-size-buffers of the other non-leaky queues
+    scale_threads: Optional[int] = None     # n-threads of every videoscale
+    convert_threads: Optional[int] = None   # n-threads of every videoconvert
+
+    def label(self) -> str:
+        return (f"batch={self.batch_size} queue={self.queue_buffers} "
+                f"scale_threads={self.scale_threads} convert_threads={self.convert_threads}")
+
+
+def load_profile(path: str) -> PipelineProfile:
+    """The profile at path; the empty profile if the file is missing or unreadable."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return PipelineProfile()
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring pipeline profile {path}: {e}")
+        return PipelineProfile()
+    values = {}
+    for field in PipelineProfile._fields:
+        value = data.get(field)
+        if value is None:
+            continue
+        if not isinstance(value, int) or value < 1:
+            logger.warning(f"Ignoring {field}={value!r} in pipeline profile {path}")
+            continue
+        values[field] = value
+    return PipelineProfile(**values)
+
+
+def save_profile(path: str, profile: PipelineProfile, measured: Optional[dict] = None):
+    """Write profile as JSON; `measured` (the tuner's numbers for it) is kept alongside for reference."""
+    data = {k: v for k, v in profile._asdict().items() if v is not None}
+    if measured:
+        data["measured"] = measured
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def is_tunable_queue(element) -> bool:
+    """True for a queue apply_pipeline_profile() may resize: not leaky, not a bypass or recording queue."""
+    name = element.get_name()
+    if name.endswith(FIXED_QUEUE_SUFFIXES) or name.startswith(FIXED_QUEUE_PREFIXES):
+        return False
+    return int(element.get_property("leaky")) == 0
+
+
+def apply_pipeline_profile(pipeline, profile: PipelineProfile) -> int:
+    """
+    Set queue depth and converter threads on a parsed pipeline (before it leaves NULL).
+
+    Returns:
+        int: Number of element properties changed.
+    """
+    changed = 0
+    for element in iter_elements(pipeline):
+        kind = factory_name(element)
+        if kind == "queue" and profile.queue_buffers is not None:
+            if is_tunable_queue(element):
+                element.set_property("max-size-buffers", profile.queue_buffers)
+                changed += 1
+        elif kind == "videoscale" and profile.scale_threads is not None:
+            element.set_property("n-threads", profile.scale_threads)
+            changed += 1
+        elif kind == "videoconvert" and profile.convert_threads is not None:
+            element.set_property("n-threads", profile.convert_threads)
+            changed += 1
+    return changed
@@ -0,0 +1,106 @@
+"""
+Tile grid for tiled inference, from elevation above ground and source resolution.
+
+Looking straight down from elevation h, a frame W pixels wide covers
+G = 2 h tan(hfov / 2) metres, so a person of person_m metres is person_m W / G pixels
+wide in the frame. A single pass scales the whole width down to the network input
+(model_size pixels); a grid of tiles_x tiles scales only one tile's width, so the
+person grows by the ratio of frame width to tile width.
+
+plan_tiles() picks the fewest columns that bring the person to min_person_px at the
+network input (failing that, the grid that makes it largest), never cutting tiles
+narrower than the network input (that would upscale pixels without adding detail),
+and as many rows as keep tiles about square, since the inference pipeline's
+videoscale letterboxes any other aspect. Overlap is set
+so that a person on a seam appears whole in at least one tile.
+"""
+import math
+from typing import NamedTuple
+
+
+class TilePlan(NamedTuple):
+    tiles_x: int
+    tiles_y: int
+    overlap_x: float
+    overlap_y: float
+    tile_width_px: int          # in source pixels
+    tile_height_px: int
+    person_px: float            # person width at the network input
+
+    @property
+    def tiles(self) -> int:
+        return self.tiles_x * self.tiles_y
+
+    def __str__(self):
+        return (f"{self.tiles_x}x{self.tiles_y} tiles of {self.tile_width_px}x{self.tile_height_px} px, "
+                f"overlap {self.overlap_x:.2f}/{self.overlap_y:.2f}, person ~{self.person_px:.1f} px")
+
+
+def tile_fraction(tiles: int, overlap: float) -> float:
+    """Width of one tile as a fraction of the frame, for hailotilecropper's tiles and overlap."""
+    return 1.0 / (tiles - (tiles - 1) * overlap)
+
+
+def _tiles_for(length_px: float, tile_px: float, overlap: float) -> int:
+    """Tiles of about tile_px needed to cover length_px with overlap (inverse of tile_fraction)."""
+    return max(1, round((length_px / tile_px - overlap) / (1 - overlap)))
+
+
+def _overlap(person_frame_px: float, tile_px: float, min_overlap: float, max_overlap: float) -> float:
+    return min(max(min_overlap, 1.5 * person_frame_px / tile_px), max_overlap)
+
+
+def grid_plan(tiles_x: int, tiles_y, elevation_m: float, frame_width: int, frame_height: int, hfov_deg: float,
+              model_size: int = 640, person_m: float = 0.5, min_overlap: float = 0.08,
+              max_overlap: float = 0.3) -> TilePlan:
+    """
+    Overlaps, tile size and person size for a grid of tiles_x columns; tiles_y=None
+    picks the rows that keep tiles about square. Arguments as for plan_tiles().
+    """
+    ground_width_m = 2 * max(elevation_m, 1.0) * math.tan(math.radians(hfov_deg) / 2)
+    person_frame_px = person_m * frame_width / ground_width_m
+    overlap_x = _overlap(person_frame_px, frame_width / tiles_x, min_overlap, max_overlap) if tiles_x > 1 else 0.0
+    tile_w = frame_width * tile_fraction(tiles_x, overlap_x)
+    if tiles_y is None:
+        tiles_y = _tiles_for(frame_height, tile_w, overlap_x)
+    overlap_y = _overlap(person_frame_px, frame_height / tiles_y, min_overlap, max_overlap) if tiles_y > 1 else 0.0
+    tile_h = frame_height * tile_fraction(tiles_y, overlap_y)
+    # videoscale fits the tile's longer side to the network input; upscaling adds no detail
+    person_px = person_frame_px * min(model_size / max(tile_w, tile_h), 1.0)
+    return TilePlan(tiles_x, tiles_y, round(overlap_x, 3), round(overlap_y, 3),
+                    int(round(tile_w)), int(round(tile_h)), person_px)
+
+
+def plan_tiles(elevation_m: float, frame_width: int, frame_height: int, hfov_deg: float,
+               model_size: int = 640, person_m: float = 0.5, min_person_px: float = 16.0,
+               max_tiles: int = 16, min_overlap: float = 0.08, max_overlap: float = 0.3) -> TilePlan:
+    """
+    Args:
+        elevation_m (float): Elevation above ground of the survey (m).
+        frame_width (int): Source width (px).
+        frame_height (int): Source height (px).
+        hfov_deg (float): Horizontal field of view of the camera (degrees).
+        model_size (int): Network input width and height (px).
+        person_m (float): Apparent size of a person seen from above (m).
+        min_person_px (float): Person size wanted at the network input (px).
+        max_tiles (int): Cap on tiles per frame.
+        min_overlap (float): Overlap floor, a fraction of the tile.
+        max_overlap (float): Overlap cap.
+
+    Returns:
+        TilePlan: 1x1 when single-pass inference already reaches min_person_px.
+    """
+    best = None
+    for tiles_x in range(1, max_tiles + 1):
+        plan = grid_plan(tiles_x, None, elevation_m, frame_width, frame_height, hfov_deg,
+                         model_size, person_m, min_overlap, max_overlap)
+        if tiles_x > 1 and plan.tile_width_px < model_size:
+            break                       # narrower tiles would only upscale
+        if plan.tiles > max_tiles:
+            plan = grid_plan(tiles_x, max(1, max_tiles // tiles_x), elevation_m, frame_width, frame_height,
+                             hfov_deg, model_size, person_m, min_overlap, max_overlap)
+        if best is None or plan.person_px > best.person_px:
+            best = plan
+        if plan.person_px >= min_person_px:
+            break
+    return best
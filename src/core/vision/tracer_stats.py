@@ -0,0 +1,160 @@
+"""
+GStreamer tracer output for the app's --benchmark mode: the environment that enables
+the tracers, a parser for their log records, and the JSON report.
+
+Tracers are configured through the environment before Gst.init():
+
+- latency (GStreamer core), flags=pipeline+element: source-to-sink latency per buffer
+  ("latency" records) and the time each element holds a buffer ("element-latency");
+- interlatency and proctime (GstShark, if installed): time from the source to every
+  pad, and processing time per element.
+
+Each record is a GstStructure serialized into the debug log, e.g.
+
+    0:00:01.2 1234 0x55 TRACE GST_TRACER :0:: element-latency, element-id=(string)0x55,
+        element=(string)inference_hailonet, src=(string)src, time=(guint64)8211840, ts=(guint64)...;
+
+Times are nanoseconds, either as a guint64 or as a "H:MM:SS.nnnnnnnnn" string. They go
+into utils.metrics Histograms, so the report has the same fields as Metrics.snapshot().
+"""
+import os
+import re
+from collections import defaultdict
+
+from utils.metrics import Histogram
+
+TRACERS = "latency(flags=pipeline+element);interlatency;proctime"
+
+# record name -> (report section, fields naming the measured span)
+RECORDS = {
+    "latency": ("pipeline", ("src-element", "sink-element")),
+    "element-latency": ("element", ("element",)),
+    "interlatency": ("interlatency", ("from_pad", "to_pad")),
+    "proctime": ("proctime", ("element",)),
+}
+
+_RECORD = re.compile(r"(?:^|\s)(element-latency|latency|interlatency|proctime), (.*)$")
+_FIELD = re.compile(r'([\w-]+)=\((\w+)\)("(?:[^"\\]|\\.)*"|[^,;]*)')
+_CLOCK = re.compile(r"(\d+):(\d{2}):(\d{2})\.(\d{1,9})$")
+
+
+def tracer_environment(log_path: str, environ=os.environ) -> dict:
+    """Environment variables that make Gst.init() enable the tracers and log them to log_path."""
+    debug = environ.get("GST_DEBUG", "")
+    return {
+        "GST_TRACERS": TRACERS,
+        "GST_DEBUG": f"{debug},GST_TRACER:7" if debug else "GST_TRACER:7",
+        "GST_DEBUG_FILE": log_path,
+        "GST_DEBUG_NO_COLOR": "1",
+    }
+
+
+def parse_fields(text: str) -> dict:
+    """Field name -> (type, value) of a serialized GstStructure body."""
+    fields = {}
+    for name, kind, value in _FIELD.findall(text):
+        if value.startswith('"'):
+            value = value[1:-1].replace('\\"', '"')
+        fields[name] = (kind, value.strip())
+    return fields
+
+
+def parse_time_ns(kind: str, value: str):
+    """A tracer time in nanoseconds; None if unparsable or GST_CLOCK_TIME_NONE."""
+    if kind == "string":
+        m = _CLOCK.match(value)
+        if m is None:
+            return None
+        h, mins, s, frac = m.groups()
+        return ((int(h) * 60 + int(mins)) * 60 + int(s)) * 1_000_000_000 + int(frac.ljust(9, "0"))
+    try:
+        ns = int(value)
+    except ValueError:
+        return None
+    return ns if 0 <= ns < 2**64 - 1 else None
+
+
+def parse_record(line: str):
+    """
+    (section, span, nanoseconds) of one tracer log line; None for any other line.
+
+    The span is the element name, or "a->b" for source-to-sink and pad-to-pad records.
+    """
+    m = _RECORD.search(line)
+    if m is None:
+        return None
+    section, keys = RECORDS[m.group(1)]
+    fields = parse_fields(m.group(2))
+    if "time" not in fields or any(k not in fields for k in keys):
+        return None
+    ns = parse_time_ns(*fields["time"])
+    if ns is None:
+        return None
+    return section, "->".join(fields[k][1] for k in keys), ns
+
+
+class TracerStats:
+    """Latency histograms (microseconds) per section and span, from tracer log lines."""
+
+    def __init__(self):
+        self._hist = defaultdict(dict)      # section -> span -> Histogram
+        self.records = 0
+
+    def add_line(self, line: str) -> bool:
+        record = parse_record(line)
+        if record is None:
+            return False
+        section, span, ns = record
+        hist = self._hist[section].get(span)
+        if hist is None:
+            hist = self._hist[section][span] = Histogram()
+        hist.record(ns // 1000)
+        self.records += 1
+        return True
+
+    def add_file(self, path: str) -> int:
+        """Parse a GST_DEBUG_FILE log; returns the number of tracer records read (0 if the file is missing)."""
+        before = self.records
+        try:
+            with open(path, errors="replace") as f:
+                for line in f:
+                    self.add_line(line)
+        except FileNotFoundError:
+            pass
+        return self.records - before
+
+    def summary(self) -> dict:
+        """section -> span -> {count, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}, as Metrics.snapshot()'s stages."""
+        out = {}
+        for section, spans in sorted(self._hist.items()):
+            out[section] = {}
+            for span, h in sorted(spans.items()):
+                p50, p90, p99 = h.quantiles()
+                out[section][span] = {
+                    "count": h.count, "mean_ms": h.mean() / 1000,
+                    "p50_ms": p50 / 1000, "p90_ms": p90 / 1000, "p99_ms": p99 / 1000, "max_ms": h.max / 1000,
+                }
+        return out
+
+
+def benchmark_report(frames: int, seconds: float, tracer: dict, stages: dict, **extra) -> dict:
+    """
+    The --benchmark JSON report.
+
+    Args:
+        frames (int): Frames that reached the user callback in the measured interval.
+        seconds (float): Wall time from the first to the last of those frames.
+        tracer (dict): TracerStats.summary().
+        stages (dict): Metrics.snapshot()["stages"] (Python callback time, source-to-callback
+            and hailonet latency from core.vision.pipeline_metrics).
+        **extra: Run description (input, size, batch size, ...) copied into the report.
+    """
+    return {
+        **extra,
+        "frames": frames,
+        "seconds": round(seconds, 3),
+        "fps": round((frames - 1) / seconds, 2) if frames > 1 and seconds > 0 else 0.0,
+        "callback": stages.get("callback", {}),
+        "stages": stages,
+        "tracers": tracer,
+    }
@@ -1,7 +1,14 @@
 import gi
 
-from constants import BATCH_INTERVAL_SEC, CONF_THRESHOLD, DATA_MAX_AGE_SEC, DATA_MAX_ROWS, DEDUP_DISTANCE_M, LORA_CFG, RELEVANT_CLASSES
+from constants import BATCH_INTERVAL_SEC, CONF_THRESHOLD, DATA_MAX_AGE_SEC, DATA_MAX_ROWS, DEDUP_DISTANCE_M, LORA_CFG, RELEVANT_CLASSES, TX_DRAIN_TIMEOUT_SEC, TX_QUEUE_MAX, LORA_LABELS, NODE_ID, AIRTIME_BURST_MS, AIRTIME_DUTY_CYCLE, ELEVATION_CACHE_SIZE, ELEVATION_GRID_M, ACK_RX_WINDOW_SEC, ACK_RX_PERIOD_MS, ACK_SLEEP_PERIOD_MS, ACK_MAX_TRIES, ARQ_WINDOW, PRIORITY_WEIGHTS, PRIORITY_MOVED_SCALE_M, TRACK_TABLE_CAPACITY, TRACKER_KEEP_LOST_FRAMES, TRACKER_KEEP_TRACKED_FRAMES, METRICS_ENABLED, METRICS_PORT, METRICS_LOG_SEC, INFERENCE_RATE_ADAPTIVE, INFERENCE_MIN_FPS, INFERENCE_MAX_FPS, INFERENCE_FRAME_OVERLAP, CAMERA_FOV_DEG
 from utils.distance_utils import haversine_m
+from utils.detection_buffer import DetectionRingBuffer, PendingDetections
+from utils.dedup import dedup_keep, group_keys
+from utils.priority import PriorityWeights, ReportLog, chunks_by_priority, order_by_priority, priority_scores
+from utils.track_table import TrackTable
+from utils.inference_rate import InferenceRateController
+from utils.metrics import METRICS, MetricsReporter, MetricsServer, install_toggle_signal
+from replay.recording import DetectionRecorder
 
 gi.require_version("Gst", "1.0")
 from gi.repository import Gst, GLib
@@ -13,17 +20,26 @@ import time
 import math
 import threading
 from collections import deque
-import pandas as pd
+import numpy as np
 
 from core.gps.gps_manager import GPSManager
 
 from core.vision.hailo_apps_infra.hailo_rpi_common import (
     get_caps_from_pad,
-    get_numpy_from_buffer,
+    map_numpy_from_buffer,
     app_callback_class,
+    FrameConverter,
 )
 from core.vision.hailo_apps_infra.detection_pipeline import GStreamerDetectionApp
+from core.vision.pipeline_metrics import attach_pipeline_metrics
+from core.vision.inference_gate import attach_inference_gate
 from core.transmitter import SX126x
+from core.transmitter.bus import open_bus
+from core.transmitter.scheduler import TxScheduler
+from core.transmitter.frame_codec import Detection, FrameEncoder, decode_ack
+from core.transmitter.link import LinkManager
+from core.transmitter.reliable import ReliableSender
+from core.transmitter.airtime import AirtimeBudget, time_on_air_from_config
 
 # --- Logging initialization (added) ---
 import os
@@ -58,25 +74,49 @@ def now_ts() -> float:
 class DetectionWithGPS(app_callback_class):
     def __init__(self, lora):
         super().__init__()
-        self.gps_manager = GPSManager()
+        self.gps_manager = GPSManager(ELEVATION_GRID_M, ELEVATION_CACHE_SIZE)
         self.detection_count = 0
 
-        # LoRa radio handle
+        # LoRa radio handle; only the TX worker thread touches it after init
         self.lora = lora
+        self.frame_encoder = FrameEncoder(NODE_ID, LORA_CFG["payloadLength"], LORA_LABELS)
+        # replies are heard in RX windows the TX worker opens after each batch
+        self.link = LinkManager(self.lora, ACK_RX_WINDOW_SEC, ACK_RX_PERIOD_MS, ACK_SLEEP_PERIOD_MS)
+        self.use_acks = ACK_RX_WINDOW_SEC > 0
+        # selective repeat: unacknowledged frames are resent as-is when their timer expires
+        self.reliable = ReliableSender(
+            ARQ_WINDOW, ACK_MAX_TRIES, lambda n: time_on_air_from_config(LORA_CFG, n), ACK_RX_WINDOW_SEC
+        ) if self.use_acks else None
+        self.tx = TxScheduler(self.lora_send_frame, max_queue=TX_QUEUE_MAX,
+                              on_idle=self.link.listen_window if self.use_acks else None)
+        self.tx.start()
+        self.airtime_budget = AirtimeBudget(AIRTIME_DUTY_CYCLE, AIRTIME_BURST_MS)
 
         # always grab frames for recording
         self.use_frame = True
+        self.bgr_converter = FrameConverter(cv2.COLOR_RGB2BGR)
+        # OpenCV recording from the callback; the app turns this off when the pipeline records (--record)
+        self.record_in_callback = True
 
-        # DataFrame to store detections; columns: ts, label, lat, lon, sent
-        self.df = pd.DataFrame(columns=["ts", "label", "id", "lat", "lon", "sent"])
-        self.df_lock = threading.Lock()
+        # Ring buffer to store detections; columns: ts, label, id, lat, lon, sent, acked
+        self.store = DetectionRingBuffer(DATA_MAX_ROWS, DATA_MAX_AGE_SEC)
+        self.store_lock = threading.Lock()
 
         # batching
         self.last_tx_time = 0.0
 
-        # remember last location per ID (for person)
-        # maps: track_id (int) -> (lat, lon)
-        self.last_loc_by_id = {}
+        # remember last location per ID (for person); an id is dropped once the tracker
+        # can no longer emit it, counted in callback frames
+        self.tracks = TrackTable(TRACK_TABLE_CAPACITY, TRACKER_KEEP_TRACKED_FRAMES + TRACKER_KEEP_LOST_FRAMES)
+        # last reported location per ID, for batch priority and time-to-first-report
+        self.reports = ReportLog()
+        self.priority_weights = PriorityWeights(**PRIORITY_WEIGHTS)
+
+        METRICS.add_collector(self.collect_metrics)
+
+        # every frame's raw detections, for offline replay (python -m replay --detections ...)
+        detection_log = os.getenv("DETECTION_LOG")
+        self.detection_log = DetectionRecorder(detection_log, hailo.HAILO_UNIQUE_ID) if detection_log else None
 
         # Video recording / rotation settings
         self.recordings_dir = os.getenv("VIDEO_DIR", os.path.join(os.getcwd(), "recordings"))
@@ -100,103 +140,76 @@ class DetectionWithGPS(app_callback_class):
 
     # ------------- GPS helpers -------------
     def get_location_data(self):
-        lat, lon, elevation = self.gps_manager.get_current_location()
-        speed, course = self.gps_manager.get_speed_and_course()
-        if self.gps_manager.is_positioned:
+        # non-blocking: reads the latest snapshot published by the GPS reader thread
+        fix, age = self.gps_manager.get_fix()
+        if fix.positioned:
             return {
-                "latitude": lat,
-                "longitude": lon,
-                "elevation": elevation,
-                "speed": speed,
-                "course": course
+                "latitude": fix.latitude,
+                "longitude": fix.longitude,
+                "elevation": fix.elevation,
+                "speed": fix.speed,
+                "course": fix.course,
+                "age": age,
             }
         return None
 
     def get_gps_string(self):
         location_data = self.get_location_data()
         if location_data:
-            return f"[GPS: Lat={location_data['latitude']:.6f}, Lon={location_data['longitude']:.6f}, Elev={location_data['elevation']:.2f}m, Speed={location_data['speed']:.2f}m/s]"
+            return f"[GPS: Lat={location_data['latitude']:.6f}, Lon={location_data['longitude']:.6f}, Elev={location_data['elevation']:.2f}m, Speed={location_data['speed']:.2f}m/s, Age={location_data['age']:.1f}s]"
         return "[GPS: No position fix]"
 
+    def collect_metrics(self, metrics):
+        """Sample store, track table and TX queue sizes into gauges (runs at metrics export)."""
+        metrics.gauge("store_rows", len(self.store))
+        metrics.gauge("tracks", len(self.tracks))
+        metrics.gauge("tx_queue_depth", self.tx.queue_depth)
+        if self.reliable is not None:
+            metrics.gauge("arq_in_flight", self.reliable.window - self.reliable.room())
+
     # ------------- Data handling -------------
     def _should_record(self, label: str, track_id, lat: float, lon: float) -> bool:
         # Only special handling for person
         if label == "person" and track_id is not None:
-            prev = self.last_loc_by_id.get(track_id)
+            prev = self.tracks.get(track_id, self.detection_count)
             if prev is not None:
                 if haversine_m(lat, lon, prev[0], prev[1]) < DEDUP_DISTANCE_M:
                     # same ID essentially in same spot → skip
                     return False
         return True
 
-    def add_detection(self, label: str, track_id, lat: float, lon: float):
+    def add_detection(self, label: str, track_id, lat: float, lon: float, confidence: float = 1.0):
         if not self._should_record(label, track_id, lat, lon):
             return
 
         ts = now_ts()
-        with self.df_lock:
-            self.df.loc[len(self.df)] = [ts, label, track_id, lat, lon, False]
-
-            # keep memory bounded
-            cutoff = ts - DATA_MAX_AGE_SEC
-            self.df = self.df[self.df["ts"] >= cutoff]
-            if len(self.df) > DATA_MAX_ROWS:
-                self.df = self.df.iloc[-DATA_MAX_ROWS:].reset_index(drop=True)
+        self.reports.seen(track_id, ts)
+        with self.store_lock:
+            # ring buffer keeps memory bounded: evicts rows older than DATA_MAX_AGE_SEC
+            # and overwrites the oldest row past DATA_MAX_ROWS
+            self.store.append(ts, label, track_id, lat, lon, confidence)
 
             # update last location for this ID (person)
             if label == "person" and track_id is not None:
-                self.last_loc_by_id[track_id] = (lat, lon)
+                self.tracks.put(track_id, lat, lon, self.detection_count)
 
 
-    def dedup_by_distance(self, batch_df: pd.DataFrame) -> pd.DataFrame:
+    def dedup_by_distance(self, batch: PendingDetections) -> np.ndarray:
         """
-        Deduplicate within this batch by label and 10 m radius.
-        For each label, keep first occurrence, drop subsequent points < 10 m from any kept point of same label.
+        Deduplicate within this batch by label and DEDUP_DISTANCE_M radius.
+        For each label, keep first occurrence, drop subsequent points closer than
+        DEDUP_DISTANCE_M to any kept point of same label.
+
+        Returns:
+            np.ndarray: Positions in batch of the kept rows, in timestamp order.
         """
-        if batch_df.empty:
-            return batch_df
-
-        keep_rows = []
-        for label, group in batch_df.groupby("label"):
-            selected = []
-            for idx, row in group.sort_values("ts").iterrows():
-                if not selected:
-                    selected.append((idx, row))
-                    continue
-                too_close = False
-                for _, kept in selected:
-                    d = haversine_m(row["lat"], row["lon"], kept["lat"], kept["lon"])
-                    if d < DEDUP_DISTANCE_M:
-                        too_close = True
-                        break
-                if not too_close:
-                    selected.append((idx, row))
-            keep_rows.extend([i for i, _ in selected])
-
-        return batch_df.loc[keep_rows].sort_values("ts")
-    
-    def dedup_by_id_and_distance(self, batch_df: pd.DataFrame) -> pd.DataFrame:
-        if batch_df.empty:
-            return batch_df
-
-        keep_rows = []
-        # group by both label and id; id may be None/NaN for rare cases
-        grouped = batch_df.groupby(["label", "id"], dropna=False)
-        for (_, _id), group in grouped:
-            selected = []
-            for idx, row in group.sort_values("ts").iterrows():
-                if not selected:
-                    selected.append((idx, row))
-                    continue
-                too_close = any(
-                    haversine_m(row["lat"], row["lon"], kept["lat"], kept["lon"]) < DEDUP_DISTANCE_M
-                    for _, kept in selected
-                )
-                if not too_close:
-                    selected.append((idx, row))
-            keep_rows.extend([i for i, _ in selected])
+        return dedup_keep(batch.ts, batch.lat, batch.lon, batch.label, DEDUP_DISTANCE_M)
 
-        return batch_df.loc[keep_rows].sort_values("ts")
+    def dedup_by_id_and_distance(self, batch: PendingDetections) -> np.ndarray:
+        """Same as dedup_by_distance, but rows are grouped by both label and track id."""
+        # rows without a track id share NO_ID and are deduplicated together
+        groups = group_keys(batch.label, batch.id)
+        return dedup_keep(batch.ts, batch.lat, batch.lon, groups, DEDUP_DISTANCE_M)
 
     def try_transmit_batch(self):
         t = now_ts()
@@ -204,46 +217,130 @@ class DetectionWithGPS(app_callback_class):
             return
         self.last_tx_time = t
 
-        with self.df_lock:
-            pending = self.df[self.df["sent"] == False].copy()
+        self.tracks.expire(self.detection_count)
+        self.reports.expire(t - DATA_MAX_AGE_SEC)
+        self.process_acks()
+        self.retransmit_due()
+        with self.store_lock:
+            pending = self.store.pending()
+            labels = self.store.label_names(pending.label)
 
-        if pending.empty:
+        if not len(pending):
             return
 
-        deduped = self.dedup_by_id_and_distance(pending)
+        keep = self.dedup_by_id_and_distance(pending)
+        order = self.prioritize(pending, keep, t)
+        queued = self.queue_frames(pending, labels, order)
+
+        self.reports.reported(pending.id[queued], pending.lat[queued], pending.lon[queued], t)
+        with self.store_lock:
+            self.store.mark_sent(pending.slots[queued], pending.seq[queued])
+
+    def prioritize(self, batch: PendingDetections, keep: np.ndarray, now: float) -> np.ndarray:
+        """Positions in batch of the kept rows, most valuable first (new tracks, confident, moved, recent)."""
+        ids = batch.id[keep]
+        lat = batch.lat[keep]
+        lon = batch.lon[keep]
+        scores = priority_scores(
+            self.reports.is_new(ids), batch.conf[keep], self.reports.moved_m(ids, lat, lon),
+            now - batch.ts[keep], self.priority_weights, PRIORITY_MOVED_SCALE_M, DATA_MAX_AGE_SEC,
+        )
+        return keep[order_by_priority(scores, batch.ts[keep])]
+
+    def queue_frames(self, batch: PendingDetections, labels: list, order: np.ndarray) -> list:
+        """
+        Fill the available airtime with frames of the highest-value rows.
 
-        for _, row in deduped.iterrows():
-            # include track id in payload; fall back to -1 if None/NaN
-            track_id = row["id"]
+        Returns:
+            list: Positions in batch of the rows that were queued. The rest stay pending for the
+            next batch (or age out), as do rows of a frame dropped by a full TX queue.
+        """
+        queued = []
+        for chunk in chunks_by_priority(order, batch.ts, self.frame_encoder.per_frame):
+            detections = [
+                Detection(batch.ts[i], labels[i], int(batch.id[i]), batch.lat[i], batch.lon[i])
+                for i in chunk
+            ]
+            frames = self.frame_encoder.encode(detections)
+            ends = np.cumsum([count for _, count in frames])
+            for (frame, count), end in zip(frames, ends):
+                airtime = time_on_air_from_config(LORA_CFG, len(frame))
+                if not self.airtime_budget.try_consume(airtime):
+                    return queued
+                rows = chunk[end - count:end]
+                # a full ARQ window leaves the rows pending until ACKs free it
+                if self.reliable is not None and not self.reliable.add(frame, (batch.slots[rows], batch.seq[rows])):
+                    self.airtime_budget.refund(airtime)
+                    return queued
+                if self.tx.submit(frame):
+                    queued.extend(rows)
+                    if METRICS.enabled:
+                        for age in (time.time() - batch.ts[rows]).tolist():
+                            METRICS.observe("detection_to_queue", age)
+                else:
+                    self.airtime_budget.refund(airtime)
+                    if self.reliable is not None:
+                        self.reliable.cancel(frame)
+        return queued
+
+    # ------------- ACKs -------------
+    def retransmit_due(self):
+        """Queue the unacknowledged frames whose retransmit timer expired, ahead of new ones."""
+        if self.reliable is None:
+            return
+        for frame in self.reliable.due():
+            airtime = time_on_air_from_config(LORA_CFG, len(frame))
+            if not self.airtime_budget.try_consume(airtime):
+                self.reliable.defer(frame)
+            elif not self.tx.submit(frame):
+                self.airtime_budget.refund(airtime)
+                self.reliable.defer(frame)
+
+    def process_acks(self):
+        """Mark the rows of every frame the ground station acknowledged since the last call."""
+        for rx in self.link.drain():
             try:
-                track_id_int = int(track_id)
-            except Exception:
-                track_id_int = -1
-            payload = f"{row['label']},{track_id_int},{row['lat']:.6f},{row['lon']:.6f}"
-            self.lora_send_string(payload)
-
-        with self.df_lock:
-            sent_mask = self.df.index.isin(deduped.index)
-            self.df.loc[sent_mask, "sent"] = True
+                ack = decode_ack(rx.payload)
+            except ValueError:
+                logger.debug(f"[LoRa RX] ignoring {len(rx.payload)} B frame")
+                continue
+            if ack.node_id != NODE_ID:
+                continue
+            acked = self.reliable.on_ack(ack.seqs)
+            with self.store_lock:
+                for slots, row_seq in acked:
+                    self.store.mark_acked(slots, row_seq)
+
+    def shutdown_tx(self, timeout: float = TX_DRAIN_TIMEOUT_SEC):
+        """Flush queued payloads and stop the TX worker."""
+        self.tx.stop(drain=True, timeout=timeout)
+        logger.info(f"[LoRa TX] shutdown stats: {self.tx.stats()}")
+        logger.info(f"[LoRa TX] time to first report of new tracks: {self.reports.stats()}")
+        logger.info(f"[Tracks] table stats: {self.tracks.stats()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[Tracks] snapshot:\n{self.tracks.snapshot()}")
+        if self.use_acks:
+            logger.info(f"[LoRa RX] link stats: {self.link.stats()}")
+            logger.info(f"[LoRa ARQ] delivery stats: {self.reliable.stats()}")
 
 
     # ------------- LoRa sending -------------
-    def lora_send_string(self, s: str):
-        # Encode to bytes; SX126x.write expects list/bytes
-        data = s.encode("utf-8")
-        # Basic guard on payload size (truncate if needed to fit configured payloadLength)
-        max_len = max(1, LORA_CFG["payloadLength"])
-        if len(data) > max_len:
-            data = data[:max_len]
-
-        self.lora.beginPacket()
-        self.lora.write(list(data), len(data))
-        self.lora.endPacket()
-        self.lora.wait()  # wait for TX done
+    # Runs on the TX worker thread; blocks for the packet's time on air.
+    def lora_send_frame(self, data: bytes):
+        # FrameEncoder never exceeds the configured payloadLength
+        with METRICS.span("lora_tx"):
+            self.lora.beginPacket()
+            self.lora.put(data)
+            self.lora.endPacket()
+            self.lora.wait()  # wait for TX done
+        METRICS.count("lora_frames")
+        METRICS.count("lora_bytes", len(data))
+        if self.reliable is not None:
+            self.reliable.on_sent(data)  # retransmit timer runs from the end of the packet
         # Print radio stats
-        logger.info(f"[LoRa TX] {s} | tx_time={self.lora.transmitTime():0.2f} ms | rate={self.lora.dataRate():0.2f} B/s")
+        logger.info(f"[LoRa TX] {len(data)} B frame | tx_time={self.lora.transmitTime():0.2f} ms | rate={self.lora.dataRate():0.2f} B/s")
 
-    # Called by detection_callback to record the current frame.
+    # Called by detection_callback to record the current frame (OpenCV fallback, --record opencv).
     # This rotates files every self.rotate_interval seconds.
     def set_frame(self, frame):
         if frame is None:
@@ -318,52 +415,67 @@ class DetectionWithGPS(app_callback_class):
 # ======================================================================================
 # GStreamer detection callback
 # ======================================================================================
+@METRICS.timed("callback")
 def detection_callback(pad, info, user_data: DetectionWithGPS):
     buffer = info.get_buffer()
     if buffer is None:
         return Gst.PadProbeReturn.OK
 
     user_data.increment()
-    gps_info = user_data.get_gps_string()  # (still prints if you need it)
+    METRICS.count("frames")
+    with METRICS.span("gps"):
+        gps_info = user_data.get_gps_string()  # (still prints if you need it)
 
-    location_data = user_data.get_location_data()
-    if not location_data:
-        location_data = {"latitude": 0.0, "longitude": 0.0, "elevation": 0.0, "speed": 0.0, "course": 0.0}
+        location_data = user_data.get_location_data()
+        if not location_data:
+            location_data = {"latitude": 0.0, "longitude": 0.0, "elevation": 0.0, "speed": 0.0, "course": 0.0, "age": float("inf")}
 
-    # caps → optional frame
+    # caps → optional frame (mapped below, only for as long as it is needed)
     format, width, height = get_caps_from_pad(pad)
-    frame = None
-    if format and width and height:
-        frame = get_numpy_from_buffer(buffer, format, width, height)
-
-    roi = hailo.get_roi_from_buffer(buffer)
-    detections = roi.get_objects_typed(hailo.HAILO_DETECTION)
-
-    for detection in detections:
-        label = detection.get_label()
-        if label not in RELEVANT_CLASSES:
-            continue  # ignore non-relevant classes
-
-        confidence = detection.get_confidence()
-        bbox = detection.get_bbox()
-
-        # Hailo track ID (from tracker)
-        track = detection.get_objects_typed(hailo.HAILO_UNIQUE_ID)
-        track_id = track[0].get_id() if len(track) == 1 else None
-
-        if confidence >= CONF_THRESHOLD:
-            user_data.add_detection(
-                label=label,
-                track_id=track_id,
-                lat=location_data["latitude"],
-                lon=location_data["longitude"],
-            )
-
-    if frame is not None:
-        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        user_data.set_frame(frame)
-
-    user_data.try_transmit_batch()
+
+    with METRICS.span("roi"):
+        roi = hailo.get_roi_from_buffer(buffer)
+        detections = roi.get_objects_typed(hailo.HAILO_DETECTION)
+    if user_data.detection_log is not None:
+        user_data.detection_log.write_frame(detections)
+
+    with METRICS.span("detections"):
+        for detection in detections:
+            label = detection.get_label()
+            # the postprocess already drops these (POSTPROCESS_PREFILTER); still needed with
+            # --no-prefilter or a custom --labels-json
+            if label not in RELEVANT_CLASSES:
+                continue  # ignore non-relevant classes
+
+            confidence = detection.get_confidence()
+            bbox = detection.get_bbox()
+
+            # Hailo track ID (from tracker)
+            track = detection.get_objects_typed(hailo.HAILO_UNIQUE_ID)
+            track_id = track[0].get_id() if len(track) == 1 else None
+
+            if confidence >= CONF_THRESHOLD:
+                METRICS.count("detections")
+                user_data.add_detection(
+                    label=label,
+                    track_id=track_id,
+                    lat=location_data["latitude"],
+                    lon=location_data["longitude"],
+                    confidence=confidence,
+                )
+
+    if user_data.record_in_callback and format and width and height:
+        # zero-copy view of the mapped buffer, converted into a reused BGR array;
+        # set_frame consumes it synchronously, before the buffer is unmapped
+        # (the record span minus convert and set_frame is the buffer mapping)
+        with METRICS.span("record"), map_numpy_from_buffer(buffer, format, width, height) as frame:
+            with METRICS.span("convert"):
+                bgr = user_data.bgr_converter.convert(frame)
+            with METRICS.span("set_frame"):
+                user_data.set_frame(bgr)
+
+    with METRICS.span("transmit"):
+        user_data.try_transmit_batch()
     return Gst.PadProbeReturn.OK
 
 
@@ -371,8 +483,8 @@ def detection_callback(pad, info, user_data: DetectionWithGPS):
 # LoRa initialization
 # ======================================================================================
 def init_lora():
-    LoRa = SX126x()
-    logger.info("Begin LoRa radio with:")
+    LoRa = SX126x(*open_bus(LORA_CFG))
+    logger.info(f"Begin LoRa radio ({LORA_CFG.get('backend', 'hardware')}) with:")
     logger.info(f"\tReset pin: {LORA_CFG['resetPin']}")
     logger.info(f"\tBusy pin: {LORA_CFG['busyPin']}")
     logger.info(f"\tIRQ pin:  {LORA_CFG['irqPin']}")
@@ -429,15 +541,47 @@ if __name__ == "__main__":
     user_data = DetectionWithGPS(lora)
     app = GStreamerDetectionApp(detection_callback, user_data)
 
+    # Per-stage latency metrics; near-free while disabled, toggled with `kill -USR2 <pid>`
+    METRICS.enabled = METRICS_ENABLED
+    attach_pipeline_metrics(app.pipeline, METRICS)
+    install_toggle_signal(METRICS)
+    MetricsReporter(METRICS, METRICS_LOG_SEC, logger).start()
+    if METRICS_PORT:
+        try:
+            MetricsServer(METRICS, port=METRICS_PORT).start()
+            logger.info(f"Metrics endpoint on http://127.0.0.1:{METRICS_PORT}/metrics")
+        except OSError:
+            logger.exception("Metrics endpoint unavailable")
+
+    # Fewer frames to the NPU while hovering or flying high (inference_fps / inference_frames_skipped gauges)
+    inference_rate = None
+    if INFERENCE_RATE_ADAPTIVE:
+        inference_rate = InferenceRateController(CAMERA_FOV_DEG, INFERENCE_FRAME_OVERLAP, INFERENCE_MIN_FPS, INFERENCE_MAX_FPS)
+        if not attach_inference_gate(app.pipeline, inference_rate, user_data.gps_manager.get_fix, METRICS,
+                                     element=app.inference_input_element):
+            inference_rate = None
+
     try:
         app.run()
     except KeyboardInterrupt:
         logger.info("Program is terminating...")
     finally:
+        if inference_rate is not None:
+            logger.info(f"[Inference] adaptive rate stats: {inference_rate.stats()}")
         try:
             user_data.stop_recording()
         except Exception:
             pass
+        try:
+            user_data.gps_manager.stop()
+        except Exception:
+            pass
+        if user_data.detection_log is not None:
+            user_data.detection_log.close()
+        try:
+            user_data.shutdown_tx()
+        except Exception:
+            logger.exception("Error draining LoRa TX queue")
         try:
             lora.end()
         except Exception:
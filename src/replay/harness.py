@@ -0,0 +1,291 @@
+"""
+Offline replay of a flight through main.detection_callback.
+
+The harness installs the fake gi/hailo modules where the real ones are missing
+(replay.stubs), imports main, and builds a real DetectionWithGPS whose outside world is
+replaced:
+
+- hailo: main's `hailo` is the fake one for the run, which reads the recorded detections
+  off the fake buffers the harness feeds;
+- time: main's `time` module is swapped for a ReplayClock that follows the recording's
+  timeline, so batching, ageing, dedup and the airtime budget see recorded time while
+  frames are fed as fast as the Python side can take them (or paced with speed);
+- GPS: ReplayGPS serves the recorded NMEA fixes through the GPSManager.get_fix API;
+- LoRa: ReplaySink takes the place of the TX scheduler and decodes every frame queued
+  for transmission. ACKs are not modelled (fire-and-forget); the radio, ARQ and link
+  are exercised by benchmarks.bench_lora_pipeline on the SX126x emulator.
+
+Per-stage timings come from utils.metrics, which is enabled for the run.
+"""
+import bisect
+import importlib
+import os
+import tempfile
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from replay import stubs
+
+# before anything that imports gi, hailo or the hardware modules (main, core.gps); only
+# what is missing is faked, so on the drone the real GStreamer stays in place
+stubs.install()
+
+from core.gps.gps_manager import GPSFix, NO_FIX
+from replay.recording import RecordedFix, RecordedFrame
+
+FRAME_NS = 1_000_000_000
+
+
+class ReplayClock:
+    """Drop-in for the `time` module whose time() and monotonic() follow the replay."""
+
+    def __init__(self, epoch: float):
+        self.epoch = epoch
+        self.t = 0.0            # seconds since the start of the recording
+
+    def time(self) -> float:
+        return self.epoch + self.t
+
+    def monotonic(self) -> float:
+        return self.t
+
+    def strftime(self, fmt, t=None):
+        return time.strftime(fmt, time.localtime(self.time()) if t is None else t)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class ReplayGPS:
+    """Recorded fixes behind the GPSManager interface used by DetectionWithGPS."""
+
+    def __init__(self, fixes: List[RecordedFix], clock: ReplayClock, ground_elevation: float = 0.0):
+        self._fixes = fixes
+        self._times = [f.t for f in fixes]
+        self._clock = clock
+        self._ground = ground_elevation
+
+    def get_fix(self):
+        i = bisect.bisect_right(self._times, self._clock.t) - 1
+        if i < 0:
+            return NO_FIX, float("inf")
+        f = self._fixes[i]
+        fix = GPSFix(f.latitude, f.longitude, f.altitude, f.altitude - self._ground, f.speed, f.course,
+                     f.fix_quality, f.positioned, f.t)
+        return fix, self._clock.t - f.t
+
+    def get_current_location(self):
+        fix, _ = self.get_fix()
+        return fix.latitude, fix.longitude, fix.elevation
+
+    def get_speed_and_course(self):
+        fix, _ = self.get_fix()
+        return fix.speed, fix.course
+
+    @property
+    def is_positioned(self) -> bool:
+        return self.get_fix()[0].positioned
+
+    def stop(self, timeout: float = 0.0):
+        pass
+
+
+class ReplaySink:
+    """Takes the place of TxScheduler: decodes each frame instead of putting it on air."""
+
+    def __init__(self, clock: ReplayClock, labels):
+        from core.transmitter.frame_codec import decode_frame
+        self._decode = decode_frame
+        self._clock = clock
+        self._labels = labels
+        self.frames = 0
+        self.bytes = 0
+        self.detections = 0
+        self.track_ids = set()
+        self.ages = []          # seconds from detection to queued frame, recorded time
+
+    def submit(self, payload, priority: int = 0) -> bool:
+        frame = self._decode(payload, self._labels)
+        now = self._clock.time()
+        self.frames += 1
+        self.bytes += len(payload)
+        self.detections += len(frame.detections)
+        for det in frame.detections:
+            self.ages.append(now - det.ts)
+            if det.track_id is not None:
+                self.track_ids.add(det.track_id)
+        return True
+
+    @property
+    def queue_depth(self) -> int:
+        return 0
+
+    def stop(self, drain: bool = True, timeout: float = 0.0) -> bool:
+        return True
+
+    def stats(self) -> dict:
+        return {"queue_depth": 0, "enqueued": self.frames, "sent": self.frames, "dropped": 0, "failed": 0}
+
+
+def _buffer(frame: RecordedFrame, index: int, pixels: Optional[np.ndarray]):
+    roi = stubs.HailoROI([
+        stubs.HailoDetection(d.label, d.confidence, d.bbox, d.track_id) for d in frame.detections
+    ])
+    return stubs.Buffer(roi, pixels, pts=int(frame.t * FRAME_NS) if frame.t >= 0 else index)
+
+
+def _video_frames(path: str):
+    import cv2
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"cannot open video {path}")
+    try:
+        while True:
+            ok, bgr = cap.read()
+            if not ok:
+                return
+            yield cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)     # the pipeline delivers RGB
+    finally:
+        cap.release()
+
+
+def _percentiles(values, qs=(50, 90, 99)) -> dict:
+    if not len(values):
+        return {}
+    return {f"p{q}": float(v) for q, v in zip(qs, np.percentile(values, qs))}
+
+
+def run_replay(frames: List[RecordedFrame], fixes: List[RecordedFix], video: Optional[str] = None,
+               speed: float = 0.0, epoch: Optional[float] = None, ground_elevation: float = 0.0,
+               record_dir: Optional[str] = None) -> dict:
+    """
+    Feed every recorded frame through main.detection_callback and report.
+
+    Args:
+        frames (list): Recorded detections per frame.
+        fixes (list): Recorded GPS fixes on the same timeline.
+        video (str): Optional video whose frames are attached to the buffers (exercises
+            mapping, colour conversion and the OpenCV recording path).
+        speed (float): Pace frames at speed x real time; 0 runs as fast as possible.
+        epoch (float): Unix time of the start of the recording (default: now).
+        ground_elevation (float): Ground elevation (m MSL) for elevation above ground.
+        record_dir (str): Where the OpenCV recorder writes when video is given (default: a temp dir).
+
+    Returns:
+        dict: Throughput, per-stage latency and packetisation report.
+    """
+    main = importlib.import_module("main")
+    from utils.metrics import METRICS
+
+    clock = ReplayClock(time.time() if epoch is None else epoch)
+    gps = ReplayGPS(fixes, clock, ground_elevation)
+    saved = {"time": main.time, "GPSManager": main.GPSManager, "hailo": main.hailo}
+    saved_env = {name: os.environ.get(name) for name in ("VIDEO_DIR", "DETECTION_LOG")}
+    tmp = tempfile.TemporaryDirectory(prefix="replay_")
+    os.environ["VIDEO_DIR"] = record_dir or tmp.name
+    os.environ.pop("DETECTION_LOG", None)       # never overwrite a recording while replaying it
+    main.time = clock
+    main.GPSManager = lambda *args, **kwargs: gps
+    main.hailo = stubs.hailo_module()           # reads the ROIs of the fake buffers below
+    metrics_enabled = METRICS.enabled
+    user_data = None
+    try:
+        user_data = main.DetectionWithGPS(lora=None)
+        user_data.tx.stop(drain=False, timeout=1.0)
+        sink = ReplaySink(clock, main.LORA_LABELS)
+        user_data.tx = sink
+        user_data.reliable = None
+        user_data.use_acks = False
+        user_data.airtime_budget = main.AirtimeBudget(main.AIRTIME_DUTY_CYCLE, main.AIRTIME_BURST_MS, clock=clock.monotonic)
+        user_data.record_in_callback = video is not None
+
+        pixels = _video_frames(video) if video else None
+        first = next(pixels, None) if pixels is not None else None
+        if first is not None:
+            h, w = first.shape[:2]
+            pad = stubs.Pad("RGB", w, h)
+        else:
+            pixels = None
+            pad = stubs.Pad()
+
+        METRICS.set_enabled(True)
+        detections_in = 0
+        wall_start = time.perf_counter()
+        for i, frame in enumerate(frames):
+            clock.t = frame.t
+            if speed > 0:
+                delay = wall_start + frame.t / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            image = None
+            if pixels is not None:
+                image = first if i == 0 else next(pixels, None)
+            detections_in += len(frame.detections)
+            main.detection_callback(pad, stubs.ProbeInfo(_buffer(frame, i, image)), user_data)
+        wall = time.perf_counter() - wall_start
+
+        # one last batch for the tail of the recording
+        if frames:
+            clock.t = frames[-1].t + main.BATCH_INTERVAL_SEC
+            user_data.try_transmit_batch()
+        user_data.stop_recording()
+
+        snap = METRICS.snapshot()
+        duration = frames[-1].t - frames[0].t if len(frames) > 1 else 0.0
+        with user_data.store_lock:
+            pending = len(user_data.store.pending())
+        return {
+            "frames": len(frames),
+            "recorded_sec": duration,
+            "wall_sec": wall,
+            "fps": len(frames) / wall if wall > 0 else 0.0,
+            "speedup": duration / wall if wall > 0 else 0.0,
+            "detections_in": detections_in,
+            "detections_stored": user_data.store.appended,
+            "pending_at_end": pending,
+            "lora": {
+                "frames": sink.frames,
+                "bytes": sink.bytes,
+                "detections": sink.detections,
+                "tracks": len(sink.track_ids),
+                "detection_age_sec": _percentiles(sink.ages),
+            },
+            "first_report": user_data.reports.stats(),
+            "track_table": user_data.tracks.stats(),
+            "stages": snap["stages"],
+        }
+    finally:
+        METRICS.set_enabled(metrics_enabled)
+        if user_data is not None:
+            METRICS.remove_collector(user_data.collect_metrics)
+        main.time = saved["time"]
+        main.GPSManager = saved["GPSManager"]
+        main.hailo = saved["hailo"]
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        tmp.cleanup()
+
+
+def format_report(report: dict) -> str:
+    lora = report["lora"]
+    lines = [
+        f"frames {report['frames']} ({report['recorded_sec']:.1f} s recorded) in {report['wall_sec']:.2f} s: "
+        f"{report['fps']:.0f} fps, {report['speedup']:.1f}x real time",
+        f"detections {report['detections_in']} in, {report['detections_stored']} stored, "
+        f"{lora['detections']} queued in {lora['frames']} LoRa frames ({lora['bytes']} B, {lora['tracks']} tracks), "
+        f"{report['pending_at_end']} pending at end",
+    ]
+    ages = lora["detection_age_sec"]
+    if ages:
+        lines.append("detection -> queued (recorded time): " + ", ".join(f"{k} {v:.2f} s" for k, v in ages.items()))
+    lines.append(f"first report: {report['first_report']}")
+    lines.append(f"track table: {report['track_table']}")
+    lines.append(f"{'stage':>20} {'count':>8} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for stage, s in report["stages"].items():
+        lines.append(f"{stage:>20} {s['count']:>8} {s['mean_ms']:>9.3f} {s['p50_ms']:>9.3f} {s['p99_ms']:>9.3f} {s['max_ms']:>9.3f}")
+    return "\n".join(lines)
@@ -0,0 +1,242 @@
+"""
+Recorded inputs for the replay harness, and a recorder that produces them on the drone.
+
+Detections: JSON lines, one per frame, with t in seconds from the start of the recording:
+
+    {"t": 0.033, "detections": [{"label": "person", "confidence": 0.91,
+                                 "bbox": [0.42, 0.37, 0.05, 0.11], "track_id": 12}]}
+
+bbox is (xmin, ymin, width, height) normalised to the frame; track_id may be null.
+
+NMEA: the raw receiver output (e.g. `cat /dev/ttyAMA0 > flight.nmea`). Sentences are
+framed and checksum-checked with core.gps.nmea.NMEAFramer; GGA, RMC and GLL update the
+position, and the UTC time field places each fix on the recording's timeline.
+"""
+import json
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from core.gps.nmea import NMEAFramer
+
+KNOTS_TO_MPS = 0.514444
+
+
+class RecordedDetection(NamedTuple):
+    label: str
+    confidence: float
+    bbox: Tuple[float, float, float, float]
+    track_id: Optional[int]
+
+
+class RecordedFrame(NamedTuple):
+    t: float
+    detections: List[RecordedDetection]
+
+
+class RecordedFix(NamedTuple):
+    t: float                    # seconds from the first fix
+    latitude: float
+    longitude: float
+    altitude: float             # MSL (m)
+    speed: float                # m/s
+    course: float
+    fix_quality: int
+    positioned: bool
+
+
+# ------------- detections -------------
+def read_detections(path: str) -> List[RecordedFrame]:
+    frames = []
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+                dets = [
+                    RecordedDetection(d["label"], float(d["confidence"]), tuple(d.get("bbox") or (0, 0, 0, 0)), d.get("track_id"))
+                    for d in rec.get("detections", ())
+                ]
+                frames.append(RecordedFrame(float(rec["t"]), dets))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{line_no}: bad detection record: {e}") from None
+    frames.sort(key=lambda fr: fr.t)
+    return frames
+
+
+def write_detections(path: str, frames) -> None:
+    with open(path, "w") as f:
+        for fr in frames:
+            f.write(_frame_line(fr.t, fr.detections))
+
+
+def _frame_line(t: float, detections) -> str:
+    return json.dumps({"t": round(t, 4), "detections": [d._asdict() for d in detections]}) + "\n"
+
+
+class DetectionRecorder:
+    """
+    Writes every callback frame's detections, all classes and confidences, in the
+    read_detections format, so a flight can be replayed with other thresholds
+    (run with --no-prefilter, or the postprocess drops them before the callback).
+    """
+
+    def __init__(self, path: str, unique_id_type):
+        """
+        Args:
+            path (str): Output file.
+            unique_id_type: hailo.HAILO_UNIQUE_ID, to read track ids.
+        """
+        self._file = open(path, "w", buffering=1 << 16)
+        self._unique_id = unique_id_type
+        self._start = None
+
+    def write_frame(self, detections):
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        records = []
+        for det in detections:
+            bbox = det.get_bbox()
+            track = det.get_objects_typed(self._unique_id)
+            records.append(RecordedDetection(
+                det.get_label(), round(float(det.get_confidence()), 4),
+                (bbox.xmin(), bbox.ymin(), bbox.width(), bbox.height()),
+                track[0].get_id() if len(track) == 1 else None,
+            ))
+        self._file.write(_frame_line(now - self._start, records))
+
+    def close(self):
+        self._file.close()
+
+
+# ------------- NMEA -------------
+def _degrees(value: str, hemisphere: str) -> float:
+    """ddmm.mmmm / dddmm.mmmm and N/S/E/W to signed decimal degrees."""
+    raw = float(value)
+    deg = int(raw // 100)
+    out = deg + (raw - deg * 100) / 60
+    return -out if hemisphere in ("S", "W") else out
+
+
+def _seconds_of_day(value: str) -> float:
+    return int(value[0:2]) * 3600 + int(value[2:4]) * 60 + float(value[4:])
+
+
+def read_nmea(path: str) -> List[RecordedFix]:
+    """
+    Fixes from a raw NMEA log, one per UTC time stamp that carried a position.
+
+    Fields missing from one sentence type (altitude from RMC, speed from GGA) are carried
+    over from the previous sentences; a day rollover of the UTC time is handled.
+    """
+    framer = NMEAFramer()
+    with open(path, "rb") as f:
+        sentences = framer.feed(f.read() + b"\n")
+
+    state = {"latitude": 0.0, "longitude": 0.0, "altitude": 0.0, "speed": 0.0, "course": 0.0,
+             "fix_quality": 0, "positioned": False}
+    fixes = []
+    first = None
+    last_tod = None
+    day = 0.0
+    for sentence in sentences:
+        fields = sentence[1:sentence.rindex("*")].split(",")
+        kind = fields[0][2:]
+        try:
+            if kind == "GGA" and len(fields) > 9:
+                tod_field = fields[1]
+                if fields[2]:
+                    state["latitude"] = _degrees(fields[2], fields[3])
+                    state["longitude"] = _degrees(fields[4], fields[5])
+                state["fix_quality"] = int(fields[6] or 0)
+                if fields[9]:
+                    state["altitude"] = float(fields[9])
+            elif kind == "RMC" and len(fields) > 8:
+                tod_field = fields[1]
+                state["positioned"] = fields[2] == "A"
+                if fields[3]:
+                    state["latitude"] = _degrees(fields[3], fields[4])
+                    state["longitude"] = _degrees(fields[5], fields[6])
+                if fields[7]:
+                    state["speed"] = float(fields[7]) * KNOTS_TO_MPS
+                if fields[8]:
+                    state["course"] = float(fields[8])
+            elif kind == "GLL" and len(fields) > 6:
+                tod_field = fields[5]
+                state["positioned"] = fields[6] == "A"
+                if fields[1]:
+                    state["latitude"] = _degrees(fields[1], fields[2])
+                    state["longitude"] = _degrees(fields[3], fields[4])
+            else:
+                continue
+            if not tod_field:
+                continue
+            tod = _seconds_of_day(tod_field)
+        except ValueError:
+            continue
+
+        if last_tod is not None and tod < last_tod - 43200:
+            day += 86400.0
+        last_tod = tod
+        if first is None:
+            first = tod + day
+        t = tod + day - first
+        fix = RecordedFix(t=t, **state)
+        if fixes and fixes[-1].t == t:
+            fixes[-1] = fix         # several sentences per epoch: keep the merged state
+        else:
+            fixes.append(fix)
+    return fixes
+
+
+CLUTTER_LABELS = ("person", "car", "bicycle", "dog", "backpack", "umbrella", "truck", "bench")
+
+
+def synthesize(seconds: float, fps: float = 30.0, tracks: int = 8, new_per_sec: float = 0.5,
+               seed: int = 0, lat: float = 45.4215, lon: float = -75.6972, speed: float = 8.0,
+               clutter: int = 0):
+    """
+    A synthetic flight for benchmarking without recordings: `tracks` people in view,
+    replaced at new_per_sec by new track ids, seen from a camera moving north at speed.
+    `clutter` adds that many untracked boxes per frame of assorted classes at 0.3-0.7
+    confidence, as an unfiltered postprocess at the NMS score threshold emits them.
+
+    Returns:
+        tuple: (frames, fixes) at fps and 1 Hz.
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    ids = list(range(tracks))
+    next_id = tracks
+    boxes = rng.random((tracks, 2)) * 0.9
+    for i in range(int(seconds * fps)):
+        t = i / fps
+        if rng.random() < new_per_sec / fps:
+            k = int(rng.integers(tracks))
+            ids[k] = next_id
+            next_id += 1
+            boxes[k] = rng.random(2) * 0.9
+        boxes = np.clip(boxes + rng.normal(0, 0.002, boxes.shape), 0, 0.95)
+        dets = [
+            RecordedDetection("person", round(float(0.6 + 0.4 * rng.random()), 3),
+                              (float(boxes[k, 0]), float(boxes[k, 1]), 0.04, 0.1), ids[k])
+            for k in range(tracks) if rng.random() > 0.05   # occasional missed detection
+        ]
+        if rng.random() < 0.1:
+            dets.append(RecordedDetection("car", 0.8, (0.5, 0.5, 0.1, 0.1), None))
+        for _ in range(clutter):
+            x, y = rng.random(2) * 0.9
+            dets.append(RecordedDetection(CLUTTER_LABELS[int(rng.integers(len(CLUTTER_LABELS)))],
+                                          round(float(0.3 + 0.4 * rng.random()), 3), (float(x), float(y), 0.05, 0.05), None))
+        frames.append(RecordedFrame(t, dets))
+
+    deg_per_m = 1 / 111_320
+    fixes = [
+        RecordedFix(float(s), lat + s * speed * deg_per_m, lon, 120.0, speed, 0.0, 1, True)
+        for s in range(int(seconds) + 1)
+    ]
+    return frames, fixes
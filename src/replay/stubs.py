@@ -0,0 +1,296 @@
+"""
+Stand-ins for the GStreamer and Hailo Python bindings, so main.detection_callback can
+run off the drone.
+
+install() puts a fake `gi` (gi.repository.Gst/GLib/GObject) and a fake `hailo` module
+in sys.modules when the real bindings cannot be imported, so on the drone the rest of
+the process keeps the real GStreamer. Hardware-only modules the import chain of main.py
+pulls in (lgpio, spidev, serial, micropyGPS, setproctitle) are likewise added only when
+they are not installed; their placeholders can be called, but using what they return
+raises, since nothing on the replay path should touch hardware. uninstall() puts back
+what install() changed.
+
+The fake objects implement just the API surface the callback uses: pad caps, buffer
+map/unmap, pts, and the ROI / detection / unique-id accessors of hailo.
+"""
+import enum
+import sys
+import types
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+HARDWARE_MODULES = ("lgpio", "spidev", "serial", "micropyGPS", "setproctitle")
+
+
+# ------------- Gst -------------
+class PadProbeReturn(enum.IntEnum):
+    DROP = 0
+    OK = 1
+    REMOVE = 2
+    PASS = 3
+    HANDLED = 4
+
+
+class PadProbeType(enum.IntFlag):
+    BUFFER = 1 << 4
+
+
+class IteratorResult(enum.IntEnum):
+    DONE = 0
+    OK = 1
+    RESYNC = 2
+    ERROR = 3
+
+
+class MapFlags(enum.IntFlag):
+    READ = 1
+    WRITE = 2
+
+
+class MapInfo:
+    __slots__ = ("data", "size")
+
+    def __init__(self, data):
+        self.data = data
+        self.size = len(data)
+
+
+class Structure:
+    def __init__(self, **fields):
+        self._fields = fields
+
+    def get_value(self, key):
+        return self._fields.get(key)
+
+
+class Caps:
+    def __init__(self, **fields):
+        self._structure = Structure(**fields)
+
+    def get_structure(self, index: int):
+        return self._structure if index == 0 else None
+
+
+class Buffer:
+    """A frame's buffer: optional RGB pixels, the Hailo ROI attached to it, and its PTS."""
+
+    def __init__(self, roi, frame: Optional[np.ndarray] = None, pts: int = 0):
+        self.roi = roi
+        self.frame = frame
+        self.pts = pts
+        self.mapped = 0
+
+    def map(self, flags):
+        if self.frame is None:
+            return False, None
+        self.mapped += 1
+        return True, MapInfo(memoryview(np.ascontiguousarray(self.frame)).cast("B"))
+
+    def unmap(self, map_info):
+        self.mapped -= 1
+
+
+class Pad:
+    """Source pad of identity_callback; its caps describe the frames, or are unset without frames."""
+
+    def __init__(self, format: Optional[str] = None, width: int = 0, height: int = 0):
+        self._caps = Caps(format=format, width=width, height=height) if format else None
+
+    def get_current_caps(self):
+        return self._caps
+
+
+class ProbeInfo:
+    def __init__(self, buffer: Optional[Buffer]):
+        self._buffer = buffer
+
+    def get_buffer(self):
+        return self._buffer
+
+
+def _gst_module():
+    gst = types.ModuleType("gi.repository.Gst")
+    gst.PadProbeReturn = PadProbeReturn
+    gst.PadProbeType = PadProbeType
+    gst.MapFlags = MapFlags
+    gst.IteratorResult = IteratorResult
+    gst.Pad = Pad
+    gst.Buffer = Buffer
+    gst.Caps = Caps
+    gst.CLOCK_TIME_NONE = 2 ** 64 - 1
+    gst.SECOND = 1_000_000_000
+    gst.MSECOND = 1_000_000
+    gst.init = lambda argv=None: None
+    gst.__getattr__ = _placeholder("Gst")
+    return gst
+
+
+# ------------- hailo -------------
+HAILO_DETECTION = "HAILO_DETECTION"
+HAILO_UNIQUE_ID = "HAILO_UNIQUE_ID"
+
+
+class HailoBBox:
+    __slots__ = ("_xmin", "_ymin", "_width", "_height")
+
+    def __init__(self, xmin: float, ymin: float, width: float, height: float):
+        self._xmin, self._ymin, self._width, self._height = xmin, ymin, width, height
+
+    def xmin(self):
+        return self._xmin
+
+    def ymin(self):
+        return self._ymin
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+
+class HailoUniqueID:
+    __slots__ = ("_id",)
+
+    def __init__(self, track_id: int):
+        self._id = track_id
+
+    def get_id(self):
+        return self._id
+
+
+class HailoDetection:
+    __slots__ = ("_label", "_confidence", "_bbox", "_ids")
+
+    def __init__(self, label: str, confidence: float, bbox: Sequence[float], track_id: Optional[int] = None):
+        self._label = label
+        self._confidence = confidence
+        self._bbox = HailoBBox(*bbox)
+        self._ids = [HailoUniqueID(track_id)] if track_id is not None else []
+
+    def get_label(self):
+        return self._label
+
+    def get_confidence(self):
+        return self._confidence
+
+    def get_bbox(self):
+        return self._bbox
+
+    def get_objects_typed(self, kind):
+        return self._ids if kind == HAILO_UNIQUE_ID else []
+
+
+class HailoROI:
+    __slots__ = ("_detections",)
+
+    def __init__(self, detections: List[HailoDetection]):
+        self._detections = detections
+
+    def get_objects_typed(self, kind):
+        return self._detections if kind == HAILO_DETECTION else []
+
+
+def hailo_module():
+    """A fake hailo module; the replay harness hands it to main even where the real one is installed."""
+    hailo = types.ModuleType("hailo")
+    hailo.HAILO_DETECTION = HAILO_DETECTION
+    hailo.HAILO_UNIQUE_ID = HAILO_UNIQUE_ID
+    hailo.HailoBBox = HailoBBox
+    hailo.HailoDetection = HailoDetection
+    hailo.HailoUniqueID = HailoUniqueID
+    hailo.HailoROI = HailoROI
+    hailo.get_roi_from_buffer = lambda buffer: buffer.roi
+    return hailo
+
+
+# ------------- install -------------
+class _Unavailable:
+    """Returned by placeholder constructors (e.g. L76X builds a MicropyGPS at import); any use raises."""
+
+    def __init__(self, what: str):
+        object.__setattr__(self, "_what", what)
+
+    def __getattr__(self, name):
+        raise RuntimeError(f"{self._what}.{name} is not available in replay")
+
+    def __setattr__(self, name, value):
+        raise RuntimeError(f"{self._what}.{name} is not available in replay")
+
+
+def _placeholder(module: str):
+    def __getattr__(name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def unavailable(*args, **kwargs):
+            return _Unavailable(f"{module}.{name}()")
+        unavailable.__name__ = name
+        return unavailable
+    return __getattr__
+
+
+def _importable(name: str) -> bool:
+    if name in sys.modules:
+        return True
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+def _gst_importable() -> bool:
+    try:
+        import gi
+        gi.require_version("Gst", "1.0")
+        from gi.repository import Gst  # noqa: F401
+    except (ImportError, ValueError):
+        return False
+    return True
+
+
+def _fake_gi() -> dict:
+    gi = types.ModuleType("gi")
+    gi.require_version = lambda namespace, version: None
+    repository = types.ModuleType("gi.repository")
+    repository.Gst = _gst_module()
+    for name in ("GLib", "GObject"):
+        mod = types.ModuleType(f"gi.repository.{name}")
+        mod.__getattr__ = _placeholder(name)
+        setattr(repository, name, mod)
+    gi.repository = repository
+    return {"gi": gi, "gi.repository": repository}
+
+
+def install() -> dict:
+    """
+    Register fakes for the modules that cannot be imported; must run before main (or
+    anything importing gi/hailo) is imported.
+
+    Returns:
+        dict: The sys.modules entries it replaced (None where there was none), for uninstall().
+    """
+    fakes = {}
+    if not _gst_importable():
+        fakes.update(_fake_gi())
+    if not _importable("hailo"):
+        fakes["hailo"] = hailo_module()
+    for name in HARDWARE_MODULES:
+        if not _importable(name):
+            mod = types.ModuleType(name)
+            mod.__getattr__ = _placeholder(name)
+            fakes[name] = mod
+    previous = {name: sys.modules.get(name) for name in fakes}
+    sys.modules.update(fakes)
+    return previous
+
+
+def uninstall(previous: dict):
+    """Put back the sys.modules entries install() returned."""
+    for name, module in previous.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
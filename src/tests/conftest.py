@@ -0,0 +1,35 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+from replay import stubs
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _forget(name: str):
+    """Drop a module from sys.modules and from its parent package, so the next import reloads it."""
+    module = sys.modules.pop(name)
+    parent, _, child = name.rpartition(".")
+    if parent in sys.modules and getattr(sys.modules[parent], child, None) is module:
+        delattr(sys.modules[parent], child)
+
+
+@pytest.fixture(scope="module")
+def stubbed():
+    """
+    replay.stubs installed for one test module. Import gi / hailo / hardware dependent
+    modules inside fixtures that use this one: afterwards the modules of this repo imported
+    on top of the fakes are forgotten and the replaced sys.modules entries are put back,
+    so the fakes do not leak into later test modules.
+    """
+    before = set(sys.modules)
+    previous = stubs.install()
+    yield stubs
+    for name in set(sys.modules) - before:
+        path = getattr(sys.modules[name], "__file__", None) or ""
+        if path.startswith(SRC_DIR + os.sep):
+            _forget(name)
+    stubs.uninstall(previous)
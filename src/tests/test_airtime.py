@@ -0,0 +1,85 @@
+# tests/test_airtime.py
+import math
+
+import pytest
+
+from core.transmitter.airtime import (
+    AirtimeBudget,
+    ldro_required,
+    lora_bandwidth_hz,
+    time_on_air_ms,
+)
+
+HEADER_EXPLICIT = 0x00
+HEADER_IMPLICIT = 0x01
+BANDWIDTHS = [7800, 10400, 15600, 20800, 31250, 41700, 62500, 125000, 250000, 500000]
+
+
+def datasheet_toa_ms(pl, sf, bw_hz, cr, npre, explicit, crc, ldro):
+    """SX1261/2 datasheet section 6.1.4, written out term by term; cr is the 4/cr denominator (CR + 4)."""
+    n_bit_crc = 16 if crc else 0
+    n_sym_header = 20 if explicit else 0
+    if sf < 7:
+        num = 8 * pl + n_bit_crc - 4 * sf + n_sym_header
+        n = npre + 6.25 + 8 + math.ceil(max(num, 0) / (4 * sf)) * cr
+    else:
+        num = 8 * pl + n_bit_crc - 4 * sf + 8 + n_sym_header
+        den = 4 * (sf - 2) if ldro else 4 * sf
+        n = npre + 4.25 + 8 + math.ceil(max(num, 0) / den) * cr
+    return n * (2 ** sf) / bw_hz * 1000
+
+
+@pytest.mark.parametrize("sf", range(5, 13))
+@pytest.mark.parametrize("bw", BANDWIDTHS)
+def test_matches_datasheet_for_all_sf_bw(sf, bw):
+    ldro = ldro_required(sf, bw)
+    for pl in (1, 10, 31, 64, 255):
+        for cr in (5, 8):
+            for header in (HEADER_EXPLICIT, HEADER_IMPLICIT):
+                for crc in (True, False):
+                    got = time_on_air_ms(pl, sf, bw, cr, 12, header, crc, ldro)
+                    want = datasheet_toa_ms(pl, sf, lora_bandwidth_hz(bw), cr, 12, header == HEADER_EXPLICIT, crc, ldro)
+                    assert got == pytest.approx(want)
+
+
+@pytest.mark.parametrize("sf, pl, ldro, expected_ms", [
+    # Semtech LoRa calculator, BW 125 kHz, CR 4/5, preamble 8, explicit header, CRC on
+    (7, 10, False, 41.216),
+    (7, 51, False, 102.656),
+    (12, 51, True, 2465.792),
+])
+def test_reference_values(sf, pl, ldro, expected_ms):
+    assert time_on_air_ms(pl, sf, 125000, 5, 8, HEADER_EXPLICIT, True, ldro) == pytest.approx(expected_ms, abs=1e-3)
+
+
+def test_ldro_required_only_for_long_symbols():
+    assert not ldro_required(7, 125000)
+    assert not ldro_required(11, 250000)
+    assert ldro_required(11, 125000)
+    assert ldro_required(12, 125000)
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_budget_refills_at_duty_cycle():
+    clock = FakeClock()
+    budget = AirtimeBudget(duty_cycle=0.1, burst_ms=500, clock=clock)
+    assert budget.try_consume(400)
+    assert not budget.try_consume(200)
+    assert budget.wait_time(200) == pytest.approx(1.0)
+    clock.t = 1.0
+    assert budget.try_consume(200)
+    clock.t = 100.0
+    assert budget.available_ms() == pytest.approx(500)
+
+
+def test_budget_refund_is_capped():
+    budget = AirtimeBudget(duty_cycle=0.5, burst_ms=100, clock=FakeClock())
+    budget.refund(50)
+    assert budget.available_ms() == pytest.approx(100)
@@ -0,0 +1,46 @@
+# tests/test_dedup.py
+import numpy as np
+import pytest
+
+from benchmarks._reference import dedup_by_id_and_distance_dataframe, dedup_engine, make_batch
+from utils.dedup import dedup_keep
+from utils.distance_utils import haversine_m
+
+
+@pytest.mark.parametrize("n", [10, 100, 1000, 5000])     # larger sizes: benchmarks.bench_dedup
+def test_matches_dataframe_implementation(n):
+    batch_df = make_batch(n, np.random.default_rng(n))
+    expected = dedup_by_id_and_distance_dataframe(batch_df).index.to_numpy()
+    assert np.array_equal(dedup_engine(batch_df), expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_dataframe_implementation_dense_single_group(seed):
+    # one label, one id, ~100 m box: most rows are dropped, exercising every neighbour cell
+    batch_df = make_batch(2000, np.random.default_rng(seed), n_ids=1, spread_deg=1e-3)
+    batch_df["label"] = "person"
+    batch_df["id"] = 7
+    expected = dedup_by_id_and_distance_dataframe(batch_df).index.to_numpy()
+    assert np.array_equal(dedup_engine(batch_df), expected)
+
+
+def test_radius_boundary_uses_haversine():
+    # second point just inside, third just outside the radius of the first
+    lat0, lon0 = 45.0, -75.0
+    dlat_10m = 10.0 / 111194.92664455873
+    lat = np.array([lat0, lat0 + dlat_10m * 0.999999, lat0 - dlat_10m * 1.000001])
+    lon = np.full(3, lon0)
+    assert haversine_m(lat[0], lon[0], lat[1], lon[1]) < 10.0 <= haversine_m(lat[0], lon[0], lat[2], lon[2])
+    keep = dedup_keep(np.arange(3.0), lat, lon, np.zeros(3, dtype=int), 10.0)
+    assert list(keep) == [0, 2]
+
+
+def test_groups_are_independent():
+    lat = np.full(4, 45.0)
+    lon = np.full(4, -75.0)
+    keep = dedup_keep(np.arange(4.0), lat, lon, np.array([0, 1, 0, 1]), 10.0)
+    assert list(keep) == [0, 1]
+
+
+def test_empty_batch():
+    assert dedup_keep(np.empty(0), np.empty(0), np.empty(0), np.empty(0, dtype=int), 10.0).size == 0
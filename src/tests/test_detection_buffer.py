@@ -0,0 +1,49 @@
+# tests/test_detection_buffer.py
+import numpy as np
+
+from utils.detection_buffer import DetectionRingBuffer
+
+
+def test_append_and_pending_order():
+    buf = DetectionRingBuffer(capacity=4, max_age_sec=100)
+    for i in range(3):
+        buf.append(float(i), "person", i, 45.0 + i, -75.0)
+    pending = buf.pending()
+    assert len(pending) == 3
+    assert list(pending.ts) == [0.0, 1.0, 2.0]
+    assert buf.label_names(pending.label) == ["person"] * 3
+
+
+def test_overwrites_oldest_when_full():
+    buf = DetectionRingBuffer(capacity=3, max_age_sec=100)
+    for i in range(5):
+        buf.append(float(i), "person", i, 0.0, 0.0)
+    assert len(buf) == 3
+    assert list(buf.pending().id) == [2, 3, 4]
+
+
+def test_age_eviction():
+    buf = DetectionRingBuffer(capacity=10, max_age_sec=5)
+    buf.append(0.0, "person", 1, 0.0, 0.0)
+    buf.append(3.0, "person", 2, 0.0, 0.0)
+    buf.append(7.0, "person", 3, 0.0, 0.0)
+    assert list(buf.pending().id) == [2, 3]
+
+
+def test_missing_track_id_is_stored_as_no_id():
+    buf = DetectionRingBuffer(capacity=2, max_age_sec=10)
+    buf.append(0.0, "person", None, 0.0, 0.0)
+    assert buf.pending().id[0] == DetectionRingBuffer.NO_ID
+
+
+def test_mark_sent_skips_overwritten_slots():
+    buf = DetectionRingBuffer(capacity=2, max_age_sec=100)
+    buf.append(0.0, "person", 1, 0.0, 0.0)
+    buf.append(1.0, "person", 2, 0.0, 0.0)
+    pending = buf.pending()
+    # slot 0 is overwritten before the batch is acknowledged
+    buf.append(2.0, "person", 3, 0.0, 0.0)
+    buf.mark_sent(pending.slots, pending.seq)
+    assert list(buf.pending().id) == [3]
+    assert np.count_nonzero(buf.sent) == 1
+
@@ -0,0 +1,136 @@
+# tests/test_elevation.py
+import threading
+import time
+
+import pytest
+
+from core.gps.elevation import ElevationCache
+
+
+class FakeSRTM:
+    def __init__(self, elevation=100.0):
+        self.elevation = elevation
+        self.queries = []
+        self.files = []
+
+    def get_elevation(self, lat, lon):
+        self.queries.append((lat, lon))
+        return self.elevation
+
+    def get_file(self, lat, lon):
+        self.files.append((int(lat), int(lon)))
+
+
+def make_cache(srtm=None, **kwargs):
+    srtm = srtm or FakeSRTM()
+    created = []
+
+    def factory():
+        created.append(srtm)
+        return srtm
+
+    kwargs.setdefault("preload_radius", 0)
+    return ElevationCache(data_factory=factory, **kwargs), srtm, created
+
+
+def test_srtm_is_loaded_lazily():
+    cache, _, created = make_cache()
+    assert created == []
+    cache.get_elevation(45.42, -75.69)
+    assert len(created) == 1
+
+
+def test_same_cell_hits_cache():
+    cache, srtm, _ = make_cache(resolution_m=30.0)
+    assert cache.get_elevation(45.420000, -75.690000) == 100.0
+    # ~1 m away, same 30 m cell
+    assert cache.get_elevation(45.420005, -75.690005) == 100.0
+    assert len(srtm.queries) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_other_cell_misses():
+    cache, srtm, _ = make_cache(resolution_m=30.0)
+    cache.get_elevation(45.4200, -75.6900)
+    cache.get_elevation(45.4210, -75.6900)     # ~110 m north
+    assert len(srtm.queries) == 2
+
+
+def test_missing_data_is_cached():
+    cache, srtm, _ = make_cache(FakeSRTM(elevation=None))
+    assert cache.get_elevation(0.0, -30.0) is None
+    assert cache.get_elevation(0.0, -30.0) is None
+    assert len(srtm.queries) == 1
+
+
+def test_lru_eviction():
+    cache, srtm, _ = make_cache(resolution_m=30.0, max_entries=2)
+    a, b, c = (45.40, -75.6), (45.41, -75.6), (45.42, -75.6)
+    cache.get_elevation(*a)
+    cache.get_elevation(*b)
+    cache.get_elevation(*a)     # a becomes most recent
+    cache.get_elevation(*c)     # evicts b
+    assert cache.stats()["entries"] == 2
+    cache.get_elevation(*a)
+    assert len(srtm.queries) == 3
+    cache.get_elevation(*b)
+    assert len(srtm.queries) == 4
+
+
+def test_preloads_tiles_around_first_fix():
+    cache, srtm, _ = make_cache(preload_radius=1)
+    cache.get_elevation(45.5, -75.5)
+    cache._preloader.join(1.0)
+    assert len(srtm.files) == 9
+    cache.get_elevation(46.5, -75.5)
+    assert len(srtm.files) == 9
+
+
+class ReentrancyCheckingSRTM(FakeSRTM):
+    """Records the most threads ever inside it at once (srtm is not thread-safe)."""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self.inside = 0
+        self.max_inside = 0
+
+    def _enter(self):
+        with self._lock:
+            self.inside += 1
+            self.max_inside = max(self.max_inside, self.inside)
+        time.sleep(0.002)
+        with self._lock:
+            self.inside -= 1
+
+    def get_elevation(self, lat, lon):
+        self._enter()
+        return super().get_elevation(lat, lon)
+
+    def get_file(self, lat, lon):
+        self._enter()
+        super().get_file(lat, lon)
+
+
+def test_lookups_and_preload_never_enter_srtm_together():
+    srtm = ReentrancyCheckingSRTM()
+    created = []
+
+    def factory():
+        created.append(srtm)
+        time.sleep(0.01)        # both threads reach the lazy load together
+        return srtm
+
+    cache = ElevationCache(resolution_m=30.0, preload_radius=2, data_factory=factory)
+    for i in range(30):
+        cache.get_elevation(45.5 + i * 0.001, -75.5)
+    cache._preloader.join(2.0)
+    assert len(srtm.files) == 25
+    assert len(srtm.queries) == 30
+    assert created == [srtm]
+    assert srtm.max_inside == 1
+
+
+def test_invalid_resolution():
+    with pytest.raises(ValueError):
+        ElevationCache(resolution_m=0, data_factory=FakeSRTM)
@@ -0,0 +1,87 @@
+# tests/test_frame_access.py
+import cv2
+import numpy as np
+import pytest
+
+from replay import stubs
+
+
+@pytest.fixture(scope="module")
+def common(stubbed):
+    from core.vision.hailo_apps_infra import hailo_rpi_common     # maps Gst buffers
+    return hailo_rpi_common
+
+
+def rgb_buffer(width=8, height=4, seed=0):
+    frame = np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    return stubs.Buffer(None, frame=frame)
+
+
+def test_mapped_view_is_read_only_and_unmapped_on_exit(common):
+    buffer = rgb_buffer()
+    with common.map_numpy_from_buffer(buffer, "RGB", 8, 4) as frame:
+        assert buffer.mapped == 1
+        assert np.shares_memory(frame, buffer.frame)       # a view, not a copy
+        np.testing.assert_array_equal(frame, buffer.frame)
+        assert not frame.flags.writeable
+        with pytest.raises(ValueError):
+            frame[0, 0, 0] = 1
+    assert buffer.mapped == 0
+
+
+def test_buffer_is_unmapped_when_the_block_raises(common):
+    buffer = rgb_buffer()
+    with pytest.raises(RuntimeError):
+        with common.map_numpy_from_buffer(buffer, "RGB", 8, 4):
+            raise RuntimeError("callback failed")
+    assert buffer.mapped == 0
+
+
+def test_nv12_planes_are_read_only_views(common):
+    width, height = 8, 4
+    data = np.arange(width * height * 3 // 2, dtype=np.uint8)
+    buffer = stubs.Buffer(None, frame=data)
+    with common.map_numpy_from_buffer(buffer, "NV12", width, height) as (y, uv):
+        assert y.shape == (height, width) and uv.shape == (height // 2, width // 2, 2)
+        assert not y.flags.writeable and not uv.flags.writeable
+        assert np.shares_memory(y, buffer.frame) and np.shares_memory(uv, buffer.frame)
+    assert buffer.mapped == 0
+
+
+def test_errors_leave_nothing_mapped(common):
+    buffer = rgb_buffer()
+    with pytest.raises(ValueError):
+        with common.map_numpy_from_buffer(buffer, "I420", 8, 4):
+            pass
+    with pytest.raises(ValueError):
+        with common.map_numpy_from_buffer(stubs.Buffer(None), "RGB", 8, 4):     # map fails
+            pass
+    assert buffer.mapped == 0
+
+
+def test_copying_variant_returns_writable_copies(common):
+    buffer = rgb_buffer()
+    frame = common.get_numpy_from_buffer(buffer, "RGB", 8, 4)
+    assert frame.flags.writeable
+    assert not np.shares_memory(frame, buffer.frame)
+    assert buffer.mapped == 0
+
+
+def test_frame_converter_reuses_its_output_for_the_same_shape(common):
+    converter = common.FrameConverter(cv2.COLOR_RGB2BGR)
+    a, b = rgb_buffer(seed=1).frame, rgb_buffer(seed=2).frame
+
+    out = converter.convert(a)
+    address = out.ctypes.data
+    np.testing.assert_array_equal(out, a[..., ::-1])
+    out = converter.convert(b)
+    assert out.ctypes.data == address
+    np.testing.assert_array_equal(out, b[..., ::-1])
+
+    # a new shape reallocates once, then is reused
+    c = rgb_buffer(width=16, height=8, seed=3).frame
+    out = converter.convert(c)
+    assert out.shape == (8, 16, 3)
+    np.testing.assert_array_equal(out, c[..., ::-1])
+    address = out.ctypes.data
+    assert converter.convert(rgb_buffer(width=16, height=8, seed=4).frame).ctypes.data == address
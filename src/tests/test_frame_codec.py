@@ -0,0 +1,73 @@
+# tests/test_frame_codec.py
+import pytest
+
+from core.transmitter.frame_codec import (
+    ENTRY,
+    HEADER,
+    Detection,
+    FrameEncoder,
+    decode_ack,
+    decode_frame,
+    encode_ack,
+    frame_seq,
+    max_detections,
+)
+
+LABELS = ("person", "car")
+
+
+def _detections(n, lat=45.42, lon=-75.69):
+    return [Detection(1_700_000_000.0 + i * 0.5, "person", i, lat + i * 1e-5, lon - i * 1e-5) for i in range(n)]
+
+
+def test_round_trip():
+    dets = _detections(3) + [Detection(1_700_000_002.0, "car", None, 45.4201, -75.6901)]
+    frames = FrameEncoder(7, 64, LABELS).encode(dets)
+    assert len(frames) == 1
+    decoded = decode_frame(frames[0][0], LABELS)
+    assert decoded.node_id == 7 and decoded.seq == 0
+    for got, want in zip(decoded.detections, dets):
+        assert got.label == want.label
+        assert got.track_id == want.track_id
+        assert got.ts == pytest.approx(want.ts, abs=0.05)
+        assert got.lat == pytest.approx(want.lat, abs=1e-6)
+        assert got.lon == pytest.approx(want.lon, abs=1e-6)
+
+
+def test_fills_payload_and_never_exceeds_it():
+    per_frame = max_detections(64)
+    frames = FrameEncoder(1, 64, LABELS).encode(_detections(per_frame * 2 + 1))
+    assert [count for _, count in frames] == [per_frame, per_frame, 1]
+    assert all(len(frame) <= 64 for frame, _ in frames)
+    assert len(frames[0][0]) == HEADER.size + per_frame * ENTRY.size
+
+
+def test_far_detection_starts_new_frame():
+    dets = _detections(1) + [Detection(1_700_000_001.0, "person", 9, 46.0, -75.69)]
+    frames = FrameEncoder(1, 64, LABELS).encode(dets)
+    assert [count for _, count in frames] == [1, 1]
+    seqs = [decode_frame(f, LABELS).seq for f, _ in frames]
+    assert seqs == [0, 1]
+
+
+def test_rejects_bad_frames():
+    frame, _ = FrameEncoder(1, 64, LABELS).encode(_detections(1))[0]
+    with pytest.raises(ValueError):
+        decode_frame(frame[:-1], LABELS)
+    with pytest.raises(ValueError):
+        decode_frame(b"\x09" + frame[1:], LABELS)
+
+
+def test_ack_round_trip():
+    frames = FrameEncoder(3, 64, LABELS).encode(_detections(10))
+    seqs = [frame_seq(frame) for frame, _ in frames]
+    assert seqs == list(range(len(frames)))
+    ack = decode_ack(encode_ack(3, seqs))
+    assert ack.node_id == 3
+    assert ack.seqs == seqs
+
+
+def test_decode_ack_rejects_data_frames():
+    frame, _ = FrameEncoder(1, 64, LABELS).encode(_detections(1))[0]
+    with pytest.raises(ValueError):
+        decode_ack(frame)
@@ -0,0 +1,205 @@
+# tests/test_gps_manager.py
+import queue
+import threading
+import time
+
+import pytest
+
+from core.gps.nmea import NMEAFramer, nmea_checksum
+
+GROUND_M = 40.0
+
+
+def sentence(body: str) -> bytes:
+    return f"${body}*{nmea_checksum(body.encode()):02X}\r\n".encode()
+
+
+def coord(value: float, degree_digits: int):
+    degrees = int(abs(value))
+    return f"{degrees:0{degree_digits}d}{(abs(value) - degrees) * 60:07.4f}"
+
+
+def fix_bytes(lat: float, lon: float, altitude: float, knots: float = 0.0, course: float = 0.0) -> bytes:
+    """GGA, RMC and GLL for one position; the GLL ends a read, as on the L76X."""
+    la, ns = coord(lat, 2), "N" if lat >= 0 else "S"
+    lo, ew = coord(lon, 3), "E" if lon >= 0 else "W"
+    return (sentence(f"GNGGA,120000.000,{la},{ns},{lo},{ew},1,09,0.95,{altitude:.1f},M,-34.1,M,,")
+            + sentence(f"GNRMC,120000.000,A,{la},{ns},{lo},{ew},{knots:.2f},{course:.1f},170326,,,A")
+            + sentence(f"GNGLL,{la},{ns},{lo},{ew},120000.000,A,A"))
+
+
+NO_FIX_GLL = sentence("GNGLL,,,,,120000.000,V,N")
+
+
+class FakeL76X:
+    """
+    Stands in for core.gps.L76X.L76X: frames UART bytes with the real NMEAFramer and sets
+    the same attributes get_gps_data() does (speed in km/h, as micropyGPS reports it).
+
+    Bytes queued with feed() are read first; after that the receiver keeps sending a
+    no-fix GLL every 10 ms, so a blocked read always ends. feed() an exception to make
+    the read raise.
+    """
+
+    SET_POS_FIX_400MS = "$PMTK220,400"
+    SET_NMEA_OUTPUT = "$PMTK314"
+    SET_HOT_START = "$PMTK101"
+
+    def __init__(self):
+        self.uart = queue.Queue()
+        self.framer = NMEAFramer()
+        self.commands = []
+        self.reads = 0
+        self.Lat = self.Lon = self.altitude = self.elevation_above_ground = 0.0
+        self.speed = self.course = 0.0
+        self.fix_quality = self.Status = 0
+
+    def L76X_Set_Baudrate(self, baudrate):
+        pass
+
+    def L76X_Send_Command(self, command):
+        self.commands.append(command)
+
+    def L76X_Exit_BackupMode(self):
+        pass
+
+    def feed(self, data):
+        self.uart.put(data)
+
+    def get_gps_data(self, elevation_data):
+        while True:
+            try:
+                chunk = self.uart.get(timeout=0.01)
+            except queue.Empty:
+                chunk = NO_FIX_GLL
+            if isinstance(chunk, Exception):
+                raise chunk
+            for s in self.framer.feed(chunk):
+                self._parse(s)
+                if s.startswith("$GNGLL"):
+                    self.reads += 1
+                    return
+
+    def _parse(self, s: str):
+        f = s.split("*")[0].split(",")
+        if f[0] == "$GNGGA" and f[2]:
+            self.Lat = (int(f[2][:2]) + float(f[2][2:]) / 60) * (1 if f[3] == "N" else -1)
+            self.Lon = (int(f[4][:3]) + float(f[4][3:]) / 60) * (1 if f[5] == "E" else -1)
+            self.fix_quality = int(f[6])
+            self.altitude = float(f[9])
+            self.elevation_above_ground = self.altitude - GROUND_M
+        elif f[0] == "$GNRMC":
+            self.Status = 1 if f[2] == "A" else 0
+            self.speed = float(f[7]) * 1.852
+            self.course = float(f[8])
+
+
+@pytest.fixture(scope="module")
+def gps_manager(stubbed):
+    from core.gps import gps_manager     # core.gps.L76X imports lgpio / serial / micropyGPS
+    return gps_manager
+
+
+@pytest.fixture
+def manager(gps_manager, monkeypatch):
+    monkeypatch.setattr(gps_manager.L76X, "L76X", FakeL76X)
+    m = gps_manager.GPSManager()
+    yield m
+    m.stop()
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_no_fix_before_the_first_sentence(gps_manager, monkeypatch):
+    class Silent(FakeL76X):
+        def get_gps_data(self, elevation_data):
+            time.sleep(0.01)
+            raise TimeoutError("no bytes")
+
+    monkeypatch.setattr(gps_manager.L76X, "L76X", Silent)
+    m = gps_manager.GPSManager()
+    try:
+        fix, age = m.get_fix()
+        assert fix == gps_manager.NO_FIX
+        assert age == float("inf")
+        assert not m.is_positioned
+    finally:
+        m.stop()
+
+
+def test_get_fix_is_an_immutable_snapshot_with_its_age(gps_manager, manager):
+    manager.gps.feed(fix_bytes(45.4201, -75.6903, 160.0, course=90.0))
+    assert wait_for(lambda: manager.get_fix()[0].positioned)
+    fix, age = manager.get_fix()
+    assert isinstance(fix, gps_manager.GPSFix)
+    assert fix.latitude == pytest.approx(45.4201, abs=1e-6)
+    assert fix.longitude == pytest.approx(-75.6903, abs=1e-6)
+    assert fix.altitude == 160.0
+    assert fix.elevation == 160.0 - GROUND_M
+    assert fix.fix_quality == 1
+    assert fix.course == 90.0
+    assert 0 <= age < 1.0
+    assert manager.get_current_location() == (fix.latitude, fix.longitude, fix.elevation)
+    with pytest.raises(AttributeError):
+        fix.latitude = 0.0
+
+    # the snapshot is not changed by later sentences, and its age keeps growing
+    manager.gps.feed(fix_bytes(46.0, -76.0, 200.0))
+    assert wait_for(lambda: manager.get_fix()[0].altitude == 200.0)
+    assert fix.altitude == 160.0
+    time.sleep(0.02)
+    assert fix.received_at is not None
+    assert time.monotonic() - fix.received_at > age
+
+
+def test_snapshots_are_consistent_while_the_reader_publishes(manager):
+    # fix i has altitude i and a latitude derived from i: a torn read would mismatch them
+    fixes = 200
+    errors = []
+    done = threading.Event()
+
+    def check():
+        while not done.is_set():
+            fix, _ = manager.get_fix()
+            if fix.positioned and fix.latitude != pytest.approx(45.0 + fix.altitude * 1e-4, abs=2e-6):
+                errors.append(fix)
+
+    checker = threading.Thread(target=check)
+    checker.start()
+    for i in range(1, fixes + 1):
+        manager.gps.feed(fix_bytes(45.0 + i * 1e-4, -75.0 - i * 1e-4, float(i)))
+    assert wait_for(lambda: manager.get_fix()[0].altitude == fixes)
+    done.set()
+    checker.join()
+    assert errors == []
+
+
+def test_stop_joins_the_reader(manager):
+    assert manager._reader.is_alive()
+    manager.stop(timeout=2.0)
+    assert not manager._reader.is_alive()
+
+
+def test_reader_survives_a_failing_serial_read(manager, caplog):
+    manager.gps.feed(OSError("UART overrun"))
+    manager.gps.feed(fix_bytes(45.5, -75.5, 120.0))
+    # the reader logs the error, backs off 0.5 s and reads on
+    assert wait_for(lambda: manager.get_fix()[0].altitude == 120.0, timeout=3.0)
+    assert "GPS read failed" in caplog.text
+    assert manager._reader.is_alive()
+
+
+def test_speed_is_metres_per_second(manager):
+    # RMC speed over ground is in knots; micropyGPS reports it in km/h, GPSFix in m/s
+    manager.gps.feed(fix_bytes(45.5, -75.5, 120.0, knots=10.0, course=270.0))
+    assert wait_for(lambda: manager.get_fix()[0].positioned)
+    fix, _ = manager.get_fix()
+    assert fix.speed == pytest.approx(10 * 1852 / 3600)     # 5.14 m/s
+    assert manager.get_speed_and_course() == (fix.speed, 270.0)
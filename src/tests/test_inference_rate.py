@@ -0,0 +1,96 @@
+# tests/test_inference_rate.py
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from utils.inference_rate import InferenceRateController
+
+FRAME_NS = 1_000_000_000 // 30
+
+
+def fix(speed, elevation, positioned=True):
+    return SimpleNamespace(speed=speed, elevation=elevation, positioned=positioned)
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def controller(clock=None, **kwargs):
+    args = dict(fov_deg=90.0, overlap=0.9, min_fps=2.0, max_fps=30.0, hold_sec=2.0)
+    args.update(kwargs)
+    return InferenceRateController(clock=clock or Clock(), **args)
+
+
+def test_target_rate_from_speed_elevation_and_overlap():
+    c = controller()
+    # 90 deg at 50 m: 100 m footprint; 10 m/s and 10% of it per frame -> 1 frame per second... floored at min_fps
+    assert c.footprint_m(50) == pytest.approx(100.0)
+    assert c.target_fps(10, 50) == 2.0
+    assert c.target_fps(50, 50) == pytest.approx(5.0)
+    assert c.target_fps(0, 50) == 2.0                   # hovering
+    assert c.target_fps(100, 5) == 30.0                 # fast and low: camera rate
+    assert c.target_fps(20, 0) == c.target_fps(20, 5)   # elevation floor when the ground is unknown
+    assert c.target_fps(20, 100) < c.target_fps(20, 50)
+
+
+def test_full_rate_without_a_usable_fix():
+    clock = Clock()
+    c = controller(clock)
+    c.update(fix(0, 50), 0.1)
+    clock.t = 3.0
+    assert c.update(fix(0, 50), 0.1) == 2.0
+    assert c.update(fix(0, 50, positioned=False), 0.1) == 30.0
+    assert c.update(fix(0, 50), 10.0) == 30.0           # stale
+
+
+def test_rate_rises_at_once_and_falls_after_hold():
+    clock = Clock()
+    c = controller(clock)
+    assert c.update(fix(0, 50), 0.0) == 30.0            # target lower: held
+    clock.t = 1.9
+    assert c.update(fix(0, 50), 0.0) == 30.0
+    clock.t = 2.1
+    assert c.update(fix(0, 50), 0.0) == 2.0
+    clock.t = 2.2
+    assert c.update(fix(50, 50), 0.0) == pytest.approx(5.0)
+    assert c.changes == 2
+
+
+def test_admit_spaces_frames_to_the_rate():
+    c = controller()
+    c.fps = 4.0
+    admitted = [i for i in range(300) if c.admit(i * FRAME_NS)]
+    assert len(admitted) == pytest.approx(40, abs=1)
+    assert max(b - a for a, b in zip(admitted, admitted[1:])) <= math.ceil(30 / 4)
+    assert c.stats()["skipped"] == 300 - len(admitted)
+    assert c.stats()["saved"] == pytest.approx(1 - len(admitted) / 300, abs=1e-3)
+
+
+def test_admit_every_frame_at_full_rate_and_after_a_restart():
+    c = controller()
+    assert all(c.admit(i * FRAME_NS + (i % 3) * 1000) for i in range(60))     # jitter does not drop frames
+    c.fps = 2.0
+    assert not c.admit(60 * FRAME_NS)
+    assert c.admit(0)                                   # source restarted: timestamps went back
+    assert not c.admit(FRAME_NS)
+
+
+def test_no_burst_after_a_gap():
+    c = controller()
+    c.fps = 5.0
+    c.admit(0)
+    assert c.admit(10 * 1_000_000_000)                  # 10 s without frames
+    assert not c.admit(10 * 1_000_000_000 + FRAME_NS)
+
+
+def test_rejects_bad_configuration():
+    with pytest.raises(ValueError):
+        controller(overlap=1.0)
+    with pytest.raises(ValueError):
+        controller(min_fps=40.0)
@@ -0,0 +1,61 @@
+# tests/test_link.py
+import threading
+import time
+
+from benchmarks.bench_lora_pipeline import make_radio
+from core.transmitter.frame_codec import decode_ack, encode_ack
+from core.transmitter.link import LinkManager
+from core.transmitter.scheduler import TxScheduler
+
+
+def send(radio, data):
+    radio.beginPacket()
+    radio.put(data)
+    radio.endPacket()
+    radio.wait()
+
+
+def test_window_queues_received_frames():
+    radio, chip = make_radio()
+    link = LinkManager(radio, rx_window_sec=0.3, rx_period_ms=10, sleep_period_ms=20)
+    chip.inject(encode_ack(1, [4, 5]))
+    chip.inject(encode_ack(1, [6]), crc_ok=False)
+    chip.inject(encode_ack(1, [7]))
+    start = time.monotonic()
+    link.listen_window()
+    assert time.monotonic() - start >= 0.3
+    assert [decode_ack(rx.payload).seqs for rx in link.drain()] == [[4, 5], [7]]
+    stats = link.stats()
+    assert stats["received"] == 2 and stats["rx_errors"] == 1
+    # the radio can transmit again after the window
+    send(radio, b"next")
+    assert chip.transmitted[-1] == b"next"
+
+
+def test_full_queue_drops_new_frames():
+    radio, chip = make_radio()
+    link = LinkManager(radio, rx_window_sec=0.2, rx_period_ms=10, sleep_period_ms=0, max_queue=1)
+    chip.inject(b"\x80\x01\x00\x00")
+    chip.inject(b"\x80\x01\x01\x00")
+    link.listen_window()
+    assert len(link.drain()) == 1
+    assert link.stats()["dropped"] == 1
+
+
+def test_scheduler_listens_after_each_batch():
+    radio, chip = make_radio()
+    chip.time_scale = 0.0
+    windows = []
+    done = threading.Event()
+
+    def on_idle():
+        windows.append(len(chip.transmitted))
+        done.set()
+
+    tx = TxScheduler(lambda data: send(radio, data), on_idle=on_idle)
+    for i in range(3):
+        tx.submit(bytes([i]) * 8)
+    tx.start()
+    assert done.wait(2)
+    tx.stop()
+    assert windows == [3]
@@ -0,0 +1,112 @@
+# tests/test_metrics.py
+import urllib.request
+
+import pytest
+
+from utils.metrics import Histogram, Metrics, MetricsServer
+
+
+def test_histogram_is_exact_for_small_values():
+    h = Histogram()
+    for v in range(1, 11):
+        h.record(v)
+    assert h.quantiles((0.5, 1.0)) == [5.0, 10.0]
+    assert h.mean() == pytest.approx(5.5)
+
+
+@pytest.mark.parametrize("value", [100, 1_234, 56_789, 9_876_543])
+def test_histogram_relative_error(value):
+    h = Histogram(sub_bits=6)
+    h.record(value - 1)     # keep the max from capping the estimate
+    h.record(value)
+    h.record(value * 4)
+    (p50,) = h.quantiles((0.5,))
+    assert abs(p50 - value) / value < 2 ** -5
+
+
+def test_histogram_clamps_out_of_range():
+    h = Histogram(sub_bits=4, max_bits=10)
+    h.record(-5)
+    h.record(10 ** 9)
+    assert h.max == 1023 and h.count == 2
+
+
+def test_disabled_registry_records_nothing():
+    m = Metrics(enabled=False)
+    with m.span("gps"):
+        pass
+    m.count("frames")
+    m.observe("tx", 0.1)
+    m.gauge("depth", 3)
+    assert m.span("a") is m.span("b")       # shared no-op
+    snap = m.snapshot()
+    assert snap["stages"] == {} and snap["counters"] == {} and snap["gauges"] == {}
+
+
+def test_spans_counters_and_gauges():
+    m = Metrics(enabled=True)
+    with m.span("gps"):
+        pass
+    m.observe("tx", 0.002)
+    m.count("frames", 3)
+    m.count("hailonet_frames", element="net")
+    m.add_collector(lambda reg: reg.gauge("queue_level_buffers", 2, queue="src_q"))
+    snap = m.snapshot()
+    assert snap["stages"]["gps"]["count"] == 1
+    assert snap["stages"]["tx"]["p50_ms"] == pytest.approx(2.0, rel=0.05)
+    assert snap["counters"][("frames", ())] == 3
+    assert snap["gauges"][("queue_level_buffers", (("queue", "src_q"),))] == 2
+
+
+def test_timed_decorator():
+    m = Metrics(enabled=False)
+
+    @m.timed("work")
+    def work(x):
+        return x * 2
+
+    assert work(2) == 4 and m.snapshot()["stages"] == {}
+    m.set_enabled(True)
+    assert work(3) == 6
+    assert m.snapshot()["stages"]["work"]["count"] == 1
+
+
+def test_prometheus_text():
+    m = Metrics(enabled=True, prefix="t_")
+    m.observe("gps", 0.00005)      # 50 us, an exact bucket
+    m.count("frames", 2)
+    m.gauge("queue_level_buffers", 1, queue="a_q")
+    text = m.render_prometheus()
+    assert "# TYPE t_stage_latency_seconds summary" in text
+    assert 't_stage_latency_seconds{stage="gps",quantile="0.5"} 5e-05' in text
+    assert 't_stage_latency_seconds_count{stage="gps"} 1' in text
+    assert "t_frames_total 2" in text
+    assert 't_queue_level_buffers{queue="a_q"} 1' in text
+
+
+def test_enabling_resets_and_summary_reports_rates():
+    m = Metrics(enabled=True)
+    m.count("frames", 5)
+    m.set_enabled(False)
+    m.set_enabled(True)
+    assert m.snapshot()["counters"] == {}
+    m.count("frames", 5)
+    m.observe("gps", 0.001)
+    line = m.summary_line()
+    assert "frames=" in line and "gps=1.00/1.00ms" in line
+
+
+def test_http_endpoint_serves_and_toggles():
+    m = Metrics(enabled=True)
+    m.count("frames")
+    server = MetricsServer(m, port=0).start()
+    base = f"http://127.0.0.1:{server.port}"
+    try:
+        body = urllib.request.urlopen(f"{base}/metrics", timeout=5).read().decode()
+        assert "tails_frames_total 1" in body
+        urllib.request.urlopen(urllib.request.Request(f"{base}/disable", method="POST"), timeout=5)
+        assert not m.enabled
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{base}/nope", timeout=5)
+    finally:
+        server.stop()
@@ -0,0 +1,142 @@
+# tests/test_nmea.py
+import pytest
+
+from core.gps.nmea import NMEAFramer, dispatch_sentence, nmea_checksum
+
+GLL = "$GNGLL,4525.1234,N,07541.5678,W,120000.000,A,A*"
+GGA = "$GNGGA,120000.000,4525.1234,N,07541.5678,W,1,09,0.95,102.3,M,-34.1,M,,*"
+RMC = "$GNRMC,120000.000,A,4525.1234,N,07541.5678,W,10.00,270.0,170326,,,A*"
+
+
+def sentence(prefix: str) -> str:
+    """Complete a '$...*' prefix with its checksum."""
+    return f"{prefix}{nmea_checksum(prefix[1:-1].encode()):02X}"
+
+
+def stream(*sentences) -> bytes:
+    return "".join(s + "\r\n" for s in sentences).encode()
+
+
+def test_checksum_known_value():
+    # PMTK command from the L76X manual: $PMTK220,1000*1F
+    assert nmea_checksum(b"PMTK220,1000") == 0x1F
+
+
+def test_feed_returns_complete_sentences():
+    gll, gga = sentence(GLL), sentence(GGA)
+    framer = NMEAFramer()
+    assert framer.feed(stream(gga, gll)) == [gga, gll]
+    assert framer.sentences == 2
+
+
+def test_sentences_split_across_reads():
+    gll, gga = sentence(GLL), sentence(GGA)
+    data = stream(gga, gll)
+    framer = NMEAFramer()
+    out = []
+    for i in range(0, len(data), 7):
+        out += framer.feed(data[i:i + 7])
+    assert out == [gga, gll]
+
+
+def test_bad_checksum_is_dropped():
+    gll = sentence(GLL)
+    corrupted = gll.replace("4525", "4526")
+    framer = NMEAFramer()
+    assert framer.feed(stream(corrupted, gll)) == [gll]
+    assert framer.bad_checksum == 1
+
+
+def test_missing_checksum_is_dropped():
+    framer = NMEAFramer()
+    assert framer.feed(b"$GNGLL,4525.1234,N\r\n") == []
+    assert framer.bad_checksum == 1
+
+
+def test_resyncs_on_truncated_sentence():
+    gll = sentence(GLL)
+    framer = NMEAFramer()
+    # the first sentence lost its tail, so the next '$' starts before any line ending
+    assert framer.feed(b"$GNGGA,1200" + stream(gll)) == [gll]
+    assert framer.dropped == 1
+
+
+def test_leading_garbage_and_overflow():
+    gll = sentence(GLL)
+    framer = NMEAFramer(max_sentence=100)
+    assert framer.feed(b"\x00\xff" + b"$" + b"A" * 200) == []
+    assert framer.dropped == 1
+    assert framer.feed(stream(gll)) == [gll]
+
+
+class TableParser:
+    """Mimics the MicropyGPS handler table."""
+
+    def __init__(self):
+        self.gps_segments = []
+        self.clean_sentences = 0
+        self.parsed_sentences = 0
+        self.seen = []
+        self.supported_sentences = {"GNGLL": TableParser.gll}
+
+    def gll(self):
+        self.seen.append(list(self.gps_segments))
+        return True
+
+
+def test_dispatch_uses_handler_table():
+    gll = sentence(GLL)
+    parser = TableParser()
+    assert dispatch_sentence(parser, gll) == "GNGLL"
+    assert parser.seen == [["GNGLL", "4525.1234", "N", "07541.5678", "W", "120000.000", "A", "A", gll[-2:]]]
+    assert parser.clean_sentences == 1 and parser.parsed_sentences == 1
+    assert dispatch_sentence(parser, sentence(GGA)) is None
+
+
+def test_dispatch_falls_back_to_char_feed():
+    class CharParser:
+        def __init__(self):
+            self.chars = []
+
+        def update(self, ch):
+            self.chars.append(ch)
+            return "GNGLL" if ch == "\n" else None
+
+    gll = sentence(GLL)
+    parser = CharParser()
+    assert dispatch_sentence(parser, gll) == "GNGLL"
+    assert "".join(parser.chars) == gll + "\r\n"
+
+
+def real_micropygps():
+    """The MicropyGPS class, skipping where only the replay placeholder module is importable."""
+    module = pytest.importorskip("micropyGPS")
+    cls = getattr(module, "MicropyGPS", None)
+    if not isinstance(cls, type):
+        pytest.skip("micropyGPS is not installed")
+    return cls
+
+
+def test_dispatch_into_real_micropygps():
+    # dispatch_sentence writes MicropyGPS's parser state directly: check it against the library
+    MicropyGPS = real_micropygps()
+    sentences = [sentence(GGA), sentence(RMC), sentence(GLL)]
+    parser = MicropyGPS()
+    assert [dispatch_sentence(parser, s) for s in sentences] == ["GNGGA", "GNRMC", "GNGLL"]
+
+    assert parser.latitude == [45, 25.1234, "N"]
+    assert parser.longitude == [75, 41.5678, "W"]
+    assert parser.altitude == pytest.approx(102.3)
+    assert parser.fix_stat == 1
+    assert parser.valid
+    assert parser.speed[0] == pytest.approx(10.0)               # knots
+    assert parser.speed[2] == pytest.approx(18.52)              # km/h, what L76X publishes
+    assert parser.course == pytest.approx(270.0)
+
+    # same state as the library's own character-by-character parser
+    reference = MicropyGPS()
+    for ch in "".join(s + "\r\n" for s in sentences):
+        reference.update(ch)
+    for field in ("latitude", "longitude", "altitude", "speed", "course", "fix_stat", "valid", "timestamp"):
+        assert getattr(parser, field) == getattr(reference, field), field
+    assert parser.parsed_sentences == reference.parsed_sentences
@@ -0,0 +1,55 @@
+# tests/test_picamera_source.py
+import cv2
+import numpy as np
+import pytest
+
+from core.vision.picamera_source import SensorTimestamps, copy_frame, frame_view, lores_conversion, rgb_stride
+
+
+def padded_frame(width, height, row_bytes, seed=0):
+    """A camera buffer: rows of row_bytes with the pixels in the first width * 3."""
+    return np.random.default_rng(seed).integers(0, 256, (height, row_bytes), dtype=np.uint8)
+
+
+def gst_rows(dst, stride, width, height):
+    return np.frombuffer(dst, dtype=np.uint8).reshape(height, stride)[:, :width * 3].reshape(height, width, 3)
+
+
+def test_rgb_stride_pads_rows_to_four_bytes():
+    assert rgb_stride(1280) == 3840
+    assert rgb_stride(641) == 1924
+
+
+@pytest.mark.parametrize("width", [640, 641])
+def test_copy_frame_between_padded_strides(width):
+    height = 4
+    camera = padded_frame(width, height, 2048)
+    src = frame_view(camera, width)
+    assert np.shares_memory(src, camera)
+    stride = rgb_stride(width)
+    dst = bytearray(stride * height)
+
+    copy_frame(dst, stride, src)
+    np.testing.assert_array_equal(gst_rows(dst, stride, width, height), src)
+
+    copy_frame(dst, stride, src, lores_conversion("RGB888"))
+    np.testing.assert_array_equal(gst_rows(dst, stride, width, height), src[..., ::-1])
+
+
+def test_lores_formats():
+    assert lores_conversion("BGR888") is None        # R, G, B in memory
+    assert lores_conversion("RGB888") == cv2.COLOR_BGR2RGB
+    with pytest.raises(ValueError):
+        lores_conversion("YUV420")
+
+
+def test_sensor_timestamps():
+    ts = SensorTimestamps()
+    # exposed 20 ms ago, pipeline running for 1 s
+    assert ts.pts(9_980_000_000, 10_000_000_000, 1_000_000_000) == 980_000_000
+    # a frame 33 ms later keeps the sensor's spacing
+    assert ts.pts(10_013_333_333, 10_040_000_000, 1_040_000_000) == 1_013_333_333
+    # no SensorTimestamp: capture time; never before the start or the previous frame
+    assert ts.pts(None, 10_050_000_000, 1_050_000_000) == 1_050_000_000
+    assert ts.pts(10_000_000_000, 10_060_000_000, 1_060_000_000) == 1_050_000_001
+    assert SensorTimestamps().pts(1_000, 5_000_000_000, 1_000_000) == 0
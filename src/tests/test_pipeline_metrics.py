@@ -0,0 +1,61 @@
+# tests/test_pipeline_metrics.py
+import threading
+
+import pytest
+
+from replay import stubs
+from utils.metrics import Metrics
+
+
+@pytest.fixture(scope="module")
+def pipeline_metrics(stubbed):
+    from core.vision import pipeline_metrics     # probes Gst buffers
+    return pipeline_metrics
+
+
+def probe(pts):
+    return stubs.ProbeInfo(stubs.Buffer(None, pts=pts))
+
+
+def test_start_and_stop_from_two_threads(pipeline_metrics):
+    metrics = Metrics(enabled=True)
+    clock = pipeline_metrics._PtsClock(metrics, "stage")
+    frames = 5 * pipeline_metrics.MAX_IN_FLIGHT      # enough to keep evicting while the other thread stops
+    errors = []
+
+    def run(fn):
+        try:
+            for pts in range(frames):
+                fn(None, probe(pts))
+        except Exception as e:      # an exception in a pad probe would break the stream
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(clock.start,)), threading.Thread(target=run, args=(clock.stop,))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(clock._started) <= pipeline_metrics.MAX_IN_FLIGHT + 1
+    assert metrics.snapshot()["stages"].get("stage", {"count": 0})["count"] <= frames
+
+
+def test_buffers_sharing_a_pts_are_matched_in_order(pipeline_metrics, monkeypatch):
+    metrics = Metrics(enabled=True)
+    clock = pipeline_metrics._PtsClock(metrics, "hailonet")
+    now = iter([0, 1_000_000, 2_000_000, 5_000_000, 5_000_000, 5_000_000])
+    monkeypatch.setattr(pipeline_metrics.time, "perf_counter_ns", lambda: next(now))
+
+    for _ in range(3):              # three tiles of the frame at pts 40 ms
+        clock.start(None, probe(40_000_000))
+    for _ in range(3):
+        clock.stop(None, probe(40_000_000))
+
+    stage = metrics.snapshot()["stages"]["hailonet"]
+    assert stage["count"] == 3
+    assert stage["max_ms"] == 5.0   # the first tile in is the first out
+    assert clock._started == {}
+    # a stop without a start is ignored
+    clock.stop(None, probe(40_000_000))
+    assert metrics.snapshot()["stages"]["hailonet"]["count"] == 3
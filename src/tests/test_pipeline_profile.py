@@ -0,0 +1,130 @@
+# tests/test_pipeline_profile.py
+import json
+import re
+
+import pytest
+
+from core.vision.hailo_apps_infra.gstreamer_helper_pipelines import INFERENCE_PIPELINE, TILED_INFERENCE_PIPELINE
+from replay import stubs
+
+
+@pytest.fixture(scope="module")
+def pipeline_profile(stubbed):
+    from core.vision import pipeline_profile     # walks Gst pipelines
+    return pipeline_profile
+
+
+class Factory:
+    def __init__(self, name):
+        self._name = name
+
+    def get_name(self):
+        return self._name
+
+
+class Element:
+    def __init__(self, name, kind, **props):
+        self._name = name
+        self._factory = Factory(kind)
+        self.props = props
+
+    def get_name(self):
+        return self._name
+
+    def get_factory(self):
+        return self._factory
+
+    def get_property(self, name):
+        return self.props[name]
+
+    def set_property(self, name, value):
+        self.props[name] = value
+
+
+class Iterator:
+    def __init__(self, elements):
+        self._elements = list(elements)
+
+    def next(self):
+        if self._elements:
+            return stubs.IteratorResult.OK, self._elements.pop(0)
+        return stubs.IteratorResult.DONE, None
+
+
+class Pipeline:
+    def __init__(self, *elements):
+        self.elements = elements
+
+    def iterate_recurse(self):
+        return Iterator(self.elements)
+
+
+def test_missing_file_is_the_untuned_profile(pipeline_profile, tmp_path):
+    assert pipeline_profile.load_profile(str(tmp_path / "none.json")) == pipeline_profile.PipelineProfile()
+
+
+def test_roundtrip_keeps_measurements_out_of_the_profile(pipeline_profile, tmp_path):
+    path = str(tmp_path / "profile.json")
+    pipeline_profile.save_profile(path, pipeline_profile.PipelineProfile(batch_size=4, queue_buffers=6), {"fps": 29.9})
+    data = json.loads(open(path).read())
+    assert data == {"batch_size": 4, "queue_buffers": 6, "measured": {"fps": 29.9}}
+    assert pipeline_profile.load_profile(path) == pipeline_profile.PipelineProfile(batch_size=4, queue_buffers=6)
+
+
+def test_bad_values_are_ignored(pipeline_profile, tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps({"batch_size": 0, "scale_threads": "2", "convert_threads": 3}))
+    assert pipeline_profile.load_profile(str(path)) == pipeline_profile.PipelineProfile(convert_threads=3)
+    path.write_text("{not json")
+    assert pipeline_profile.load_profile(str(path)) == pipeline_profile.PipelineProfile()
+
+
+def test_apply_only_touches_default_queues_and_converters(pipeline_profile):
+    default_q = Element("inference_scale_q", "queue", **{"max-size-buffers": 3, "leaky": 0})
+    bypass_q = Element("inference_wrapper_bypass_q", "queue", **{"max-size-buffers": 20, "leaky": 0})
+    leaky_q = Element("recording_q", "queue", **{"max-size-buffers": 3, "leaky": 2})
+    scale = Element("inference_videoscale", "videoscale", **{"n-threads": 2})
+    convert = Element("source_convert", "videoconvert", **{"n-threads": 3})
+    hailonet = Element("inference_hailonet", "hailonet", **{"batch-size": 8})
+    pipeline = Pipeline(default_q, bypass_q, leaky_q, scale, convert, hailonet)
+
+    tuned = pipeline_profile.PipelineProfile(batch_size=2, queue_buffers=6, scale_threads=4)
+    changed = pipeline_profile.apply_pipeline_profile(pipeline, tuned)
+    assert changed == 2
+    assert default_q.props["max-size-buffers"] == 6
+    assert bypass_q.props["max-size-buffers"] == 20 and leaky_q.props["max-size-buffers"] == 3
+    assert scale.props["n-threads"] == 4
+    assert convert.props["n-threads"] == 3          # not in the profile
+    assert hailonet.props["batch-size"] == 8        # batch size goes into the pipeline string
+
+
+def queues_of(pipeline_string):
+    """The queue elements a pipeline string would parse into, with the properties QUEUE() sets."""
+    return [Element(name, "queue", **{"max-size-buffers": int(size), "leaky": 0 if leaky == "no" else 2})
+            for name, leaky, size in re.findall(r"queue name=(\S+) leaky=(\S+) max-size-buffers=(\d+) ", pipeline_string)]
+
+
+def test_tile_bypass_queue_keeps_its_size(pipeline_profile):
+    inner = INFERENCE_PIPELINE(hef_path="m.hef", post_process_so="post.so", batch_size=2)
+    queues = queues_of(TILED_INFERENCE_PIPELINE(inner, 3, 2, batch_size=2))
+    bypass = next(q for q in queues if q.get_name() == "tile_bypass_q")
+    assert bypass.props["max-size-buffers"] == 3        # the same as an untouched queue: not told apart by size
+
+    pipeline_profile.apply_pipeline_profile(Pipeline(*queues), pipeline_profile.PipelineProfile(queue_buffers=1))
+    assert bypass.props["max-size-buffers"] == 3
+    others = [q for q in queues if q is not bypass]
+    assert others and all(q.props["max-size-buffers"] == 1 for q in others)
+
+
+def test_best_configuration_trades_a_little_fps_for_latency(pipeline_profile):
+    from core.vision.autotune import choose_best
+
+    results = [
+        (pipeline_profile.PipelineProfile(8, 3, 2, 2), {"fps": 30.0, "latency_p50_ms": 120.0, "cpu": 1.5}),
+        (pipeline_profile.PipelineProfile(4, 3, 2, 2), {"fps": 29.5, "latency_p50_ms": 70.0, "cpu": 1.6}),
+        (pipeline_profile.PipelineProfile(1, 3, 2, 2), {"fps": 22.0, "latency_p50_ms": 30.0, "cpu": 1.2}),
+        (pipeline_profile.PipelineProfile(2, 6, 1, 1), {"error": "not negotiated"}),
+    ]
+    assert choose_best(results, fps_tolerance=0.03)[0].batch_size == 4
+    assert choose_best(results, fps_tolerance=0.0)[0].batch_size == 8
+    assert choose_best(results[3:], fps_tolerance=0.03) is None
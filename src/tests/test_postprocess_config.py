@@ -0,0 +1,38 @@
+# tests/test_postprocess_config.py
+import json
+
+import pytest
+
+from replay.recording import synthesize
+
+
+@pytest.fixture(scope="module")
+def write_postprocess_config(stubbed):
+    from core.vision.hailo_apps_infra.detection_pipeline import write_postprocess_config     # imports gi and hailo
+    return write_postprocess_config
+
+
+def test_config_matches_the_postprocess_schema(write_postprocess_config, tmp_path):
+    path = write_postprocess_config({"person", "car"}, 0.7, 0.3, path=str(tmp_path / "pp.json"))
+    config = json.loads(open(path).read())
+    assert config == {"detection_threshold": 0.3, "allowed_labels": ["car", "person"], "min_confidence": 0.7}
+    assert "labels" not in config       # the postprocess falls back to COCO
+
+
+def test_temporary_config_file(write_postprocess_config):
+    path = write_postprocess_config(set(), 0.5, 0.3)
+    assert json.loads(open(path).read())["allowed_labels"] == []
+
+
+def test_prefiltered_frames_store_the_same_detections(stubbed):
+    from benchmarks.bench_prefilter import prefilter
+    from replay.harness import run_replay
+
+    raw, fixes = synthesize(10, clutter=15)
+    filtered = prefilter(raw, {"person"}, 0.7)
+    assert all(d.label == "person" and d.confidence >= 0.7 for fr in filtered for d in fr.detections)
+    assert sum(map(len, (fr.detections for fr in raw))) > 3 * sum(map(len, (fr.detections for fr in filtered)))
+
+    before, after = run_replay(raw, fixes, epoch=1_700_000_000), run_replay(filtered, fixes, epoch=1_700_000_000)
+    assert before["detections_stored"] == after["detections_stored"] > 0
+    assert before["lora"]["detections"] == after["lora"]["detections"]
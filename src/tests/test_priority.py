@@ -0,0 +1,77 @@
+# tests/test_priority.py
+import numpy as np
+import pytest
+
+from utils.distance_utils import haversine_m, haversine_m_array
+from utils.priority import PriorityWeights, ReportLog, chunks_by_priority, order_by_priority, priority_scores
+
+WEIGHTS = PriorityWeights()
+
+
+def test_new_tracks_outrank_resightings():
+    log = ReportLog()
+    log.reported(np.array([1]), np.array([45.0]), np.array([-75.0]), ts=0.0)
+    ids = np.array([1, 2, 1])
+    lat = np.array([45.0, 45.0, 45.001])     # row 2 moved about 111 m
+    lon = np.full(3, -75.0)
+    scores = priority_scores(log.is_new(ids), np.full(3, 0.8), log.moved_m(ids, lat, lon),
+                             np.zeros(3), WEIGHTS, 50.0, 300.0)
+    assert list(order_by_priority(scores, np.arange(3.0))) == [1, 2, 0]
+
+
+def test_age_and_confidence_break_ties():
+    scores = priority_scores(np.zeros(3, bool), np.array([0.7, 0.9, 0.9]), np.zeros(3),
+                             np.array([0.0, 0.0, 30.0]), WEIGHTS, 50.0, 300.0)
+    assert list(order_by_priority(scores, np.arange(3.0))) == [1, 2, 0]
+
+
+def test_untracked_rows_count_as_new():
+    log = ReportLog()
+    log.reported(np.array([-1]), np.array([45.0]), np.array([-75.0]), ts=0.0)
+    assert list(log.is_new(np.array([-1]))) == [True]
+
+
+def test_chunks_are_in_timestamp_order():
+    ts = np.array([5.0, 1.0, 3.0, 2.0, 4.0])
+    order = np.array([0, 4, 2, 1, 3])
+    chunks = list(chunks_by_priority(order, ts, 2))
+    assert [list(c) for c in chunks] == [[4, 0], [1, 2], [3]]
+
+
+def test_time_to_first_report():
+    log = ReportLog()
+    log.seen(7, 10.0)
+    log.seen(7, 11.0)
+    log.seen(8, 12.0)
+    log.reported(np.array([7]), np.array([45.0]), np.array([-75.0]), ts=13.0)
+    log.seen(7, 14.0)            # already reported: no new clock
+    stats = log.stats()
+    assert stats["first_reports"] == 1 and stats["waiting"] == 1
+    assert stats["ttfr_max_s"] == pytest.approx(3.0)
+
+
+def test_haversine_array_matches_scalar():
+    lat2 = np.array([45.0, 45.01, 44.5])
+    lon2 = np.array([-75.0, -75.02, -74.0])
+    expected = [haversine_m(45.0, -75.0, a, b) for a, b in zip(lat2, lon2)]
+    assert haversine_m_array(45.0, -75.0, lat2, lon2) == pytest.approx(expected)
+
+
+def test_expire_forgets_tracks_without_stored_rows():
+    log = ReportLog()
+    log.seen(1, 0.0)
+    log.seen(2, 0.0)
+    log.reported(np.array([1]), np.array([45.0]), np.array([-75.0]), ts=1.0)
+    log.seen(3, 5.0)
+    assert log.expire(cutoff=2.0) == 2
+    assert list(log.is_new(np.array([1, 3]))) == [True, True]
+    stats = log.stats()
+    assert stats["tracks"] == 1 and stats["waiting"] == 1 and stats["never_reported"] == 1
+
+
+def test_max_tracks_caps_the_log():
+    log = ReportLog(max_tracks=3)
+    for i in range(10):
+        log.seen(i, float(i))
+    assert len(log) == 3
+    assert log.stats()["never_reported"] == 7
@@ -0,0 +1,99 @@
+# tests/test_recording_pipeline.py
+import pytest
+
+from core.vision.hailo_apps_infra.gstreamer_helper_pipelines import RECORDING_PIPELINE
+
+
+@pytest.fixture(scope="module")
+def detection_pipeline(stubbed):
+    from core.vision.hailo_apps_infra import detection_pipeline     # imports gi and hailo
+    return detection_pipeline
+
+
+class ElementFactory:
+    installed = set()
+
+    @classmethod
+    def find(cls, name):
+        return name if name in cls.installed else None
+
+
+@pytest.fixture
+def encoders(detection_pipeline, monkeypatch):
+    monkeypatch.setattr(detection_pipeline.Gst, "ElementFactory", ElementFactory, raising=False)
+    ElementFactory.installed = set()
+    return ElementFactory.installed
+
+
+def make_app(detection_pipeline, tmp_path, record_mode="pipeline"):
+    """A GStreamerDetectionApp with just the attributes get_pipeline_string() reads."""
+    cls = detection_pipeline.GStreamerDetectionApp
+    app = cls.__new__(cls)
+    app.video_source = str(tmp_path / "flight.mp4")
+    app.video_width, app.video_height = 1280, 720
+    app.tile_plan = None
+    app.hef_path, app.post_process_so, app.post_function_name = "m.hef", "post.so", "filter_letterbox"
+    app.batch_size, app.labels_json, app.thresholds_str = 8, None, ""
+    app.video_sink, app.sync, app.show_fps = "fakesink", "false", False
+    app.record_mode = record_mode
+    app.recordings_dir = str(tmp_path / "recordings")
+    app.record_fps, app.record_rotate_sec, app.record_encoder = 20.0, 30, None
+    return app
+
+
+def test_segments_and_location():
+    s = RECORDING_PIPELINE("/data/rec", segment_sec=45, fps=20)
+    assert "splitmuxsink name=recording_sink muxer-factory=matroskamux " in s
+    assert "max-size-time=45000000000 " in s
+    assert 'location="/data/rec/recording_%05d.mkv"' in s
+    # a keyframe every 2 s, so segments split close to segment_sec
+    assert "key-int-max=40 " in s
+    assert "videorate name=recording_videorate drop-only=true max-rate=20 " in s
+
+
+def test_branch_starts_with_a_leaky_queue():
+    s = RECORDING_PIPELINE("/data/rec", max_size_buffers=4)
+    assert s.startswith("queue name=recording_q leaky=downstream max-size-buffers=4 ")
+    assert "queue name=recording_encoder_q leaky=downstream max-size-buffers=4 " in s
+
+
+def test_encoder_strings():
+    hw = RECORDING_PIPELINE("/data/rec", fps=20, encoder="v4l2h264enc", bitrate=3000)
+    assert "v4l2h264enc name=recording_encoder " in hw
+    assert "video_bitrate=3000000,h264_i_frame_period=40" in hw
+    assert "x264enc" not in hw
+    sw = RECORDING_PIPELINE("/data/rec", encoder="x264enc", bitrate=3000)
+    assert "x264enc name=recording_encoder speed-preset=ultrafast tune=zerolatency bitrate=3000 " in sw
+
+
+def test_encoder_fallback_order(detection_pipeline, encoders):
+    select = detection_pipeline.GStreamerDetectionApp.select_record_encoder
+    assert select(None) is None
+    encoders.add("x264enc")
+    assert select(None) == "x264enc"
+    encoders.add("v4l2h264enc")
+    assert select(None) == "v4l2h264enc"
+
+
+def test_recording_branch_tees_after_the_callback(detection_pipeline, tmp_path, encoders):
+    encoders.add("v4l2h264enc")
+    app = make_app(detection_pipeline, tmp_path)
+    s = app.get_pipeline_string()
+    assert app.record_encoder == "v4l2h264enc"
+    _, _, rest = s.partition("identity name=identity_callback")
+    assert rest.split()[:4] == ["!", "tee", "name=recording_tee", "recording_tee."]
+    assert "recording_tee. ! queue name=recording_q leaky=downstream" in s
+    assert (tmp_path / "recordings").is_dir()
+
+
+def test_no_encoder_falls_back_to_opencv_recording(detection_pipeline, tmp_path, encoders):
+    app = make_app(detection_pipeline, tmp_path)
+    s = app.get_pipeline_string()
+    assert app.record_mode == "opencv"
+    assert "recording_tee" not in s and "splitmuxsink" not in s
+
+
+def test_recording_off(detection_pipeline, tmp_path, encoders):
+    encoders.add("x264enc")
+    s = make_app(detection_pipeline, tmp_path, record_mode="off").get_pipeline_string()
+    assert "splitmuxsink" not in s
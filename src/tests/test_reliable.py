@@ -0,0 +1,129 @@
+# tests/test_reliable.py
+import random
+
+import pytest
+
+from core.transmitter.frame_codec import Detection, FrameEncoder, decode_frame
+from core.transmitter.reliable import ReliableSender, SelectiveRepeatReceiver
+
+LABELS = ("person",)
+AIRTIME_MS = 50.0
+ACK_WAIT = 0.5
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def make_frames(n):
+    encoder = FrameEncoder(1, 25, LABELS)       # one detection per frame
+    dets = [Detection(1_700_000_000 + i, "person", i, 45.0, -75.0) for i in range(n)]
+    return [frame for frame, _ in encoder.encode(dets)]
+
+
+def make_sender(clock, window=4, max_tries=3):
+    return ReliableSender(window, max_tries, lambda n: AIRTIME_MS, ACK_WAIT, clock=clock)
+
+
+def test_rto_covers_airtime_and_ack_window():
+    sender = make_sender(Clock())
+    assert sender.rto(30) == pytest.approx(2 * AIRTIME_MS / 1000 + ACK_WAIT)
+    assert sender.rto(30, tries=3) == pytest.approx(4 * sender.rto(30))
+
+
+def test_window_bounds_outstanding_frames():
+    clock = Clock()
+    sender = make_sender(clock, window=2)
+    frames = make_frames(3)
+    assert sender.add(frames[0], 0) and sender.add(frames[1], 1)
+    assert not sender.add(frames[2], 2)
+    assert sender.room() == 0
+    assert sender.on_ack([1]) == [1]
+    assert sender.add(frames[2], 2)
+
+
+def test_only_expired_unacked_frames_are_resent():
+    clock = Clock()
+    sender = make_sender(clock)
+    frames = make_frames(3)
+    for i, frame in enumerate(frames):
+        sender.add(frame, i)
+        sender.on_sent(frame)
+    # nothing is due before the timer runs out
+    assert sender.due() == []
+    sender.on_ack([0, 2])
+    clock.t += sender.rto(len(frames[1]))
+    assert sender.due() == [frames[1]]
+    # queued for retransmission: not offered again until it is sent
+    clock.t += 10
+    assert sender.due() == []
+    sender.on_sent(frames[1])
+    clock.t += sender.rto(len(frames[1]), tries=2)
+    assert sender.due() == [frames[1]]
+    sender.on_sent(frames[1])
+    clock.t += 100
+    assert sender.due() == []       # third try was the last
+    stats = sender.stats()
+    assert stats["acked"] == 2 and stats["failed"] == 1 and stats["retransmissions"] == 2
+
+
+def test_deferred_frame_is_offered_again():
+    clock = Clock()
+    sender = make_sender(clock)
+    frame = make_frames(1)[0]
+    sender.add(frame)
+    sender.on_sent(frame)
+    clock.t += 10
+    assert sender.due() == [frame]
+    sender.defer(frame)
+    assert sender.due() == [frame]
+    assert sender.stats()["retransmissions"] == 1
+
+
+def test_receiver_drops_duplicates():
+    rx = SelectiveRepeatReceiver(history=2)
+    assert rx.accept(1, 5) and not rx.accept(1, 5)
+    assert rx.accept(2, 5)
+    assert rx.accept(1, 6)
+    assert rx.accept(1, 5)          # forgotten after history newer frames
+
+
+@pytest.mark.parametrize("loss", [0.0, 0.2, 0.4])
+def test_lossy_channel_delivers_every_frame_once(loss):
+    rng = random.Random(1)
+    clock = Clock()
+    sender = make_sender(clock, window=8, max_tries=20)
+    receiver = SelectiveRepeatReceiver()
+    frames = make_frames(100)
+    delivered = []
+    backlog = list(frames)
+    while (backlog or sender.stats()["in_flight"]) and clock.t < 600:
+        # one batch: retransmissions first, then new frames while the window has room
+        batch = sender.due()
+        while backlog and sender.add(backlog[0]):
+            batch.append(backlog.pop(0))
+        acks = []
+        for frame in batch:
+            clock.t += AIRTIME_MS / 1000
+            sender.on_sent(frame)
+            if rng.random() < loss:
+                continue
+            decoded = decode_frame(frame, LABELS)
+            if receiver.accept(decoded.node_id, decoded.seq):
+                delivered.extend(d.track_id for d in decoded.detections)
+            if rng.random() >= loss:
+                acks.append(decoded.seq)
+        # RX window after the batch
+        clock.t += ACK_WAIT
+        sender.on_ack(acks)
+        clock.t += 1.0
+    assert sorted(delivered) == list(range(100))
+    stats = sender.stats()
+    assert stats["delivery_ratio"] == 1.0
+    assert stats["acked"] == 100
+    assert (stats["retransmissions"] > 0) == (loss > 0)
+    assert stats["efficiency"] <= 1.0
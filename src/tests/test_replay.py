@@ -0,0 +1,102 @@
+# tests/test_replay.py
+import sys
+import time
+import types
+
+import pytest
+
+from core.gps.nmea import nmea_checksum
+from replay import stubs
+from replay.recording import (DetectionRecorder, RecordedDetection, RecordedFrame, read_detections, read_nmea,
+                              synthesize, write_detections)
+
+
+@pytest.fixture(scope="module")
+def harness(stubbed):
+    from replay import harness     # imports main
+    return harness
+
+
+def sentence(body: str) -> str:
+    return f"${body}*{nmea_checksum(body.encode()):02X}\r\n"
+
+
+def test_stubs_leave_installed_modules_alone(monkeypatch):
+    real = types.ModuleType("hailo")
+    monkeypatch.setitem(sys.modules, "hailo", real)
+    before = dict(sys.modules)
+    previous = stubs.install()
+    assert sys.modules["hailo"] is real and "hailo" not in previous
+    assert all(sys.modules[name] is not before.get(name) for name in previous)
+    stubs.uninstall(previous)
+    assert all(sys.modules.get(name) is before.get(name) for name in previous)
+
+
+def test_nmea_fixes_on_the_recording_timeline(tmp_path):
+    log = tmp_path / "flight.nmea"
+    log.write_text(
+        sentence("GNGGA,235959.000,4525.2900,N,07541.8320,W,1,09,0.95,150.0,M,-34.1,M,,")
+        + sentence("GNRMC,235959.000,A,4525.2900,N,07541.8320,W,10.0,90.0,170326,,,A")
+        + "garbage\r\n"
+        + sentence("GNGGA,000001.000,4525.3000,N,07541.8320,W,1,09,0.95,152.0,M,-34.1,M,,")
+    )
+    fixes = read_nmea(str(log))
+    assert [f.t for f in fixes] == [0.0, 2.0]            # across midnight
+    first = fixes[0]
+    assert first.latitude == pytest.approx(45.421500)
+    assert first.longitude == pytest.approx(-75.697200)
+    assert first.speed == pytest.approx(5.14444)
+    assert first.positioned and first.fix_quality == 1
+    assert fixes[1].altitude == 152.0 and fixes[1].speed == first.speed     # carried over
+
+
+def test_detections_roundtrip(tmp_path):
+    frames = [
+        RecordedFrame(0.0, [RecordedDetection("person", 0.9, (0.1, 0.2, 0.05, 0.1), 3)]),
+        RecordedFrame(0.033, [RecordedDetection("car", 0.75, (0.5, 0.5, 0.1, 0.1), None)]),
+    ]
+    path = tmp_path / "det.jsonl"
+    write_detections(str(path), frames)
+    assert read_detections(str(path)) == frames
+
+
+def test_recorder_writes_replayable_frames(tmp_path):
+    path = tmp_path / "log.jsonl"
+    recorder = DetectionRecorder(str(path), stubs.HAILO_UNIQUE_ID)
+    recorder.write_frame([stubs.HailoDetection("person", 0.8, (0.1, 0.1, 0.2, 0.2), 7)])
+    recorder.write_frame([])
+    recorder.close()
+    frames = read_detections(str(path))
+    assert len(frames) == 2
+    assert frames[0].detections == [RecordedDetection("person", 0.8, (0.1, 0.1, 0.2, 0.2), 7)]
+
+
+def test_bad_record_names_the_line(tmp_path):
+    path = tmp_path / "bad.jsonl"
+    path.write_text('{"t": 0, "detections": []}\n{"detections": []}\n')
+    with pytest.raises(ValueError, match=":2:"):
+        read_detections(str(path))
+
+
+def test_replay_drives_the_callback(harness):
+    import main
+
+    frames, fixes = synthesize(10, fps=10, tracks=4)
+    real_time = main.time
+    report = harness.run_replay(frames, fixes, epoch=1_700_000_000.0)
+    assert main.time is real_time
+    assert report["frames"] == 100
+    assert report["detections_in"] == sum(len(f.detections) for f in frames)
+    lora = report["lora"]
+    assert 0 < lora["detections"] == report["detections_stored"] - report["pending_at_end"]
+    assert lora["tracks"] >= 4
+    assert report["first_report"]["first_reports"] >= 4
+    assert {"callback", "gps", "roi", "detections", "transmit"} <= set(report["stages"])
+    assert report["stages"]["callback"]["count"] == 100
+
+
+def test_replay_paces_with_speed(harness):
+    frames, fixes = synthesize(1, fps=10, tracks=1)
+    start = time.perf_counter()
+    harness.run_replay(frames, fixes, speed=10.0)
+    assert time.perf_counter() - start >= 0.09
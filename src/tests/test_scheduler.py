@@ -0,0 +1,113 @@
+# tests/test_scheduler.py
+import threading
+import time
+
+from core.transmitter.scheduler import TxScheduler
+
+
+def test_submit_never_blocks_and_counts_drops():
+    tx = TxScheduler(lambda payload: None, max_queue=2)     # not started: nothing is consumed
+    t0 = time.monotonic()
+    assert tx.submit(b"a")
+    assert tx.submit(b"b")
+    assert not tx.submit(b"c")
+    assert time.monotonic() - t0 < 0.1
+    stats = tx.stats()
+    assert stats["queue_depth"] == 2
+    assert stats["enqueued"] == 2
+    assert stats["dropped"] == 1
+
+
+def test_lowest_priority_first_then_fifo():
+    sent = []
+    tx = TxScheduler(sent.append)
+    for payload, priority in ((b"low-1", 5), (b"high-1", 0), (b"low-2", 5), (b"high-2", 0), (b"mid", 1)):
+        tx.submit(payload, priority)
+    tx.start()
+    assert tx.stop(drain=True, timeout=2.0)
+    assert sent == [b"high-1", b"high-2", b"mid", b"low-1", b"low-2"]
+
+
+def test_stop_with_drain_sends_everything_within_timeout():
+    sent = []
+
+    def send(payload):
+        time.sleep(0.01)
+        sent.append(payload)
+
+    tx = TxScheduler(send)
+    tx.start()
+    for i in range(10):
+        tx.submit(i)
+    assert tx.stop(drain=True, timeout=2.0)
+    assert sent == list(range(10))
+    assert tx.stats()["sent"] == 10
+
+
+def test_stop_without_drain_discards_the_queue():
+    sending = threading.Event()
+    release = threading.Event()
+    sent = []
+
+    def send(payload):
+        sending.set()
+        release.wait(2.0)
+        sent.append(payload)
+
+    tx = TxScheduler(send)
+    tx.start()
+    tx.submit(0)
+    assert sending.wait(2.0)            # the worker holds payload 0
+    for i in range(1, 5):
+        tx.submit(i)
+    release.set()
+    assert tx.stop(drain=False, timeout=2.0)
+    assert sent == [0]
+    stats = tx.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["dropped"] == 4
+
+
+def test_stop_reports_a_worker_that_does_not_finish():
+    release = threading.Event()
+    tx = TxScheduler(lambda payload: release.wait(2.0))
+    tx.start()
+    tx.submit(b"slow")
+    time.sleep(0.05)
+    assert not tx.stop(drain=True, timeout=0.05)
+    release.set()
+
+
+def test_stats_count_failures_and_latency():
+    def send(payload):
+        if payload == b"bad":
+            raise OSError("radio busy")
+        time.sleep(0.02)
+
+    tx = TxScheduler(send)
+    tx.submit(b"ok")
+    tx.submit(b"bad")
+    tx.start()
+    assert tx.stop(drain=True, timeout=2.0)
+    stats = tx.stats()
+    assert stats["sent"] == 1
+    assert stats["failed"] == 1
+    assert stats["enqueued"] == 2
+    assert stats["latency_ms_max"] >= stats["latency_ms_mean"] > 0
+
+
+def test_on_idle_runs_when_the_queue_empties():
+    idle = threading.Event()
+    calls = []
+
+    def on_idle():
+        calls.append(tx.queue_depth)
+        idle.set()
+
+    tx = TxScheduler(lambda payload: None, on_idle=on_idle)
+    for i in range(3):
+        tx.submit(i)
+    tx.start()
+    assert idle.wait(2.0)
+    assert tx.stop(drain=True, timeout=2.0)
+    assert calls == [0]                 # once, after the batch, not after every payload
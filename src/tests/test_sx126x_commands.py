@@ -0,0 +1,101 @@
+# tests/test_sx126x_commands.py
+import time
+
+from benchmarks._reference import LegacySX126x, make_radio, send
+from core.transmitter.SX126x import SX126x
+from core.transmitter.mock_bus import MockGpio, MockSpiDev
+
+PAYLOAD = bytes(range(40))
+FIX_OPCODES = (0x11, 0x1D)      # GetPacketType and ReadRegister from the BW500 workaround
+
+
+def packet_frames(cls, packets=2):
+    radio, spi, _ = make_radio(cls)
+    frames = []
+    for _ in range(packets):
+        spi.log = []
+        send(radio, PAYLOAD)
+        frames.append(spi.log)
+    return frames
+
+
+def test_first_packet_matches_legacy_traffic():
+    assert packet_frames(SX126x)[0] == packet_frames(LegacySX126x)[0]
+
+
+def test_workaround_is_not_repeated():
+    legacy = packet_frames(LegacySX126x)[1]
+    queued = packet_frames(SX126x)[1]
+    fix_write = bytes((0x0D, (SX126x.REG_TX_MODULATION >> 8) & 0xFF, SX126x.REG_TX_MODULATION & 0xFF))
+    expected = [f for f in legacy if f[0] not in FIX_OPCODES and not f.startswith(fix_write)]
+    assert queued == expected
+    assert len(queued) == len(legacy) - 3
+
+
+def test_payload_reaches_buffer_in_one_frame():
+    frames = packet_frames(SX126x, packets=1)[0]
+    writes = [f for f in frames if f[0] == 0x0E]
+    assert writes == [b"\x0e\x00" + PAYLOAD]
+
+
+def test_read_flushes_queued_writes_first():
+    radio, spi, _ = make_radio(SX126x)
+    spi.log = []
+    radio.beginCommands()
+    radio.setStandby(SX126x.STANDBY_RC)
+    radio.setPacketType(SX126x.LORA_MODEM)
+    assert spi.log == []
+    radio.getStatus()
+    assert [f[0] for f in spi.log] == [0x80, 0x8A, 0xC0]
+    # still queueing after the read
+    radio.setStandby(SX126x.STANDBY_RC)
+    assert len(spi.log) == 3
+    radio.flushCommands()
+    assert len(spi.log) == 4
+
+
+def test_queued_commands_wait_for_busy():
+    class BusyGpio(MockGpio):
+        busy_pin = None
+        busy_reads = 0
+
+        def gpio_read(self, handle, pin):
+            if pin == self.busy_pin and self.busy_reads:
+                self.busy_reads -= 1
+                return 1
+            return super().gpio_read(handle, pin)
+
+    gpio = BusyGpio()
+    radio, spi, _ = make_radio(SX126x, gpio=gpio)
+    gpio.busy_pin = radio._busy
+    spi.log = []
+    radio.beginCommands()
+    radio.setStandby(SX126x.STANDBY_RC)
+    radio.setPacketType(SX126x.LORA_MODEM)
+    gpio.busy_reads = 3
+    radio.flushCommands()
+    assert gpio.busy_reads == 0
+    assert [f[0] for f in spi.log] == [0x80, 0x8A]
+
+
+def test_writes_reuse_frame():
+    radio, spi, _ = make_radio(SX126x, spi=MockSpiDev())
+    frame = radio._frame
+    radio.setStandby(SX126x.STANDBY_RC)
+    radio.writeBuffer(0, PAYLOAD, len(PAYLOAD))
+    assert radio._frame is frame and len(frame) == SX126x._FRAME_SIZE
+
+
+def test_transmit_time_starts_after_the_flush():
+    class SlowSpiDev(MockSpiDev):
+        set_tx_at = None
+
+        def _record(self, values):
+            time.sleep(0.005)       # every frame takes a while to clock out
+            super()._record(values)
+            if values[0] == 0x83:   # SetTx
+                self.set_tx_at = time.time()
+
+    radio, spi, _ = make_radio(SX126x, spi=SlowSpiDev())
+    send(radio, PAYLOAD)
+    assert radio._transmitTime >= spi.set_tx_at
@@ -0,0 +1,82 @@
+# tests/test_sx126x_emulator.py
+import time
+
+import pytest
+
+from benchmarks.bench_lora_pipeline import IRQ_PIN, make_radio
+from constants import LORA_CFG
+from core.transmitter.SX126x import SX126x
+from core.transmitter.airtime import time_on_air_from_config
+from core.transmitter.bus import open_bus
+from core.transmitter.emulator import SX126xEmulator
+
+PAYLOAD = bytes(range(40))
+
+
+def transmit(radio, payload=PAYLOAD):
+    radio.beginPacket()
+    radio.put(payload)
+    radio.endPacket()
+    return radio.wait(2)
+
+
+@pytest.mark.parametrize("irq_pin", [-1, IRQ_PIN])
+def test_tx_takes_time_on_air(irq_pin):
+    radio, chip = make_radio(irq_pin)
+    toa = time_on_air_from_config(LORA_CFG, len(PAYLOAD)) / 1000
+    start = time.monotonic()
+    assert transmit(radio)
+    assert time.monotonic() - start >= toa
+    assert radio.status() == SX126x.STATUS_TX_DONE
+    assert chip.transmitted == [PAYLOAD]
+
+
+def test_payloads_wrap_around_the_buffer():
+    radio, chip = make_radio()
+    chip.time_scale = 0.0
+    payloads = [bytes([i]) * 60 for i in range(6)]     # 360 bytes, past the end of the 256 byte buffer
+    for p in payloads:
+        assert transmit(radio, p)
+    assert chip.transmitted == payloads
+
+
+@pytest.mark.parametrize("irq_pin", [-1, IRQ_PIN])
+def test_receive_injected_packet(irq_pin):
+    radio, chip = make_radio(irq_pin)
+    chip.inject(b"ack", rssi=-80.0, snr=6.0)
+    assert radio.request(SX126x.RX_SINGLE)
+    assert radio.wait(2)
+    assert radio.status() == SX126x.STATUS_RX_DONE
+    assert bytes(radio.read(radio.available())) == b"ack"
+    assert radio.packetRssi() == -80.0
+    assert radio.snr() == 6.0
+
+
+def test_rx_timeout():
+    radio, chip = make_radio()
+    assert radio.request(20)
+    assert radio.wait(2)
+    assert radio.status() == SX126x.STATUS_RX_TIMEOUT
+
+
+def test_sync_word_register():
+    radio, chip = make_radio()
+    radio.setSyncWord(0x34)
+    assert radio.readRegister(SX126x.REG_LORA_SYNC_WORD_MSB, 2) == (0x34, 0x44)
+    radio.setSyncWord(0x1424)
+    assert radio.readRegister(SX126x.REG_LORA_SYNC_WORD_MSB, 2) == (0x14, 0x24)
+
+
+def test_busy_after_reset():
+    chip = SX126xEmulator()
+    chip.gpio.gpio_write(0, chip.reset_pin, 0)
+    chip.gpio.gpio_write(0, chip.reset_pin, 1)
+    assert chip.gpio.gpio_read(0, chip.busy_pin) == 1
+
+
+def test_open_bus_selects_backend():
+    assert open_bus({"backend": "hardware"}) == (None, None)
+    spi, gpio = open_bus(dict(LORA_CFG, backend="emulator"))
+    assert isinstance(spi.chip, SX126xEmulator)
+    with pytest.raises(ValueError):
+        open_bus({"backend": "carrier-pigeon"})
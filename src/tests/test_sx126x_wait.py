@@ -0,0 +1,57 @@
+# tests/test_sx126x_wait.py
+import time
+
+import pytest
+
+from benchmarks.bench_lora_wait import IRQ_PIN, make_radio
+from core.transmitter.SX126x import SX126x
+
+TX_TIME = 0.05
+
+
+def transmit(radio, timeout=0):
+    radio.beginPacket()
+    radio.put(bytes(16))
+    radio.endPacket()
+    return radio.wait(timeout)
+
+
+@pytest.mark.parametrize("irq_pin", [-1, IRQ_PIN])
+def test_wait_returns_after_tx_done(irq_pin):
+    radio, spi = make_radio(SX126x, irq_pin, TX_TIME)
+    start = time.monotonic()
+    assert transmit(radio)
+    assert time.monotonic() - start >= TX_TIME
+    assert radio.status() == SX126x.STATUS_TX_DONE
+
+
+@pytest.mark.parametrize("irq_pin", [-1, IRQ_PIN])
+def test_wait_times_out(irq_pin):
+    radio, spi = make_radio(SX126x, irq_pin, 1.0)
+    start = time.monotonic()
+    assert not transmit(radio, timeout=0.05)
+    assert time.monotonic() - start < 0.5
+
+
+def test_polling_sleeps_through_time_on_air():
+    radio, spi = make_radio(SX126x, -1, TX_TIME)
+    polls = []
+    get_irq = radio.getIrqStatus
+
+    def counting():
+        polls.append(time.monotonic())
+        return get_irq()
+
+    radio.getIrqStatus = counting
+    transmit(radio)
+    # one symbol at SF7/125 kHz is ~1 ms, so only the tail of the transmission is polled
+    assert len(polls) < 10
+
+
+def test_irq_handler_registered_once():
+    radio, spi = make_radio(SX126x, IRQ_PIN, 0.0)
+    transmit(radio)
+    first = spi.gpio.callbacks[IRQ_PIN]
+    for _ in range(3):
+        transmit(radio)
+    assert spi.gpio.callbacks[IRQ_PIN] is first
@@ -0,0 +1,53 @@
+# tests/test_tiling.py
+import pytest
+
+from core.vision.hailo_apps_infra.gstreamer_helper_pipelines import TILE_CROPPER_PIPELINE, TILED_INFERENCE_PIPELINE
+from core.vision.tiling import grid_plan, plan_tiles, tile_fraction
+
+
+def test_tile_fraction_covers_the_frame():
+    for tiles, overlap in ((1, 0.0), (3, 0.08), (5, 0.2)):
+        w = tile_fraction(tiles, overlap)
+        assert tiles * w - (tiles - 1) * overlap * w == pytest.approx(1.0)
+
+
+def test_single_pass_when_people_are_big_enough():
+    plan = plan_tiles(10, 1920, 1080, 66)
+    assert (plan.tiles_x, plan.tiles_y) == (1, 1) and plan.person_px >= 16
+
+
+def test_more_tiles_with_elevation_and_resolution():
+    low, high = plan_tiles(20, 1920, 1080, 66), plan_tiles(60, 1920, 1080, 66)
+    assert high.tiles > low.tiles
+    assert plan_tiles(60, 3840, 2160, 66).tiles > high.tiles
+
+
+def test_tiles_never_narrower_than_the_network_input():
+    for elevation in (20, 60, 200):
+        for width, height in ((1280, 720), (1920, 1080), (3840, 2160)):
+            plan = plan_tiles(elevation, width, height, 66)
+            assert plan.tiles == 1 or plan.tile_width_px >= 640
+            assert plan.tiles <= 16
+    assert plan_tiles(200, 1280, 720, 66).tiles_x == 2         # 720p cannot do better than two columns
+
+
+def test_tiles_about_square_and_overlap_covers_a_person():
+    plan = plan_tiles(60, 1920, 1080, 66)
+    assert 0.7 < plan.tile_width_px / plan.tile_height_px < 1.4
+    person_frame_px = 0.5 * 1920 / (2 * 60 * 0.6494)       # tan(33 deg)
+    assert plan.overlap_x * plan.tile_width_px >= person_frame_px
+
+
+def test_fixed_grid_counts_upscaling_as_no_gain():
+    fine = grid_plan(4, 3, 60, 1920, 1080, 66)             # 511 px tiles, upscaled to 640
+    assert fine.person_px == pytest.approx(0.5 * 1920 / (2 * 60 * 0.6494), rel=1e-3)
+
+
+def test_tiled_pipeline_string():
+    s = TILED_INFERENCE_PIPELINE("INNER", 3, 2, 0.1, 0.08, batch_size=16)
+    assert s.startswith("queue name=tile_input_q ")
+    assert "tiles-along-x-axis=3 tiles-along-y-axis=2 overlap-x-axis=0.1 overlap-y-axis=0.08" in s
+    assert "! INNER ! agg. agg. ! queue name=tile_output_q" in s
+    # a batch of 16 spans three frames of 6 tiles: the bypass queue must hold them
+    assert "queue name=tile_bypass_q leaky=no max-size-buffers=5 " in s
+    assert "max-size-buffers=3 " in TILE_CROPPER_PIPELINE()
@@ -0,0 +1,77 @@
+# tests/test_tracer_stats.py
+import pytest
+
+from core.vision.tracer_stats import TracerStats, benchmark_report, parse_record, parse_time_ns, tracer_environment
+
+PREFIX = "0:00:02.512345678 41230 0x7f1c000b70 TRACE             GST_TRACER :0:: "
+
+LATENCY = (PREFIX + "latency, src-element-id=(string)0x55d0, src-element=(string)source, src=(string)src, "
+           "sink-element-id=(string)0x55e0, sink-element=(string)hailo_display, sink=(string)sink, "
+           "time=(guint64){ns}, ts=(guint64)2512000000;")
+ELEMENT = (PREFIX + "element-latency, element-id=(string)0x55f0, element=(string){name}, src=(string)src, "
+           "time=(guint64){ns}, ts=(guint64)2512000000;")
+INTERLATENCY = PREFIX + "interlatency, from_pad=(string)source_src, to_pad=(string)identity_callback_src, time=(string){t};"
+PROCTIME = PREFIX + "proctime, element=(string)inference_hailonet, time=(string){t};"
+
+
+def test_parse_records():
+    assert parse_record(LATENCY.format(ns=41_000_000)) == ("pipeline", "source->hailo_display", 41_000_000)
+    assert parse_record(ELEMENT.format(name="inference_hailonet", ns=8_211_840)) == \
+        ("element", "inference_hailonet", 8_211_840)
+    assert parse_record(INTERLATENCY.format(t="0:00:00.012345678")) == \
+        ("interlatency", "source_src->identity_callback_src", 12_345_678)
+    assert parse_record(PROCTIME.format(t="0:00:00.0021")) == ("proctime", "inference_hailonet", 2_100_000)
+
+
+def test_other_lines_are_ignored():
+    assert parse_record("0:00:00.1 1 0x1 INFO GST_INIT gst.c:598:init_pre: Initializing GStreamer Core Library") is None
+    assert parse_record(PREFIX + "rusage, thread-id=(guint64)1, ts=(guint64)2, average-cpuload=(uint)10;") is None
+    # GST_CLOCK_TIME_NONE and truncated records
+    assert parse_record(ELEMENT.format(name="q", ns=2**64 - 1)) is None
+    assert parse_record(PREFIX + "element-latency, element=(string)q, src=(string)src") is None
+
+
+@pytest.mark.parametrize("kind,value,ns", [
+    ("guint64", "1500", 1500),
+    ("string", "1:02:03.000000004", (3723 * 10**9) + 4),
+    ("string", "99:99:99", None),
+    ("guint64", "n/a", None),
+])
+def test_parse_time(kind, value, ns):
+    assert parse_time_ns(kind, value) == ns
+
+
+def test_stats_per_element(tmp_path):
+    log = tmp_path / "tracer.log"
+    lines = [ELEMENT.format(name="inference_hailonet", ns=ms * 1_000_000) for ms in range(1, 101)]
+    lines += [ELEMENT.format(name="source_scale_q", ns=200_000)] * 10
+    lines.append("0:00:00.1 1 0x1 DEBUG GST_PADS gstpad.c:1: not a tracer record")
+    log.write_text("\n".join(lines) + "\n")
+
+    stats = TracerStats()
+    assert stats.add_file(str(log)) == 110
+    assert stats.add_file(str(tmp_path / "missing.log")) == 0
+    element = stats.summary()["element"]
+    hailonet = element["inference_hailonet"]
+    assert hailonet["count"] == 100
+    assert hailonet["p50_ms"] == pytest.approx(50, rel=0.04)
+    assert hailonet["p99_ms"] == pytest.approx(99, rel=0.04)
+    assert hailonet["max_ms"] == pytest.approx(100)
+    assert element["source_scale_q"]["mean_ms"] == pytest.approx(0.2)
+
+
+def test_tracer_environment_keeps_existing_debug_categories():
+    env = tracer_environment("/tmp/t.log", environ={"GST_DEBUG": "hailonet:3"})
+    assert env["GST_DEBUG"] == "hailonet:3,GST_TRACER:7"
+    assert env["GST_DEBUG_FILE"] == "/tmp/t.log"
+    assert "latency(flags=pipeline+element)" in env["GST_TRACERS"]
+    assert tracer_environment("/tmp/t.log", environ={})["GST_DEBUG"] == "GST_TRACER:7"
+
+
+def test_benchmark_report():
+    callback = {"count": 300, "mean_ms": 0.05, "p50_ms": 0.04, "p90_ms": 0.07, "p99_ms": 0.1, "max_ms": 0.3}
+    report = benchmark_report(301, 10.0, {"element": {}}, {"callback": callback}, input="example.mp4")
+    assert report["fps"] == 30.0                # 300 intervals between the first and last frame
+    assert report["callback"] == callback
+    assert report["input"] == "example.mp4"
+    assert benchmark_report(1, 0.0, {}, {})["fps"] == 0.0
@@ -0,0 +1,74 @@
+# tests/test_track_table.py
+import pytest
+
+from utils.track_table import TrackTable
+
+
+def test_get_put_roundtrip():
+    t = TrackTable(4, ttl_frames=10)
+    assert t.get(7, 0) is None
+    t.put(7, 45.0, -75.0, 0)
+    assert t.get(7, 5) == (45.0, -75.0)
+    assert 7 in t and len(t) == 1
+
+
+def test_sighting_refreshes_ttl():
+    t = TrackTable(4, ttl_frames=10)
+    t.put(7, 45.0, -75.0, 0)
+    assert t.get(7, 10) is not None     # seen at frame 10 ...
+    assert t.get(7, 20) is not None     # ... so still alive 10 frames later
+    assert t.get(7, 31) is None
+    assert t.stats()["evicted_ttl"] == 1 and len(t) == 0
+
+
+def test_expire_evicts_stale_tracks():
+    t = TrackTable(8, ttl_frames=5)
+    for i in range(4):
+        t.put(i, 45.0, -75.0, i)
+    assert sorted(t.expire(8)) == [0, 1, 2]
+    assert len(t) == 1 and 3 in t
+
+
+def test_full_table_evicts_least_recently_seen():
+    t = TrackTable(3, ttl_frames=100)
+    for i in range(3):
+        t.put(i, 45.0, -75.0, i)
+    t.get(0, 5)                         # 1 is now the least recently seen
+    assert t.put(9, 46.0, -76.0, 6) == [1]
+    assert 1 not in t and t.get(9, 6) == (46.0, -76.0)
+    assert t.stats()["evicted_lru"] == 1
+
+
+def test_full_table_prefers_expired_tracks():
+    t = TrackTable(2, ttl_frames=5)
+    t.put(1, 45.0, -75.0, 0)
+    t.put(2, 45.0, -75.0, 8)
+    assert t.put(3, 45.0, -75.0, 9) == [1]
+    assert t.stats()["evicted_lru"] == 0
+
+
+def test_snapshot_is_a_copy_most_recent_first():
+    t = TrackTable(4, ttl_frames=10)
+    t.put(1, 45.0, -75.0, 0)
+    t.put(2, 46.0, -76.0, 3)
+    snap = t.snapshot()
+    assert snap["id"].tolist() == [2, 1]
+    assert snap["lat"].tolist() == [46.0, 45.0]
+    snap["lat"][:] = 0.0
+    assert t.get(1, 4) == (45.0, -75.0)
+
+
+def test_memory_is_fixed():
+    t = TrackTable(16, ttl_frames=2)
+    size = t.nbytes()
+    for frame in range(1000):
+        t.put(frame, 45.0, -75.0, frame)
+    assert len(t) <= 16
+    assert t.nbytes() <= size + 1024
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        TrackTable(0, 1)
+    with pytest.raises(ValueError):
+        TrackTable(1, -1)
@@ -0,0 +1,98 @@
+import math
+
+import numpy as np
+
+from utils.distance_utils import haversine_m
+
+EARTH_RADIUS_M = 6371000.0
+
+# Grid cells are made a hair larger than the dedup radius so that rounding in the
+# projection can never push a true neighbour two cells away.
+_CELL_MARGIN = 1.0 + 1e-6
+
+
+def group_keys(*columns) -> np.ndarray:
+    """Collapse one or more integer key columns into a single dense group id per row."""
+    if len(columns) == 1:
+        return np.asarray(columns[0])
+    stacked = np.column_stack([np.asarray(c, dtype=np.int64) for c in columns])
+    _, inverse = np.unique(stacked, axis=0, return_inverse=True)
+    return inverse.reshape(-1)
+
+
+def project_enu(lat, lon):
+    """
+    Project lat/lon (degrees) onto the local east/north tangent plane at the batch centre.
+
+    Points are placed on the sphere used by haversine_m and orthogonally projected onto
+    the plane, so planar distance <= chord <= great-circle distance for every pair.
+    """
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    lmb = np.radians(np.asarray(lon, dtype=np.float64))
+    phi0 = float(np.mean(phi))
+    lmb0 = float(np.mean(lmb))
+
+    cos_phi = np.cos(phi)
+    x = cos_phi * np.cos(lmb)
+    y = cos_phi * np.sin(lmb)
+    z = np.sin(phi)
+
+    sin_phi0, cos_phi0 = math.sin(phi0), math.cos(phi0)
+    sin_lmb0, cos_lmb0 = math.sin(lmb0), math.cos(lmb0)
+    east = EARTH_RADIUS_M * (-sin_lmb0 * x + cos_lmb0 * y)
+    north = EARTH_RADIUS_M * (-sin_phi0 * cos_lmb0 * x - sin_phi0 * sin_lmb0 * y + cos_phi0 * z)
+    return east, north
+
+
+def dedup_keep(ts, lat, lon, group, distance_m: float) -> np.ndarray:
+    """
+    Greedy spatial dedup of a detection batch.
+
+    Within each group, rows are visited in timestamp order and a row is kept unless it
+    lies closer than distance_m (haversine) to a row already kept in the same group.
+    Kept rows are bucketed into distance_m-sized cells on the local ENU plane, so each
+    row is only compared against kept rows in the 3x3 neighbouring cells.
+
+    Args:
+        ts, lat, lon: Per-row timestamp and position arrays.
+        group: Per-row integer group id (see group_keys).
+        distance_m: Dedup radius in meters.
+
+    Returns:
+        np.ndarray: Positions of the kept rows, in timestamp order.
+    """
+    ts = np.asarray(ts)
+    n = len(ts)
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    order = np.argsort(ts, kind="stable")
+    east, north = project_enu(lat, lon)
+    cell = distance_m * _CELL_MARGIN
+    cx = np.floor(east / cell).astype(np.int64).tolist()
+    cy = np.floor(north / cell).astype(np.int64).tolist()
+    groups = np.asarray(group).tolist()
+    lat_l = np.asarray(lat, dtype=np.float64).tolist()
+    lon_l = np.asarray(lon, dtype=np.float64).tolist()
+
+    kept_by_cell = {}
+    keep = []
+    for i in order.tolist():
+        g, x, y = groups[i], cx[i], cy[i]
+        la, lo = lat_l[i], lon_l[i]
+        too_close = False
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for k in kept_by_cell.get((g, x + dx, y + dy), ()):
+                    if haversine_m(la, lo, lat_l[k], lon_l[k]) < distance_m:
+                        too_close = True
+                        break
+                if too_close:
+                    break
+            if too_close:
+                break
+        if not too_close:
+            kept_by_cell.setdefault((g, x, y), []).append(i)
+            keep.append(i)
+
+    return np.asarray(keep, dtype=np.intp)
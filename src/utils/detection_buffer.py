@@ -0,0 +1,158 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+class PendingDetections(NamedTuple):
+    """Column arrays for the not-yet-sent rows, oldest first."""
+    slots: np.ndarray
+    seq: np.ndarray
+    ts: np.ndarray
+    label: np.ndarray
+    id: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    conf: np.ndarray
+
+    def __len__(self):
+        return len(self.slots)
+
+
+class DetectionRingBuffer:
+    """
+    Fixed-capacity, NumPy-backed detection store.
+
+    Rows are kept in preallocated columns (ts, label code, id, lat, lon, confidence, sent) and
+    written in a ring: appending is O(1), and once the buffer is full the oldest
+    row is overwritten. Rows older than max_age_sec are evicted from the tail,
+    which is amortised O(1) because timestamps are appended in order.
+
+    Every row gets a monotonically increasing sequence number so that a caller
+    holding slot indices from pending() can mark them sent later without
+    touching rows that were overwritten in the meantime.
+
+    A row is offered by pending() until it is marked sent, and then never again.
+    Retransmitting until the ground station acknowledges (ARQ) is done per frame
+    by core/transmitter/reliable.py; mark_acked() only records the delivery.
+    """
+
+    NO_ID = -1
+
+    def __init__(self, capacity: int, max_age_sec: float):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self.max_age_sec = float(max_age_sec)
+
+        self.ts = np.zeros(self.capacity, dtype=np.float64)
+        self.label = np.zeros(self.capacity, dtype=np.int16)
+        self.id = np.full(self.capacity, self.NO_ID, dtype=np.int64)
+        self.lat = np.zeros(self.capacity, dtype=np.float64)
+        self.lon = np.zeros(self.capacity, dtype=np.float64)
+        self.conf = np.zeros(self.capacity, dtype=np.float32)
+        self.sent = np.zeros(self.capacity, dtype=bool)
+        self.acked = np.zeros(self.capacity, dtype=bool)
+        self.seq = np.full(self.capacity, -1, dtype=np.int64)
+
+        self._head = 0      # next slot to write
+        self._size = 0      # number of live rows
+        self._next_seq = 0
+
+        # label string <-> small integer code
+        self._labels = []
+        self._label_codes = {}
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def appended(self) -> int:
+        """Rows appended since creation, including those since evicted or overwritten."""
+        return self._next_seq
+
+    @property
+    def _tail(self) -> int:
+        return (self._head - self._size) % self.capacity
+
+    # ------------- labels -------------
+    def label_code(self, label: str) -> int:
+        code = self._label_codes.get(label)
+        if code is None:
+            code = len(self._labels)
+            self._labels.append(label)
+            self._label_codes[label] = code
+        return code
+
+    def label_name(self, code: int) -> str:
+        return self._labels[code]
+
+    def label_names(self, codes) -> list:
+        return [self._labels[c] for c in codes]
+
+    # ------------- mutation -------------
+    def append(self, ts: float, label: str, track_id, lat: float, lon: float, conf: float = 1.0) -> int:
+        """Store one detection and evict rows older than max_age_sec. Returns the slot used."""
+        self.evict_older_than(ts - self.max_age_sec)
+
+        slot = self._head
+        self.ts[slot] = ts
+        self.label[slot] = self.label_code(label)
+        self.id[slot] = self.NO_ID if track_id is None else track_id
+        self.lat[slot] = lat
+        self.lon[slot] = lon
+        self.conf[slot] = conf
+        self.sent[slot] = False
+        self.acked[slot] = False
+        self.seq[slot] = self._next_seq
+        self._next_seq += 1
+
+        self._head = (slot + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        return slot
+
+    def evict_older_than(self, cutoff: float):
+        """Drop rows from the tail while their timestamp is before cutoff."""
+        while self._size and self.ts[self._tail] < cutoff:
+            self._size -= 1
+
+    def _still_valid(self, slots, seq) -> np.ndarray:
+        slots = np.asarray(slots, dtype=np.intp)
+        if slots.size == 0:
+            return slots
+        return slots[self.seq[slots] == np.asarray(seq, dtype=np.int64)]
+
+    def mark_sent(self, slots, seq):
+        """Flag rows as sent, skipping any slot that has since been overwritten."""
+        slots = self._still_valid(slots, seq)
+        self.sent[slots] = True
+
+    def mark_acked(self, slots, seq):
+        """Flag rows as received by the other end."""
+        slots = self._still_valid(slots, seq)
+        self.sent[slots] = True
+        self.acked[slots] = True
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    # ------------- views -------------
+    def live_slots(self) -> np.ndarray:
+        """Slot indices of live rows, oldest first."""
+        return (self._tail + np.arange(self._size)) % self.capacity
+
+    def pending(self) -> PendingDetections:
+        """Copies of the unsent rows, oldest first."""
+        slots = self.live_slots()
+        slots = slots[~self.sent[slots]]
+        return PendingDetections(
+            slots=slots,
+            seq=self.seq[slots],
+            ts=self.ts[slots],
+            label=self.label[slots],
+            id=self.id[slots],
+            lat=self.lat[slots],
+            lon=self.lon[slots],
+            conf=self.conf[slots],
+        )
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 def haversine_m(lat1, lon1, lat2, lon2):
     """Great-circle distance between two lat/lon points in meters."""
     R = 6371000.0
@@ -9,4 +11,14 @@ def haversine_m(lat1, lon1, lat2, lon2):
     dlmb = math.radians(lon2 - lon1)
     a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
\ No newline at end of file
+    return R * c
+
+def haversine_m_array(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Element-wise haversine_m over NumPy arrays (or scalars broadcast against them)."""
+    R = 6371000.0
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = np.radians(np.asarray(lon2, dtype=np.float64) - lon1)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return R * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
@@ -0,0 +1,131 @@
+"""
+Inference frame rate from flight state.
+
+Looking straight down from elevation h with field of view fov, the camera covers a
+footprint of L = 2 h tan(fov / 2) metres along its narrow side. At ground speed v,
+two inferred frames taken dt apart share a fraction 1 - v dt / L of that footprint,
+so keeping at least `overlap` of it shared needs
+
+    fps >= v / (L (1 - overlap))
+
+clamped to [min_fps, max_fps]. Hovering or flying high therefore needs few frames;
+flying fast and low needs the full camera rate. Without a usable fix the rate is
+max_fps, as if the controller were off.
+
+The rate goes up as soon as the target does, and down only after the target has
+stayed lower for hold_sec, so GPS noise does not make it oscillate.
+
+admit() is the per-frame gate: it spaces admitted frames 1/fps apart on average on
+the buffer timestamps and counts the frames it skips (frames the NPU never sees).
+"""
+import math
+import threading
+import time
+from typing import Optional
+
+
+class InferenceRateController:
+    """Chooses the inference rate from ground speed and elevation and gates frames to it."""
+
+    def __init__(self, fov_deg: float, overlap: float, min_fps: float, max_fps: float,
+                 min_elevation_m: float = 5.0, max_fix_age_sec: float = 2.0, hold_sec: float = 2.0,
+                 clock=time.monotonic):
+        """
+        Args:
+            fov_deg (float): Narrowest field of view of the (nadir) camera, degrees.
+            overlap (float): Fraction of the footprint consecutive inferred frames must share.
+            min_fps (float): Rate while hovering.
+            max_fps (float): Rate cap, normally the camera frame rate.
+            min_elevation_m (float): Elevation floor, so a missing or bad ground elevation
+                (0 m above ground) errs towards a high rate.
+            max_fix_age_sec (float): Older fixes fall back to max_fps.
+            hold_sec (float): Time the target must stay lower before the rate goes down.
+            clock: Monotonic clock (seconds), injectable for tests.
+        """
+        if not 0 < fov_deg < 180:
+            raise ValueError("fov_deg must be in (0, 180)")
+        if not 0 <= overlap < 1:
+            raise ValueError("overlap must be in [0, 1)")
+        if not 0 < min_fps <= max_fps:
+            raise ValueError("need 0 < min_fps <= max_fps")
+        self._footprint_per_m = 2 * math.tan(math.radians(fov_deg) / 2)
+        self.overlap = overlap
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.min_elevation_m = min_elevation_m
+        self.max_fix_age_sec = max_fix_age_sec
+        self.hold_sec = hold_sec
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.fps = max_fps
+        self._lower_since: Optional[float] = None
+        self._last_due: Optional[int] = None    # nominal PTS (ns) of the last admitted frame
+        self._last_pts = -1
+        self.admitted = 0
+        self.skipped = 0
+        self.changes = 0
+
+    def footprint_m(self, elevation: float) -> float:
+        return max(elevation, self.min_elevation_m) * self._footprint_per_m
+
+    def target_fps(self, speed: float, elevation: float) -> float:
+        """Rate keeping `overlap` of the footprint shared at speed (m/s) and elevation (m above ground)."""
+        fps = max(speed, 0.0) / (self.footprint_m(elevation) * (1 - self.overlap))
+        return min(max(fps, self.min_fps), self.max_fps)
+
+    def update(self, fix, age: float) -> float:
+        """
+        Re-derive the rate from a GPSManager fix and its age.
+
+        Returns:
+            float: The rate now in effect.
+        """
+        if fix.positioned and age <= self.max_fix_age_sec:
+            target = self.target_fps(fix.speed, fix.elevation)
+        else:
+            target = self.max_fps
+        now = self._clock()
+        with self._lock:
+            if target >= self.fps:
+                self._lower_since = None
+                self._set(target)
+            elif self._lower_since is None:
+                self._lower_since = now
+            elif now - self._lower_since >= self.hold_sec:
+                self._lower_since = None
+                self._set(target)
+            return self.fps
+
+    def _set(self, fps: float):
+        if fps != self.fps:
+            self.changes += 1
+            self.fps = fps
+
+    def admit(self, pts_ns: int) -> bool:
+        """Whether the frame with this PTS goes to inference; frames are spaced 1/fps apart on average."""
+        interval = int(1e9 / self.fps)
+        with self._lock:
+            restart = pts_ns < self._last_pts       # a seek or a restarted source
+            self._last_pts = pts_ns
+            if self.fps >= self.max_fps or self._last_due is None or restart:
+                self._last_due = pts_ns
+                self.admitted += 1
+                return True
+            due = self._last_due + interval
+            if pts_ns < due - interval // 4:         # tolerate timestamp jitter
+                self.skipped += 1
+                return False
+            # keep the nominal schedule, unless a gap or a rate increase left it an interval behind
+            self._last_due = due if pts_ns < due + interval else pts_ns
+            self.admitted += 1
+            return True
+
+    def stats(self) -> dict:
+        total = self.admitted + self.skipped
+        return {
+            "fps": round(self.fps, 2),
+            "admitted": self.admitted,
+            "skipped": self.skipped,
+            "saved": round(self.skipped / total, 3) if total else 0.0,
+            "changes": self.changes,
+        }
@@ -0,0 +1,361 @@
+"""
+Low-overhead in-process metrics: monotonic-clock spans, HDR-style latency histograms,
+counters and gauges, exported as a periodic log line or as Prometheus text over HTTP.
+
+Instrumented code uses the module-level METRICS registry:
+
+    with METRICS.span("gps"):
+        ...
+    METRICS.count("frames")
+
+While METRICS.enabled is False, span() returns a shared no-op context manager and
+count()/observe()/gauge() return after one attribute check, so the calls can stay in
+the per-frame path. The flag can be flipped at runtime: set_enabled(), the signal
+installed by install_toggle_signal(), or POST /enable and /disable on MetricsServer.
+"""
+import functools
+import logging
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Histogram:
+    """
+    Log-linear histogram of non-negative integers (microseconds for latencies), HDR style.
+
+    Values below 2**sub_bits are counted exactly; above that, each power-of-two range is
+    split into 2**(sub_bits - 1) equal buckets, so a reported quantile is within
+    2**-(sub_bits - 1) of the recorded value (about 3% with the default 6 bits).
+    Recording is O(1) and memory is fixed; values past 2**max_bits are clamped.
+    """
+
+    def __init__(self, sub_bits: int = 6, max_bits: int = 40):
+        if not 1 < sub_bits < max_bits:
+            raise ValueError("need 1 < sub_bits < max_bits")
+        self._sub_bits = sub_bits
+        self._max_value = (1 << max_bits) - 1
+        self.counts = [0] * (((max_bits - sub_bits) << (sub_bits - 1)) + (1 << sub_bits))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self._sub_bits
+        if shift <= 0:
+            return value
+        return (shift << (self._sub_bits - 1)) + (value >> shift)
+
+    def _bucket(self, index: int):
+        """Lowest value and width of bucket index."""
+        if index < 1 << self._sub_bits:
+            return index, 1
+        shift = (index >> (self._sub_bits - 1)) - 1
+        return (index - (shift << (self._sub_bits - 1))) << shift, 1 << shift
+
+    def record(self, value: int):
+        value = min(max(int(value), 0), self._max_value)
+        i = self._index(value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def quantiles(self, qs=QUANTILES) -> list:
+        """Value at each quantile (bucket midpoint, capped at the maximum recorded value)."""
+        with self._lock:
+            counts = np.array(self.counts, dtype=np.int64)
+            n, top = self.count, self.max
+        if not n:
+            return [0.0] * len(qs)
+        cum = np.cumsum(counts)
+        out = []
+        for q in qs:
+            i = int(np.searchsorted(cum, max(1, int(np.ceil(q * n)))))
+            low, width = self._bucket(i)
+            out.append(float(min(low + (width - 1) / 2, top)))
+        return out
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class _Span:
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.observe_us(self._name, (time.perf_counter_ns() - self._start) // 1000)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _key(name: str, labels: dict):
+    return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+
+def _labels_text(labels, extra=()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class Metrics:
+    """Registry of stage latency histograms (by stage name), counters and gauges."""
+
+    def __init__(self, enabled: bool = False, prefix: str = "tails_"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._hist = {}         # stage -> Histogram of microseconds
+        self._counters = {}     # (name, labels) -> int
+        self._gauges = {}       # (name, labels) -> float
+        self._collectors = []
+        self._last_counters = {}
+        self._last_summary = time.monotonic()
+
+    def set_enabled(self, enabled: bool):
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = bool(enabled)
+        logger.info(f"Metrics {'enabled' if self.enabled else 'disabled'}")
+
+    def reset(self):
+        with self._lock:
+            self._hist.clear()
+            self._counters.clear()
+            self._gauges.clear()
+            self._last_counters.clear()
+            self._last_summary = time.monotonic()
+
+    # ------------- recording -------------
+    def span(self, stage: str):
+        """Context manager timing a stage; a shared no-op while disabled."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def timed(self, stage: str):
+        """Decorator timing every call of a function as a stage."""
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Span(self, stage):
+                    return fn(*args, **kwargs)
+            return inner
+        return wrap
+
+    def observe(self, stage: str, seconds: float):
+        """Record a duration measured elsewhere."""
+        if self.enabled:
+            self.observe_us(stage, seconds * 1e6)
+
+    def observe_us(self, stage: str, micros):
+        hist = self._hist.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self._hist.setdefault(stage, Histogram())
+        hist.record(micros)
+
+    def count(self, name: str, n: int = 1, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def gauge(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[_key(name, labels)] = float(value)
+
+    def add_collector(self, collect):
+        """Register a callable run before every export, e.g. to sample queue depths into gauges."""
+        self._collectors.append(collect)
+
+    def remove_collector(self, collect):
+        if collect in self._collectors:
+            self._collectors.remove(collect)
+
+    def collect(self):
+        if not self.enabled:
+            return
+        for collect in list(self._collectors):
+            try:
+                collect(self)
+            except Exception:
+                logger.exception("Metrics collector failed")
+
+    # ------------- export -------------
+    def snapshot(self) -> dict:
+        """Plain-data view: stage -> {count, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}, counters, gauges."""
+        self.collect()
+        with self._lock:
+            hists = dict(self._hist)
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        stages = {}
+        for stage, h in sorted(hists.items()):
+            p50, p90, p99 = h.quantiles()
+            stages[stage] = {
+                "count": h.count, "mean_ms": h.mean() / 1000,
+                "p50_ms": p50 / 1000, "p90_ms": p90 / 1000, "p99_ms": p99 / 1000, "max_ms": h.max / 1000,
+            }
+        return {"enabled": self.enabled, "stages": stages, "counters": counters, "gauges": gauges}
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        snap = self.snapshot()
+        p = self.prefix
+        lines = [f"# TYPE {p}metrics_enabled gauge", f"{p}metrics_enabled {int(snap['enabled'])}"]
+        with self._lock:
+            hists = sorted(self._hist.items())
+        if hists:
+            lines.append(f"# TYPE {p}stage_latency_seconds summary")
+        for stage, h in hists:
+            label = (("stage", stage),)
+            for q, v in zip(QUANTILES, h.quantiles()):
+                lines.append(f"{p}stage_latency_seconds{_labels_text(label, (('quantile', q),))} {v / 1e6:.9g}")
+            lines.append(f"{p}stage_latency_seconds_sum{_labels_text(label)} {h.total / 1e6:.9g}")
+            lines.append(f"{p}stage_latency_seconds_count{_labels_text(label)} {h.count}")
+        for kind, values, suffix in (("counter", snap["counters"], "_total"), ("gauge", snap["gauges"], "")):
+            typed = set()
+            for (name, labels), v in sorted(values.items()):
+                full = f"{p}{name}{suffix}"
+                if full not in typed:
+                    lines.append(f"# TYPE {full} {kind}")
+                    typed.add(full)
+                lines.append(f"{full}{_labels_text(labels)} {v:.9g}")
+        return "\n".join(lines) + "\n"
+
+    def summary_line(self) -> str:
+        """One log line: counter rates since the previous summary, then stage p50/p99 and gauges."""
+        snap = self.snapshot()
+        now = time.monotonic()
+        with self._lock:
+            elapsed = max(now - self._last_summary, 1e-9)
+            last, self._last_counters = self._last_counters, dict(snap["counters"])
+            self._last_summary = now
+        parts = []
+        for (name, labels), v in sorted(snap["counters"].items()):
+            rate = (v - last.get((name, labels), 0)) / elapsed
+            parts.append(f"{name}{_labels_text(labels)}={rate:.1f}/s")
+        for stage, s in snap["stages"].items():
+            parts.append(f"{stage}={s['p50_ms']:.2f}/{s['p99_ms']:.2f}ms")
+        for (name, labels), v in sorted(snap["gauges"].items()):
+            parts.append(f"{name}{_labels_text(labels)}={v:g}")
+        return " ".join(parts)
+
+
+METRICS = Metrics()
+
+
+# ------------- exporters -------------
+class MetricsReporter:
+    """Daemon thread that logs METRICS.summary_line() every interval seconds while enabled."""
+
+    def __init__(self, metrics: Metrics, interval: float, log=logger):
+        self._metrics = metrics
+        self._interval = interval
+        self._log = log
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-log", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            if self._metrics.enabled:
+                self._log.info(f"[Metrics] {self._metrics.summary_line()}")
+
+
+class MetricsServer:
+    """
+    Local HTTP endpoint: GET /metrics returns Prometheus text, POST /enable and
+    POST /disable toggle collection.
+    """
+
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9108):
+        registry = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, code, body, ctype="text/plain; charset=utf-8"):
+                data = body.encode()
+                self.send_response(code)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    return self._reply(404, "not found\n")
+                self._reply(200, registry.render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+
+            def do_POST(self):
+                if self.path not in ("/enable", "/disable"):
+                    return self._reply(404, "not found\n")
+                registry.set_enabled(self.path == "/enable")
+                self._reply(200, f"enabled={int(registry.enabled)}\n")
+
+            def log_message(self, fmt, *args):
+                logger.debug("metrics http: " + fmt, *args)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def install_toggle_signal(metrics: Metrics, signum=signal.SIGUSR2):
+    """Flip metrics on/off when the process receives signum (e.g. `kill -USR2 <pid>`)."""
+    signal.signal(signum, lambda *_: metrics.set_enabled(not metrics.enabled))
@@ -0,0 +1,154 @@
+"""
+Value of pending detections for the LoRa link, so a busy scene spends its airtime
+on new tracks before re-sightings of tracks the ground station already knows.
+
+score = new_track * [track never reported]
+      + confidence * detector confidence
+      + moved * min(distance from the last reported position / moved_scale_m, 1)
+      - age * (seconds since the detection / max_age_sec)
+
+Detections without a track id are treated as new: nothing says they were reported.
+"""
+from collections import OrderedDict, deque
+from typing import NamedTuple
+
+import numpy as np
+
+from utils.distance_utils import haversine_m_array
+
+NO_ID = -1
+
+
+class PriorityWeights(NamedTuple):
+    new_track: float = 4.0
+    confidence: float = 1.0
+    moved: float = 2.0
+    age: float = 1.0
+
+
+def priority_scores(is_new, conf, moved_m, age_s, weights: PriorityWeights,
+                    moved_scale_m: float, max_age_sec: float) -> np.ndarray:
+    """Score per row (higher is sent first) from column arrays of equal length."""
+    moved = np.minimum(np.nan_to_num(np.asarray(moved_m, dtype=np.float64), nan=0.0, posinf=moved_scale_m)
+                       / moved_scale_m, 1.0)
+    return (
+        weights.new_track * np.asarray(is_new, dtype=np.float64)
+        + weights.confidence * np.asarray(conf, dtype=np.float64)
+        + weights.moved * moved
+        - weights.age * np.asarray(age_s, dtype=np.float64) / max_age_sec
+    )
+
+
+def order_by_priority(scores: np.ndarray, ts: np.ndarray) -> np.ndarray:
+    """Positions sorted by descending score, oldest first among equal scores."""
+    return np.lexsort((ts, -np.asarray(scores)))
+
+
+def chunks_by_priority(order: np.ndarray, ts: np.ndarray, per_frame: int):
+    """
+    Split positions in priority order into frame-sized chunks, highest value first.
+
+    Each chunk is re-sorted by timestamp, since FrameEncoder delta-encodes from the
+    frame's first detection.
+    """
+    for start in range(0, len(order), per_frame):
+        chunk = order[start:start + per_frame]
+        yield chunk[np.argsort(ts[chunk], kind="stable")]
+
+
+class ReportLog:
+    """
+    Last reported position of every track, and how long new tracks wait for their first report.
+
+    A track is reported when a frame carrying it is queued for transmission. A track is
+    forgotten by expire() once its latest stored detection is older than the store's
+    max age, since none of its rows can be pending any more; max_tracks is a hard cap
+    on top of that, dropping the least recently seen tracks.
+    """
+
+    def __init__(self, latency_samples: int = 1024, max_tracks: int = 4096):
+        self.max_tracks = max_tracks
+        self._seen_at = OrderedDict()   # track id -> ts of its latest stored detection, oldest first
+        self._last = {}                 # track id -> (lat, lon)
+        self._first_seen = {}           # track id -> ts of its first stored detection, until reported
+        self._latencies = deque(maxlen=latency_samples)
+        self.first_reports = 0
+        self.never_reported = 0
+
+    def __len__(self):
+        return len(self._seen_at)
+
+    def seen(self, track_id, ts: float):
+        """Record a stored detection; starts the first-report clock of a new track."""
+        if track_id is None:
+            return
+        self._seen_at[track_id] = ts
+        self._seen_at.move_to_end(track_id)
+        if track_id not in self._last:
+            self._first_seen.setdefault(track_id, ts)
+        if len(self._seen_at) > self.max_tracks:
+            self._forget(self._seen_at.popitem(last=False)[0])
+
+    def _forget(self, track_id):
+        self._last.pop(track_id, None)
+        if self._first_seen.pop(track_id, None) is not None:
+            self.never_reported += 1
+
+    def expire(self, cutoff: float) -> int:
+        """Forget tracks with no stored detection since cutoff. Returns how many were forgotten."""
+        n = 0
+        while self._seen_at:
+            track_id, ts = next(iter(self._seen_at.items()))
+            if ts >= cutoff:
+                break
+            del self._seen_at[track_id]
+            self._forget(track_id)
+            n += 1
+        return n
+
+    def is_new(self, ids: np.ndarray) -> np.ndarray:
+        return np.fromiter((i == NO_ID or i not in self._last for i in ids.tolist()), dtype=bool, count=len(ids))
+
+    def moved_m(self, ids: np.ndarray, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Distance from each row to its track's last reported position, inf for unreported tracks."""
+        prev = np.full((len(ids), 2), np.nan)
+        for row, i in enumerate(ids.tolist()):
+            p = self._last.get(i)
+            if p is not None:
+                prev[row] = p
+        moved = haversine_m_array(prev[:, 0], prev[:, 1], lat, lon)
+        return np.where(np.isnan(prev[:, 0]), np.inf, moved)
+
+    def reported(self, ids: np.ndarray, lat: np.ndarray, lon: np.ndarray, ts: float):
+        """Record rows as reported at time ts."""
+        for i, la, lo in zip(ids.tolist(), lat.tolist(), lon.tolist()):
+            if i == NO_ID:
+                continue
+            if i not in self._seen_at:
+                self._seen_at[i] = ts       # reported without seen(); still bounded by expire()
+            self._last[i] = (la, lo)
+            first = self._first_seen.pop(i, None)
+            if first is not None:
+                self._latencies.append(ts - first)
+                self.first_reports += 1
+
+    def stats(self) -> dict:
+        """Time-to-first-report of new tracks, in seconds, over the last latency_samples tracks."""
+        lat = np.fromiter(self._latencies, dtype=np.float64)
+        counts = {
+            "tracks": len(self._seen_at),
+            "first_reports": self.first_reports,
+            "waiting": len(self._first_seen),
+            "never_reported": self.never_reported,
+        }
+        if not len(lat):
+            return counts
+        p50, p95 = np.percentile(lat, (50, 95))
+        return {
+            **counts,
+            "ttfr_mean_s": float(lat.mean()),
+            "ttfr_p50_s": float(p50),
+            "ttfr_p95_s": float(p95),
+            "ttfr_max_s": float(lat.max()),
+        }
+
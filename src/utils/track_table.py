@@ -0,0 +1,140 @@
+"""
+Bounded last-location table for tracker IDs.
+
+hailotracker never reuses an ID: a track that goes unmatched for keep_tracked_frames
+becomes 'lost', and keep_lost_frames later it is removed for good. An entry that has
+not been seen for ttl_frames = keep_tracked_frames + keep_lost_frames frames can
+therefore never be looked up again and is evicted. When the table is full anyway
+(more live tracks than capacity), the least recently seen track is evicted.
+
+Rows live in preallocated NumPy columns; the only per-track Python object is the
+id -> slot index, which is bounded by the capacity.
+"""
+import sys
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+SNAPSHOT_DTYPE = np.dtype([
+    ("id", np.int64), ("lat", np.float64), ("lon", np.float64),
+    ("last_frame", np.int64), ("updated_frame", np.int64),
+])
+
+
+class TrackTable:
+    """Last recorded (lat, lon) per track id, evicted by frame TTL and LRU."""
+
+    FREE = -1
+
+    def __init__(self, capacity: int, ttl_frames: int):
+        """
+        Args:
+            capacity (int): Maximum number of tracks held.
+            ttl_frames (int): Frames without a sighting after which a track is evicted.
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if ttl_frames < 0:
+            raise ValueError("ttl_frames must be >= 0")
+        self.capacity = int(capacity)
+        self.ttl_frames = int(ttl_frames)
+
+        self.id = np.full(self.capacity, self.FREE, dtype=np.int64)
+        self.lat = np.zeros(self.capacity, dtype=np.float64)
+        self.lon = np.zeros(self.capacity, dtype=np.float64)
+        self.last_frame = np.zeros(self.capacity, dtype=np.int64)      # last sighting
+        self.updated_frame = np.zeros(self.capacity, dtype=np.int64)   # last location update
+
+        self._index = {}                                # track id -> slot
+        self._free = list(range(self.capacity - 1, -1, -1))
+        self.evicted_ttl = 0
+        self.evicted_lru = 0
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, track_id):
+        return track_id in self._index
+
+    def _expired(self, slot: int, frame: int) -> bool:
+        return frame - self.last_frame[slot] > self.ttl_frames
+
+    def _evict(self, slot: int):
+        del self._index[int(self.id[slot])]
+        self.id[slot] = self.FREE
+        self._free.append(slot)
+
+    def get(self, track_id, frame: int) -> Optional[Tuple[float, float]]:
+        """
+        Last location of track_id, or None if unknown or expired.
+
+        Counts as a sighting: the track's TTL restarts at frame.
+        """
+        slot = self._index.get(track_id)
+        if slot is None:
+            return None
+        if self._expired(slot, frame):
+            self._evict(slot)
+            self.evicted_ttl += 1
+            return None
+        self.last_frame[slot] = frame
+        return float(self.lat[slot]), float(self.lon[slot])
+
+    def put(self, track_id, lat: float, lon: float, frame: int) -> List[int]:
+        """
+        Set the location of track_id at frame.
+
+        Returns:
+            list: Track ids evicted to make room (expired ones first, then the least recently seen).
+        """
+        slot = self._index.get(track_id)
+        evicted = []
+        if slot is None:
+            if not self._free:
+                evicted = self.expire(frame)
+            if not self._free:
+                lru = int(np.argmin(self.last_frame))       # every slot is live here
+                evicted.append(int(self.id[lru]))
+                self._evict(lru)
+                self.evicted_lru += 1
+            slot = self._free.pop()
+            self._index[track_id] = slot
+            self.id[slot] = track_id
+        self.lat[slot] = lat
+        self.lon[slot] = lon
+        self.last_frame[slot] = frame
+        self.updated_frame[slot] = frame
+        return evicted
+
+    def expire(self, frame: int) -> List[int]:
+        """Evict every track not seen within ttl_frames of frame. Returns their ids."""
+        live = self.id != self.FREE
+        stale = np.flatnonzero(live & (frame - self.last_frame > self.ttl_frames))
+        ids = self.id[stale].tolist()
+        for slot in stale.tolist():
+            self._evict(slot)
+        self.evicted_ttl += len(ids)
+        return ids
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the table, index included."""
+        columns = self.id.nbytes + self.lat.nbytes + self.lon.nbytes + self.last_frame.nbytes + self.updated_frame.nbytes
+        return columns + sys.getsizeof(self._index) + sys.getsizeof(self._free)
+
+    def stats(self) -> dict:
+        return {
+            "tracks": len(self._index),
+            "capacity": self.capacity,
+            "evicted_ttl": self.evicted_ttl,
+            "evicted_lru": self.evicted_lru,
+            "bytes": self.nbytes(),
+        }
+
+    def snapshot(self) -> np.ndarray:
+        """Copy of the live rows as a structured array, most recently seen first (for debugging)."""
+        slots = np.flatnonzero(self.id != self.FREE)
+        slots = slots[np.argsort(-self.last_frame[slots], kind="stable")]
+        out = np.empty(len(slots), dtype=SNAPSHOT_DTYPE)
+        for name in SNAPSHOT_DTYPE.names:
+            out[name] = getattr(self, name)[slots]
+        return out